@@ -0,0 +1,87 @@
+"""Subscriber micro-batching benchmark on the dummy interface.
+
+Capture one dummy channel with single-sample frames, then measure how
+fast a CSV-writing consumer drains the subscriber with and without
+subscriber batching (``DStreamSubOpts.batch_rows/batch_latency``).
+
+Run with ``python benchmarks/bench_batching.py``.
+"""
+
+import argparse
+import csv
+import io
+import queue
+import time
+from typing import Any
+
+from nxslib.intf.dummy import DummyDev
+from nxslib.nxscope import NxscopeHandler
+from nxslib.proto.parse import Parser
+
+from nxscli.channelref import ChannelRef
+from nxscli.phandler import PluginHandler
+from nxscli.stream_queue import DStreamSubOpts
+
+
+def _consume(subq: "queue.Queue[Any]") -> tuple[int, int]:
+    writer = csv.writer(io.StringIO(), delimiter=" ")
+    rows = 0
+    payloads = 0
+    while True:
+        try:
+            data = subq.get(timeout=0.2)
+        except queue.Empty:
+            return rows, payloads
+        payloads += 1
+        for block in data:
+            writer.writerows(block.data.tolist())
+            rows += int(block.data.shape[0])
+
+
+def bench(
+    chan: int, duration: float, opts: DStreamSubOpts | None
+) -> tuple[float, int, int]:
+    """Capture for ``duration`` then drain the subscriber.
+
+    Return consumer ``(rows/s, rows, payloads)``.
+    """
+    intf = DummyDev(stream_sleep=0.0001, stream_snum=1)
+    nxs = NxscopeHandler(intf, Parser(), stream_decode_mode="numpy")
+    with PluginHandler() as phandler:
+        phandler.nxscope_connect(nxs)
+        phandler.channels_configure([ChannelRef.physical(chan)])
+        subq = phandler.stream_sub(ChannelRef.physical(chan), opts)
+        phandler.stream_start()
+        time.sleep(duration)
+        phandler.stream_stop()
+
+        start = time.perf_counter()
+        rows, payloads = _consume(subq)
+        # exclude the final empty-queue timeout
+        elapsed = time.perf_counter() - start - 0.2
+        phandler.stream_unsub(subq)
+    return rows / elapsed, rows, payloads
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--chan", type=int, default=0)
+    args = parser.parse_args()
+
+    cases = {
+        "unbatched": None,
+        "batch_10ms": DStreamSubOpts(batch_latency=0.01),
+        "batch_4096_50ms": DStreamSubOpts(batch_rows=4096, batch_latency=0.05),
+    }
+    for name, opts in cases.items():
+        rate, rows, payloads = bench(args.chan, args.duration, opts)
+        print(
+            f"{name:16s} consumer_rows_s={rate:.0f} "
+            f"rows={rows} payloads={payloads}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Capture file compression benchmark.
+
+Write a slowly varying channel through the background file writer with
+each available codec. Report the compression ratio, the compression CPU
+cost, the time spent in ``write()`` by the capture thread and the time
+to drain all buffers on close.
+
+Run with ``python benchmarks/bench_codec.py``.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from nxscli.codec import CODECS
+from nxscli.filewriter import DFileWriterOpts, FileWriter
+
+
+def _signal(rows: int, dtype: str) -> np.ndarray:
+    """Get a slowly varying signal with a little noise."""
+    rng = np.random.default_rng(0)
+    t = np.arange(rows)
+    data = 1000 * np.sin(2 * np.pi * t / 20000) + rng.normal(0, 2, rows)
+    return data.astype(dtype).reshape(-1, 1)
+
+
+def bench(
+    codec: str | None, data: np.ndarray, block: int, workers: int
+) -> tuple[float, float, float, float]:
+    """Return ratio, CPU s/MB, capture s/MB and close time in seconds."""
+    opts = DFileWriterOpts(flush_interval=0, codec=codec, workers=workers)
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = FileWriter(os.path.join(tmp, "data.bin"), opts)
+        spent = 0.0
+        for i in range(0, data.shape[0], block):
+            start = time.perf_counter()
+            writer.write(data[i : i + block])
+            spent += time.perf_counter() - start
+        start = time.perf_counter()
+        writer.close()
+        drain = time.perf_counter() - start
+    stats = writer.stats()
+    mbytes = data.nbytes / 1e6
+    ratio = cpu = 0.0
+    if stats.codec is not None:
+        ratio = stats.codec.ratio
+        cpu = stats.codec.cpu_time / mbytes
+    return ratio, cpu, spent / mbytes, drain
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=4_000_000)
+    parser.add_argument("--block", type=int, default=4096)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    for dtype in ("int16", "float32"):
+        data = _signal(args.rows, dtype)
+        for codec in [None] + sorted(CODECS):
+            ratio, cpu, spent, drain = bench(
+                codec, data, args.block, args.workers
+            )
+            print(
+                f"dtype={dtype:7s} codec={str(codec):5s} "
+                f"ratio={ratio:6.2f} cpu_s_per_mb={cpu:7.4f} "
+                f"capture_s_per_mb={spent:7.5f} close_s={drain:6.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""CSV capture encoder benchmark.
+
+Compare the block encoder of the ``pcsv`` plugin with the previous
+row by row ``csv.writer`` encoder, for several block data types, vector
+dimensions and metadata formats. Rows/s are the best of ``--repeat``
+runs, the output of both encoders must be the same.
+
+Run with ``python benchmarks/bench_csv.py``.
+"""
+
+import argparse
+import csv
+import io
+import time
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+from nxscli.csvfile import csv_block
+
+
+def _legacy(
+    out: io.StringIO,
+    data: np.ndarray[Any, Any],
+    meta: np.ndarray[Any, Any] | None,
+    metastr: bool,
+) -> None:
+    """Encode a block as the plugin did before the block encoder."""
+    writer = csv.writer(
+        out,
+        delimiter=" ",
+        quotechar="|",
+        escapechar="\\",
+        quoting=csv.QUOTE_MINIMAL,
+    )
+    data_rows = (tuple(row) for row in data)
+    meta_rows: Any
+    if meta is None:
+        meta_rows = (() for _ in range(data.shape[0]))
+    elif metastr:
+        meta_rows = (mrow.tobytes().decode() for mrow in meta.astype(np.uint8))
+    else:
+        meta_rows = (tuple(mrow) for mrow in meta)
+    writer.writerows(zip(data_rows, meta_rows))
+
+
+def _block(
+    out: io.StringIO,
+    data: np.ndarray[Any, Any],
+    meta: np.ndarray[Any, Any] | None,
+    metastr: bool,
+) -> None:
+    out.write(csv_block(data, meta, metastr))
+
+
+def _blocks(
+    dtype: str, vdim: int, meta: str, rows: int, count: int
+) -> list[tuple[np.ndarray[Any, Any], np.ndarray[Any, Any] | None]]:
+    rng = np.random.default_rng(0)
+    ret = []
+    for _ in range(count):
+        data = (rng.standard_normal((rows, vdim)) * 100).astype(dtype)
+        mdata = None
+        if meta == "tuple":
+            mdata = rng.integers(0, 255, (rows, 1)).astype(np.uint8)
+        elif meta == "str":
+            mdata = rng.integers(97, 123, (rows, 8)).astype(np.uint8)
+        ret.append((data, mdata))
+    return ret
+
+
+def bench(
+    encode: Callable[..., None],
+    blocks: list[Any],
+    metastr: bool,
+    repeat: int,
+) -> tuple[float, str]:
+    """Return encoded rows/s and the encoder output."""
+    best = float("inf")
+    text = ""
+    for _ in range(repeat):
+        out = io.StringIO()
+        start = time.perf_counter()
+        for data, meta in blocks:
+            encode(out, data, meta, metastr)
+        best = min(best, time.perf_counter() - start)
+        text = out.getvalue()
+    rows = sum(int(data.shape[0]) for data, _ in blocks)
+    return rows / best, text
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=4096)
+    parser.add_argument("--count", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for dtype in ("float32", "float64", "int16"):
+        for vdim in (1, 3):
+            for meta in ("none", "tuple", "str"):
+                blocks = _blocks(dtype, vdim, meta, args.rows, args.count)
+                metastr = meta == "str"
+                old, ref = bench(_legacy, blocks, metastr, args.repeat)
+                new, text = bench(_block, blocks, metastr, args.repeat)
+                assert text == ref
+                print(
+                    f"dtype={dtype:7s} vdim={vdim} meta={meta:5s} "
+                    f"csv_writer_rows_s={old:10.0f} "
+                    f"block_rows_s={new:10.0f} speedup={new / old:5.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Multi-rate plugin wait benchmark.
+
+Measure per-channel delivery latency of ``PluginThread`` consumers fed
+by one fast channel (1 ms) and a growing number of slow channels
+(200 ms). The ``blocking`` mode reproduces the previous per-channel
+blocking ``queue_get()`` loop, where idle channels delay the fast one.
+The ``ready`` mode uses the shared ``PluginData`` readiness wait.
+
+Run with ``python benchmarks/bench_multirate.py``.
+"""
+
+import argparse
+import threading
+import time
+from typing import Any
+
+import numpy as np
+from nxslib.dev import DeviceChannel
+from nxslib.nxscope import DNxscopeStreamBlock
+
+from nxscli.idata import PluginData, PluginDataCb, PluginQueueData
+from nxscli.pluginthr import PluginThread, StreamBlocks
+from nxscli.stream_queue import StreamQueue
+from nxscli.trigger import DTriggerConfig, ETriggerType, TriggerHandler
+
+FAST_PERIOD = 0.001
+SLOW_PERIOD = 0.2
+
+
+class _ReadyThread(PluginThread):
+    def __init__(self, chmax: int) -> None:
+        super().__init__()
+        self._samples = 1 << 62
+        self.lat: list[list[float]] = [[] for _ in range(chmax)]
+
+    def _handle_blocks(
+        self, data: StreamBlocks, pdata: PluginQueueData, j: int
+    ) -> None:
+        now = time.perf_counter()
+        for block in data:
+            self.lat[j].append(now - float(block.data[0, 0]))
+
+    def _init(self) -> None:
+        return
+
+    def _final(self) -> None:
+        return
+
+
+class _BlockingThread(_ReadyThread):
+    def _queue_data_get(self, pdata: PluginQueueData) -> Any:
+        return pdata.queue_get(block=True, timeout=1)
+
+
+def _produce(que: StreamQueue, period: float, stop: threading.Event) -> None:
+    nxt = time.perf_counter()
+    while not stop.is_set():
+        nxt += period
+        stamp = time.perf_counter()
+        que.put(
+            [
+                DNxscopeStreamBlock(
+                    data=np.full((16, 1), stamp, dtype=np.float64), meta=None
+                )
+            ]
+        )
+        delay = nxt - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def bench(mode: str, chmax: int, duration: float) -> dict[str, float]:
+    """Measure fast and slow channel latency for a consumer mode."""
+    queues: list[StreamQueue] = []
+
+    def stream_sub(_: Any) -> StreamQueue:
+        queues.append(StreamQueue())
+        return queues[-1]
+
+    chans = [DeviceChannel(i, 10, 1, f"chan{i}") for i in range(chmax)]
+    trig = [
+        TriggerHandler(i, DTriggerConfig(ETriggerType.ALWAYS_ON))
+        for i in range(chmax)
+    ]
+    pdata = PluginData(chans, trig, PluginDataCb(stream_sub, lambda _: None))
+    plug = _ReadyThread(chmax) if mode == "ready" else _BlockingThread(chmax)
+    plug.thread_start(pdata)
+
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            target=_produce,
+            args=(que, FAST_PERIOD if i == 0 else SLOW_PERIOD, stop),
+        )
+        for i, que in enumerate(queues)
+    ]
+    for thr in threads:
+        thr.start()
+    time.sleep(duration)
+    stop.set()
+    for thr in threads:
+        thr.join()
+    plug.stop()
+    pdata.close()
+    TriggerHandler.cls_cleanup()
+
+    fast = np.asarray(plug.lat[0], dtype=np.float64)
+    ret = {
+        "fast_p50_ms": float(np.percentile(fast, 50) * 1e3),
+        "fast_p99_ms": float(np.percentile(fast, 99) * 1e3),
+        "fast_blocks_s": fast.size / duration,
+    }
+    slow = np.asarray(
+        [x for i in range(1, chmax) for x in plug.lat[i]], dtype=np.float64
+    )
+    if slow.size:
+        ret["slow_p99_ms"] = float(np.percentile(slow, 99) * 1e3)
+    return ret
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=2.0)
+    args = parser.parse_args()
+
+    for chmax in (1, 2, 8):
+        for mode in ("blocking", "ready"):
+            lat = bench(mode, chmax, args.duration)
+            fields = " ".join(f"{k}={v:.2f}" for k, v in lat.items())
+            print(f"channels={chmax} mode={mode:8s} {fields}")
+
+
+if __name__ == "__main__":
+    main()
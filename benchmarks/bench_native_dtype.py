@@ -0,0 +1,102 @@
+"""Native data type capture benchmark.
+
+Compare capture files stored in the channel data type with files
+converted to float64, as all capture plugins did before.
+
+* ``writer`` - feed ``INT8`` and ``FLOAT`` blocks, as delivered by nxslib
+  for these channel types, to ``NpyStreamWriter`` and report write
+  throughput and bytes per sample,
+* ``dummy`` - capture dummy interface channels with ``pnpsave`` in a
+  subprocess and report CPU time and file sizes. The dummy device
+  produces samples at a fixed rate, so wall time is not reported.
+
+Run with ``python benchmarks/bench_native_dtype.py``.
+"""
+
+import argparse
+import glob
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any
+
+import numpy as np
+
+from nxscli.npyfile import NpyStreamWriter
+
+
+def _blocks(
+    dtype: Any, vdim: int, rows: int, count: int
+) -> list[np.ndarray[Any, Any]]:
+    rng = np.random.default_rng(0)
+    data = rng.integers(-100, 100, (count * rows, vdim)).astype(dtype)
+    return [data[i : i + rows] for i in range(0, count * rows, rows)]
+
+
+def bench_writer(
+    src: Any, dst: Any, vdim: int, rows: int, count: int
+) -> dict[str, float]:
+    """Measure stream writer throughput for a block and file data type."""
+    blocks = _blocks(src, vdim, rows, count)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.npy")
+        start = time.perf_counter()
+        writer = NpyStreamWriter(path, vdim, dtype=dst)
+        for block in blocks:
+            writer.write(block)
+        writer.close()
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(path) - NpyStreamWriter.HEADER_SIZE
+    samples = count * rows * vdim
+    return {
+        "msamples_s": samples / elapsed / 1e6,
+        "bytes_sample": size / samples,
+    }
+
+
+def bench_dummy(
+    chans: str, samples: int, dtype: str | None
+) -> dict[str, float]:
+    """Capture dummy channels, return child CPU time and file bytes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench")
+        args = [sys.executable, "-m", "nxscli", "dummy", "chan", chans]
+        args += ["pnpsave"]
+        if dtype is not None:
+            args += ["--dtype", dtype]
+        args += [str(samples), path]
+        before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        subprocess.run(args, check=True, capture_output=True)
+        after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        size = sum(os.path.getsize(f) for f in glob.glob(path + "_chan*"))
+    cpu = after.ru_utime + after.ru_stime - before.ru_utime - before.ru_stime
+    return {"cpu_s": cpu, "kib": size / 1024}
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=4096)
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--chan", default="0,7")
+    parser.add_argument("--samples", type=int, default=20000)
+    args = parser.parse_args()
+
+    for name, src, vdim in (("int8", np.int8, 3), ("float32", np.float32, 1)):
+        for dst in (src, np.float64):
+            ret = bench_writer(src, dst, vdim, args.rows, args.count)
+            fields = " ".join(f"{k}={v:.2f}" for k, v in ret.items())
+            out = np.dtype(dst).name
+            print(f"writer block={name:7s} file={out:7s} {fields}")
+
+    for dtype in (None, "float64"):
+        ret = bench_dummy(args.chan, args.samples, dtype)
+        fields = " ".join(f"{k}={v:.2f}" for k, v in ret.items())
+        print(f"dummy chan={args.chan} dtype={dtype or 'native':7s} {fields}")
+
+
+if __name__ == "__main__":
+    main()
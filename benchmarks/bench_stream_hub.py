@@ -0,0 +1,174 @@
+"""Stream hub fan-out benchmark.
+
+Measure per-channel delivery latency and fan-out throughput of
+``SharedStreamProvider`` with 1, 8 and 32 channels at mixed rates.
+
+Run with ``python benchmarks/bench_stream_hub.py``.
+"""
+
+import argparse
+import queue
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+from nxslib.dev import DeviceChannel
+from nxslib.nxscope import DNxscopeStreamBlock
+
+from nxscli.channelref import ChannelRef
+from nxscli.stream_hub import SharedStreamProvider
+
+# fast channels emit every 1 ms, slow channels every 50 ms
+FAST_PERIOD = 0.001
+SLOW_PERIOD = 0.05
+
+
+class _BenchNxscope:
+    def __init__(self, chmax: int) -> None:
+        self._channels = {
+            i: DeviceChannel(i, 10, 1, f"chan{i}") for i in range(chmax)
+        }
+        self.dev = SimpleNamespace(data=SimpleNamespace(chmax=chmax))
+        self.queues: dict[int, queue.Queue[Any]] = {}
+
+    def dev_channel_get(self, chid: int) -> DeviceChannel | None:
+        return self._channels.get(chid)
+
+    def stream_sub(self, chid: int) -> queue.Queue[Any]:
+        q: queue.Queue[Any] = queue.Queue()
+        self.queues[chid] = q
+        return q
+
+    def stream_unsub(self, subq: queue.Queue[Any]) -> None:
+        return
+
+
+def _block(stamp: float, rows: int = 16) -> DNxscopeStreamBlock:
+    return DNxscopeStreamBlock(
+        data=np.full((rows, 1), stamp, dtype=np.float64), meta=None
+    )
+
+
+def _consume(
+    subq: queue.Queue[Any], lat: list[float], stop: threading.Event
+) -> None:
+    while not stop.is_set():
+        try:
+            blocks = subq.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        now = time.perf_counter()
+        for block in blocks:
+            lat.append(now - float(block.data[0, 0]))
+
+
+def _produce(
+    q: queue.Queue[Any], period: float, stop: threading.Event
+) -> None:
+    nxt = time.perf_counter()
+    while not stop.is_set():
+        nxt += period
+        q.put([_block(time.perf_counter())])
+        delay = nxt - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _setup(
+    chmax: int,
+) -> tuple[SharedStreamProvider, _BenchNxscope, list[Any]]:
+    hub = SharedStreamProvider()
+    nxs = _BenchNxscope(chmax)
+    hub.on_connect(nxs)  # type: ignore[arg-type]
+    subs = [hub.stream_sub(ChannelRef.physical(i)) for i in range(chmax)]
+    hub.on_stream_start()
+    return hub, nxs, subs
+
+
+def bench_latency(chmax: int, duration: float) -> dict[str, float]:
+    """Measure delivery latency for fast and slow channels."""
+    hub, nxs, subs = _setup(chmax)
+    stop = threading.Event()
+    lat: list[list[float]] = [[] for _ in range(chmax)]
+    threads = []
+    for i in range(chmax):
+        period = FAST_PERIOD if i % 2 == 0 else SLOW_PERIOD
+        threads.append(
+            threading.Thread(
+                target=_produce, args=(nxs.queues[i], period, stop)
+            )
+        )
+        threads.append(
+            threading.Thread(target=_consume, args=(subs[i], lat[i], stop))
+        )
+    for thr in threads:
+        thr.start()
+    time.sleep(duration)
+    stop.set()
+    for thr in threads:
+        thr.join()
+    hub.on_stream_stop()
+    hub.on_disconnect()
+
+    fast = np.asarray(
+        [x for i in range(0, chmax, 2) for x in lat[i]], dtype=np.float64
+    )
+    slow = np.asarray(
+        [x for i in range(1, chmax, 2) for x in lat[i]], dtype=np.float64
+    )
+    ret = {
+        "fast_p50_ms": float(np.percentile(fast, 50) * 1e3),
+        "fast_p99_ms": float(np.percentile(fast, 99) * 1e3),
+        "fast_blocks_s": fast.size / duration,
+    }
+    if slow.size:
+        ret["slow_p50_ms"] = float(np.percentile(slow, 50) * 1e3)
+        ret["slow_p99_ms"] = float(np.percentile(slow, 99) * 1e3)
+    return ret
+
+
+def bench_throughput(chmax: int, blocks: int) -> float:
+    """Return fan-out blocks/s for pre-filled upstream queues."""
+    hub, nxs, subs = _setup(chmax)
+    per_chan = max(blocks // chmax, 1)
+    payload = [_block(0.0)]
+    for i in range(chmax):
+        for _ in range(per_chan):
+            nxs.queues[i].put(payload)
+    total = per_chan * chmax
+    start = time.perf_counter()
+    got = 0
+    while got < total:
+        for subq in subs:
+            while True:
+                try:
+                    got += len(subq.get_nowait())
+                except queue.Empty:
+                    break
+        time.sleep(0.0001)
+        if time.perf_counter() - start > 60.0:
+            break
+    elapsed = time.perf_counter() - start
+    hub.on_stream_stop()
+    hub.on_disconnect()
+    return got / elapsed
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--blocks", type=int, default=32000)
+    args = parser.parse_args()
+
+    for chmax in (1, 8, 32):
+        lat = bench_latency(chmax, args.duration)
+        thr = bench_throughput(chmax, args.blocks)
+        fields = " ".join(f"{k}={v:.2f}" for k, v in lat.items())
+        print(f"channels={chmax:2d} {fields} burst_blocks_s={thr:.0f}")
+
+
+if __name__ == "__main__":
+    main()
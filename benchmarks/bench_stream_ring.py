@@ -0,0 +1,85 @@
+"""Stream hub queue vs ring backend benchmark.
+
+Measure hub dispatch cost and consumer read cost for one high-rate
+channel with N subscribers using per-subscriber queues or the shared
+ring backend (``DStreamSubOpts(ring_rows=...)``).
+
+Run with ``python benchmarks/bench_stream_ring.py``.
+"""
+
+import argparse
+import queue
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+from nxslib.dev import DeviceChannel
+from nxslib.nxscope import DNxscopeStreamBlock
+
+from nxscli.channelref import ChannelRef
+from nxscli.stream_hub import SharedStreamProvider, _SourceForwarder
+from nxscli.stream_queue import DStreamSubOpts
+
+
+class _BenchNxscope:
+    def __init__(self) -> None:
+        self.dev = SimpleNamespace(data=SimpleNamespace(chmax=1))
+
+    def dev_channel_get(self, chid: int) -> DeviceChannel:
+        return DeviceChannel(chid, 10, 1, "chan0")
+
+    def stream_sub(self, chid: int) -> queue.Queue[Any]:
+        return queue.Queue()
+
+    def stream_unsub(self, subq: queue.Queue[Any]) -> None:
+        return
+
+
+def bench(nsubs: int, ring: bool, passes: int, rows: int) -> float:
+    """Return dispatched+consumed rows/s for ``nsubs`` subscribers."""
+    hub = SharedStreamProvider()
+    hub.on_connect(_BenchNxscope())  # type: ignore[arg-type]
+    opts = DStreamSubOpts(ring_rows=rows * 64) if ring else None
+    subs = [hub.stream_sub(ChannelRef.physical(0), opts) for _ in range(nsubs)]
+    # drive the dispatcher synchronously, no background threads
+    hub._started = True
+    hub._source_subs = {0: _SourceForwarder(0, queue.Queue(), hub._readyq)}
+    payload = [
+        DNxscopeStreamBlock(
+            data=np.zeros((rows, 1), dtype=np.float64), meta=None
+        )
+    ]
+    got = 0
+    start = time.perf_counter()
+    for _ in range(passes):
+        hub._readyq.put((0, payload, time.perf_counter()))
+        hub._thread_common()
+        for subq in subs:
+            assert subq is not None
+            for block in subq.get_nowait():
+                got += int(block.data.shape[0])
+    elapsed = time.perf_counter() - start
+    hub._source_subs = {}
+    hub._started = False
+    return got / elapsed
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--passes", type=int, default=20000)
+    parser.add_argument("--rows", type=int, default=16)
+    args = parser.parse_args()
+
+    for nsubs in (1, 5, 10):
+        qrate = bench(nsubs, False, args.passes, args.rows)
+        rrate = bench(nsubs, True, args.passes, args.rows)
+        print(
+            f"subscribers={nsubs:2d} queue_rows_s={qrate:.0f} "
+            f"ring_rows_s={rrate:.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""Trigger engine micro-benchmark and regression suite.
+
+Feed synthetic ``DNxscopeStreamBlock`` streams to ``TriggerHandler`` for
+all trigger types, block sizes, pre-sample lengths, capture modes and
+cross-channel fan-outs, and report per case:
+
+* ``msamples_s`` - source channel samples/s including all dependents,
+  the best of ``--repeat`` runs,
+* ``cost`` - median of handler time relative to a plain NumPy edge
+  detection pass over the same blocks, timed before each run,
+* ``alloc_kib`` - mean peak of memory allocated while handling one block,
+  traced with ``tracemalloc`` in a separate pass,
+* ``rows`` and ``events`` - captured rows and trigger events, which must
+  not change between runs.
+
+The ``start_after`` and ``stop_after`` modes use a constant signal, so
+triggers stay armed and evaluate every block. The ``rearm`` mode uses a
+sine signal and captures a segment on every accepted hit.
+
+Baselines keep only the machine-independent fields (``rows``,
+``events`` and ``cost``). The repository baseline is checked by the
+``bench`` tox environment, the script exits with status 1 on a
+regression::
+
+  tox -e bench
+
+Regenerate it with ``--save benchmarks/bench_trigger.json`` and the
+arguments of the tox environment after an intended change.
+
+Regressions are checked on ``cost``, which is less sensitive to CPU
+frequency and load changes than raw throughput. Captured rows and events
+are exact. Allocations depend on the NumPy and Python version and are
+only reported.
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+import numpy as np
+from nxslib.nxscope import DNxscopeStreamBlock
+
+from nxscli.trigger import (
+    DTriggerConfig,
+    ETriggerCaptureMode,
+    ETriggerType,
+    TriggerHandler,
+)
+
+# sine period and trigger holdoff of the rearm mode
+PERIOD = 1000
+HOLDOFF = 100
+
+
+def _config(name: str) -> DTriggerConfig:
+    """Return a trigger configuration for a sine in ``[-1, 1]``."""
+    rise = DTriggerConfig(ETriggerType.EDGE_RISING, level=0.5)
+    fall = DTriggerConfig(ETriggerType.EDGE_FALLING, vect=1, level=0.5)
+    nfall = DTriggerConfig(
+        ETriggerType.EDGE_FALLING, vect=1, level=0.5, negate=True
+    )
+    slew = DTriggerConfig(ETriggerType.SLEW, level=0.006)
+    cases = {
+        "on": DTriggerConfig(ETriggerType.ALWAYS_ON),
+        "er": rise,
+        "ef": DTriggerConfig(ETriggerType.EDGE_FALLING, level=0.5),
+        "we": DTriggerConfig(
+            ETriggerType.WINDOW_ENTER, window_low=-0.5, window_high=0.5
+        ),
+        "wx": DTriggerConfig(
+            ETriggerType.WINDOW_EXIT, window_low=-0.5, window_high=0.5
+        ),
+        "sr": slew,
+        "ph": DTriggerConfig(
+            ETriggerType.PULSE_HIGH, level=0.5, width_min=100
+        ),
+        "pl": DTriggerConfig(ETriggerType.PULSE_LOW, level=-0.5, width_min=1),
+        "rh": DTriggerConfig(
+            ETriggerType.RUNT_HIGH, window_low=0.5, window_high=1.5
+        ),
+        "rl": DTriggerConfig(
+            ETriggerType.RUNT_LOW, window_low=-1.5, window_high=-0.5
+        ),
+        "and": DTriggerConfig(ETriggerType.AND, terms=[rise, nfall]),
+        "then": DTriggerConfig(
+            ETriggerType.THEN, terms=[rise, fall], within=PERIOD
+        ),
+    }
+    return cases[name]
+
+
+TYPES = (
+    "on",
+    "er",
+    "ef",
+    "we",
+    "wx",
+    "sr",
+    "ph",
+    "pl",
+    "rh",
+    "rl",
+    "and",
+    "then",
+)
+MODES = ("start_after", "stop_after", "rearm")
+
+
+def _payloads(
+    mode: str, count: int, rows: int
+) -> list[list[DNxscopeStreamBlock]]:
+    if mode == "rearm":
+        phase = 2 * np.pi * np.arange(count * rows) / PERIOD
+        data = np.column_stack((np.sin(phase), np.cos(phase)))
+    else:
+        data = np.zeros((count * rows, 2))
+    return [
+        [DNxscopeStreamBlock(data=data[i : i + rows].copy(), meta=None)]
+        for i in range(0, count * rows, rows)
+    ]
+
+
+def _handlers(
+    name: str, mode: str, pre: int, fanout: int
+) -> list[TriggerHandler]:
+    """Create the source handler and its cross-channel dependents."""
+    ret = []
+    for chan in range(fanout + 1):
+        dtc = _config(name)
+        dtc.pre_samples = pre
+        if mode == "stop_after":
+            dtc.capture_mode = ETriggerCaptureMode.STOP_AFTER
+            dtc.post_samples = pre
+        elif mode == "rearm":
+            dtc.rearm = True
+            dtc.post_samples = pre
+            dtc.holdoff = HOLDOFF
+        if chan > 0:
+            dtc.srcchan = 0
+        ret.append(TriggerHandler(chan, dtc))
+    return ret
+
+
+def _feed(
+    handlers: list[TriggerHandler], payloads: list[Any], trace: bool
+) -> tuple[int, int, float]:
+    """Feed payloads to all handlers, return rows, events and peak bytes."""
+    rows = 0
+    events = 0
+    peak = 0
+    for payload in payloads:
+        if trace:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        for handler in handlers:
+            for block in handler.data_triggered(payload):
+                rows += int(block.data.shape[0])
+            events += len(handler.pop_trigger_events())
+        if trace:
+            peak += tracemalloc.get_traced_memory()[1] - base
+    return rows, events, peak / len(payloads)
+
+
+def _reference(payloads: list[Any]) -> None:
+    """Plain NumPy edge detection, the unit of the ``cost`` metric."""
+    for payload in payloads:
+        vec = payload[0].data[:, 0]
+        np.flatnonzero((vec[:-1] <= 0.5) & (vec[1:] > 0.5))
+
+
+def bench(
+    name: str,
+    mode: str,
+    rows: int,
+    pre: int,
+    fanout: int,
+    count: int,
+    repeat: int = 1,
+) -> dict[str, float]:
+    """Measure one trigger case."""
+    payloads = _payloads(mode, count, rows)
+
+    elapsed = float("inf")
+    costs = []
+    for _ in range(repeat):
+        start = time.process_time()
+        _reference(payloads)
+        ref = time.process_time() - start
+        handlers = _handlers(name, mode, pre, fanout)
+        start = time.process_time()
+        nrows, events, _ = _feed(handlers, payloads, False)
+        run = time.process_time() - start
+        TriggerHandler.cls_cleanup()
+        elapsed = min(elapsed, run)
+        costs.append(run / ref)
+
+    # allocations in a separate pass, tracing slows down the handler
+    handlers = _handlers(name, mode, pre, fanout)
+    tracemalloc.start()
+    _feed(handlers, payloads[:1], True)
+    _, _, peak = _feed(handlers, payloads[1:], True)
+    tracemalloc.stop()
+    TriggerHandler.cls_cleanup()
+
+    return {
+        "msamples_s": round(count * rows / elapsed / 1e6, 3),
+        "cost": round(float(np.median(costs)), 3),
+        "alloc_kib": round(peak / 1024, 3),
+        "rows": nrows,
+        "events": events,
+    }
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """Return regressions of results against a baseline."""
+    ret = []
+    for key, base in baseline.items():
+        cur = results.get(key)
+        if cur is None:
+            continue
+        for field in ("rows", "events"):
+            if cur[field] != base[field]:
+                ret.append(f"{key} {field} {base[field]} -> {cur[field]}")
+        # small absolute slack for cases cheaper than the reference pass
+        if cur["cost"] > base["cost"] * (1 + tolerance) + 1:
+            ret.append(f"{key} cost {base['cost']:.1f} -> {cur['cost']:.1f}")
+    return ret
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rows", type=int, nargs="+", default=[256, 4096])
+    parser.add_argument("--pre", type=int, nargs="+", default=[0, 1024])
+    parser.add_argument("--fanout", type=int, nargs="+", default=[0, 4])
+    parser.add_argument("--types", nargs="+", default=TYPES, choices=TYPES)
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--save", help="write results to a JSON baseline")
+    parser.add_argument("--compare", help="compare with a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=1.0)
+    args = parser.parse_args()
+
+    results = {}
+    for name, mode, rows, pre, fanout in itertools.product(
+        args.types, args.modes, args.rows, args.pre, args.fanout
+    ):
+        key = f"{name}/{mode}/rows={rows}/pre={pre}/fanout={fanout}"
+        ret = bench(name, mode, rows, pre, fanout, args.count, args.repeat)
+        results[key] = ret
+        print(
+            f"{key:40s} msamples_s={ret['msamples_s']:8.2f} "
+            f"cost={ret['cost']:6.1f} "
+            f"alloc_kib={ret['alloc_kib']:8.1f} "
+            f"rows={ret['rows']} events={ret['events']}"
+        )
+
+    if args.save:
+        saved = {
+            key: {
+                "rows": ret["rows"],
+                "events": ret["events"],
+                "cost": round(ret["cost"], 1),
+            }
+            for key, ret in results.items()
+        }
+        with open(args.save, "w") as f:
+            json.dump({"count": args.count, "results": saved}, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["count"] != args.count:
+            sys.exit(f"baseline count is {baseline['count']}")
+        failed = compare(results, baseline["results"], args.tolerance)
+        for line in failed:
+            print(f"REGRESSION {line}")
+        if failed:
+            sys.exit(1)
+        print(f"no regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
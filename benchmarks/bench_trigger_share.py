@@ -0,0 +1,78 @@
+"""Shared trigger detection benchmark.
+
+Feed the same block payloads to N plugin queues with an identical edge
+trigger on one channel, as the stream hub does for N plugins subscribed
+to a triggered channel. The ``local`` mode evaluates the trigger in each
+handler, the ``shared`` mode evaluates it once per block and reuses the
+result in all handlers.
+
+The trigger level is never crossed, so all handlers stay armed and
+evaluate every block, which is the steady state of a waiting trigger.
+
+Run with ``python benchmarks/bench_trigger_share.py``.
+"""
+
+import argparse
+import time
+
+import numpy as np
+from nxslib.nxscope import DNxscopeStreamBlock
+
+from nxscli.trigger import DTriggerConfig, ETriggerType, TriggerHandler
+
+
+def _payloads(count: int, rows: int) -> list[list[DNxscopeStreamBlock]]:
+    rng = np.random.default_rng(0)
+    return [
+        [DNxscopeStreamBlock(data=rng.random((rows, 2)), meta=None)]
+        for _ in range(count)
+    ]
+
+
+def bench(
+    mode: str, plugins: int, rows: int, count: int, pre: int
+) -> dict[str, float]:
+    """Measure trigger handling time per payload for all plugins."""
+    TriggerHandler.SHARED_DETECTION = mode == "shared"
+    handlers = [
+        TriggerHandler(
+            0,
+            DTriggerConfig(
+                ETriggerType.EDGE_RISING, level=2.0, pre_samples=pre
+            ),
+        )
+        for _ in range(plugins)
+    ]
+    payloads = _payloads(count, rows)
+
+    start = time.perf_counter()
+    for payload in payloads:
+        for handler in handlers:
+            handler.data_triggered(payload)
+    elapsed = time.perf_counter() - start
+
+    TriggerHandler.cls_cleanup()
+    TriggerHandler.SHARED_DETECTION = True
+    return {
+        "us_per_payload": elapsed / count * 1e6,
+        "msamples_s": count * rows / elapsed / 1e6,
+    }
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=4096)
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--pre", type=int, default=64)
+    args = parser.parse_args()
+
+    for plugins in (1, 2, 4, 8):
+        for mode in ("local", "shared"):
+            ret = bench(mode, plugins, args.rows, args.count, args.pre)
+            fields = " ".join(f"{k}={v:.2f}" for k, v in ret.items())
+            print(f"plugins={plugins} mode={mode:6s} {fields}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Asyncio stream API."""
+
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING
+
+from nxslib.nxscope import DNxscopeStreamBlock
+
+from nxscli.stream_queue import StreamQueue
+
+if TYPE_CHECKING:
+    from nxscli.idata import PluginData
+
+StreamItem = tuple[int, list[DNxscopeStreamBlock]]
+
+
+###############################################################################
+# Class: AsyncStream
+###############################################################################
+
+
+class AsyncStream:
+    """Async iterator over triggered payloads of subscribed channels.
+
+    Yields ``(channel, blocks)`` tuples. Subscriber queues wake the event
+    loop with ``call_soon_threadsafe()`` when new data arrives, so no
+    thread is blocked per subscriber. Queues without wakeup support (for
+    example ring cursors) are polled every ``POLL_INTERVAL`` seconds.
+
+    Backpressure follows the subscription options: with a bounded
+    ``BLOCK`` policy a slow consumer stalls the producer, the drop
+    policies discard data instead. ``aclose()`` unsubscribes all queues,
+    it is also called on ``async with`` exit.
+    """
+
+    # poll interval for queues without wakeup support
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, data: "PluginData") -> None:
+        """Initialize async stream.
+
+        :param data: plugin data with subscribed channel queues
+        """
+        self._data = data
+        self._event: asyncio.Event | None = None
+        self._poll = False
+        self._closed = False
+        self._pending: deque[StreamItem] = deque()
+
+    async def __aenter__(self) -> "AsyncStream":
+        """Return self on context manager entry."""
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        """Close stream on context manager exit."""
+        await self.aclose()
+
+    def __aiter__(self) -> "AsyncStream":
+        """Return async iterator."""
+        return self
+
+    def _bind(self) -> asyncio.Event:
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+
+        # called from producer threads, must not keep the stream alive
+        def wake() -> None:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # event loop already closed
+                pass
+
+        for pdata in self._data.qdlist:
+            if isinstance(pdata.queue, StreamQueue):
+                pdata.queue.set_waker(wake)
+            else:
+                self._poll = True
+        self._event = event
+        return event
+
+    def _timeout(self) -> float | None:
+        wait = self.POLL_INTERVAL if self._poll else None
+        for pdata in self._data.qdlist:
+            if not isinstance(pdata.queue, StreamQueue):
+                continue
+            # pending batch is delivered by get() after its deadline
+            batch = pdata.queue.batch_wait()
+            if batch is not None and (wait is None or batch < wait):
+                wait = max(batch, 0.0)
+        return wait
+
+    def _collect(self) -> None:
+        # one payload per channel and round keeps channels fair
+        for pdata in self._data.qdlist:
+            payload = pdata.queue_get(block=False)
+            if payload:
+                self._pending.append((pdata.chan, payload))
+
+    async def __anext__(self) -> StreamItem:
+        """Wait for the next channel payload."""
+        event = self._event if self._event is not None else self._bind()
+        while not self._pending:
+            if self._closed:
+                raise StopAsyncIteration
+            event.clear()
+            self._collect()
+            if self._pending:
+                break
+            try:
+                await asyncio.wait_for(event.wait(), self._timeout())
+            except asyncio.TimeoutError:
+                pass
+        return self._pending.popleft()
+
+    async def aclose(self) -> None:
+        """Unsubscribe all queues and finish iteration."""
+        if self._closed:
+            return
+        self._closed = True
+        for pdata in self._data.qdlist:
+            if isinstance(pdata.queue, StreamQueue):
+                pdata.queue.set_waker(None)
+        self._data.close()
+        self._pending.clear()
+        if self._event is not None:
+            # wake a task waiting in __anext__
+            self._event.set()
+
+    @property
+    def closed(self) -> bool:
+        """Return ``True`` if the stream was closed."""
+        return self._closed
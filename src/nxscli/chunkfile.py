@@ -0,0 +1,521 @@
+"""Chunked multi-channel capture container."""
+
+import os
+import zlib
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+import numpy as np
+
+from nxscli.codec import DCodecStats, codec_by_ident, codec_get
+from nxscli.filewriter import DFileWriterOpts, DFileWriterStats, FileWriter
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+###############################################################################
+# Container file layout
+###############################################################################
+
+# container file magic and format version
+CHUNK_FILE_MAGIC = b"NXSCHNK"
+CHUNK_FILE_VERSION = 1
+
+# header at the file start, all fields little-endian
+CHUNK_FILE_HEADER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("header_size", "<u4"),
+    ]
+)
+
+# file header size, also keeps chunks aligned
+CHUNK_FILE_HEADER_SIZE = 64
+
+# chunk magic
+CHUNK_MAGIC = b"CHNK"
+
+# header of each chunk, followed by ``events`` float64 sample indexes of
+# trigger events and ``rows * vdim`` values, padded to 8 bytes. Values
+# are compressed if ``codec`` is not 0 (see nxscli.codec.DCodec.ident)
+CHUNK_HEADER = np.dtype(
+    [
+        ("magic", "S4"),
+        ("chan", "<u4"),
+        ("descr", "S16"),
+        ("vdim", "<u4"),
+        ("events", "<u4"),
+        # capture index of the first row
+        ("first", "<u8"),
+        ("rows", "<u8"),
+        # bytes of events and values, without padding
+        ("size", "<u8"),
+        # CRC32 of events and values
+        ("crc", "<u4"),
+        ("codec", "<u4"),
+    ]
+)
+
+# entry of the footer index, one per chunk
+CHUNK_INDEX_ENTRY = np.dtype(
+    [
+        ("chan", "<u4"),
+        ("reserved", "<u4"),
+        ("first", "<u8"),
+        ("rows", "<u8"),
+        ("offset", "<u8"),
+    ]
+)
+
+# index magic
+CHUNK_INDEX_MAGIC = b"NXSINDX"
+
+# trailer at the file end, locates the footer index that precedes it
+CHUNK_TRAILER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("offset", "<u8"),
+        ("count", "<u8"),
+        # CRC32 of index entries
+        ("crc", "<u4"),
+        ("reserved", "<u4"),
+    ]
+)
+
+
+def _chunk_file_header() -> bytes:
+    header = np.zeros(1, dtype=CHUNK_FILE_HEADER)
+    header["magic"] = CHUNK_FILE_MAGIC
+    header["version"] = CHUNK_FILE_VERSION
+    header["header_size"] = CHUNK_FILE_HEADER_SIZE
+    return header.tobytes().ljust(CHUNK_FILE_HEADER_SIZE, b"\0")
+
+
+def _chunk_footer(entries: np.ndarray[Any, Any], offset: int) -> bytes:
+    """Get footer index and trailer for index entries at ``offset``."""
+    index = entries.astype(CHUNK_INDEX_ENTRY).tobytes()
+    trailer = np.zeros(1, dtype=CHUNK_TRAILER)
+    trailer["magic"] = CHUNK_INDEX_MAGIC
+    trailer["offset"] = offset
+    trailer["count"] = entries.shape[0]
+    trailer["crc"] = zlib.crc32(index)
+    return index + trailer.tobytes()
+
+
+def _pad(size: int) -> int:
+    return -size % 8
+
+
+def _chunk_header(
+    chan: int,
+    data: np.ndarray[Any, Any],
+    first: int,
+    marks: np.ndarray[Any, Any],
+    values: bytes | memoryview,
+    codec: int = 0,
+) -> bytes:
+    """Get header of a chunk with stored ``values``."""
+    header = np.zeros(1, dtype=CHUNK_HEADER)
+    header["magic"] = CHUNK_MAGIC
+    header["chan"] = chan
+    header["descr"] = data.dtype.str.encode()
+    header["vdim"] = data.shape[1]
+    header["events"] = marks.shape[0]
+    header["first"] = first
+    header["rows"] = data.shape[0]
+    header["size"] = marks.nbytes + memoryview(values).nbytes
+    header["crc"] = zlib.crc32(values, zlib.crc32(marks.data))
+    header["codec"] = codec
+    return header.tobytes()
+
+
+###############################################################################
+# Class: ChunkFileWriter
+###############################################################################
+
+
+class ChunkFileWriter:
+    """Write sample rows of many channels to one chunked container.
+
+    Each :meth:`write` appends a self-describing chunk with channel,
+    data type, vector dimension, capture index of the first row, row
+    count and trigger events, so any chunk can be decoded alone. The
+    index of all chunks is built as chunks are written and appended as
+    a footer on close.
+
+    The file is append-only. A file of a capture that was killed has no
+    footer, :class:`ChunkFileReader` rebuilds the index by scanning chunk
+    headers and drops a torn last chunk.
+
+    With a codec in writer options, values of each chunk are compressed
+    independently in the writer thread pool, so any chunk can still be
+    read alone.
+    """
+
+    def __init__(self, path: str, opts: DFileWriterOpts | None = None):
+        """Create a container file.
+
+        :param path: file path
+        :param opts: file writer options
+        """
+        opts = opts or DFileWriterOpts()
+        self._codec = None if opts.codec is None else codec_get(opts.codec)
+        self._level = opts.level
+        # chunks are compressed one by one, not file buffers
+        self._writer = FileWriter(
+            path, replace(opts, codec=None), _chunk_file_header()
+        )
+        self._offset = CHUNK_FILE_HEADER_SIZE
+        self._index: list[tuple[int, int, int, int, int]] = []
+        self._codec_stats: dict[int, DCodecStats] = {}
+
+    @property
+    def chunks(self) -> int:
+        """Get the number of chunks written so far."""
+        return len(self._index)
+
+    def stats(self) -> DFileWriterStats:
+        """Get file writer counters."""
+        return self._writer.stats()
+
+    def codec_stats(self) -> dict[int, DCodecStats]:
+        """Get compression counters of written chunks, per channel.
+
+        Raw bytes are channel values, stored bytes are whole chunks.
+        """
+        return dict(self._codec_stats)
+
+    def write(
+        self,
+        chan: int,
+        data: np.ndarray[Any, Any],
+        first: int,
+        events: "Sequence[float] | None" = None,
+    ) -> None:
+        """Append rows of a channel as one chunk.
+
+        :param chan: channel number
+        :param data: ``(rows, vdim)`` numerical array
+        :param first: capture index of the first row
+        :param events: capture sample indexes of trigger events
+        """
+        data = np.ascontiguousarray(data)
+        if data.dtype.kind not in "biuf":
+            raise ValueError(f"can't store {data.dtype} samples in chunks")
+        rows = int(data.shape[0])
+        if rows == 0:
+            return
+        marks = np.ascontiguousarray(
+            [] if events is None else events, dtype="<f8"
+        )
+        if self._codec is not None:
+            # encoded later in the pool, the caller may reuse its buffer
+            values = data.copy()
+            self._writer.write_job(
+                lambda: self._encode(chan, values, first, marks),
+                data.nbytes,
+                lambda stored, cpu: self._stored(
+                    chan, first, rows, data.nbytes, stored, cpu
+                ),
+            )
+            return
+
+        size = marks.nbytes + data.nbytes
+        self._writer.write(_chunk_header(chan, data, first, marks, data.data))
+        self._writer.write(marks)
+        self._writer.write(data)
+        self._writer.write(bytes(_pad(size)))
+
+        self._index.append((chan, 0, first, rows, self._offset))
+        self._offset += CHUNK_HEADER.itemsize + size + _pad(size)
+
+    def _encode(
+        self,
+        chan: int,
+        data: np.ndarray[Any, Any],
+        first: int,
+        marks: np.ndarray[Any, Any],
+    ) -> bytes:
+        """Get a chunk with compressed values, runs in the thread pool."""
+        assert self._codec
+        values = self._codec.compress(data.data, self._level)
+        header = _chunk_header(
+            chan, data, first, marks, values, self._codec.ident
+        )
+        size = marks.nbytes + len(values)
+        return header + marks.tobytes() + values + bytes(_pad(size))
+
+    def _stored(
+        self,
+        chan: int,
+        first: int,
+        rows: int,
+        raw: int,
+        stored: int,
+        cpu: float,
+    ) -> None:
+        """Index a compressed chunk, runs in the I/O thread."""
+        self._index.append((chan, 0, first, rows, self._offset))
+        self._offset += stored
+        stats = self._codec_stats.get(chan, DCodecStats())
+        self._codec_stats[chan] = stats.add(raw, stored, cpu)
+
+    def _finalize(self, file: BinaryIO) -> None:
+        entries = np.array(self._index, dtype=CHUNK_INDEX_ENTRY)
+        file.write(_chunk_footer(entries, self._offset))
+
+    def close(self) -> None:
+        """Write pending chunks and the footer index, close the file."""
+        self._writer.close(self._finalize)
+
+
+###############################################################################
+# Class: ChunkFileReader
+###############################################################################
+
+
+def _footer_index(
+    mm: "np.memmap[Any, Any]",
+) -> np.ndarray[Any, Any] | None:
+    """Get the footer index, None if the footer is missing or damaged."""
+    size = int(mm.size)
+    end = size - CHUNK_TRAILER.itemsize
+    if end < CHUNK_FILE_HEADER_SIZE:
+        return None
+    trailer = mm[end:].view(CHUNK_TRAILER)[0]
+    if trailer["magic"] != CHUNK_INDEX_MAGIC:
+        return None
+    offset = int(trailer["offset"])
+    count = int(trailer["count"])
+    if offset + count * CHUNK_INDEX_ENTRY.itemsize != end:
+        return None
+    index = mm[offset:end]
+    if zlib.crc32(index.data) != int(trailer["crc"]):
+        return None
+    return index.view(CHUNK_INDEX_ENTRY)
+
+
+def _scan_index(
+    mm: "np.memmap[Any, Any]",
+) -> tuple[np.ndarray[Any, Any], int]:
+    """Rebuild the index from chunk headers.
+
+    Return index entries of complete chunks and the end of the last one.
+    """
+    size = int(mm.size)
+    offset = CHUNK_FILE_HEADER_SIZE
+    entries = []
+    while offset + CHUNK_HEADER.itemsize <= size:
+        start = offset + CHUNK_HEADER.itemsize
+        header = mm[offset:start].view(CHUNK_HEADER)[0]
+        if header["magic"] != CHUNK_MAGIC:
+            break
+        nbytes = int(header["size"])
+        if start + nbytes > size:
+            break
+        if zlib.crc32(mm[start : start + nbytes].data) != int(header["crc"]):
+            break
+        entries.append(
+            (
+                int(header["chan"]),
+                0,
+                int(header["first"]),
+                int(header["rows"]),
+                offset,
+            )
+        )
+        offset = start + nbytes + _pad(nbytes)
+    return np.array(entries, dtype=CHUNK_INDEX_ENTRY), min(offset, size)
+
+
+def _chunk_map(path: str) -> "np.memmap[Any, Any]":
+    """Map a container file read-only and check its header."""
+    if os.path.getsize(path) < CHUNK_FILE_HEADER_SIZE:
+        raise ValueError(f"{path} is not a chunk file")
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    header = mm[: CHUNK_FILE_HEADER.itemsize].view(CHUNK_FILE_HEADER)[0]
+    if header["magic"] != CHUNK_FILE_MAGIC:
+        raise ValueError(f"{path} is not a chunk file")
+    if int(header["version"]) != CHUNK_FILE_VERSION:
+        raise ValueError(f"{path} has unsupported chunk file version")
+    return mm
+
+
+class ChunkFileReader:
+    """Read a container written by :class:`ChunkFileWriter`.
+
+    The file is memory mapped, only chunks of a requested range are
+    touched. Chunks of a channel are found with a binary search over the
+    index, so any sample range is fetched in ``O(log chunks)`` plus the
+    copied rows.
+
+    Without a valid footer (a killed capture, or a file still being
+    written) the index is rebuilt by scanning chunk headers.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Open a container file.
+
+        :param path: file path
+        """
+        self._mm = _chunk_map(path)
+        index = _footer_index(self._mm)
+        self._recovered = index is None
+        if index is None:
+            index, _ = _scan_index(self._mm)
+
+        self._chunks: dict[int, np.ndarray[Any, Any]] = {}
+        for chan in np.unique(index["chan"]):
+            entries = index[index["chan"] == chan]
+            order = np.argsort(entries["first"], kind="stable")
+            self._chunks[int(chan)] = entries[order]
+
+    @property
+    def recovered(self) -> bool:
+        """Return True if the index was rebuilt by scanning the file."""
+        return self._recovered
+
+    @property
+    def channels(self) -> list[int]:
+        """Get stored channels."""
+        return sorted(self._chunks)
+
+    def chunks(self, chan: int) -> int:
+        """Get the number of chunks of a channel.
+
+        :param chan: channel number
+        """
+        return int(self._entries(chan).shape[0])
+
+    def span(self, chan: int) -> tuple[int, int]:
+        """Get capture indexes of the first and after the last stored row.
+
+        :param chan: channel number
+        """
+        entries = self._entries(chan)
+        last = entries[-1]
+        return int(entries["first"][0]), int(last["first"] + last["rows"])
+
+    def dtype(self, chan: int) -> "np.dtype[Any]":
+        """Get the data type of a channel.
+
+        :param chan: channel number
+        """
+        return self._chunk(self._entries(chan)[0])[0]
+
+    def vdim(self, chan: int) -> int:
+        """Get the number of values in a row of a channel.
+
+        :param chan: channel number
+        """
+        return int(self._chunk(self._entries(chan)[0])[2].shape[1])
+
+    def _entries(self, chan: int) -> np.ndarray[Any, Any]:
+        if chan not in self._chunks:
+            raise KeyError(f"channel {chan} not stored")
+        return self._chunks[chan]
+
+    def _chunk(
+        self, entry: Any
+    ) -> tuple["np.dtype[Any]", np.ndarray[Any, Any], np.ndarray[Any, Any]]:
+        """Get data type, events and rows of a chunk.
+
+        Rows of uncompressed chunks are views of the file map.
+        """
+        offset = int(entry["offset"])
+        start = offset + CHUNK_HEADER.itemsize
+        header = self._mm[offset:start].view(CHUNK_HEADER)[0]
+        dtype = np.dtype(header["descr"].decode())
+        vdim = int(header["vdim"])
+        events = int(header["events"])
+        marks = self._mm[start : start + 8 * events].view("<f8")
+        end = start + int(header["size"])
+        values = self._mm[start + 8 * events : end]
+        if int(header["codec"]):
+            codec = codec_by_ident(int(header["codec"]))
+            raw = codec.decompress(values.data)
+            return dtype, marks, np.frombuffer(raw, dtype).reshape(-1, vdim)
+        return dtype, marks, values.view(dtype).reshape(-1, vdim)
+
+    def _range(
+        self, chan: int, start: int, stop: int | None
+    ) -> tuple[np.ndarray[Any, Any], int, int]:
+        """Get index entries of chunks overlapping a capture range."""
+        entries = self._entries(chan)
+        first = entries["first"]
+        start = max(start, 0)
+        if stop is None:
+            stop = self.span(chan)[1]
+        lo = max(int(np.searchsorted(first, start, side="right")) - 1, 0)
+        hi = int(np.searchsorted(first, stop, side="left"))
+        return entries[lo:hi], start, stop
+
+    def read(
+        self, chan: int, start: int = 0, stop: int | None = None
+    ) -> np.ndarray[Any, Any]:
+        """Get rows of a capture index range.
+
+        A range within one uncompressed chunk is returned as a read-only
+        view of the file map, other ranges as a copy. Only chunks of the
+        range are decompressed.
+
+        :param chan: channel number
+        :param start: capture index of the first row
+        :param stop: capture index after the last row, the end of the
+          channel if not given
+        """
+        entries, start, stop = self._range(chan, start, stop)
+        parts = []
+        for entry in entries:
+            first = int(entry["first"])
+            data = self._chunk(entry)[2]
+            lo = max(start - first, 0)
+            hi = min(stop - first, int(data.shape[0]))
+            if lo < hi:
+                parts.append(data[lo:hi])
+        if not parts:
+            return np.empty((0, self.vdim(chan)), dtype=self.dtype(chan))
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts)
+
+    def events(
+        self, chan: int, start: int = 0, stop: int | None = None
+    ) -> np.ndarray[Any, Any]:
+        """Get capture sample indexes of trigger events in a range.
+
+        :param chan: channel number
+        :param start: capture index of the first row
+        :param stop: capture index after the last row, the end of the
+          channel if not given
+        """
+        entries, start, stop = self._range(chan, start, stop)
+        marks = [self._chunk(entry)[1] for entry in entries]
+        ret = np.concatenate([np.empty(0, dtype="<f8")] + marks)
+        return ret[(ret >= start) & (ret < stop)]
+
+
+###############################################################################
+# Function: chunk_file_repair
+###############################################################################
+
+
+def chunk_file_repair(path: str) -> bool:
+    """Rebuild the footer index of a container without a valid footer.
+
+    A torn last chunk is truncated. Return True if the file was repaired,
+    False if its footer was valid.
+
+    :param path: file path
+    """
+    mm = _chunk_map(path)
+    if _footer_index(mm) is not None:
+        return False
+    entries, end = _scan_index(mm)
+    del mm
+    with open(path, "r+b") as file:
+        file.truncate(end)
+        file.seek(end)
+        file.write(_chunk_footer(entries, end))
+    return True
@@ -5,6 +5,9 @@ from typing import Any
 import click
 
 from nxscli.channelref import ChannelRef
+from nxscli.codec import CODECS
+from nxscli.filewriter import DFileWriterOpts, EFsyncPolicy
+from nxscli.rotate import DRotateOpts
 from nxscli.trigger import DTriggerConfigReq
 
 ###############################################################################
@@ -117,6 +120,12 @@ class Trigger(click.ParamType):
     req_cross = "#"
     req_global = "g"
     req_vect = "@"
+    req_term = "/"
+    req_not = "!"
+
+    # trigger combinations and types allowed as their terms
+    combo_types = ("and", "or", "then")
+    term_types = ("er", "ef", "we", "wx", "sr", "ph", "pl", "rh", "rl")
 
     @staticmethod
     def _parse_bool(value: str) -> bool:
@@ -163,11 +172,45 @@ class Trigger(click.ParamType):
                 named["holdoff"] = int(raw)
             elif key == "rearm":
                 named["rearm"] = self._parse_bool(raw)
+            elif key == "within":
+                named["within"] = int(raw)
             else:
                 raise click.BadParameter(f"unsupported trigger option: {key}")
 
         return positional, named
 
+    def _parse_term(self, value: str, vect: int) -> DTriggerConfigReq:
+        """Parse one trigger combination term.
+
+        Format: '[!][trigger][@chan_vector]/[parameters]', parameters
+        are the same as for a single trigger without hoffset.
+        """
+        negate = value.startswith(self.req_not)
+        if negate:
+            value = value[1:]
+        trg, *params = value.split(self.req_term)
+        if self.req_vect in trg:
+            trg, vect_s = trg.split(self.req_vect)
+            vect = int(vect_s)
+        if trg not in self.term_types:
+            raise click.BadParameter(
+                f"unsupported trigger combination term: {trg}"
+            )
+        return DTriggerConfigReq(
+            trg, None, vect, ["0"] + params, negate=negate
+        )
+
+    def _parse_terms(
+        self, trg: str, cfg: list[str], vect: int
+    ) -> list[DTriggerConfigReq]:
+        """Parse all terms of a trigger combination."""
+        terms = [self._parse_term(item, vect) for item in cfg]
+        if len(terms) < 2 or (trg == "then" and len(terms) != 2):
+            raise click.BadParameter(
+                f"invalid number of terms for trigger combination: {trg}"
+            )
+        return terms
+
     def convert(
         self, value: Any, param: Any, ctx: Any
     ) -> dict[int, DTriggerConfigReq]:
@@ -207,6 +250,9 @@ class Trigger(click.ParamType):
                 cross = None
 
             cfg, named = self._parse_named_args(tmp[1:])
+            if trg in self.combo_types:
+                named["terms"] = self._parse_terms(trg, cfg, vect)
+                cfg = []
             # special case for global configuration
             if schan == self.req_global:
                 chan = -1
@@ -305,6 +351,9 @@ divider_option_help = """Configure divider for a given channels.
                           the same divider value, or use a list of integers
                           (separated by commas) to directly configure the
                           channels."""
+dtype_option_help = """Data type of stored samples.
+                        By default samples are stored in the channel data
+                        type."""
 
 
 ###############################################################################
@@ -334,3 +383,162 @@ def capture_options(fn: Any) -> Any:
     for decorator in reversed(_capture_options):
         fn = decorator(fn)
     return fn
+
+
+###############################################################################
+# Decorator: dtype_option
+###############################################################################
+
+
+# Numpy data types of capture files
+_dtype_option = click.option(
+    "--dtype",
+    default=None,
+    type=click.Choice(
+        [
+            "int8",
+            "uint8",
+            "int16",
+            "uint16",
+            "int32",
+            "uint32",
+            "int64",
+            "uint64",
+            "float32",
+            "float64",
+        ]
+    ),
+    help=dtype_option_help,
+)
+
+
+def dtype_option(fn: Any) -> Any:
+    """Decorate command with capture file data type option."""
+    return _dtype_option(fn)
+
+
+###############################################################################
+# Decorator: writer_options
+###############################################################################
+
+
+# background file writer options
+_writer_options = (
+    click.option(
+        "--wbuf",
+        default=1024,
+        type=click.IntRange(min=1),
+        help="file write buffer size in KiB",
+    ),
+    click.option(
+        "--wflush",
+        default=1.0,
+        type=click.FloatRange(min=0.0),
+        help="write partially filled buffers after this many seconds, "
+        "0 disables",
+    ),
+    click.option(
+        "--fsync",
+        default=EFsyncPolicy.NEVER.value,
+        type=click.Choice([policy.value for policy in EFsyncPolicy]),
+        help="sync files to disk never, on close or after every write",
+    ),
+)
+
+
+def writer_options(fn: Any) -> Any:
+    """Decorate command with file writer options decorator."""
+    for decorator in reversed(_writer_options):
+        fn = decorator(fn)
+    return fn
+
+
+###############################################################################
+# Decorator: codec_options
+###############################################################################
+
+
+# file compression options
+_codec_options = (
+    click.option(
+        "--codec",
+        default=None,
+        type=click.Choice(sorted(CODECS)),
+        help="compress files in independent chunks",
+    ),
+    click.option(
+        "--clevel",
+        default=None,
+        type=int,
+        help="compression level, codec default if not set",
+    ),
+)
+
+
+def codec_options(fn: Any) -> Any:
+    """Decorate command with file compression options decorator."""
+    for decorator in reversed(_codec_options):
+        fn = decorator(fn)
+    return fn
+
+
+def writer_opts(
+    wbuf: int,
+    wflush: float,
+    fsync: str,
+    codec: str | None = None,
+    clevel: int | None = None,
+) -> DFileWriterOpts:
+    """Get file writer options from command options.
+
+    :param wbuf: buffer size in KiB
+    :param wflush: flush interval in seconds
+    :param fsync: sync policy
+    :param codec: compression codec
+    :param clevel: compression level
+    """
+    return DFileWriterOpts(
+        buffer_size=wbuf * 1024,
+        flush_interval=wflush,
+        fsync=EFsyncPolicy(fsync),
+        codec=codec,
+        level=clevel,
+    )
+
+
+###############################################################################
+# Decorator: rotate_options
+###############################################################################
+
+
+# file rotation options
+_rotate_options = (
+    click.option(
+        "--rotsize",
+        default=0.0,
+        type=click.FloatRange(min=0.0),
+        help="start a new file segment after this many MiB, 0 disables",
+    ),
+    click.option(
+        "--rottime",
+        default=0.0,
+        type=click.FloatRange(min=0.0),
+        help="start a new file segment after this many seconds, 0 disables",
+    ),
+)
+
+
+def rotate_options(fn: Any) -> Any:
+    """Decorate command with file rotation options decorator."""
+    for decorator in reversed(_rotate_options):
+        fn = decorator(fn)
+    return fn
+
+
+def rotate_opts(rotsize: float, rottime: float) -> DRotateOpts:
+    """Get file rotation options from command options.
+
+    :param rotsize: segment size in MiB
+    :param rottime: segment duration in seconds
+    """
+    return DRotateOpts(size=int(rotsize * 1024 * 1024), interval=rottime)
@@ -0,0 +1,199 @@
+"""Compression codecs of capture files."""
+
+import bz2
+import gzip
+import importlib
+import lzma
+import zlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from nxscli.logger import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+###############################################################################
+# Data: DCodec
+###############################################################################
+
+
+@dataclass(frozen=True)
+class DCodec:
+    """Compression codec.
+
+    ``compress`` encodes data as one independent stream, streams of a
+    codec can be concatenated in a file and the file is still readable
+    by the codec command line tool. ``decompress`` decodes one stream,
+    ``decompressor`` creates an incremental decoder of one stream with
+    ``decompress()``, ``eof`` and ``unused_data`` members.
+    """
+
+    name: str
+    # codec identifier stored in chunk headers
+    ident: int
+    # file name suffix
+    ext: str
+    compress: "Callable[[Any, int | None], bytes]"
+    decompress: "Callable[[Any], bytes]"
+    decompressor: "Callable[[], Any]"
+
+
+def _zlib_compress(data: Any, level: int | None) -> bytes:
+    # gzip framing, concatenated members are a valid gzip file
+    return gzip.compress(data, 6 if level is None else level, mtime=0)
+
+
+def _lzma_compress(data: Any, level: int | None) -> bytes:
+    return lzma.compress(data, preset=level)
+
+
+def _bz2_compress(data: Any, level: int | None) -> bytes:
+    return bz2.compress(data, 9 if level is None else level)
+
+
+def _zlib_decompressor() -> Any:
+    # gzip framing
+    return zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+
+def _zstd_codec() -> DCodec | None:  # pragma: no cover
+    try:
+        zstd = importlib.import_module("zstandard")
+    except ImportError:
+        return None
+
+    def compress(data: Any, level: int | None) -> bytes:
+        cctx = zstd.ZstdCompressor(level=3 if level is None else level)
+        return bytes(cctx.compress(data))
+
+    def decompress(data: Any) -> bytes:
+        return bytes(zstd.ZstdDecompressor().decompressobj().decompress(data))
+
+    def decompressor() -> Any:
+        return zstd.ZstdDecompressor().decompressobj()
+
+    return DCodec("zstd", 4, ".zst", compress, decompress, decompressor)
+
+
+def _lz4_codec() -> DCodec | None:  # pragma: no cover
+    try:
+        lz4 = importlib.import_module("lz4.frame")
+    except ImportError:
+        return None
+
+    def compress(data: Any, level: int | None) -> bytes:
+        return bytes(lz4.compress(data, compression_level=level or 0))
+
+    return DCodec(
+        "lz4", 5, ".lz4", compress, lz4.decompress, lz4.LZ4FrameDecompressor
+    )
+
+
+# available codecs, optional codecs are added if their package is installed
+CODECS: dict[str, DCodec] = {
+    codec.name: codec
+    for codec in (
+        DCodec(
+            "zlib",
+            1,
+            ".gz",
+            _zlib_compress,
+            gzip.decompress,
+            _zlib_decompressor,
+        ),
+        DCodec(
+            "lzma",
+            2,
+            ".xz",
+            _lzma_compress,
+            lzma.decompress,
+            lzma.LZMADecompressor,
+        ),
+        DCodec(
+            "bz2",
+            3,
+            ".bz2",
+            _bz2_compress,
+            bz2.decompress,
+            bz2.BZ2Decompressor,
+        ),
+        _zstd_codec(),
+        _lz4_codec(),
+    )
+    if codec is not None
+}
+
+
+def codec_get(name: str) -> DCodec:
+    """Get a codec by name.
+
+    :param name: codec name
+    """
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"unsupported codec {name}") from None
+
+
+def codec_by_ident(ident: int) -> DCodec:
+    """Get a codec by chunk header identifier.
+
+    :param ident: codec identifier
+    """
+    for codec in CODECS.values():
+        if codec.ident == ident:
+            return codec
+    raise ValueError(f"unsupported codec identifier {ident}")
+
+
+###############################################################################
+# Data: DCodecStats
+###############################################################################
+
+
+@dataclass(frozen=True)
+class DCodecStats:
+    """Compression counters.
+
+    ``cpu_time`` is the CPU time of compression in seconds, summed over
+    all worker threads.
+    """
+
+    raw_bytes: int = 0
+    bytes: int = 0
+    cpu_time: float = 0.0
+
+    @property
+    def ratio(self) -> float:
+        """Get compression ratio, raw bytes per stored byte."""
+        if not self.bytes:
+            return 0.0
+        return self.raw_bytes / self.bytes
+
+    def add(self, raw: int, stored: int, cpu: float) -> "DCodecStats":
+        """Get counters with one more compressed stream.
+
+        :param raw: raw bytes
+        :param stored: compressed bytes
+        :param cpu: CPU time in seconds
+        """
+        return DCodecStats(
+            self.raw_bytes + raw, self.bytes + stored, self.cpu_time + cpu
+        )
+
+
+def codec_stats_log(name: str, stats: DCodecStats) -> None:
+    """Log compression counters.
+
+    :param name: stream name
+    :param stats: compression counters
+    """
+    logger.info(
+        "%s: compressed %d to %d bytes, ratio=%.2f cpu=%.3fs",
+        name,
+        stats.raw_bytes,
+        stats.bytes,
+        stats.ratio,
+        stats.cpu_time,
+    )
@@ -0,0 +1,83 @@
+"""Module containing chunked container capture plugin command."""
+
+from typing import TYPE_CHECKING
+
+import click
+
+from nxscli.cli.environment import Environment, pass_environment
+from nxscli.cli.types import (
+    Samples,
+    capture_options,
+    codec_options,
+    dtype_option,
+    rotate_options,
+    rotate_opts,
+    writer_options,
+    writer_opts,
+)
+
+if TYPE_CHECKING:
+    from nxscli.trigger import DTriggerConfigReq
+
+
+@click.command(name="pchunk")
+@click.argument("samples", type=Samples(), required=True)
+@click.argument("path", type=click.Path(resolve_path=False), required=True)
+@capture_options
+@dtype_option
+@writer_options
+@codec_options
+@rotate_options
+@pass_environment
+def cmd_pchunk(
+    ctx: Environment,
+    samples: int,
+    path: str,
+    chan: list[int],
+    trig: dict[int, "DTriggerConfigReq"],
+    dtype: str | None,
+    wbuf: int,
+    wflush: float,
+    fsync: str,
+    codec: str | None,
+    clevel: int | None,
+    rotsize: float,
+    rottime: float,
+) -> bool:
+    """[plugin] Store samples in a chunked container file.
+
+    All configured channels are stored in a single PATH.nxc file.
+    If SAMPLES argument is set to 'i' then we capture data until enter
+    is press.
+
+    Samples are appended in chunks with their trigger events and an
+    index is written when the capture ends. Any sample range can be read
+    back without loading the whole file, also from a file of a killed
+    capture. With '--codec' each chunk is compressed independently.
+
+    With '--rotsize' or '--rottime' the container is split into
+    numbered segments (PATH_000000.nxc, ...), finished segments and
+    their sample ranges are listed in PATH_segments.jsonl.
+
+    Samples are stored in the channel data type, use '--dtype' to
+    convert them.
+    """  # noqa: D301
+    assert ctx.phandler
+    if samples == 0:  # pragma: no cover
+        ctx.waitenter = True
+
+    ctx.phandler.enable(
+        "chunk",
+        samples=samples,
+        path=path,
+        channels=chan,
+        trig=trig,
+        nostop=ctx.waitenter,
+        dtype=dtype,
+        writer_opts=writer_opts(wbuf, wflush, fsync, codec, clevel),
+        rotate_opts=rotate_opts(rotsize, rottime),
+    )
+
+    ctx.needchannels = True
+
+    return True
@@ -5,7 +5,15 @@ from typing import TYPE_CHECKING
 import click
 
 from nxscli.cli.environment import Environment, pass_environment
-from nxscli.cli.types import Samples, capture_options
+from nxscli.cli.types import (
+    Samples,
+    capture_options,
+    codec_options,
+    rotate_options,
+    rotate_opts,
+    writer_options,
+    writer_opts,
+)
 
 if TYPE_CHECKING:
     from nxscli.trigger import DTriggerConfigReq
@@ -23,6 +31,9 @@ if TYPE_CHECKING:
 @click.option(
     "--metastr", default=False, is_flag=True, help="store metadata as string"
 )
+@writer_options
+@codec_options
+@rotate_options
 @pass_environment
 def cmd_pcsv(
     ctx: Environment,
@@ -31,12 +42,29 @@ def cmd_pcsv(
     chan: list[int],
     trig: dict[int, "DTriggerConfigReq"],
     metastr: bool,
+    wbuf: int,
+    wflush: float,
+    fsync: str,
+    codec: str | None,
+    clevel: int | None,
+    rotsize: float,
+    rottime: float,
 ) -> bool:
     """[plugin] Store samples in CSV files.
 
     Each configured channel will be stored in a separate file.
     If SAMPLES argument is set to '0' then we capture data until enter
     is press.
+
+    Files are written by background threads, '--wbuf', '--wflush' and
+    '--fsync' configure write buffers, flush interval and disk sync.
+
+    With '--codec' each write buffer is compressed as an independent
+    stream, files can be read with the codec tools (for example gzip).
+
+    With '--rotsize' or '--rottime' files are split into numbered
+    segments (PATH_chanN_000000.EXT, ...), finished segments and their
+    sample ranges are listed in PATH_segments.jsonl.
     """  # noqa: D301
     # wait for enter if samples set to '0'
     assert ctx.phandler
@@ -50,6 +78,8 @@ def cmd_pcsv(
         channels=chan,
         trig=trig,
         metastr=metastr,
+        writer_opts=writer_opts(wbuf, wflush, fsync, codec, clevel),
+        rotate_opts=rotate_opts(rotsize, rottime),
         nostop=ctx.waitenter,
     )
 
@@ -5,7 +5,13 @@ from typing import TYPE_CHECKING
 import click
 
 from nxscli.cli.environment import Environment, pass_environment
-from nxscli.cli.types import Samples, capture_options
+from nxscli.cli.types import (
+    Samples,
+    capture_options,
+    dtype_option,
+    writer_options,
+    writer_opts,
+)
 
 if TYPE_CHECKING:
     from nxscli.trigger import DTriggerConfigReq
@@ -16,6 +22,8 @@ if TYPE_CHECKING:
 @click.argument("path", type=click.Path(resolve_path=False), required=True)
 @click.argument("shape", type=int, required=True)
 @capture_options
+@dtype_option
+@writer_options
 @pass_environment
 def cmd_pnpmem(
     ctx: Environment,
@@ -24,6 +32,10 @@ def cmd_pnpmem(
     shape: int,
     chan: list[int],
     trig: dict[int, "DTriggerConfigReq"],
+    dtype: str | None,
+    wbuf: int,
+    wflush: float,
+    fsync: str,
 ) -> bool:
     """[plugin] Store samples in Numpy memmap files.
 
@@ -32,7 +44,13 @@ def cmd_pnpmem(
     If SAMPLES argument is set to 'i' then we capture data until enter
     is press.
 
-    The 'shape' argument defines the second dimension of the memmap array.
+    Each file is a ring buffer that keeps the latest SHAPE samples and
+    can be read by other processes during capture. The ring is its own
+    write buffer, with '--fsync flush' it is synced to disk every
+    '--wflush' seconds.
+
+    Samples are stored in the channel data type, use '--dtype' to
+    convert them.
     """  # noqa: D301
     assert ctx.phandler
     if samples == 0:  # pragma: no cover
@@ -46,6 +64,8 @@ def cmd_pnpmem(
         shape=shape,
         trig=trig,
         nostop=ctx.waitenter,
+        dtype=dtype,
+        writer_opts=writer_opts(wbuf, wflush, fsync),
     )
 
     ctx.needchannels = True
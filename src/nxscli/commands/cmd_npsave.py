@@ -5,7 +5,16 @@ from typing import TYPE_CHECKING
 import click
 
 from nxscli.cli.environment import Environment, pass_environment
-from nxscli.cli.types import Samples, capture_options
+from nxscli.cli.types import (
+    Samples,
+    capture_options,
+    codec_options,
+    dtype_option,
+    rotate_options,
+    rotate_opts,
+    writer_options,
+    writer_opts,
+)
 
 if TYPE_CHECKING:
     from nxscli.trigger import DTriggerConfigReq
@@ -15,6 +24,16 @@ if TYPE_CHECKING:
 @click.argument("samples", type=Samples(), required=True)
 @click.argument("path", type=click.Path(resolve_path=False), required=True)
 @capture_options
+@click.option(
+    "--bufrows",
+    default=None,
+    type=click.IntRange(min=1),
+    help="rows in one write buffer of a channel, overrides '--wbuf'",
+)
+@dtype_option
+@writer_options
+@codec_options
+@rotate_options
 @pass_environment
 def cmd_pnpsave(
     ctx: Environment,
@@ -22,12 +41,36 @@ def cmd_pnpsave(
     path: str,
     chan: list[int],
     trig: dict[int, "DTriggerConfigReq"],
+    bufrows: int | None,
+    dtype: str | None,
+    wbuf: int,
+    wflush: float,
+    fsync: str,
+    codec: str | None,
+    clevel: int | None,
+    rotsize: float,
+    rottime: float,
 ) -> bool:
     """[plugin] Store samples in Numpy files.
 
     Each configured channel will be stored in a separate file.
     If SAMPLES argument is set to 'i' then we capture data until enter
     is press.
+
+    Samples are written to disk during capture by background threads,
+    '--wbuf' (or '--bufrows'), '--wflush' and '--fsync' configure write
+    buffers, flush interval and disk sync.
+
+    With '--codec' each write buffer is compressed as an independent
+    stream, load files with Numpy from the codec file object (for
+    example gzip.open()).
+
+    With '--rotsize' or '--rottime' files are split into numbered
+    segments (PATH_chanN_000000.EXT, ...), finished segments and their
+    sample ranges are listed in PATH_segments.jsonl.
+
+    Samples are stored in the channel data type, use '--dtype' to
+    convert them.
     """  # noqa: D301
     assert ctx.phandler
     if samples == 0:  # pragma: no cover
@@ -40,6 +83,10 @@ def cmd_pnpsave(
         channels=chan,
         trig=trig,
         nostop=ctx.waitenter,
+        buffer_rows=bufrows,
+        dtype=dtype,
+        writer_opts=writer_opts(wbuf, wflush, fsync, codec, clevel),
+        rotate_opts=rotate_opts(rotsize, rottime),
     )
 
     ctx.needchannels = True
@@ -46,6 +46,14 @@ def cmd_trig(
        ef - edge falling: [hoffset, level]
        we - window enter, parameters: [hoffset, low, high]
        wx - window exit, parameters: [hoffset, low, high]
+       sr - slew rate, parameters: [hoffset, limit]
+       ph - high pulse width: [hoffset, level, wmin, wmax]
+       pl - low pulse width: [hoffset, level, wmin, wmax]
+       rh - high runt pulse, parameters: [hoffset, low, high]
+       rl - low runt pulse, parameters: [hoffset, low, high]
+       and - all terms at the same sample, parameters: [term, term, ...]
+       or - any term, parameters: [term, term, ...]
+       then - second term within N samples after first: [term, term]
 
     Optional named trigger options:
        mode=start_after|stop_after
@@ -53,11 +61,20 @@ def cmd_trig(
        post=<samples>
        holdoff=<samples>
        rearm=true|false
+       within=<samples>
 
     \b
     where:
        hoffset - legacy pre-trigger sample count
        level - trigger level
+       limit - maximum change between two samples
+       wmin, wmax - pulse width limits in samples, wmax=0 or no wmax
+                    is unlimited
+       rearm - capture every hit as a pre/post segment (start_after)
+       holdoff - minimum samples between rearmed triggers
+       term - '[!][trigger][@chan_vector]/[parameters]', data trigger
+              parameters without hoffset, '!' negates the term
+       within - maximum samples from the first to the second 'then' term
 
     Default: all channels on ('g:on').
 
@@ -84,6 +101,16 @@ def cmd_trig(
       'g:we,0,-0.5,0.5,pre=32'
     - all chans capture after exiting window [-0.25, 0.25]:
       'g:wx,0,-0.25,0.25'
+    - all chans triggered after a high pulse of 5 to 20 samples:
+      'g:ph,0,0.5,5,20'
+    - all chans triggered after a pulse above 0.2 that stays below 0.8:
+      'g:rh,0,0.2,0.8'
+    - all chans triggered on vect 0 rising edge when vect 1 does not
+      exit window [-1, 1] at the same sample:
+      'g:and,er/0.5,!wx@1/-1/1'
+    - all chans triggered on vect 0 rising edge followed by vect 1
+      falling edge within 100 samples, 16 pre-trigger samples:
+      'g:then,er/0.5,ef@1/0.2,within=100,pre=16'
     """  # noqa: D301
     assert ctx.phandler
     ctx.triggers = triggers
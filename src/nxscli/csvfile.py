@@ -0,0 +1,141 @@
+"""Block encoder for CSV capture files."""
+
+import re
+from typing import Any
+
+import numpy as np
+
+###############################################################################
+# CSV dialect
+###############################################################################
+
+# rows are written as with this csv.writer dialect:
+#   delimiter=" ", quotechar="|", escapechar="\\", quoting=QUOTE_MINIMAL
+CSV_DELIMITER = " "
+CSV_QUOTECHAR = "|"
+CSV_ESCAPECHAR = "\\"
+CSV_LINETERMINATOR = "\r\n"
+
+# characters that need quoting or escaping in a field
+_CSV_SPECIAL = re.compile(r"[ |\\\r\n]")
+_CSV_QUOTE = re.compile(r"[ |\r\n]")
+
+
+def csv_field(text: str) -> str:
+    """Quote a field as ``csv.writer`` does with the capture dialect.
+
+    :param text: field text
+    """
+    if not _CSV_SPECIAL.search(text):
+        return text
+    quote = _CSV_QUOTE.search(text) is not None
+    text = text.replace(CSV_ESCAPECHAR, CSV_ESCAPECHAR * 2)
+    text = text.replace(CSV_QUOTECHAR, CSV_QUOTECHAR * 2)
+    if quote:
+        return CSV_QUOTECHAR + text + CSV_QUOTECHAR
+    return text
+
+
+###############################################################################
+# Function: csv_block
+###############################################################################
+
+
+def _scalar_format(dtype: "np.dtype[Any]") -> str | None:
+    """Get ``%`` format of ``repr()`` of a Numpy scalar.
+
+    Tuples of Numpy scalars are formatted with ``repr()`` of items, which
+    wraps the value in the type name since Numpy 2.0. Values are
+    formatted from Python scalars where ``str()`` is the same and
+    faster, from Numpy strings otherwise.
+    """
+    if dtype.kind in "iu":
+        conv = "%d"
+    elif dtype.kind == "f" and dtype.itemsize == 8:
+        conv = "%r"
+    elif dtype.kind == "f":
+        conv = "%s"
+    else:
+        return None
+    value = dtype.type(0)
+    prefix, _, suffix = repr(value).partition(str(value))
+    return prefix.replace("%", "%%") + conv + suffix.replace("%", "%%")
+
+
+def _tuple_format(cols: int, item: str) -> str:
+    """Get ``%`` format of a ``str(tuple(row))`` field."""
+    if cols == 1:
+        text = "(" + item + ",)"
+    else:
+        text = "(" + ", ".join([item] * cols) + ")"
+    # formatted values never contain special characters
+    return csv_field(text)
+
+
+def _tuple_fields(
+    arr: np.ndarray[Any, Any],
+) -> tuple[str, np.ndarray[Any, Any]]:
+    """Get row format and values of ``str(tuple(row))`` fields.
+
+    Numerical columns are formatted with the block, other types are
+    formatted row by row.
+    """
+    cols = int(arr.shape[1])
+    if cols == 0:
+        return "()", np.empty((arr.shape[0], 0), dtype=object)
+    item = _scalar_format(arr.dtype)
+    if item is None:
+        rows = [csv_field(str(tuple(row))) for row in arr]
+        return "%s", np.array(rows, dtype=object).reshape(-1, 1)
+    if "%s" in item:
+        return _tuple_format(cols, item), arr.astype(str).astype(object)
+    return _tuple_format(cols, item), arr.astype(object)
+
+
+def _meta_strings(meta: np.ndarray[Any, Any]) -> np.ndarray[Any, Any]:
+    """Decode metadata rows as strings, quoted for CSV."""
+    raw = np.ascontiguousarray(meta.astype(np.uint8, copy=False))
+    mlen = int(raw.shape[1])
+    buf = raw.tobytes()
+    if raw.size and int(raw.max()) >= 0x80:
+        # multi-byte characters, rows are decoded separately
+        strs = [buf[i : i + mlen].decode() for i in range(0, len(buf), mlen)]
+    else:
+        text = buf.decode("ascii")
+        strs = [text[i : i + mlen] for i in range(0, len(text), mlen)]
+    if _CSV_SPECIAL.search(buf.decode("latin1")):
+        strs = [csv_field(s) for s in strs]
+    return np.array(strs, dtype=object).reshape(-1, 1)
+
+
+def csv_block(
+    data: np.ndarray[Any, Any],
+    meta: np.ndarray[Any, Any] | None,
+    metastr: bool = False,
+) -> str:
+    """Encode a block as CSV rows.
+
+    The output is the same as ``csv.writer.writerows()`` of
+    ``(tuple(data_row), meta)`` rows with the capture dialect, where
+    meta is ``tuple(meta_row)``, the decoded meta row if ``metastr``
+    is set, or an empty tuple if the block has no metadata.
+
+    All rows are formatted with a single ``%`` operation.
+
+    :param data: ``(rows, vdim)`` block data
+    :param meta: ``(rows, mlen)`` block metadata
+    :param metastr: decode metadata as a string
+    """
+    rows = int(data.shape[0])
+    if rows == 0:
+        return ""
+    dfmt, dvals = _tuple_fields(data)
+    if meta is None:
+        mfmt, mvals = "()", np.empty((rows, 0), dtype=object)
+    elif metastr:
+        mfmt, mvals = "%s", _meta_strings(meta)
+    else:
+        mfmt, mvals = _tuple_fields(meta)
+    line = dfmt + CSV_DELIMITER + mfmt + CSV_LINETERMINATOR
+    values = np.concatenate((dvals, mvals), axis=1)
+    return (line * rows) % tuple(values.ravel().tolist())
@@ -2,6 +2,7 @@
 
 from typing import TYPE_CHECKING
 
+from nxscli.commands.cmd_chunk import cmd_pchunk
 from nxscli.commands.cmd_csv import cmd_pcsv
 from nxscli.commands.cmd_devinfo import cmd_pdevinfo
 from nxscli.commands.cmd_none import cmd_pnone
@@ -25,6 +26,7 @@ commands_list: list["click.Command"] = [
     cmd_pcsv,
     cmd_pnpsave,
     cmd_pnpmem,
+    cmd_pchunk,
     cmd_pnone,
     cmd_printer,
     cmd_pudp,
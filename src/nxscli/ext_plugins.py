@@ -1,6 +1,7 @@
 """Default plugins."""
 
 from nxscli.iplugin import DPluginDescription
+from nxscli.plugins.chunk import PluginChunk
 from nxscli.plugins.csv import PluginCsv
 from nxscli.plugins.devinfo import PluginDevinfo
 from nxscli.plugins.none import PluginNone
@@ -14,6 +15,7 @@ plugins_list = [
     DPluginDescription("csv", PluginCsv),
     DPluginDescription("npsave", PluginNpsave),
     DPluginDescription("npmem", PluginNpmem),
+    DPluginDescription("chunk", PluginChunk),
     DPluginDescription("none", PluginNone),
     DPluginDescription("printer", PluginPrinter),
     DPluginDescription("udp", PluginUdp),
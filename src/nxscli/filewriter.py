@@ -0,0 +1,462 @@
+"""Buffered file writer with a background I/O thread."""
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from time import perf_counter, thread_time
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+from nxscli.codec import DCodecStats, codec_get, codec_stats_log
+from nxscli.logger import logger
+from nxscli.metrics import DHistogramSnapshot, LatencyHistogram
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+###############################################################################
+# Enum: EFsyncPolicy
+###############################################################################
+
+
+class EFsyncPolicy(Enum):
+    """File sync policy."""
+
+    # leave it to the OS
+    NEVER = "never"
+    # sync once when the file is closed
+    CLOSE = "close"
+    # sync after every flush
+    FLUSH = "flush"
+
+
+###############################################################################
+# Data: DFileWriterOpts
+###############################################################################
+
+
+@dataclass(frozen=True)
+class DFileWriterOpts:
+    """File writer options.
+
+    Data are copied into one of ``buffers`` buffers of ``buffer_size``
+    bytes, full buffers are written by the I/O thread. If all buffers
+    wait for the disk another one is allocated, up to ``max_buffers``
+    buffers. Past that limit the capture thread waits for the disk, so
+    memory never exceeds ``max_buffers * buffer_size`` bytes, the same
+    limit applies to data of compression jobs.
+
+    A partially filled buffer is passed to the I/O thread after
+    ``flush_interval`` seconds, so data reach the file even at low data
+    rates. ``0`` disables the interval flush.
+
+    With a ``codec`` (see :data:`nxscli.codec.CODECS`) each buffer is
+    compressed as an independent stream by a pool of ``workers``
+    threads, ``level`` is the codec compression level.
+    """
+
+    buffer_size: int = 1 << 20
+    buffers: int = 2
+    max_buffers: int = 8
+    flush_interval: float = 1.0
+    fsync: EFsyncPolicy = EFsyncPolicy.NEVER
+    codec: str | None = None
+    level: int | None = None
+    workers: int = 2
+
+
+###############################################################################
+# Data: DFileWriterStats
+###############################################################################
+
+
+@dataclass(frozen=True)
+class DFileWriterStats:
+    """File writer counters.
+
+    ``bytes_written`` counts bytes stored in the file, ``latency`` holds
+    durations of disk writes including sync. ``stalls`` counts waits of
+    the capture thread for a free buffer, ``stall_time`` is their total
+    duration. ``codec`` holds compression counters of compressed files.
+    """
+
+    bytes_written: int = 0
+    writes: int = 0
+    fsyncs: int = 0
+    buffers: int = 0
+    buffer_bytes: int = 0
+    pending_bytes: int = 0
+    high_water_bytes: int = 0
+    stalls: int = 0
+    stall_time: float = 0.0
+    latency: DHistogramSnapshot = field(default_factory=DHistogramSnapshot)
+    codec: DCodecStats | None = None
+
+    @property
+    def occupancy(self) -> float:
+        """Get fraction of buffer memory waiting for the disk."""
+        if not self.buffer_bytes:
+            return 0.0
+        return self.pending_bytes / self.buffer_bytes
+
+
+def writer_stats_log(name: str, stats: DFileWriterStats) -> None:
+    """Log file writer counters.
+
+    :param name: writer name
+    :param stats: writer counters
+    """
+    logger.info(
+        "%s: wrote %d bytes in %d writes, buffers=%d high_water=%d, "
+        "stalls=%d (%.3fs), latency mean=%.6f max=%.6f",
+        name,
+        stats.bytes_written,
+        stats.writes,
+        stats.buffers,
+        stats.high_water_bytes,
+        stats.stalls,
+        stats.stall_time,
+        stats.latency.mean,
+        stats.latency.maximum,
+    )
+    if stats.codec is not None:
+        codec_stats_log(name, stats.codec)
+
+
+@dataclass
+class _DPending:
+    """Data waiting for the I/O thread."""
+
+    # raw bytes
+    size: int
+    # buffer with raw data, returned to the free list once written
+    buf: bytearray | None = None
+    # encoded data
+    future: "Future[tuple[bytes, float]] | None" = None
+    # called with stored bytes and CPU time once written
+    done: "Callable[[int, float], None] | None" = None
+
+
+###############################################################################
+# Class: FileWriter
+###############################################################################
+
+
+class FileWriter:
+    """Write a file from a background I/O thread.
+
+    :meth:`write` only copies data into the active buffer, all file
+    operations run in the I/O thread. It waits for the disk only when
+    ``max_buffers`` buffers are in use (see :class:`DFileWriterOpts`).
+    Errors of the I/O thread are raised by the next :meth:`write` or by
+    :meth:`close`.
+
+    Compression runs in a thread pool, the I/O thread writes compressed
+    buffers in order.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        opts: DFileWriterOpts | None = None,
+        header: bytes = b"",
+    ) -> None:
+        """Open a file.
+
+        :param path: file path
+        :param opts: writer options
+        :param header: data written before the I/O thread starts
+        """
+        self._opts = opts or DFileWriterOpts()
+        assert self._opts.buffer_size > 0
+        assert self._opts.buffers > 0
+        # the I/O thread flush needs a second buffer
+        assert self._opts.max_buffers >= max(self._opts.buffers, 2)
+        self._codec = None
+        self._codec_stats: DCodecStats | None = None
+        if self._opts.codec is not None:
+            self._codec = codec_get(self._opts.codec)
+            self._codec_stats = DCodecStats()
+            if header:
+                raw = len(header)
+                header = self._codec.compress(header, self._opts.level)
+                self._codec_stats = self._codec_stats.add(raw, len(header), 0)
+        self._pool: ThreadPoolExecutor | None = None
+        self._file: BinaryIO = open(path, "w+b")
+        # the header reaches the file even if the capture is killed
+        self._file.write(header)
+        self._file.flush()
+
+        size = self._opts.buffer_size
+        self._active = bytearray(size)
+        self._fill = 0
+        self._free = [bytearray(size) for _ in range(self._opts.buffers - 1)]
+        self._pending: deque[_DPending] = deque()
+        self._buffers = self._opts.buffers
+        self._pending_bytes = 0
+        self._high_water = 0
+        self._stalls = 0
+        self._stall_time = 0.0
+        self._stamp = perf_counter()
+        self._closing = False
+
+        self._header_size = len(header)
+        self._bytes = len(header)
+        self._writes = 0
+        self._fsyncs = 0
+        self._latency = LatencyHistogram()
+        self._error: BaseException | None = None
+
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._io_loop, name="filewriter", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def opts(self) -> DFileWriterOpts:
+        """Get writer options."""
+        return self._opts
+
+    @property
+    def header_size(self) -> int:
+        """Get stored header size, compressed with a codec."""
+        return self._header_size
+
+    @property
+    def closed(self) -> bool:
+        """Return True if the file is closed."""
+        return self._file.closed
+
+    def stats(self) -> DFileWriterStats:
+        """Get writer counters."""
+        with self._cond:
+            return DFileWriterStats(
+                bytes_written=self._bytes,
+                writes=self._writes,
+                fsyncs=self._fsyncs,
+                buffers=self._buffers,
+                buffer_bytes=self._buffers * self._opts.buffer_size,
+                pending_bytes=self._pending_bytes + self._fill,
+                high_water_bytes=self._high_water,
+                stalls=self._stalls,
+                stall_time=self._stall_time,
+                latency=self._latency.snapshot(),
+                codec=self._codec_stats,
+            )
+
+    def _pool_get(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                self._opts.workers, thread_name_prefix="filecodec"
+            )
+        return self._pool
+
+    @staticmethod
+    def _run(job: "Callable[[], bytes]") -> tuple[bytes, float]:
+        """Run an encoder job, return its output and CPU time."""
+        start = thread_time()
+        data = job()
+        return data, thread_time() - start
+
+    def _encode(self, buf: bytearray, num: int) -> bytes:
+        assert self._codec
+        return self._codec.compress(memoryview(buf)[:num], self._opts.level)
+
+    def _queue(self, item: _DPending) -> None:
+        """Pass data to the I/O thread, lock must be held."""
+        self._pending.append(item)
+        self._pending_bytes += item.size
+        self._high_water = max(self._high_water, self._pending_bytes)
+        self._cond.notify_all()
+
+    def _wait(self, ready: "Callable[[], bool]") -> None:
+        """Wait for the I/O thread until ready, lock must be held."""
+        if ready():
+            return
+        start = perf_counter()
+        while not ready():
+            self._cond.wait()
+        self._stalls += 1
+        self._stall_time += perf_counter() - start
+
+    def _buffer_ready(self) -> bool:
+        """Return True if a buffer can be submitted, lock must be held."""
+        return bool(self._free) or self._buffers < self._opts.max_buffers
+
+    def _submit(self) -> None:
+        """Pass the active buffer to the I/O thread, lock must be held.
+
+        A free buffer or room for a new one must be available, see
+        :meth:`_buffer_ready`.
+        """
+        if self._fill == 0:
+            return
+        item = _DPending(self._fill, buf=self._active)
+        if self._codec is not None:
+            buf, num = self._active, self._fill
+            item.future = self._pool_get().submit(
+                self._run, lambda: self._encode(buf, num)
+            )
+        self._queue(item)
+        if self._free:
+            self._active = self._free.pop()
+        else:
+            # the disk is behind, the writer waits only at the limit
+            self._active = bytearray(self._opts.buffer_size)
+            self._buffers += 1
+        self._fill = 0
+        self._stamp = perf_counter()
+
+    def write(self, data: Any) -> None:
+        """Append data.
+
+        :param data: bytes-like object, C-contiguous
+        """
+        view = memoryview(data)
+        if view.nbytes == 0:
+            return
+        view = view.cast("B")
+        size = self._opts.buffer_size
+        with self._cond:
+            if self._error is not None:
+                raise self._error
+            pos = 0
+            while pos < len(view):
+                num = min(len(view) - pos, size - self._fill)
+                self._active[self._fill : self._fill + num] = view[
+                    pos : pos + num
+                ]
+                self._fill += num
+                pos += num
+                if self._fill == size:
+                    # the I/O thread may flush the buffer meanwhile
+                    self._wait(self._buffer_ready)
+                    self._submit()
+
+    def write_job(
+        self,
+        job: "Callable[[], bytes]",
+        size: int,
+        done: "Callable[[int, float], None] | None" = None,
+    ) -> None:
+        """Append data encoded by a job in the compression thread pool.
+
+        Jobs are written in order with the other data, ``done`` is
+        called from the I/O thread once the job output is written.
+
+        :param job: encoder, returns data to write
+        :param size: raw bytes encoded by the job
+        :param done: called with stored bytes and encoder CPU time
+        """
+        limit = self._opts.max_buffers * self._opts.buffer_size
+        with self._cond:
+            if self._error is not None:
+                raise self._error
+            self._wait(self._buffer_ready)
+            self._submit()
+            self._wait(lambda: self._pending_bytes < limit)
+            future = self._pool_get().submit(self._run, job)
+            self._queue(_DPending(size, future=future, done=done))
+
+    def flush(self) -> None:
+        """Pass buffered data to the I/O thread.
+
+        Waits only if all ``max_buffers`` buffers wait for the disk.
+        """
+        with self._cond:
+            self._wait(self._buffer_ready)
+            self._submit()
+
+    def _next(self) -> _DPending | None:
+        """Wait for a buffer to write, None when closed."""
+        interval = self._opts.flush_interval
+        with self._cond:
+            while not self._pending:
+                if self._closing:
+                    return None
+                if interval <= 0:
+                    self._cond.wait()
+                elif not self._cond.wait(interval) and (
+                    perf_counter() - self._stamp >= interval
+                ):
+                    self._submit()
+            return self._pending.popleft()
+
+    def _store(self, item: _DPending) -> tuple[int, float]:
+        """Write data, return stored bytes and encoder CPU time."""
+        data: bytes | memoryview
+        if item.future is not None:
+            data, cpu = item.future.result()
+        else:
+            assert item.buf is not None
+            data, cpu = memoryview(item.buf)[: item.size], 0.0
+        self._file.write(data)
+        # buffers are large, do not keep data in the process
+        self._file.flush()
+        if self._opts.fsync is EFsyncPolicy.FLUSH:
+            self._sync()
+        if item.done is not None:
+            item.done(len(data), cpu)
+        return len(data), cpu
+
+    def _io_loop(self) -> None:
+        while True:
+            item = self._next()
+            if item is None:
+                break
+            start = perf_counter()
+            stored, cpu = 0, 0.0
+            try:
+                if self._error is None:
+                    stored, cpu = self._store(item)
+            except Exception as exc:
+                # reported to the capture thread on the next write
+                self._error = exc
+            with self._cond:
+                self._latency.observe(perf_counter() - start)
+                self._pending_bytes -= item.size
+                self._bytes += stored
+                self._writes += 1
+                if item.future is not None:
+                    stats = self._codec_stats or DCodecStats()
+                    self._codec_stats = stats.add(item.size, stored, cpu)
+                if item.buf is not None:
+                    self._free.append(item.buf)
+                # wake the capture thread waiting for a buffer
+                self._cond.notify_all()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._fsyncs += 1
+
+    def close(
+        self, finalize: "Callable[[BinaryIO], None] | None" = None
+    ) -> None:
+        """Write pending data and close the file.
+
+        :param finalize: called with the file after all data are written,
+          before the file is synced and closed
+        """
+        if self.closed:
+            return
+        with self._cond:
+            self._wait(self._buffer_ready)
+            self._submit()
+            self._closing = True
+            self._cond.notify()
+        self._thread.join()
+        if self._pool is not None:
+            self._pool.shutdown()
+        try:
+            if self._error is not None:
+                raise self._error
+            if finalize is not None:
+                finalize(self._file)
+            if self._opts.fsync is not EFsyncPolicy.NEVER:
+                self._sync()
+        finally:
+            self._file.close()
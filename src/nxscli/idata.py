@@ -1,10 +1,15 @@
 """Module containing common plugin data definition."""
 
 import queue
+import threading
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any
 
+import numpy as np
+from nxslib.dev import EDeviceChannelType
+
 from nxscli.logger import logger
+from nxscli.stream_queue import StreamQueue, merge_blocks, payload_size
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -12,8 +17,37 @@ if TYPE_CHECKING:
     from nxslib.dev import DeviceChannel
 
     from nxscli.channelref import ChannelRef
+    from nxscli.stream_queue import DStreamQueueStats, DStreamSubOpts
     from nxscli.trigger import DTriggerEvent, TriggerHandler
 
+###############################################################################
+# Function: channel_dtype
+###############################################################################
+
+# block data types of numerical channels, other channel types (fixed-point
+# scaled by nxslib, user types) are delivered as float64
+_CHANNEL_DTYPES: dict[int, "np.dtype[Any]"] = {
+    EDeviceChannelType.UINT8.value: np.dtype(np.uint8),
+    EDeviceChannelType.INT8.value: np.dtype(np.int8),
+    EDeviceChannelType.UINT16.value: np.dtype(np.uint16),
+    EDeviceChannelType.INT16.value: np.dtype(np.int16),
+    EDeviceChannelType.UINT32.value: np.dtype(np.uint32),
+    EDeviceChannelType.INT32.value: np.dtype(np.int32),
+    EDeviceChannelType.UINT64.value: np.dtype(np.uint64),
+    EDeviceChannelType.INT64.value: np.dtype(np.int64),
+    EDeviceChannelType.FLOAT.value: np.dtype(np.float32),
+    EDeviceChannelType.DOUBLE.value: np.dtype(np.float64),
+}
+
+
+def channel_dtype(dtype: int) -> "np.dtype[Any]":
+    """Get Numpy data type of stream blocks for a channel type.
+
+    :param dtype: device channel data type
+    """
+    return _CHANNEL_DTYPES.get(dtype, np.dtype(np.float64))
+
+
 ###############################################################################
 # Class: PluginDataCb
 ###############################################################################
@@ -23,7 +57,7 @@ if TYPE_CHECKING:
 class PluginDataCb:
     """Plugin data callbacks."""
 
-    stream_sub: "Callable[[ChannelRef], queue.Queue[Any]]"
+    stream_sub: "Callable[..., queue.Queue[Any]]"
     stream_unsub: "Callable[[queue.Queue[Any]], None]"
 
 
@@ -41,18 +75,25 @@ class PluginQueueData:
         channel: "DeviceChannel",
         trig: "TriggerHandler",
         aux_drain: "Callable[[], None] | None" = None,
+        drain_rows: int = 0,
+        drain_bytes: int = 0,
     ):
         """Initialize a queue data handler.
 
         :param que: queue subscribed to a given channel
         :param channel: instance of a channel
         :param dtc: trigger configuration
+        :param drain_rows: row cap of drain-and-merge reads, 0 disables
+        :param drain_bytes: byte cap of drain-and-merge reads, 0 disables
         """
         self._queue = que
         self._channel = channel
         self._trigger = trig
         self._aux_drain = aux_drain
-        self._last_trigger_event: "DTriggerEvent | None" = None
+        self._drain_rows = drain_rows
+        self._drain_bytes = drain_bytes
+        self._drain_stamp: float | None = None
+        self._trigger_events: list["DTriggerEvent"] = []
 
     def __str__(self) -> str:
         """Format string representation."""
@@ -94,13 +135,36 @@ class PluginQueueData:
         """Return stream metadata dimension."""
         return self._channel.data.mlen
 
+    @property
+    def dtype(self) -> "np.dtype[Any]":
+        """Return Numpy data type of stream blocks."""
+        return channel_dtype(self._channel.data.dtype)
+
+    def queue_stats(self) -> "DStreamQueueStats | None":
+        """Get subscriber queue counters if supported by the provider."""
+        if isinstance(self._queue, StreamQueue):
+            return self._queue.stats()
+        return None
+
+    def queue_stamp(self) -> float | None:
+        """Get hub arrival stamp of the last payload from the queue."""
+        if self._drain_stamp is not None:
+            return self._drain_stamp
+        if isinstance(self._queue, StreamQueue):
+            return self._queue.last_stamp
+        return None
+
     def queue_get(self, block: bool, timeout: float = 1.0) -> Any:
         """Get data from a stream queue.
 
+        With drain-and-merge reads enabled, all pending payloads up to the
+        row/byte cap are returned as one merged payload.
+
         :param block: blocking operation
         :param timeout: get data timeout
         """
         ret = []
+        self._drain_stamp = None
         if self._aux_drain is not None:
             self._aux_drain()
         try:
@@ -109,15 +173,47 @@ class PluginQueueData:
         except queue.Empty:
             pass
 
+        if ret and (self._drain_rows > 0 or self._drain_bytes > 0):
+            ret = self._drain(ret)
+
         payload = self._trigger.data_triggered(ret)
-        self._last_trigger_event = self._trigger.pop_trigger_event()
+        self._trigger_events = self._trigger.pop_trigger_events()
         return payload
 
+    def _drain(self, first: Any) -> Any:
+        stamp = self.queue_stamp()
+        _, rows, nbytes = payload_size(first)
+        payload = list(first)
+        while not self._drain_full(rows, nbytes):
+            try:
+                more = self._queue.get(block=False)
+            except queue.Empty:
+                break
+            _, nrows, nb = payload_size(more)
+            rows += nrows
+            nbytes += nb
+            payload.extend(more)
+        if len(payload) == len(first):
+            return first
+        # latency of a merged read is measured from its oldest payload
+        self._drain_stamp = stamp
+        return merge_blocks(payload)
+
+    def _drain_full(self, rows: int, nbytes: int) -> bool:
+        if self._drain_rows > 0 and rows >= self._drain_rows:
+            return True
+        return self._drain_bytes > 0 and nbytes >= self._drain_bytes
+
     def pop_trigger_event(self) -> "DTriggerEvent | None":
-        """Return and clear the last trigger event metadata."""
-        event = self._last_trigger_event
-        self._last_trigger_event = None
-        return event
+        """Return the first trigger event metadata and clear all events."""
+        events = self.pop_trigger_events()
+        return events[0] if events else None
+
+    def pop_trigger_events(self) -> list["DTriggerEvent"]:
+        """Return and clear trigger events of the last payload."""
+        events = self._trigger_events
+        self._trigger_events = []
+        return events
 
 
 ###############################################################################
@@ -128,16 +224,21 @@ class PluginQueueData:
 class PluginData:
     """A common plugin data handler."""
 
+    # wait slice used when some queues cannot notify the consumer
+    POLL_INTERVAL = 0.01
+
     def __init__(
         self,
         chanlist: list["DeviceChannel"],
         trig: list["TriggerHandler"],
         cb: PluginDataCb,
+        opts: "DStreamSubOpts | None" = None,
     ):
         """Initialize a plugin data handler.
 
         :param chanlist: a list with plugin channels
         :param cb: plugin callback to nxslib
+        :param opts: optional stream queue limits and overflow policy
         """
         logger.info("prepare data %s", str(chanlist))
         assert len(chanlist) == len(trig)
@@ -145,11 +246,21 @@ class PluginData:
         self._chanlist = chanlist
         self._trig = trig
         self._cb = cb
+        self._opts = opts
 
         # queue handlers
         self._aux_qd: list[tuple[queue.Queue[Any], "TriggerHandler"]] = []
         self._qdlist = self._qdlist_init()
 
+        # shared readiness notifier for all channel queues
+        self._ready = threading.Event()
+        self._poll = False
+        for pdata in self._qdlist:
+            if isinstance(pdata.queue, StreamQueue):
+                pdata.queue.set_waker(self._ready.set)
+            else:
+                self._poll = True
+
     def __del__(self) -> None:
         """Deinitialize queue handlers."""
         try:
@@ -176,10 +287,15 @@ class PluginData:
                         "invalid virtual channel name "
                         f"for stream subscription: {name}"
                     )
-            que = self._cb.stream_sub(cref)
+            que = self._stream_sub(cref)
             # initialize queue handler
             pdata = PluginQueueData(
-                que, channel, self._trig[i], aux_drain=self._aux_drain
+                que,
+                channel,
+                self._trig[i],
+                aux_drain=self._aux_drain,
+                drain_rows=self._opts.drain_rows if self._opts else 0,
+                drain_bytes=self._opts.drain_bytes if self._opts else 0,
             )
             # add hanler to a list
             ret.append(pdata)
@@ -203,6 +319,11 @@ class PluginData:
             aux_source_ids.add(srcchan)
         return ret
 
+    def _stream_sub(self, cref: "ChannelRef") -> queue.Queue[Any]:
+        if self._opts is None:
+            return self._cb.stream_sub(cref)
+        return self._cb.stream_sub(cref, self._opts)
+
     def _find_trigger(self, chan: int) -> "TriggerHandler | None":
         for trig in self._trig:
             if trig.chan == chan:
@@ -221,11 +342,41 @@ class PluginData:
                 trig.data_triggered(data)
                 trig.pop_trigger_event()
 
+    def wait_ready(self, timeout: float) -> None:
+        """Wait until any channel queue has data or a batch is due.
+
+        Returns immediately if some queue is not empty, so the caller
+        can drain all channels without blocking on idle ones.
+
+        :param timeout: maximum wait time
+        """
+        self._ready.clear()
+        wait = timeout
+        for pdata in self._qdlist:
+            que = pdata.queue
+            if not que.empty():
+                return
+            if isinstance(que, StreamQueue):
+                due = que.batch_wait()
+                if due is not None:
+                    wait = min(wait, due)
+        if self._poll:
+            wait = min(wait, self.POLL_INTERVAL)
+        if wait > 0:
+            self._ready.wait(wait)
+
+    def close(self) -> None:
+        """Unsubscribe all queues and clean up triggers."""
+        self._queue_deinit()
+
     def _queue_deinit(self) -> None:
         """Deinitialize queue."""
         for pdata in self._qdlist:
+            if isinstance(pdata.queue, StreamQueue):
+                pdata.queue.set_waker(None)
             self._cb.stream_unsub(pdata.queue)
         self._qdlist.clear()
+        self._ready.set()
         for aux_q, _ in self._aux_qd:
             self._cb.stream_unsub(aux_q)
         self._aux_qd.clear()
@@ -1,13 +1,29 @@
 """Module containing Nxscli plugin interfaces."""
 
+import threading
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from nxscli.codec import DCodecStats, codec_get, codec_stats_log
+from nxscli.filewriter import DFileWriterOpts, writer_stats_log
+from nxscli.rotate import (
+    DRotateOpts,
+    SegmentManifest,
+    SegmentRotator,
+    SupportsClose,
+)
+from nxscli.stream_queue import DStreamSubOpts
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from nxscli.filewriter import DFileWriterStats
     from nxscli.phandler import PluginHandler
 
+_W = TypeVar("_W", bound=SupportsClose)
+
 ###############################################################################
 # Enum: EPluginType
 ###############################################################################
@@ -42,7 +58,13 @@ class DPluginDescription:
 
 
 class IPlugin(ABC):
-    """The Nxscli plugin common interface."""
+    """The Nxscli plugin common interface.
+
+    Plugin base classes set the ``PTYPE`` class attribute, so the plugin
+    type is known without creating an instance.
+    """
+
+    PTYPE: EPluginType
 
     def __init__(self, ptype: EPluginType) -> None:
         """Initialize a Nxslib plugin.
@@ -140,9 +162,11 @@ class IPlugin(ABC):
 class IPluginNone(IPlugin):
     """None-type plugin."""
 
+    PTYPE = EPluginType.NONE
+
     def __init__(self) -> None:
         """Initialize none-type plugin."""
-        super().__init__(EPluginType.NONE)
+        super().__init__(self.PTYPE)
 
 
 ###############################################################################
@@ -153,9 +177,11 @@ class IPluginNone(IPlugin):
 class IPluginText(IPlugin):
     """Text-type plugin."""
 
+    PTYPE = EPluginType.TEXT
+
     def __init__(self) -> None:
         """Initialize text-type plugin."""
-        super().__init__(EPluginType.TEXT)
+        super().__init__(self.PTYPE)
 
 
 ###############################################################################
@@ -166,9 +192,11 @@ class IPluginText(IPlugin):
 class IPluginPlotStatic(IPlugin):
     """Static-plot plugin."""
 
+    PTYPE = EPluginType.STATIC
+
     def __init__(self) -> None:
         """Initialize static-plot-type plugin."""
-        super().__init__(EPluginType.STATIC)
+        super().__init__(self.PTYPE)
 
 
 ###############################################################################
@@ -179,9 +207,11 @@ class IPluginPlotStatic(IPlugin):
 class IPluginPlotDynamic(IPlugin):
     """Dynamic-plot plugin."""
 
+    PTYPE = EPluginType.ANIMATION
+
     def __init__(self) -> None:
         """Initialize dynamic-plot-type plugin."""
-        super().__init__(EPluginType.ANIMATION)
+        super().__init__(self.PTYPE)
 
 
 ###############################################################################
@@ -190,8 +220,103 @@ class IPluginPlotDynamic(IPlugin):
 
 
 class IPluginFile(IPlugin):
-    """File-type plugin."""
+    """File-type plugin.
+
+    Files are written by background I/O threads configured with
+    ``writer_opts`` plugin argument, optionally compressed. With
+    ``rotate_opts`` files are split into segments listed in a
+    ``_segments.jsonl`` manifest. Compression counters are summed over
+    all segments of a file.
+    """
+
+    # file writers trade a few ms of latency for large write batches
+    STREAM_OPTS = DStreamSubOpts(
+        batch_rows=4096, batch_latency=0.05, drain_rows=65536
+    )
+
+    PTYPE = EPluginType.FILE
 
     def __init__(self) -> None:
         """Initialize file-type plugin."""
-        super().__init__(EPluginType.FILE)
+        super().__init__(self.PTYPE)
+        self._writer_opts = DFileWriterOpts()
+        self._path: str
+        self._rotate_opts = DRotateOpts()
+        self._manifest: SegmentManifest | None = None
+        self._codec_totals: dict[str, DCodecStats] = {}
+        self._codec_lock = threading.Lock()
+
+    def _file_suffix(self, ext: str) -> str:
+        """Get file name suffix, with the codec suffix if compressed.
+
+        :param ext: file name suffix of uncompressed files
+        """
+        if self._writer_opts.codec is None:
+            return ext
+        return ext + codec_get(self._writer_opts.codec).ext
+
+    def _rotator(
+        self,
+        base: str,
+        suffix: str,
+        opener: "Callable[[str], _W]",
+        closed: "Callable[[_W], None] | None" = None,
+    ) -> SegmentRotator[_W]:
+        """Open a file, split into segments if rotation is enabled.
+
+        :param base: file path without suffix
+        :param suffix: file name suffix
+        :param opener: opens a segment file
+        :param closed: called with each segment writer once closed
+        """
+        if self._rotate_opts.enabled and self._manifest is None:
+            self._manifest = SegmentManifest(self._path + "_segments.jsonl")
+        return SegmentRotator(
+            base,
+            suffix,
+            opener,
+            self._rotate_opts,
+            self._manifest,
+            closed,
+        )
+
+    def _rotators_close(self, rotators: list[SegmentRotator[_W]]) -> None:
+        """Close files and wait for all segments.
+
+        :param rotators: files to close
+        """
+        for rotator in rotators:
+            rotator.close()
+        if self._manifest is not None:
+            self._manifest.close()
+            self._manifest = None
+
+    def _codec_account(self, name: str, stats: DCodecStats | None) -> None:
+        """Add compression counters of a closed file.
+
+        :param name: stream name
+        :param stats: compression counters, None if not compressed
+        """
+        if stats is None:
+            return
+        with self._codec_lock:
+            total = self._codec_totals.get(name, DCodecStats())
+            self._codec_totals[name] = total.add(
+                stats.raw_bytes, stats.bytes, stats.cpu_time
+            )
+
+    def codec_stats(self) -> dict[str, DCodecStats]:
+        """Get compression counters of closed files, summed by stream."""
+        with self._codec_lock:
+            return dict(self._codec_totals)
+
+    def writer_stats(self) -> list["DFileWriterStats"]:
+        """Get file writer counters, one per file."""
+        return []
+
+    def _writer_stats_log(self) -> None:
+        name = type(self).__name__
+        for i, stats in enumerate(self.writer_stats()):
+            writer_stats_log(f"{name}[{i}]", replace(stats, codec=None))
+        for stream, codec in sorted(self.codec_stats().items()):
+            codec_stats_log(f"{name}[{stream}]", codec)
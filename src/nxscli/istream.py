@@ -1,6 +1,6 @@
 """Interfaces for additional stream providers."""
 
-from typing import TYPE_CHECKING, Any, Protocol
+from typing import TYPE_CHECKING, Any, Protocol, runtime_checkable
 
 if TYPE_CHECKING:
     import queue
@@ -9,6 +9,7 @@ if TYPE_CHECKING:
     from nxslib.nxscope import DNxscopeStreamBlock, NxscopeHandler
 
     from nxscli.channelref import ChannelRef
+    from nxscli.stream_queue import DStreamSubOpts, DSubscriberStats
 
 
 ###############################################################################
@@ -38,9 +39,12 @@ class IStreamProvider(Protocol):
         """Return all channels managed by this provider."""
 
     def stream_sub(
-        self, channel: "ChannelRef"
+        self, channel: "ChannelRef", opts: "DStreamSubOpts | None" = None
     ) -> "queue.Queue[list[DNxscopeStreamBlock]] | None":
-        """Subscribe to a provider-managed channel queue."""
+        """Subscribe to a provider-managed channel queue.
+
+        ``opts`` is passed only when the subscriber requested queue limits.
+        """
 
     def stream_unsub(
         self, subq: "queue.Queue[list[DNxscopeStreamBlock]]"
@@ -48,6 +52,19 @@ class IStreamProvider(Protocol):
         """Unsubscribe queue. Return ``True`` if queue belonged here."""
 
 
+###############################################################################
+# Class: IStreamStatsProvider
+###############################################################################
+
+
+@runtime_checkable
+class IStreamStatsProvider(Protocol):
+    """Stream provider that reports subscriber queue counters."""
+
+    def stream_stats(self) -> tuple["DSubscriberStats", ...]:
+        """Return subscriber queue counters."""
+
+
 ###############################################################################
 # Class: IServiceRegistry
 ###############################################################################
@@ -0,0 +1,272 @@
+"""Stream pipeline metrics registry."""
+
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from nxscli.stream_queue import DSubscriberStats, StreamBlocks
+
+###############################################################################
+# Data: DHistogramSnapshot
+###############################################################################
+
+
+@dataclass(frozen=True)
+class DHistogramSnapshot:
+    """Latency histogram snapshot.
+
+    Bucket ``i`` counts values in ``[2**(i-1), 2**i)`` microseconds,
+    bucket ``0`` counts values below 1 us and the last bucket also holds
+    all larger values.
+    """
+
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+    buckets: tuple[int, ...] = ()
+
+    @property
+    def mean(self) -> float:
+        """Get mean value in seconds."""
+        if not self.count:
+            return 0.0
+        return self.total / self.count
+
+    def percentile(self, pct: float) -> float:
+        """Get percentile upper bound in seconds.
+
+        :param pct: percentile in range ``0-100``
+        """
+        if not self.count:
+            return 0.0
+        rank = self.count * pct / 100.0
+        last = len(self.buckets) - 1
+        acc = 0
+        for i, num in enumerate(self.buckets):
+            acc += num
+            if acc >= rank and num and i < last:
+                return min((1 << i) * 1e-6, self.maximum)
+        return self.maximum
+
+
+###############################################################################
+# Data: DStageMetrics
+###############################################################################
+
+
+@dataclass(frozen=True)
+class DStageMetrics:
+    """Counters of one pipeline stage."""
+
+    name: str
+    blocks_in: int = 0
+    rows_in: int = 0
+    blocks_out: int = 0
+    rows_out: int = 0
+    queue_high_water: int = 0
+    handler_time: DHistogramSnapshot = field(
+        default_factory=DHistogramSnapshot
+    )
+    latency: DHistogramSnapshot = field(default_factory=DHistogramSnapshot)
+
+
+###############################################################################
+# Data: DMetricsSnapshot
+###############################################################################
+
+
+@dataclass(frozen=True)
+class DMetricsSnapshot:
+    """Pipeline metrics with provider subscriber counters."""
+
+    stages: dict[str, DStageMetrics]
+    subscribers: tuple["DSubscriberStats", ...] = ()
+
+
+###############################################################################
+# Function: payload_rows
+###############################################################################
+
+
+def payload_rows(payload: "StreamBlocks") -> int:
+    """Return number of rows in a block payload."""
+    rows = 0
+    for block in payload:
+        rows += int(block.data.shape[0])
+    return rows
+
+
+###############################################################################
+# Class: LatencyHistogram
+###############################################################################
+
+
+class LatencyHistogram:
+    """Log2 histogram of durations, not thread-safe on its own."""
+
+    # 1 us .. ~4 s, the last bucket holds everything above
+    BUCKETS = 24
+
+    __slots__ = ("_buckets", "_count", "_total", "_max")
+
+    def __init__(self) -> None:
+        """Initialize empty histogram."""
+        self._buckets = [0] * self.BUCKETS
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Add one duration.
+
+        :param seconds: duration in seconds
+        """
+        idx = int(seconds * 1e6).bit_length() if seconds > 0 else 0
+        if idx >= self.BUCKETS:
+            idx = self.BUCKETS - 1
+        self._buckets[idx] += 1
+        self._count += 1
+        self._total += seconds
+        if seconds > self._max:
+            self._max = seconds
+
+    def snapshot(self) -> DHistogramSnapshot:
+        """Return histogram snapshot."""
+        return DHistogramSnapshot(
+            count=self._count,
+            total=self._total,
+            maximum=self._max,
+            buckets=tuple(self._buckets),
+        )
+
+
+###############################################################################
+# Class: StageMetrics
+###############################################################################
+
+
+class StageMetrics:
+    """Counters updated by one pipeline stage.
+
+    Updates take a short uncontended lock so one stage can be shared by
+    several threads (e.g. trigger handlers of different plugins).
+    """
+
+    def __init__(self, name: str) -> None:
+        """Initialize stage counters.
+
+        :param name: stage name
+        """
+        self._name = name
+        self._lock = Lock()
+        self._blocks_in = 0
+        self._rows_in = 0
+        self._blocks_out = 0
+        self._rows_out = 0
+        self._queue_high_water = 0
+        self._handler_time = LatencyHistogram()
+        self._latency = LatencyHistogram()
+
+    @property
+    def name(self) -> str:
+        """Get stage name."""
+        return self._name
+
+    def data_in(self, payload: "StreamBlocks") -> None:
+        """Count payload received by the stage."""
+        rows = payload_rows(payload)
+        with self._lock:
+            self._blocks_in += len(payload)
+            self._rows_in += rows
+
+    def data_out(self, payload: "StreamBlocks") -> None:
+        """Count payload emitted by the stage."""
+        rows = payload_rows(payload)
+        with self._lock:
+            self._blocks_out += len(payload)
+            self._rows_out += rows
+
+    def queue_depth(self, depth: int) -> None:
+        """Update stage input queue high-water mark."""
+        with self._lock:
+            if depth > self._queue_high_water:
+                self._queue_high_water = depth
+
+    def handler_time(self, seconds: float) -> None:
+        """Add payload handling time."""
+        with self._lock:
+            self._handler_time.observe(seconds)
+
+    def latency(self, seconds: float) -> None:
+        """Add latency from hub arrival to this stage."""
+        with self._lock:
+            self._latency.observe(seconds)
+
+    def reset(self) -> None:
+        """Zero all counters."""
+        with self._lock:
+            self._blocks_in = 0
+            self._rows_in = 0
+            self._blocks_out = 0
+            self._rows_out = 0
+            self._queue_high_water = 0
+            self._handler_time = LatencyHistogram()
+            self._latency = LatencyHistogram()
+
+    def snapshot(self) -> DStageMetrics:
+        """Return stage counters snapshot."""
+        with self._lock:
+            return DStageMetrics(
+                name=self._name,
+                blocks_in=self._blocks_in,
+                rows_in=self._rows_in,
+                blocks_out=self._blocks_out,
+                rows_out=self._rows_out,
+                queue_high_water=self._queue_high_water,
+                handler_time=self._handler_time.snapshot(),
+                latency=self._latency.snapshot(),
+            )
+
+
+###############################################################################
+# Class: MetricsRegistry
+###############################################################################
+
+
+class MetricsRegistry:
+    """Registry of pipeline stage metrics."""
+
+    def __init__(self) -> None:
+        """Initialize empty registry."""
+        self._lock = Lock()
+        self._stages: dict[str, StageMetrics] = {}
+
+    def stage(self, name: str) -> StageMetrics:
+        """Get or create stage metrics.
+
+        :param name: stage name
+        """
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = StageMetrics(name)
+                self._stages[name] = stage
+            return stage
+
+    def snapshot(self) -> dict[str, DStageMetrics]:
+        """Return snapshot of all stages."""
+        with self._lock:
+            stages = list(self._stages.values())
+        return {stage.name: stage.snapshot() for stage in stages}
+
+    def reset(self) -> None:
+        """Zero counters of all stages."""
+        with self._lock:
+            stages = list(self._stages.values())
+        for stage in stages:
+            stage.reset()
+
+
+# global registry, all pipeline stages report here
+metrics = MetricsRegistry()
@@ -0,0 +1,335 @@
+"""Ring buffer of sample rows in a shared Numpy memmap file."""
+
+import threading
+from time import monotonic, perf_counter, sleep
+from typing import Any
+
+import numpy as np
+
+from nxscli.filewriter import DFileWriterOpts, DFileWriterStats, EFsyncPolicy
+from nxscli.metrics import LatencyHistogram
+
+###############################################################################
+# Ring file layout
+###############################################################################
+
+# ring file magic and format version
+RING_MAGIC = b"NXSRING"
+RING_VERSION = 1
+
+# header at the file start, all fields little-endian
+RING_HEADER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("header_size", "<u4"),
+        ("descr", "S16"),
+        ("vdim", "<u4"),
+        ("reserved", "<u4"),
+        ("capacity", "<u8"),
+        # total rows written since the capture start
+        ("index", "<u8"),
+        # incremented before and after each write, odd while writing
+        ("seq", "<u8"),
+    ]
+)
+
+# header size, also keeps data aligned
+RING_HEADER_SIZE = 128
+
+
+def _ring_map(
+    path: str, size: int = 0
+) -> tuple["np.memmap[Any, Any]", np.ndarray[Any, Any]]:
+    """Map a ring file, return the file map and its header record.
+
+    :param path: file path
+    :param size: size of a new file, an existing file is mapped read-only
+      if not given
+    """
+    if size > 0:
+        mm = np.memmap(path, dtype=np.uint8, mode="w+", shape=(size,))
+    else:
+        mm = np.memmap(path, dtype=np.uint8, mode="r")
+    if mm.size < RING_HEADER_SIZE:
+        raise ValueError(f"{path} is not a ring file")
+    header = mm[: RING_HEADER.itemsize].view(RING_HEADER)
+    return mm, header
+
+
+###############################################################################
+# Class: NpRingWriter
+###############################################################################
+
+
+class NpRingWriter:
+    """Write sample rows to a fixed size ring in a memmap file.
+
+    The file holds a header and ``2 * capacity`` rows of ``vdim`` values.
+    Each row is stored twice, ``capacity`` rows apart, so the latest
+    ``n <= capacity`` rows are always a contiguous slice and readers can
+    access them without a copy. Rows are written in place and become
+    visible to readers in other processes without a flush.
+
+    Writes are guarded by the header ``seq`` counter, it is odd while a
+    write is in progress. A reader repeats a read if ``seq`` was odd or
+    changed while reading.
+
+    The ring is its own write buffer, only the sync policy and the flush
+    interval of writer options apply. With :attr:`EFsyncPolicy.FLUSH`
+    the file is synced to disk every flush interval by a background
+    thread, with :attr:`EFsyncPolicy.CLOSE` when the ring is closed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        vdim: int,
+        capacity: int,
+        dtype: Any = np.float64,
+        opts: DFileWriterOpts | None = None,
+    ) -> None:
+        """Create a ring file.
+
+        :param path: file path
+        :param vdim: number of values in a row
+        :param capacity: number of rows kept in the ring
+        :param dtype: stored data type
+        :param opts: file writer options
+        """
+        assert capacity > 0
+        assert vdim > 0
+        self._capacity = capacity
+        self._dtype: "np.dtype[Any]" = np.dtype(dtype)
+        size = RING_HEADER_SIZE + 2 * capacity * vdim * self._dtype.itemsize
+        self._mm, self._header = _ring_map(path, size)
+        self._header["magic"] = RING_MAGIC
+        self._header["version"] = RING_VERSION
+        self._header["header_size"] = RING_HEADER_SIZE
+        self._header["descr"] = self._dtype.str.encode()
+        self._header["vdim"] = vdim
+        self._header["capacity"] = capacity
+        self._data: np.ndarray[Any, Any] = (
+            self._mm[RING_HEADER_SIZE:]
+            .view(self._dtype)
+            .reshape(2 * capacity, vdim)
+        )
+        self._index = 0
+
+        self._opts = opts or DFileWriterOpts()
+        self._synced = 0
+        self._syncs = 0
+        self._high_water = 0
+        self._latency = LatencyHistogram()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        if (
+            self._opts.fsync is EFsyncPolicy.FLUSH
+            and self._opts.flush_interval > 0
+        ):
+            self._thread = threading.Thread(
+                target=self._sync_loop, name="ringsync", daemon=True
+            )
+            self._thread.start()
+
+    @property
+    def index(self) -> int:
+        """Get the number of rows written so far."""
+        return self._index
+
+    @property
+    def data(self) -> np.ndarray[Any, Any]:
+        """Get the mirrored ring data, ``(2 * capacity, vdim)`` array."""
+        return self._data
+
+    def _put(self, start: int, rows: np.ndarray[Any, Any]) -> None:
+        """Store rows at a ring position and its mirror."""
+        num = int(rows.shape[0])
+        cap = self._capacity
+        first = min(num, cap - start)
+        for base in (start, start + cap):
+            self._data[base : base + first] = rows[:first]
+        if first < num:
+            rest = rows[first:]
+            self._data[: num - first] = rest
+            self._data[cap : cap + num - first] = rest
+
+    def write(self, data: np.ndarray[Any, Any]) -> None:
+        """Append rows, older rows are overwritten.
+
+        :param data: ``(rows, vdim)`` array, converted to the file type
+        """
+        rows = int(data.shape[0])
+        if rows == 0:
+            return
+        # only the latest rows survive a write larger than the ring
+        keep = data[-self._capacity :]
+        start = (self._index + rows - int(keep.shape[0])) % self._capacity
+
+        self._header["seq"] += 1
+        self._put(start, keep)
+        self._index += rows
+        self._header["index"] = self._index
+        self._header["seq"] += 1
+
+    def _pending_bytes(self, index: int) -> int:
+        rows = min(index - self._synced, self._capacity)
+        return 2 * rows * int(self._data[0].nbytes)
+
+    def _sync(self) -> None:
+        index = self._index
+        self._high_water = max(self._high_water, self._pending_bytes(index))
+        start = perf_counter()
+        self._mm.flush()
+        self._latency.observe(perf_counter() - start)
+        self._synced = index
+        self._syncs += 1
+
+    def _sync_loop(self) -> None:
+        while not self._stop.wait(self._opts.flush_interval):
+            if self._index != self._synced:
+                self._sync()
+
+    def stats(self) -> DFileWriterStats:
+        """Get ring sync counters.
+
+        Bytes waiting for the disk are ring rows written since the last
+        sync.
+        """
+        index = self._index
+        return DFileWriterStats(
+            bytes_written=index * int(self._data[0].nbytes),
+            writes=self._syncs,
+            fsyncs=self._syncs,
+            buffers=1,
+            buffer_bytes=int(self._data.nbytes),
+            pending_bytes=self._pending_bytes(index),
+            high_water_bytes=self._high_water,
+            latency=self._latency.snapshot(),
+        )
+
+    def close(self) -> None:
+        """Stop background sync and sync the file if required."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if self._opts.fsync is not EFsyncPolicy.NEVER:
+            self._sync()
+
+
+###############################################################################
+# Class: NpRingReader
+###############################################################################
+
+
+class NpRingReader:
+    """Attach to a ring file written by :class:`NpRingWriter`.
+
+    The reader can run in another process while the capture is running.
+    """
+
+    # retry limit of reads racing with a write
+    READ_TIMEOUT = 1.0
+    # longest sleep between read retries
+    RETRY_SLEEP = 0.001
+
+    def __init__(self, path: str) -> None:
+        """Open a ring file for reading.
+
+        :param path: file path
+        """
+        self._path = path
+        self._mm, self._header = _ring_map(path)
+        if self._header["magic"][0] != RING_MAGIC:
+            raise ValueError(f"{path} is not a ring file")
+        if int(self._header["version"][0]) != RING_VERSION:
+            raise ValueError(f"{path} has unsupported ring version")
+        self._capacity = int(self._header["capacity"][0])
+        self._vdim = int(self._header["vdim"][0])
+        self._dtype: "np.dtype[Any]" = np.dtype(
+            self._header["descr"][0].decode()
+        )
+        offset = int(self._header["header_size"][0])
+        self._data: np.ndarray[Any, Any] = (
+            self._mm[offset:]
+            .view(self._dtype)
+            .reshape(2 * self._capacity, self._vdim)
+        )
+
+    @property
+    def capacity(self) -> int:
+        """Get the number of rows kept in the ring."""
+        return self._capacity
+
+    @property
+    def vdim(self) -> int:
+        """Get the number of values in a row."""
+        return self._vdim
+
+    @property
+    def dtype(self) -> "np.dtype[Any]":
+        """Get the stored data type."""
+        return self._dtype
+
+    @property
+    def index(self) -> int:
+        """Get the number of rows written so far."""
+        return int(self._header["index"][0])
+
+    @property
+    def seq(self) -> int:
+        """Get the write sequence counter."""
+        return int(self._header["seq"][0])
+
+    def latest(
+        self, num: int, index: int | None = None
+    ) -> np.ndarray[Any, Any]:
+        """Get a view of the latest rows, without a copy.
+
+        The view is overwritten by the writer as the ring advances, use
+        :meth:`read` for a consistent copy.
+
+        :param num: number of rows, limited by the ring capacity and
+          the rows written
+        :param index: ring index, the current one if not given
+        """
+        if index is None:
+            index = self.index
+        num = min(num, self._capacity, index)
+        end = index % self._capacity + self._capacity
+        return self._data[end - num : end]
+
+    def read(
+        self, num: int, timeout: float | None = None
+    ) -> tuple[np.ndarray[Any, Any], int]:
+        """Get a copy of the latest rows and the ring index.
+
+        Reads racing with a write are retried, first yielding the CPU
+        and then sleeping ``RETRY_SLEEP`` seconds between retries.
+
+        :param num: number of rows
+        :param timeout: retry time limit in seconds, ``READ_TIMEOUT`` if
+          not given
+        :raises TimeoutError: no consistent copy within the time limit,
+          a write never completed (for example the writer was killed)
+        """
+        if timeout is None:
+            timeout = self.READ_TIMEOUT
+        deadline = monotonic() + timeout
+        retries = 0
+        while True:
+            seq = self.seq
+            if seq % 2 == 0:
+                index = self.index
+                rows = self.latest(num, index).copy()
+                if self.seq == seq:
+                    return rows, index
+            if monotonic() >= deadline:
+                raise TimeoutError(
+                    f"{self._path}: ring write in progress for {timeout}s "
+                    f"(seq={seq}), the ring is torn or its writer was killed"
+                )
+            # yield first, writes of a live writer are short
+            sleep(0 if retries < 10 else self.RETRY_SLEEP)
+            retries += 1
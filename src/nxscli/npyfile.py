@@ -0,0 +1,298 @@
+"""Streaming writer for Numpy ``.npy`` files."""
+
+import io
+import os
+import struct
+from dataclasses import replace
+from typing import Any, BinaryIO
+
+import numpy as np
+
+from nxscli.codec import CODECS, DCodec, codec_get
+from nxscli.filewriter import (
+    DFileWriterOpts,
+    DFileWriterStats,
+    EFsyncPolicy,
+    FileWriter,
+)
+
+###############################################################################
+# Function: npy_header
+###############################################################################
+
+# npy format 1.0 magic, the header length is the next 2 bytes
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+
+def npy_header(
+    shape: tuple[int, ...],
+    dtype: "np.dtype[Any]",
+    fortran_order: bool,
+    size: int,
+) -> bytes:
+    """Return a ``.npy`` format 1.0 header padded to ``size`` bytes.
+
+    A fixed size header can be rewritten in place once the final shape
+    is known.
+
+    :param shape: array shape
+    :param dtype: array data type
+    :param fortran_order: array data is in column-major order
+    :param size: total header size, multiple of 64 for aligned data
+    """
+    desc = {
+        "descr": np.lib.format.dtype_to_descr(dtype),
+        "fortran_order": fortran_order,
+        "shape": shape,
+    }
+    text = repr(desc).encode("latin1")
+    pad = size - len(_NPY_MAGIC) - 2 - len(text) - 1
+    if pad < 0:
+        raise ValueError(f"npy header does not fit in {size} bytes")
+    header = text + b" " * pad + b"\n"
+    return _NPY_MAGIC + struct.pack("<H", len(header)) + header
+
+
+###############################################################################
+# Class: NpyStreamWriter
+###############################################################################
+
+
+class NpyStreamWriter:
+    """Write sample rows to a ``.npy`` file as they arrive.
+
+    Rows are written by a :class:`nxscli.filewriter.FileWriter`, memory
+    is bounded by ``max_buffers`` write buffers of the writer options
+    regardless of the capture length, the capture waits for the disk
+    past that limit. The header is written up front and patched with
+    the final shape on close.
+
+    Rows of a ``(rows, vdim)`` stream in C order are the same bytes as
+    a ``(vdim, rows)`` array in Fortran order, so the transposed layout
+    is stored without any extra copy.
+
+    With a codec in writer options, rows are compressed to a ``.part``
+    file which starts with the compressed header, shape without rows.
+    On close the compressed final header and the rows are copied to the
+    file, which can be loaded with ``np.load()`` from the codec file
+    object (for example ``gzip.open()``). The ``.part`` file of a
+    killed capture is recovered with :func:`npy_file_repair`.
+    """
+
+    # header size, also keeps data aligned
+    HEADER_SIZE = 128
+
+    def __init__(
+        self,
+        path: str,
+        vdim: int,
+        dtype: Any = np.float64,
+        buffer_rows: int | None = None,
+        transposed: bool = True,
+        opts: DFileWriterOpts | None = None,
+    ) -> None:
+        """Open a streaming ``.npy`` file.
+
+        :param path: file path
+        :param vdim: number of values in a row
+        :param dtype: stored data type
+        :param buffer_rows: rows in one write buffer, overrides the
+          buffer size of writer options
+        :param transposed: store ``(vdim, rows)`` instead of
+          ``(rows, vdim)``
+        :param opts: file writer options
+        """
+        self._vdim = vdim
+        self._dtype = np.dtype(dtype)
+        self._transposed = transposed
+        self._rows = 0
+        opts = opts or DFileWriterOpts()
+        if buffer_rows is not None:
+            assert buffer_rows > 0
+            size = buffer_rows * max(vdim, 1) * self._dtype.itemsize
+            opts = replace(opts, buffer_size=size)
+        self._path = path
+        self._opts = opts
+        if opts.codec is None:
+            self._writer = FileWriter(path, opts, self._header())
+        else:
+            self._writer = FileWriter(path + ".part", opts, self._header())
+
+    @property
+    def rows(self) -> int:
+        """Get the number of rows written so far."""
+        return self._rows
+
+    @property
+    def buffer_bytes(self) -> int:
+        """Get memory used by write buffers."""
+        return self._writer.stats().buffer_bytes
+
+    def stats(self) -> DFileWriterStats:
+        """Get file writer counters."""
+        return self._writer.stats()
+
+    def _shape(self) -> tuple[int, int]:
+        if self._transposed:
+            return (self._vdim, self._rows)
+        return (self._rows, self._vdim)
+
+    def _header(self) -> bytes:
+        return npy_header(
+            self._shape(), self._dtype, self._transposed, self.HEADER_SIZE
+        )
+
+    def write(self, data: np.ndarray[Any, Any]) -> None:
+        """Append rows.
+
+        :param data: ``(rows, vdim)`` array, converted to the file type
+        """
+        data = np.ascontiguousarray(data, dtype=self._dtype)
+        self._writer.write(data)
+        self._rows += int(data.shape[0])
+
+    def _finalize(self, file: BinaryIO) -> None:
+        file.seek(0)
+        file.write(self._header())
+
+    def _finalize_codec(self, file: BinaryIO) -> None:
+        assert self._opts.codec
+        _npy_part_copy(
+            file,
+            self._path,
+            codec_get(self._opts.codec),
+            self._opts.level,
+            self._header(),
+            self._writer.header_size,
+            None,
+            self._opts.fsync is not EFsyncPolicy.NEVER,
+        )
+
+    def close(self) -> None:
+        """Write pending rows, patch the header and close the file."""
+        if self._opts.codec is None:
+            self._writer.close(self._finalize)
+        elif not self._writer.closed:
+            self._writer.close(self._finalize_codec)
+            os.remove(self._path + ".part")
+
+
+###############################################################################
+# Function: npy_file_repair
+###############################################################################
+
+
+def _npy_part_copy(
+    part: BinaryIO,
+    path: str,
+    codec: DCodec,
+    level: int | None,
+    header: bytes,
+    start: int,
+    end: int | None,
+    fsync: bool,
+) -> None:
+    """Write a compressed header and the streams of a ``.part`` file.
+
+    :param part: ``.part`` file
+    :param path: output file path
+    :param codec: compression codec
+    :param level: compression level of the header
+    :param header: raw ``.npy`` header
+    :param start: offset of the first rows stream
+    :param end: end offset of the last stream, file end if None
+    :param fsync: sync the output file
+    """
+    if end is None:
+        end = part.seek(0, io.SEEK_END)
+    part.seek(start)
+    with open(path, "wb") as out:
+        out.write(codec.compress(header, level))
+        for pos in range(start, end, 1 << 20):
+            out.write(part.read(min(end - pos, 1 << 20)))
+        if fsync:
+            out.flush()
+            os.fsync(out.fileno())
+
+
+def _npy_part_scan(
+    part: BinaryIO, codec: DCodec
+) -> tuple[bytes, int, int, int]:
+    """Scan compressed streams of a ``.part`` file.
+
+    Return the decoded first stream (the header), its end offset, the
+    end offset of the last complete stream and the decoded size of the
+    complete streams after the header. A torn stream ends the scan.
+
+    :param part: ``.part`` file
+    :param codec: compression codec
+    """
+    header = b""
+    header_end = end = raw = size = read = 0
+    dec = codec.decompressor()
+    while block := part.read(1 << 20):
+        read += len(block)
+        data = block
+        while data:
+            try:
+                out = dec.decompress(data)
+            except Exception:
+                # torn stream of a killed capture
+                return header, header_end, end, raw
+            if header_end:
+                size += len(out)
+            else:
+                header += out
+            if not dec.eof:
+                break
+            end = read - len(dec.unused_data)
+            if header_end:
+                raw += size
+            else:
+                header_end = end
+            size = 0
+            data = dec.unused_data
+            dec = codec.decompressor()
+    return header, header_end, end, raw
+
+
+def npy_file_repair(path: str, level: int | None = None) -> int:
+    """Rebuild a compressed ``.npy`` file from its ``.part`` file.
+
+    The ``.part`` file of a killed :class:`NpyStreamWriter` capture is
+    converted to ``path`` with all complete compressed streams and the
+    ``.part`` file is removed. The codec is selected by the ``path``
+    suffix. Return the number of recovered rows.
+
+    :param path: file path, without the ``.part`` suffix
+    :param level: compression level of the header
+    """
+    codec = next(
+        (c for c in CODECS.values() if path.endswith(c.ext)),
+        None,
+    )
+    if codec is None:
+        raise ValueError(f"{path} has no codec suffix")
+    part_path = path + ".part"
+    with open(part_path, "rb") as part:
+        header, start, end, raw = _npy_part_scan(part, codec)
+        if not start:
+            raise ValueError(f"{part_path} has no header")
+        hdr = io.BytesIO(header)
+        np.lib.format.read_magic(hdr)
+        shape, transposed, dtype = np.lib.format.read_array_header_1_0(hdr)
+        vdim = shape[0] if transposed else shape[1]
+        rows = raw // (vdim * dtype.itemsize) if vdim else 0
+        final = (vdim, rows) if transposed else (rows, vdim)
+        _npy_part_copy(
+            part,
+            path,
+            codec,
+            level,
+            npy_header(final, dtype, transposed, NpyStreamWriter.HEADER_SIZE),
+            start,
+            end,
+            False,
+        )
+    os.remove(part_path)
+    return int(rows)
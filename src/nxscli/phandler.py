@@ -2,9 +2,13 @@
 
 from typing import TYPE_CHECKING, Any, Sequence
 
+from nxscli.astream import AsyncStream
 from nxscli.channelref import ChannelRef
-from nxscli.idata import PluginDataCb
+from nxscli.idata import PluginData, PluginDataCb
+from nxscli.istream import IStreamStatsProvider
 from nxscli.logger import logger
+from nxscli.metrics import DMetricsSnapshot, metrics
+from nxscli.procplugin import PluginProcess
 from nxscli.stream_hub import SharedStreamProvider
 from nxscli.trigger import (
     DTriggerConfig,
@@ -22,6 +26,7 @@ if TYPE_CHECKING:
 
     from nxscli.iplugin import DPluginDescription, IPlugin
     from nxscli.istream import IStreamProvider
+    from nxscli.stream_queue import DStreamSubOpts, DSubscriberStats
 
 
 ###############################################################################
@@ -45,6 +50,8 @@ class PluginHandler:
                 self._plugins[cls.name] = cls.plugin
 
         self._enabled: list[tuple[int, type["IPlugin"], Any]] = []
+        # enabled plugins that run in a child process
+        self._process: set[int] = set()
         self._started: list[tuple["IPlugin", Any]] = []
         self._triggers: dict[int, DTriggerConfigReq] = {}
 
@@ -226,9 +233,32 @@ class PluginHandler:
         return self.nxscope.get_device_capabilities()
 
     def get_stream_stats(self) -> Any:
-        """Get stream stats snapshot from NxScope."""
+        """Get stream stats snapshot from NxScope.
+
+        Subscriber queue counters are returned by
+        :meth:`get_subscriber_stats`.
+        """
         return self.nxscope.get_stream_stats()
 
+    def get_subscriber_stats(self) -> tuple["DSubscriberStats", ...]:
+        """Get queue counters of all provider subscriptions."""
+        ret: list["DSubscriberStats"] = []
+        for provider in self._providers:
+            if isinstance(provider, IStreamStatsProvider):
+                ret.extend(provider.stream_stats())
+        return tuple(ret)
+
+    def get_metrics(self) -> DMetricsSnapshot:
+        """Get stream pipeline metrics snapshot.
+
+        Per-stage counters (hub, virtual runtime, triggers, plugins) with
+        per-subscriber queue counters from all stream providers.
+        """
+        return DMetricsSnapshot(
+            stages=metrics.snapshot(),
+            subscribers=self.get_subscriber_stats(),
+        )
+
     def collect_inputhooks(self) -> list[Any]:
         """Collect inputhooks from all loaded plugins.
 
@@ -315,7 +345,7 @@ class PluginHandler:
         result = []
         for i, (plugin, _) in enumerate(self._started):
             # Find registered name for this plugin class
-            plugin_class = type(plugin)
+            plugin_class = getattr(plugin, "plugin_cls", type(plugin))
             name = None
             for reg_name, reg_class in self._plugins.items():
                 if reg_class == plugin_class:
@@ -339,6 +369,26 @@ class PluginHandler:
         """Get callbacks for plugins."""
         return PluginDataCb(self.stream_sub, self.stream_unsub)
 
+    def astream(
+        self,
+        channels: Sequence[ChannelRef] | None,
+        trig: dict[int, DTriggerConfigReq] | None = None,
+        opts: "DStreamSubOpts | None" = None,
+    ) -> AsyncStream:
+        """Subscribe channels for asyncio consumers.
+
+        Channels and triggers are resolved like for plugins. Use as
+        ``async with phandler.astream(...) as stream`` and iterate over
+        ``(channel, blocks)`` tuples.
+
+        :param channels: channel references, ``None`` selects all
+        :param trig: optional per-channel trigger configuration
+        :param opts: optional stream queue limits and overflow policy
+        """
+        chanlist = self.chanlist_plugin(channels)
+        trigs = self.triggers_plugin(chanlist, trig)
+        return AsyncStream(PluginData(chanlist, trigs, self.cb_get(), opts))
+
     def service_set(self, name: str, service: Any) -> None:
         """Register named service for extensions."""
         self._services[name] = service
@@ -365,11 +415,20 @@ class PluginHandler:
                 return ch
         return None
 
-    def stream_sub(self, channel: ChannelRef) -> "queue.Queue[Any]":
-        """Subscribe queue for device/provider channel."""
+    def stream_sub(
+        self, channel: ChannelRef, opts: "DStreamSubOpts | None" = None
+    ) -> "queue.Queue[Any]":
+        """Subscribe queue for device/provider channel.
+
+        :param channel: channel reference
+        :param opts: optional queue limits and overflow policy
+        """
         assert self._nxs
         for provider in self._providers:
-            subq = provider.stream_sub(channel)
+            if opts is None:
+                subq = provider.stream_sub(channel)
+            else:
+                subq = provider.stream_sub(channel, opts)
             if subq is not None:
                 return subq
         if not channel.is_physical:
@@ -436,16 +495,19 @@ class PluginHandler:
         """
         return self._plugins[name]
 
-    def enable(self, name: str, **kwargs: Any) -> int:
+    def enable(self, name: str, process: bool = False, **kwargs: Any) -> int:
         """Enable plugin.
 
         :param name: plugin name
+        :param process: run plugin in a child process fed over shared memory
         :param kwargs: implementation specific arguments
         """
         pid = len(self._enabled)
         plugin = (pid, self._plugins[name], kwargs)
         logger.info("enable %s", str(plugin))
         self._enabled.append(plugin)
+        if process:
+            self._process.add(pid)
         return pid
 
     def disable(self, pid: int) -> None:
@@ -463,6 +525,7 @@ class PluginHandler:
         if found:
             logger.info("disable %d %s", pid, str(self._enabled[i]))
             self._enabled.pop(i)
+            self._process.discard(pid)
         else:
             raise AttributeError
 
@@ -472,7 +535,11 @@ class PluginHandler:
             pid, cls, args = plg
 
             # create instance
-            plugin = cls()  # type: ignore
+            plugin: "IPlugin"
+            if pid in self._process:
+                plugin = PluginProcess(cls)
+            else:
+                plugin = cls()  # type: ignore
 
             # we need data stream
             if plugin.stream is True:
@@ -671,12 +738,12 @@ class PluginHandler:
         """
         self._triggers = triggers
 
-    def triggers_plugin(
+    def triggers_config(
         self,
         chanlist: list["DeviceChannel"],
         triggers: dict[int, DTriggerConfigReq] | None,
-    ) -> list[TriggerHandler]:
-        """Prepare triggers list for a plugin.
+    ) -> list[tuple[int, DTriggerConfig]]:
+        """Resolve trigger configuration for plugin channels.
 
         :param chanlist: a list with plugin channels
         :param triggers: a list with plugin triggers
@@ -693,9 +760,7 @@ class PluginHandler:
                 tcfg = self.trigger_get(chan.data.chan)
                 trgs.append((chan.data.chan, tcfg))
 
-        visible_ids = {chan.data.chan for chan in chanlist}
         resolved: list[tuple[int, DTriggerConfig]] = []
-        hidden_handlers: list[TriggerHandler] = []
         for item in trgs:
             dtc = trigger_from_req(item[1])
             source_ref = self._trigger_source_ref(item[1])
@@ -707,13 +772,30 @@ class PluginHandler:
                 else:
                     dtc.source_ref = source_ref
                     dtc.srcchan = src_channel.data.chan
-                    if dtc.srcchan not in visible_ids:
-                        hidden = self._hidden_trigger_source(
-                            dtc.srcchan, source_ref
-                        )
-                        hidden_handlers.append(hidden)
 
             resolved.append((item[0], dtc))
+        return resolved
+
+    def triggers_plugin(
+        self,
+        chanlist: list["DeviceChannel"],
+        triggers: dict[int, DTriggerConfigReq] | None,
+    ) -> list[TriggerHandler]:
+        """Prepare triggers list for a plugin.
+
+        :param chanlist: a list with plugin channels
+        :param triggers: a list with plugin triggers
+        """
+        resolved = self.triggers_config(chanlist, triggers)
+
+        visible_ids = {chan.data.chan for chan in chanlist}
+        hidden_handlers: list[TriggerHandler] = []
+        for _, dtc in resolved:
+            if dtc.srcchan is None or dtc.srcchan in visible_ids:
+                continue
+            assert dtc.source_ref is not None
+            hidden = self._hidden_trigger_source(dtc.srcchan, dtc.source_ref)
+            hidden_handlers.append(hidden)
 
         ret = []
         for chan_id, dtc in resolved:
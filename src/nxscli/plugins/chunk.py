@@ -0,0 +1,129 @@
+"""Module containing chunked container capture plugin."""
+
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from nxscli.chunkfile import ChunkFileWriter
+from nxscli.idata import PluginData, PluginQueueData
+from nxscli.iplugin import IPluginFile
+from nxscli.logger import logger
+from nxscli.pluginthr import PluginThread, StreamBlocks
+from nxscli.rotate import SegmentRotator
+from nxscli.stream_queue import merge_blocks
+
+if TYPE_CHECKING:
+    from nxscli.filewriter import DFileWriterStats
+
+
+class PluginChunk(PluginThread, IPluginFile):
+    """Plugin that capture data to a chunked container file.
+
+    All channels are written to one ``.nxc`` file, each stream batch of
+    a channel becomes one chunk with its trigger events (see
+    :class:`nxscli.chunkfile.ChunkFileReader`). Chunks are compressed
+    if a codec is configured.
+
+    Files keep the channel data type unless an output data type is
+    given.
+    """
+
+    def __init__(self) -> None:
+        """Intiialize a chunked container capture plugin."""
+        IPluginFile.__init__(self)
+        PluginThread.__init__(self)
+
+        self._data: "PluginData"
+        self._path: str
+        self._dtype: "np.dtype[Any] | None" = None
+        self._writer: SegmentRotator[ChunkFileWriter] | None = None
+
+    def _writer_open(self, path: str) -> ChunkFileWriter:
+        return ChunkFileWriter(path, self._writer_opts)
+
+    def _writer_closed(self, writer: ChunkFileWriter) -> None:
+        for chan, stats in writer.codec_stats().items():
+            self._codec_account(f"chan{chan}", stats)
+
+    def _init(self) -> None:
+        assert self._phandler
+
+        # all channels share segments
+        self._writer = self._rotator(
+            self._path, ".nxc", self._writer_open, self._writer_closed
+        )
+
+    def _file_dtype(self, pdata: "PluginQueueData") -> "np.dtype[Any]":
+        if self._dtype is not None:
+            return self._dtype
+        return pdata.dtype
+
+    def _final(self) -> None:
+        logger.info("chunk captures DONE")
+
+        assert self._writer
+        self._rotators_close([self._writer])
+        self._writer_stats_log()
+
+    def writer_stats(self) -> list["DFileWriterStats"]:
+        """Get file writer counters of the current file."""
+        if self._writer is None:
+            return []
+        return [self._writer.writer.stats()]
+
+    def _handle_blocks(
+        self, data: StreamBlocks, pdata: "PluginQueueData", j: int
+    ) -> None:
+        assert self._writer
+        # trigger events are relative to the payload start
+        base = self._datalen[j]
+        marks = [base + ev.sample_index for ev in pdata.pop_trigger_events()]
+        # merged payload gives one chunk per payload instead of per block
+        for cols in self._block_columns(merge_blocks(data), j):
+            end = cols.start + cols.rows
+            values = np.asarray(cols.data, dtype=self._file_dtype(pdata))
+            self._writer.get().write(
+                pdata.chan,
+                values,
+                cols.start,
+                [mark for mark in marks if cols.start <= mark < end],
+            )
+            self._writer.account(
+                pdata.chan, cols.start, cols.rows, values.nbytes
+            )
+
+    def start(self, kwargs: Any) -> bool:  # pragma: no cover
+        """Start capture plugin.
+
+        :param kwargs: implementation specific arguments
+        """
+        assert self._phandler
+
+        logger.info("start capture %s", str(kwargs))
+
+        self._samples = kwargs["samples"]
+        self._path = kwargs["path"]
+        self._nostop = kwargs["nostop"]
+        self._writer_opts = kwargs.get("writer_opts", self._writer_opts)
+        self._rotate_opts = kwargs.get("rotate_opts", self._rotate_opts)
+        dtype = kwargs.get("dtype")
+        self._dtype = None if dtype is None else np.dtype(dtype)
+
+        chanlist = self._phandler.chanlist_plugin(kwargs["channels"])
+        trig = self._phandler.triggers_plugin(chanlist, kwargs["trig"])
+
+        cb = self._phandler.cb_get()
+        self._data = PluginData(
+            chanlist, trig, cb, kwargs.get("stream_opts", self.STREAM_OPTS)
+        )
+
+        if not self._data.qdlist:  # pragma: no cover
+            return False
+
+        self.thread_start(self._data)
+
+        return True
+
+    def result(self) -> None:
+        """Get chunk plugin result."""
+        return  # pragma: no cover
@@ -1,14 +1,18 @@
 """Module containing CSV plugin."""  # noqa: A005
 
-import csv
-from typing import Any
-
-import numpy as np
+import functools
+from typing import TYPE_CHECKING, Any
 
+from nxscli.csvfile import csv_block
+from nxscli.filewriter import FileWriter
 from nxscli.idata import PluginData, PluginQueueData
 from nxscli.iplugin import IPluginFile
 from nxscli.logger import logger
 from nxscli.pluginthr import PluginThread, StreamBlocks
+from nxscli.rotate import SegmentRotator
+
+if TYPE_CHECKING:
+    from nxscli.filewriter import DFileWriterStats
 
 ###############################################################################
 # Class: PluginCsv
@@ -16,7 +20,11 @@ from nxscli.pluginthr import PluginThread, StreamBlocks
 
 
 class PluginCsv(PluginThread, IPluginFile):
-    """Plugin that capture data to CSV files."""
+    """Plugin that capture data to CSV files.
+
+    Blocks are encoded at once with :func:`nxscli.csvfile.csv_block`
+    and written by a background I/O thread.
+    """
 
     def __init__(self) -> None:
         """Initialize a CSV plugin."""
@@ -26,70 +34,49 @@ class PluginCsv(PluginThread, IPluginFile):
         self._data: "PluginData"
         self._path: str
         self._meta_string = False
-        self._csvwriters: list[Any] = []
-
-    def _csvwriters_open(self) -> list[Any]:
-        csvwriters = []
-        for pdata in self._data.qdlist:
-            chanpath = self._path + "_chan" + str(pdata.chan) + ".csv"
-            csvfile = open(chanpath, "w", newline="")
-            csvwriter = csv.writer(
-                csvfile,
-                delimiter=" ",
-                quotechar="|",
-                escapechar="\\",
-                quoting=csv.QUOTE_MINIMAL,
-            )
+        self._csvfiles: list[SegmentRotator[FileWriter]] = []
 
-            csvwriters.append([csvwriter, csvfile])
+    def _csvfile_open(self, path: str) -> FileWriter:
+        return FileWriter(path, self._writer_opts)
 
-        return csvwriters
+    def _csvfile_closed(self, chan: int, csvfile: FileWriter) -> None:
+        self._codec_account(f"chan{chan}", csvfile.stats().codec)
+
+    def _csvfiles_open(self) -> list[SegmentRotator[FileWriter]]:
+        return [
+            self._rotator(
+                self._path + "_chan" + str(pdata.chan),
+                self._file_suffix(".csv"),
+                self._csvfile_open,
+                functools.partial(self._csvfile_closed, pdata.chan),
+            )
+            for pdata in self._data.qdlist
+        ]
 
     def _init(self) -> None:
         assert self._phandler
-        # open writers
-        self._csvwriters = self._csvwriters_open()
+        # open files
+        self._csvfiles = self._csvfiles_open()
 
     def _final(self) -> None:
         # close all files
-        for csvwriter in self._csvwriters:
-            csvwriter[1].close()
+        self._rotators_close(self._csvfiles)
 
         logger.info("csv capture DONE")
+        self._writer_stats_log()
+
+    def writer_stats(self) -> list["DFileWriterStats"]:
+        """Get file writer counters of current files, one per channel."""
+        return [csvfile.writer.stats() for csvfile in self._csvfiles]
 
     def _handle_blocks(
         self, data: StreamBlocks, pdata: "PluginQueueData", j: int
     ) -> None:
-        writer = self._csvwriters[j][0]
-        for block in data:
-            block_data = block.data
-            assert isinstance(block_data, np.ndarray)
-            rows = int(block_data.shape[0])
-            if rows == 0:
-                continue
-
-            if not self._nostop:  # pragma: no cover
-                remaining = self._samples - self._datalen[j]
-                if remaining <= 0:
-                    break
-                rows = min(rows, remaining)
-                if rows <= 0:  # pragma: no cover
-                    break
-
-            data_rows = (tuple(row) for row in block_data[:rows])
-            meta_rows: Any
-            if block.meta is None:
-                meta_rows = (() for _ in range(rows))
-            elif self._meta_string:
-                meta_rows = (
-                    bytes(np.asarray(mrow, dtype=np.uint8)).decode()
-                    for mrow in block.meta[:rows]
-                )
-            else:
-                meta_rows = (tuple(mrow) for mrow in block.meta[:rows])
-
-            writer.writerows(zip(data_rows, meta_rows))
-            self._datalen[j] += rows
+        csvfile = self._csvfiles[j]
+        for cols in self._block_columns(data, j):
+            text = csv_block(cols.data, cols.meta, self._meta_string).encode()
+            csvfile.get().write(text)
+            csvfile.account(pdata.chan, cols.start, cols.rows, len(text))
 
     def start(self, kwargs: Any) -> bool:
         """Start CSV plugin.
@@ -103,13 +90,17 @@ class PluginCsv(PluginThread, IPluginFile):
         self._samples = kwargs["samples"]
         self._path = kwargs["path"]
         self._meta_string = kwargs["metastr"]
+        self._writer_opts = kwargs.get("writer_opts", self._writer_opts)
+        self._rotate_opts = kwargs.get("rotate_opts", self._rotate_opts)
         self._nostop = kwargs["nostop"]
 
         chanlist = self._phandler.chanlist_plugin(kwargs["channels"])
         trig = self._phandler.triggers_plugin(chanlist, kwargs["trig"])
 
         cb = self._phandler.cb_get()
-        self._data = PluginData(chanlist, trig, cb)
+        self._data = PluginData(
+            chanlist, trig, cb, kwargs.get("stream_opts", self.STREAM_OPTS)
+        )
 
         if not self._data.qdlist:  # pragma: no cover
             return False
@@ -62,7 +62,7 @@ class PluginNone(PluginThread, IPluginNone):
         trig = self._phandler.triggers_plugin(chanlist, kwargs["trig"])
 
         cb = self._phandler.cb_get()
-        self._data = PluginData(chanlist, trig, cb)
+        self._data = PluginData(chanlist, trig, cb, kwargs.get("stream_opts"))
 
         if not self._data.qdlist:  # pragma: no cover
             return False
@@ -7,14 +7,24 @@ import numpy as np
 from nxscli.idata import PluginData, PluginQueueData
 from nxscli.iplugin import IPluginFile
 from nxscli.logger import logger
+from nxscli.npring import NpRingWriter
 from nxscli.pluginthr import PluginThread, StreamBlocks
 
 if TYPE_CHECKING:
     from nxslib.nxscope import DNxscopeStream
 
+    from nxscli.filewriter import DFileWriterStats
+
 
 class PluginNpmem(PluginThread, IPluginFile):
-    """Plugin that capture data to Numpy memmap files."""
+    """Plugin that capture data to Numpy memmap files.
+
+    Each channel is written to a ring buffer of ``shape`` samples in a
+    memmap file, which other processes can read while the capture is
+    running (see :class:`nxscli.npring.NpRingReader`).
+
+    Files keep the channel data type unless an output data type is given.
+    """
 
     def __init__(self) -> None:
         """Intiialize a Numpy capture plugin."""
@@ -23,67 +33,61 @@ class PluginNpmem(PluginThread, IPluginFile):
 
         self._data: "PluginData"
         self._path: str
-        self._npfiles: list[Any] = []
-
+        self._dtype: "np.dtype[Any] | None" = None
         self._npshape: int
-        self._npdata: list[np.ndarray[Any, Any]] = []
+        self._rings: list[NpRingWriter] = []
 
     def _init(self) -> None:
         assert self._phandler
 
-        self._npdata = []
-
-        for pdata in self._data.qdlist:
-            chanpath = self._path + "_chan" + str(pdata.chan) + ".dat"
-            npf = np.memmap(
-                chanpath,
-                dtype="float32",
-                mode="w+",
-                shape=(pdata.vdim, self._npshape),
+        self._rings = [
+            NpRingWriter(
+                self._path + "_chan" + str(pdata.chan) + ".dat",
+                pdata.vdim,
+                self._npshape,
+                dtype=self._file_dtype(pdata),
+                opts=self._writer_opts,
             )
-            self._npfiles.append(npf)
-            self._npdata.append(np.empty((0, pdata.vdim), dtype=np.float64))
+            for pdata in self._data.qdlist
+        ]
+
+    def _file_dtype(self, pdata: "PluginQueueData") -> "np.dtype[Any]":
+        if self._dtype is not None:
+            return self._dtype
+        return pdata.dtype
 
     def _final(self) -> None:
         logger.info("numpy memmap captures DONE")
 
-        # no API to close memmap
+        for ring in self._rings:
+            ring.close()
+        self._writer_stats_log()
 
-    def _flush_ready(self, pdata: "PluginQueueData", j: int) -> None:
-        pending = self._npdata[j]
-        while pending.shape[0] >= self._npshape:
-            chunk = pending[: self._npshape, :]
-            self._npfiles[j][:] = chunk.T.astype(np.float32, copy=False)
-            self._npfiles[j].flush()
-            self._datalen[j] += self._npshape
-            pending = pending[self._npshape :, :]
-        self._npdata[j] = pending
+    def writer_stats(self) -> list["DFileWriterStats"]:
+        """Get ring sync counters, one per channel."""
+        return [ring.stats() for ring in self._rings]
 
     def _handle_blocks(
         self, data: StreamBlocks, pdata: "PluginQueueData", j: int
     ) -> None:
-        chunks: list[np.ndarray[Any, Any]] = [self._npdata[j]]
         for block in data:
-            block_data = np.asarray(block.data, dtype=np.float64)
-            if int(block_data.shape[0]) == 0:  # pragma: no cover
-                continue
-            chunks.append(block_data)
-        if len(chunks) > 1:  # pragma: no branch
-            self._npdata[j] = np.concatenate(chunks, axis=0)
-        self._flush_ready(pdata, j)
+            self._rings[j].write(block.data)
+            self._datalen[j] += int(block.data.shape[0])
 
     def _handle_samples(
         self, data: list["DNxscopeStream"], pdata: "PluginQueueData", j: int
     ) -> None:
         if not data:  # pragma: no cover
             return
-        block = np.empty((len(data), pdata.vdim), dtype=np.float64)
+        block = np.empty(
+            (len(data), pdata.vdim), dtype=self._file_dtype(pdata)
+        )
         for row, sample in enumerate(data):
             for col in range(pdata.vdim):
                 # TODO: metadata not supported for now
                 block[row, col] = sample.data[col]
-        self._npdata[j] = np.concatenate((self._npdata[j], block), axis=0)
-        self._flush_ready(pdata, j)
+        self._rings[j].write(block)
+        self._datalen[j] += len(data)
 
     def start(self, kwargs: Any) -> bool:  # pragma: no cover
         """Start capture plugin.
@@ -98,12 +102,17 @@ class PluginNpmem(PluginThread, IPluginFile):
         self._path = kwargs["path"]
         self._nostop = kwargs["nostop"]
         self._npshape = kwargs["shape"]
+        self._writer_opts = kwargs.get("writer_opts", self._writer_opts)
+        dtype = kwargs.get("dtype")
+        self._dtype = None if dtype is None else np.dtype(dtype)
 
         chanlist = self._phandler.chanlist_plugin(kwargs["channels"])
         trig = self._phandler.triggers_plugin(chanlist, kwargs["trig"])
 
         cb = self._phandler.cb_get()
-        self._data = PluginData(chanlist, trig, cb)
+        self._data = PluginData(
+            chanlist, trig, cb, kwargs.get("stream_opts", self.STREAM_OPTS)
+        )
 
         if not self._data.qdlist:  # pragma: no cover
             return False
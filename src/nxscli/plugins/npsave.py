@@ -1,5 +1,6 @@
 """Module containing Numpy capture plugin."""
 
+import functools
 from typing import TYPE_CHECKING, Any
 
 import numpy as np
@@ -7,14 +8,23 @@ import numpy as np
 from nxscli.idata import PluginData, PluginQueueData
 from nxscli.iplugin import IPluginFile
 from nxscli.logger import logger
+from nxscli.npyfile import NpyStreamWriter
 from nxscli.pluginthr import PluginThread, StreamBlocks
+from nxscli.rotate import SegmentRotator
 
 if TYPE_CHECKING:
     from nxslib.nxscope import DNxscopeStream
 
+    from nxscli.filewriter import DFileWriterStats
+
 
 class PluginNpsave(PluginThread, IPluginFile):
-    """Plugin that capture data to Numpy file."""
+    """Plugin that capture data to Numpy file.
+
+    Rows are streamed to disk as they arrive by a background I/O thread.
+    Files keep the channel data type unless an output data type is
+    given.
+    """
 
     def __init__(self) -> None:
         """Intiialize a Numpy capture plugin."""
@@ -23,49 +33,82 @@ class PluginNpsave(PluginThread, IPluginFile):
 
         self._data: "PluginData"
         self._path: str
-        self._npdata: list[list[np.ndarray[Any, Any]]] = []
+        self._buffer_rows: int | None = None
+        self._dtype: "np.dtype[Any] | None" = None
+        self._writers: list[SegmentRotator[NpyStreamWriter]] = []
+
+    def _writer_open(
+        self, pdata: "PluginQueueData", path: str
+    ) -> NpyStreamWriter:
+        # (vdim, samples) layout is kept without a transpose copy
+        return NpyStreamWriter(
+            path,
+            pdata.vdim,
+            dtype=self._file_dtype(pdata),
+            buffer_rows=self._buffer_rows,
+            opts=self._writer_opts,
+        )
+
+    def _writer_closed(self, chan: int, writer: NpyStreamWriter) -> None:
+        self._codec_account(f"chan{chan}", writer.stats().codec)
 
     def _init(self) -> None:
         assert self._phandler
 
-        self._npdata = [[] for _ in range(len(self._data.qdlist))]
+        self._writers = [
+            self._rotator(
+                self._path + "_chan" + str(pdata.chan),
+                self._file_suffix(".npy"),
+                functools.partial(self._writer_open, pdata),
+                functools.partial(self._writer_closed, pdata.chan),
+            )
+            for pdata in self._data.qdlist
+        ]
+
+    def _file_dtype(self, pdata: "PluginQueueData") -> "np.dtype[Any]":
+        if self._dtype is not None:
+            return self._dtype
+        return pdata.dtype
 
     def _final(self) -> None:
         logger.info("numpy save captures DONE")
 
-        for i, pdata in enumerate(self._data.qdlist):
-            chanpath = self._path + "_chan" + str(pdata.chan) + ".npy"
-            chunks = self._npdata[i]
-            if chunks:
-                npdata = np.concatenate(chunks, axis=0).T
-            else:
-                npdata = np.empty((pdata.vdim, 0), dtype=np.float64)
-            np.save(chanpath, npdata)
+        self._rotators_close(self._writers)
+        self._writer_stats_log()
+
+    def writer_stats(self) -> list["DFileWriterStats"]:
+        """Get file writer counters of current files, one per channel."""
+        return [writer.writer.stats() for writer in self._writers]
 
     def _handle_blocks(
         self, data: StreamBlocks, pdata: "PluginQueueData", j: int
     ) -> None:
-        rows = 0
         for block in data:
-            block_data = np.asarray(block.data, dtype=np.float64)
-            if int(block_data.shape[0]) == 0:  # pragma: no cover
-                continue
-            self._npdata[j].append(block_data)
-            rows += int(block_data.shape[0])
-        self._datalen[j] += rows
+            self._write(block.data, pdata, j)
 
     def _handle_samples(
         self, data: list["DNxscopeStream"], pdata: "PluginQueueData", j: int
     ) -> None:
         if not data:  # pragma: no cover
             return
-        block = np.empty((len(data), pdata.vdim), dtype=np.float64)
+        block = np.empty(
+            (len(data), pdata.vdim), dtype=self._file_dtype(pdata)
+        )
         for row, sample in enumerate(data):
             for col in range(pdata.vdim):
                 # TODO: metadata not supported for now
                 block[row, col] = sample.data[col]
-        self._npdata[j].append(block)
-        self._datalen[j] += int(block.shape[0])
+        self._write(block, pdata, j)
+
+    def _write(
+        self, data: "np.ndarray[Any, Any]", pdata: "PluginQueueData", j: int
+    ) -> None:
+        rows = int(data.shape[0])
+        nbytes = rows * pdata.vdim * self._file_dtype(pdata).itemsize
+        rotator = self._writers[j]
+        rotator.get().write(data)
+        rotator.account(pdata.chan, self._datalen[j], rows, nbytes)
+        self._datalen[j] += rows
 
     def start(self, kwargs: Any) -> bool:  # pragma: no cover
         """Start capture plugin.
@@ -79,12 +122,19 @@ class PluginNpsave(PluginThread, IPluginFile):
         self._samples = kwargs["samples"]
         self._path = kwargs["path"]
         self._nostop = kwargs["nostop"]
+        self._buffer_rows = kwargs.get("buffer_rows")
+        self._writer_opts = kwargs.get("writer_opts", self._writer_opts)
+        self._rotate_opts = kwargs.get("rotate_opts", self._rotate_opts)
+        dtype = kwargs.get("dtype")
+        self._dtype = None if dtype is None else np.dtype(dtype)
 
         chanlist = self._phandler.chanlist_plugin(kwargs["channels"])
         trig = self._phandler.triggers_plugin(chanlist, kwargs["trig"])
 
         cb = self._phandler.cb_get()
-        self._data = PluginData(chanlist, trig, cb)
+        self._data = PluginData(
+            chanlist, trig, cb, kwargs.get("stream_opts", self.STREAM_OPTS)
+        )
 
         if not self._data.qdlist:  # pragma: no cover
             return False
@@ -4,10 +4,13 @@ import queue
 from threading import Event
 from typing import Any
 
+import numpy as np
+
 from nxscli.idata import PluginData, PluginQueueData
 from nxscli.iplugin import IPluginText
 from nxscli.logger import logger
 from nxscli.pluginthr import PluginThread, StreamBlocks
+from nxscli.stream_queue import DStreamSubOpts, EOverflowPolicy
 
 ###############################################################################
 # Class: PluginPrinter
@@ -15,14 +18,26 @@ from nxscli.pluginthr import PluginThread, StreamBlocks
 
 
 class PluginPrinter(PluginThread, IPluginText):
-    """Dummy plugin that print captured data."""
+    """Dummy plugin that print captured data.
+
+    Samples wait for ``result()`` in a queue of ``MAX_SAMPLES``, when the
+    terminal falls behind the oldest samples are dropped.
+    """
+
+    # display plugin, never let a slow terminal grow stream queues
+    STREAM_OPTS = DStreamSubOpts(
+        max_blocks=256, policy=EOverflowPolicy.DROP_OLDEST
+    )
+    # samples waiting for the terminal
+    MAX_SAMPLES = 4096
 
     def __init__(self) -> None:
         """Intiialize a printer plugin."""
         IPluginText.__init__(self)
         PluginThread.__init__(self)
 
-        self._q: queue.Queue[Any] = queue.Queue()
+        self._q: queue.Queue[Any] = queue.Queue(self.MAX_SAMPLES)
+        self._dropped = 0
         self._done = Event()
         self._ret_len = 0
         self._meta_string = False
@@ -33,22 +48,44 @@ class PluginPrinter(PluginThread, IPluginText):
         assert self._phandler
 
     def _final(self) -> None:
+        if self._dropped:
+            logger.info("printer dropped %d samples", self._dropped)
         logger.info("printer DONE")
 
+    def _sample_put(self, sample: dict[str, Any]) -> None:
+        """Queue a sample for the terminal, dropping the oldest if full."""
+        while True:
+            try:
+                self._q.put_nowait(sample)
+                return
+            except queue.Full:
+                pass
+            try:
+                self._q.get_nowait()
+            except queue.Empty:  # pragma: no cover
+                # taken by result() meanwhile
+                continue
+            self._dropped += 1
+
     def _handle_blocks(
         self, data: StreamBlocks, pdata: "PluginQueueData", j: int
     ) -> None:
-        for data_t, meta_t in self._block_rows(data, pdata, j):
-            if self._datalen[j] < self._samples:
-                d: dict[str, Any] = dict()
-                d["chan"] = self._data.qdlist[j].chan
-                d["data"] = data_t
-                if self._meta_string:
-                    d["meta"] = bytes(list(meta_t)).decode()
-                else:
-                    d["meta"] = meta_t
-                self._q.put(d)
-                self._datalen[j] += 1
+        chan = pdata.chan
+        for cols in self._block_columns(data, j):
+            meta: list[Any]
+            if cols.meta is None:
+                meta = [()] * cols.rows
+            elif self._meta_string:
+                meta = [
+                    mrow.tobytes().decode()
+                    for mrow in cols.meta.astype(np.uint8)
+                ]
+            else:
+                meta = [tuple(mrow) for mrow in cols.meta.tolist()]
+            for row, mrow in zip(cols.data.tolist(), meta):
+                self._sample_put(
+                    {"chan": chan, "data": tuple(row), "meta": mrow}
+                )
 
     @property
     def handled(self) -> bool:
@@ -91,7 +128,9 @@ class PluginPrinter(PluginThread, IPluginText):
         trig = self._phandler.triggers_plugin(chanlist, kwargs["trig"])
 
         cb = self._phandler.cb_get()
-        self._data = PluginData(chanlist, trig, cb)
+        self._data = PluginData(
+            chanlist, trig, cb, kwargs.get("stream_opts", self.STREAM_OPTS)
+        )
 
         if not self._data.qdlist:  # pragma: no cover
             return False
@@ -109,7 +148,8 @@ class PluginPrinter(PluginThread, IPluginText):
         except queue.Empty:
             return ""
 
-        if self._ret_len >= self._samples:
+        # dropped samples count as shown, or the capture never ends
+        if self._ret_len + self._dropped >= self._samples:
             self._done.set()
 
         s = str(self._ret_len) + ": " + str(samples)
@@ -4,8 +4,6 @@ import json
 import socket
 from typing import Any
 
-import numpy as np
-
 from nxscli.idata import PluginData, PluginQueueData
 from nxscli.iplugin import IPluginFile
 from nxscli.logger import logger
@@ -51,24 +49,9 @@ class PluginUdp(PluginThread, IPluginFile):
         sendto = self._sock.sendto
         endpoint = (self._address, self._port)
 
-        for block in data:
-            block_data = block.data
-            assert isinstance(block_data, np.ndarray)
-            rows = int(block_data.shape[0])
-            if rows == 0:
-                continue
-
-            if not self._nostop:  # pragma: no cover
-                remaining = self._samples - self._datalen[j]
-                if remaining <= 0:
-                    break
-                rows = min(rows, remaining)
-                if rows <= 0:  # pragma: no cover
-                    break
-
-            start = self._datalen[j]
-            for offs, row in enumerate(block_data[:rows]):
-                temp: dict[str, Any] = {"timestamp": start + offs}
+        for cols in self._block_columns(data, j):
+            for offs, row in enumerate(cols.data.tolist()):
+                temp: dict[str, Any] = {"timestamp": cols.start + offs}
                 for key, val in zip(keys, row):
                     temp[key] = float(val)
 
@@ -80,8 +63,6 @@ class PluginUdp(PluginThread, IPluginFile):
 
                 sendto(encoded, endpoint)
 
-            self._datalen[j] += rows
-
     def start(self, kwargs: Any) -> bool:
         """Start UDP plugin.
 
@@ -104,7 +85,7 @@ class PluginUdp(PluginThread, IPluginFile):
         trig = self._phandler.triggers_plugin(chanlist, kwargs["trig"])
 
         cb = self._phandler.cb_get()
-        self._data = PluginData(chanlist, trig, cb)
+        self._data = PluginData(chanlist, trig, cb, kwargs.get("stream_opts"))
 
         if not self._data.qdlist:  # pragma: no cover
             return False
@@ -1,19 +1,48 @@
 """Module containing Nxscli plugin thread common logic."""
 
 import threading
+import warnings
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from time import perf_counter
 from typing import TYPE_CHECKING, Any, Iterator
 
 import numpy as np
 from nxslib.nxscope import DNxscopeStreamBlock
 from nxslib.thread import ThreadCommon
 
+from nxscli.logger import logger
+from nxscli.metrics import metrics
+
 if TYPE_CHECKING:
     from nxscli.idata import PluginData, PluginQueueData
 
 StreamBlocks = list[DNxscopeStreamBlock]
 
 
+###############################################################################
+# Data: DBlockColumns
+###############################################################################
+
+
+@dataclass(frozen=True)
+class DBlockColumns:
+    """Columnar view of plugin channel rows.
+
+    ``data`` and ``meta`` are ``(rows, vdim)`` and ``(rows, mlen)`` views
+    of stream blocks, ``start`` is the capture index of the first row.
+    """
+
+    data: "np.ndarray[Any, Any]"
+    meta: "np.ndarray[Any, Any] | None"
+    start: int
+
+    @property
+    def rows(self) -> int:
+        """Get number of rows."""
+        return int(self.data.shape[0])
+
+
 ###############################################################################
 # Class: PluginThread
 ###############################################################################
@@ -22,6 +51,9 @@ StreamBlocks = list[DNxscopeStreamBlock]
 class PluginThread(ABC):
     """The Nxscli plugin thread."""
 
+    # maximum wait for channel data in one thread loop iteration
+    WAIT_TIMEOUT = 1.0
+
     def __init__(self) -> None:
         """Initialize a Nxslib plugin thread."""
         self._thread = ThreadCommon(
@@ -33,10 +65,12 @@ class PluginThread(ABC):
         self._ready = threading.Event()
         self._datalen: list[int] = []
         self._plugindata: "PluginData"
+        self._metrics = metrics.stage("plugin." + type(self).__name__)
 
     def _thread_common(self) -> None:
         assert self._plugindata
-        # get samples
+        # wait for any channel and then handle all ready channels
+        self._plugindata.wait_ready(self.WAIT_TIMEOUT)
         for j, pdata in enumerate(self._plugindata.qdlist):
             if not self._nostop:  # pragma: no cover
                 if self._datalen[j] >= self._samples:
@@ -45,7 +79,13 @@ class PluginThread(ABC):
             data = self._queue_data_get(pdata)
 
             if self._is_block_payload(data):
+                start = perf_counter()
+                self._metrics.data_in(data)
+                stamp = pdata.queue_stamp()
+                if stamp is not None:
+                    self._metrics.latency(start - stamp)
                 self._handle_blocks(data, pdata, j)
+                self._metrics.handler_time(perf_counter() - start)
             elif data:
                 raise RuntimeError(
                     "nxscli requires numpy block stream payloads; "
@@ -57,7 +97,7 @@ class PluginThread(ABC):
             self._thread.stop_set()
 
     def _queue_data_get(self, pdata: "PluginQueueData") -> Any:
-        return pdata.queue_get(block=True, timeout=1)
+        return pdata.queue_get(block=False)
 
     def _is_block_payload(self, data: Any) -> bool:
         return (
@@ -72,8 +112,22 @@ class PluginThread(ABC):
 
     def _final_common(self) -> None:
         self._final()
+        self._queue_stats_log()
         self._ready.set()
 
+    def _queue_stats_log(self) -> None:
+        for pdata in self._plugindata.qdlist:
+            stats = pdata.queue_stats()
+            if stats is None or not stats.dropped_blocks:
+                continue
+            logger.info(
+                "%s: dropped %d blocks (%d rows), overflows=%d",
+                str(pdata),
+                stats.dropped_blocks,
+                stats.dropped_rows,
+                stats.overflows,
+            )
+
     @property
     def stream(self) -> bool:
         """Return True if this plugin needs stream."""
@@ -108,21 +162,55 @@ class PluginThread(ABC):
             done = False
         return done
 
+    def _block_columns(
+        self, data: StreamBlocks, j: int
+    ) -> Iterator[DBlockColumns]:
+        """Get columnar views of payload rows and account them.
+
+        One view is returned per block, data are never copied. Rows above
+        the sample limit are cut off and ``_datalen[j]`` is advanced by the
+        returned rows. Plugins that want fewer, larger views can merge the
+        payload with ``merge_blocks()`` first, at the cost of a copy.
+
+        :param data: block payload
+        :param j: plugin channel index
+        """
+        for block in data:
+            rows = int(block.data.shape[0])
+            if not self._nostop:
+                rows = min(rows, self._samples - self._datalen[j])
+            if rows <= 0:
+                continue
+            start = self._datalen[j]
+            self._datalen[j] += rows
+            meta = None if block.meta is None else block.meta[:rows]
+            yield DBlockColumns(block.data[:rows], meta, start)
+
     def _block_rows(
         self, data: StreamBlocks, pdata: "PluginQueueData", j: int
     ) -> Iterator[tuple[tuple[Any, ...], tuple[Any, ...]]]:
+        """Get payload rows as ``(data, meta)`` tuples.
+
+        Deprecated, use ``_block_columns()``. Rows are not accounted
+        in ``_datalen``.
+
+        :param data: block payload
+        :param pdata: plugin queue data (unused)
+        :param j: plugin channel index (unused)
+        """
+        warnings.warn(
+            "_block_rows() is deprecated, use _block_columns()",
+            DeprecationWarning,
+            stacklevel=2,
+        )
         for block in data:
-            arr = block.data
-            meta_arr = block.meta
-            for idx in range(int(arr.shape[0])):
-                row = np.asarray(arr[idx]).reshape(-1)
-                data_t = tuple(row.tolist())
-                if meta_arr is None:
-                    meta_t: tuple[Any, ...] = ()
-                else:
-                    mrow = np.asarray(meta_arr[idx]).reshape(-1)
-                    meta_t = tuple(mrow.tolist())
-                yield data_t, meta_t
+            rows = block.data.reshape(block.data.shape[0], -1).tolist()
+            if block.meta is None:
+                metas: list[Any] = [[]] * len(rows)
+            else:
+                metas = block.meta.reshape(len(rows), -1).tolist()
+            for row, mrow in zip(rows, metas):
+                yield tuple(row), tuple(mrow)
 
     @abstractmethod
     def _handle_blocks(
@@ -0,0 +1,645 @@
+"""Process-isolated plugin execution fed over shared memory rings."""
+
+import multiprocessing
+import pickle
+import queue
+from multiprocessing import shared_memory
+from threading import Lock
+from time import sleep
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from nxslib.nxscope import DNxscopeStreamBlock
+from nxslib.thread import ThreadCommon
+
+from nxscli.channelref import ChannelRef
+from nxscli.idata import PluginDataCb
+from nxscli.iplugin import EPluginType, IPlugin
+from nxscli.logger import logger
+from nxscli.pluginthr import PluginThread
+from nxscli.stream_queue import StreamQueue
+from nxscli.trigger import DTriggerConfig, ETriggerType, TriggerHandler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from multiprocessing.connection import Connection
+
+    from nxslib.dev import DeviceChannel
+
+    from nxscli.stream_queue import DStreamSubOpts
+
+StreamBlocks = list[DNxscopeStreamBlock]
+# array location in a ring: byte offset, dtype string and shape
+ArrayDesc = tuple[int, str, tuple[int, ...]]
+# data and optional metadata array of one block
+BlockDesc = tuple[ArrayDesc, ArrayDesc | None]
+ChannelTriggers = list[tuple[int, DTriggerConfig]]
+
+
+###############################################################################
+# Class: ShmRing
+###############################################################################
+
+
+class ShmRing:
+    """Single-producer single-consumer byte ring in shared memory.
+
+    The writer copies block arrays into the ring and passes a small
+    descriptor to the reader. The reader copies the arrays out and
+    publishes its absolute read position in the ring header, which frees
+    the space for the writer.
+    """
+
+    _HEADER = 64
+    _ALIGN = 64
+    # wait slice used by a writer blocked on a full ring
+    WAIT_SLICE = 0.001
+
+    def __init__(self, size: int, name: str | None = None) -> None:
+        """Create a new ring or attach to an existing one.
+
+        :param size: ring capacity in bytes
+        :param name: shared memory name, ``None`` creates a new ring
+        """
+        assert size > 0
+        self._owner = name is None
+        if name is None:
+            self._shm = shared_memory.SharedMemory(
+                create=True, size=size + self._HEADER
+            )
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._size = size
+        # absolute read position, written only by the reader
+        self._tail: np.ndarray[Any, Any] | None = np.ndarray(
+            (1,), dtype=np.uint64, buffer=self._shm.buf
+        )
+        if self._owner:
+            self._tail[0] = 0
+        # absolute write position, known only to the writer
+        self._head = 0
+
+    @property
+    def name(self) -> str:
+        """Get shared memory name."""
+        return self._shm.name
+
+    @property
+    def size(self) -> int:
+        """Get ring capacity in bytes."""
+        return self._size
+
+    def _aligned(self, nbytes: int) -> int:
+        return -(-nbytes // self._ALIGN) * self._ALIGN
+
+    def payload_bytes(self, payload: StreamBlocks) -> int:
+        """Return ring space needed for a payload."""
+        nbytes = 0
+        for block in payload:
+            nbytes += self._aligned(np.asarray(block.data).nbytes)
+            if block.meta is not None:
+                nbytes += self._aligned(np.asarray(block.meta).nbytes)
+        return nbytes
+
+    def _free(self) -> int:
+        assert self._tail is not None
+        return self._size - (self._head - int(self._tail[0]))
+
+    def _wait(self, nbytes: int, alive: "Callable[[], bool]") -> bool:
+        while self._free() < nbytes:
+            if not alive():
+                return False
+            sleep(self.WAIT_SLICE)
+        return True
+
+    def _put(self, arr: np.ndarray[Any, Any]) -> ArrayDesc:
+        arr = np.ascontiguousarray(arr)
+        if arr.dtype.hasobject:
+            raise ValueError("object arrays cannot be shared")
+        offset = self._head % self._size
+        dst: np.ndarray[Any, Any] = np.ndarray(
+            arr.shape,
+            dtype=arr.dtype,
+            buffer=self._shm.buf,
+            offset=self._HEADER + offset,
+        )
+        dst[...] = arr
+        self._head += self._aligned(arr.nbytes)
+        return offset, arr.dtype.str, arr.shape
+
+    def write(
+        self, payload: StreamBlocks, alive: "Callable[[], bool]"
+    ) -> tuple[int, list[BlockDesc]] | None:
+        """Copy payload into the ring.
+
+        The payload is stored contiguously, the ring wraps before it if
+        needed. Waits for free space while ``alive()`` returns ``True``.
+
+        :param payload: block payload
+        :param alive: returns ``False`` when the writer is shutting down
+        :return: ring position after payload and block descriptors or
+          ``None`` if the writer was stopped while waiting
+        :raises ValueError: if the payload does not fit into the ring
+        """
+        nbytes = self.payload_bytes(payload)
+        if nbytes > self._size:
+            raise ValueError("payload larger than shared memory ring")
+        pos = self._head % self._size
+        pad = self._size - pos if pos + nbytes > self._size else 0
+        # with an empty ring the padding is never read, so it can overlap
+        if not self._wait(min(pad + nbytes, self._size), alive):
+            return None
+        self._head += pad
+
+        descs: list[BlockDesc] = []
+        for block in payload:
+            data = self._put(np.asarray(block.data))
+            meta = None
+            if block.meta is not None:
+                meta = self._put(np.asarray(block.meta))
+            descs.append((data, meta))
+        return self._head, descs
+
+    def _get(self, desc: ArrayDesc) -> np.ndarray[Any, Any]:
+        offset, dtype, shape = desc
+        src: np.ndarray[Any, Any] = np.ndarray(
+            shape,
+            dtype=np.dtype(dtype),
+            buffer=self._shm.buf,
+            offset=self._HEADER + offset,
+        )
+        return src.copy()
+
+    def read(self, end: int, descs: list[BlockDesc]) -> StreamBlocks:
+        """Copy payload out of the ring and release its space.
+
+        :param end: ring position after payload
+        :param descs: block descriptors returned by ``write()``
+        """
+        assert self._tail is not None
+        ret: StreamBlocks = []
+        for data, meta in descs:
+            ret.append(
+                DNxscopeStreamBlock(
+                    data=self._get(data),
+                    meta=None if meta is None else self._get(meta),
+                )
+            )
+        self._tail[0] = end
+        return ret
+
+    def close(self) -> None:
+        """Detach from the ring, the creator also removes it."""
+        if self._tail is None:
+            return
+        # release buffer export before closing shared memory
+        self._tail = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+###############################################################################
+# Class: _ShmFeeder
+###############################################################################
+
+
+class _ShmFeeder:
+    """Copy one subscriber queue into a shared memory ring."""
+
+    def __init__(
+        self,
+        idx: int,
+        subq: "queue.Queue[Any]",
+        ring: ShmRing,
+        descq: Any,
+    ) -> None:
+        """Initialize feeder for one channel subscription."""
+        self._idx = idx
+        self._subq = subq
+        self._ring = ring
+        self._descq = descq
+        self._started = False
+        self._thread = ThreadCommon(self._thread_common, name=f"shmfeed{idx}")
+
+    @property
+    def subq(self) -> "queue.Queue[Any]":
+        """Get subscriber queue."""
+        return self._subq
+
+    def start(self) -> None:
+        """Start feeder thread."""
+        self._started = True
+        self._thread.thread_start()
+
+    def stop(self) -> None:
+        """Stop feeder thread."""
+        self._started = False
+        self._thread.thread_stop()
+
+    def _is_started(self) -> bool:
+        return self._started
+
+    def _thread_common(self) -> None:
+        try:
+            payload = self._subq.get(block=True, timeout=0.05)
+        except queue.Empty:
+            return
+
+        if not payload:
+            return
+
+        # payload larger than the ring is passed block by block
+        if self._ring.payload_bytes(payload) <= self._ring.size:
+            chunks = [payload]
+        else:
+            chunks = [[block] for block in payload]
+
+        for chunk in chunks:
+            ret = self._ring.write(chunk, self._is_started)
+            if ret is None:
+                return
+            self._descq.put((self._idx, ret[0], ret[1]))
+
+
+###############################################################################
+# Class: ProcessPluginHandler
+###############################################################################
+
+
+class ProcessPluginHandler:
+    """Plugin handler stand-in used inside the plugin process.
+
+    Serves the subset of ``PluginHandler`` used by stream plugins: channel
+    list, triggers and stream subscriptions fed from shared memory rings.
+    """
+
+    def __init__(
+        self,
+        chanlist: list["DeviceChannel"],
+        triggers: ChannelTriggers,
+        refs: list[ChannelRef],
+        rings: list[ShmRing],
+        descq: Any,
+    ) -> None:
+        """Initialize child handler.
+
+        :param chanlist: plugin channels resolved by the parent
+        :param triggers: plugin trigger configuration resolved by the parent
+        :param refs: channel reference of each ring
+        :param rings: shared memory rings attached in this process
+        :param descq: queue with payload descriptors
+        """
+        self._chanlist = chanlist
+        self._triggers = triggers
+        self._refs = refs
+        self._rings = rings
+        self._descq = descq
+        self._lock = Lock()
+        self._subs: dict[int, list["queue.Queue[Any]"]] = {}
+        self._hidden: list[TriggerHandler] = []
+        self._thread = ThreadCommon(self._thread_common, name="shmread")
+
+    def chanlist_plugin(self, channels: Any) -> list["DeviceChannel"]:
+        """Return channels resolved by the parent process."""
+        return self._chanlist
+
+    def triggers_plugin(
+        self, chanlist: list["DeviceChannel"], triggers: Any
+    ) -> list[TriggerHandler]:
+        """Create trigger handlers from the parent configuration."""
+        visible_ids = {chan.data.chan for chan in chanlist}
+        for _, dtc in self._triggers:
+            if dtc.srcchan is None or dtc.srcchan in visible_ids:
+                continue
+            if TriggerHandler.find_by_channel(dtc.srcchan) is not None:
+                continue
+            # handlers are registered weakly, keep hidden sources alive
+            # for the lifetime of the plugin handler
+            self._hidden.append(
+                TriggerHandler(
+                    dtc.srcchan,
+                    DTriggerConfig(
+                        ETriggerType.ALWAYS_OFF, source_ref=dtc.source_ref
+                    ),
+                )
+            )
+
+        return [TriggerHandler(chan, dtc) for chan, dtc in self._triggers]
+
+    def cb_get(self) -> PluginDataCb:
+        """Get callbacks for plugins."""
+        return PluginDataCb(self.stream_sub, self.stream_unsub)
+
+    def stream_sub(
+        self, channel: ChannelRef, opts: "DStreamSubOpts | None" = None
+    ) -> "queue.Queue[Any]":
+        """Subscribe queue fed from the channel ring.
+
+        Queue options are applied by the parent subscription.
+        """
+        if channel not in self._refs:
+            raise ValueError(f"Unknown channel: {channel}")
+        subq: "queue.Queue[Any]" = StreamQueue()
+        with self._lock:
+            self._subs.setdefault(self._refs.index(channel), []).append(subq)
+        return subq
+
+    def stream_unsub(self, subq: "queue.Queue[Any]") -> None:
+        """Unsubscribe queue."""
+        with self._lock:
+            for subs in self._subs.values():
+                if subq in subs:
+                    subs.remove(subq)
+
+    def start(self) -> None:
+        """Start ring reader thread."""
+        self._thread.thread_start()
+
+    def stop(self) -> None:
+        """Stop ring reader thread and detach rings."""
+        self._thread.thread_stop()
+        for ring in self._rings:
+            ring.close()
+
+    def _thread_common(self) -> None:
+        try:
+            idx, end, descs = self._descq.get(block=True, timeout=0.05)
+        except queue.Empty:
+            return
+
+        # always read to release ring space, even without subscribers
+        payload = self._rings[idx].read(end, descs)
+        with self._lock:
+            subs = list(self._subs.get(idx, ()))
+        for subq in subs:
+            subq.put(payload)
+
+
+###############################################################################
+# Function: plugin_process_main
+###############################################################################
+
+
+def plugin_process_main(
+    cls: type[IPlugin],
+    conn: "Connection",
+    descq: Any,
+    rings: list[tuple[str, int]],
+    refs: list[ChannelRef],
+    chanlist: list["DeviceChannel"],
+    triggers: ChannelTriggers,
+) -> None:
+    """Run plugin and serve lifecycle commands until ``exit``.
+
+    :param cls: plugin class
+    :param conn: command pipe end
+    :param descq: queue with payload descriptors
+    :param rings: shared memory name and size of each ring
+    :param refs: channel reference of each ring
+    :param chanlist: plugin channels resolved by the parent
+    :param triggers: plugin trigger configuration resolved by the parent
+    """
+    handler = ProcessPluginHandler(
+        chanlist,
+        triggers,
+        refs,
+        [ShmRing(size, name) for name, size in rings],
+        descq,
+    )
+    plugin = cls()  # type: ignore
+    plugin.connect_phandler(handler)  # type: ignore[arg-type]
+    handler.start()
+    try:
+        while True:
+            try:
+                cmd, arg = conn.recv()
+            except EOFError:
+                break
+            if cmd == "exit":
+                break
+            conn.send(_plugin_command(plugin, cmd, arg))
+    finally:
+        plugin.stop()
+        handler.stop()
+        conn.close()
+
+
+def _plugin_command(plugin: IPlugin, cmd: str, arg: Any) -> Any:
+    if cmd == "start":
+        return plugin.start(arg)
+    if cmd == "stop":
+        plugin.stop()
+        return None
+    if cmd == "data_wait":
+        return plugin.data_wait(arg)
+    if cmd == "wait_for_plugin":
+        return plugin.wait_for_plugin()
+    if cmd == "result":
+        ret = plugin.result()
+        try:
+            pickle.dumps(ret)
+        except Exception:
+            logger.error("plugin result cannot be sent: %s", str(ret))
+            return None
+        return ret
+    raise ValueError(f"unknown plugin command {cmd}")
+
+
+###############################################################################
+# Class: PluginProcess
+###############################################################################
+
+
+class PluginProcess(IPlugin):
+    """Run a plugin in a child process.
+
+    The parent subscribes the plugin channels as usual and copies their
+    blocks into one shared memory ring per channel. The child runs an
+    unchanged plugin instance against ``ProcessPluginHandler`` and the
+    plugin lifecycle calls are proxied over a pipe. Plugin arguments and
+    results must be picklable, plot plugins are not supported.
+    """
+
+    # default ring size per channel in bytes
+    RING_BYTES = 16 * 1024 * 1024
+    # child process shutdown timeout
+    JOIN_TIMEOUT = 5.0
+
+    def __init__(self, cls: type[IPlugin], ring_bytes: int = 0) -> None:
+        """Initialize process plugin proxy.
+
+        :param cls: plugin class
+        :param ring_bytes: ring size per channel, ``0`` selects default
+        """
+        # plugin is never created in the parent, its constructor may
+        # allocate resources meant for the child
+        ptype = getattr(cls, "PTYPE", None)
+        if ptype is None or ptype in (
+            EPluginType.STATIC,
+            EPluginType.ANIMATION,
+        ):
+            raise ValueError(f"{cls.__name__} cannot run in a process")
+        super().__init__(ptype)
+        self._cls = cls
+        # stream capture plugins are built on PluginThread
+        self._stream = issubclass(cls, PluginThread)
+        self._ring_bytes = ring_bytes or self.RING_BYTES
+        self._ctx = multiprocessing.get_context("spawn")
+        self._proc: Any = None
+        self._conn: "Connection | None" = None
+        self._descq: Any = None
+        self._lock = Lock()
+        self._rings: list[ShmRing] = []
+        self._feeders: list[_ShmFeeder] = []
+
+    def __str__(self) -> str:
+        """Format string representation."""
+        return f"PluginProcess({self._cls.__name__})"
+
+    @property
+    def plugin_cls(self) -> type[IPlugin]:
+        """Get plugin class running in the process."""
+        return self._cls
+
+    @property
+    def stream(self) -> bool:
+        """Return True if this plugin needs stream."""
+        return self._stream
+
+    def _refs(
+        self, chanlist: list["DeviceChannel"], triggers: ChannelTriggers
+    ) -> list[ChannelRef]:
+        refs: list[ChannelRef] = []
+        for channel in chanlist:
+            if channel.data.chan >= 0:
+                refs.append(ChannelRef.physical(channel.data.chan))
+            else:
+                refs.append(ChannelRef.virtual(int(channel.data.name[1:])))
+        # hidden trigger sources are drained by the plugin too
+        for _, dtc in triggers:
+            if dtc.source_ref is not None and dtc.source_ref not in refs:
+                refs.append(dtc.source_ref)
+        return refs
+
+    def _call(self, cmd: str, arg: Any = None) -> Any:
+        if self._conn is None:
+            return None
+        with self._lock:
+            try:
+                self._conn.send((cmd, arg))
+                return self._conn.recv()
+            except (EOFError, OSError):
+                logger.error("%s: plugin process exited", str(self))
+                return None
+
+    def _shutdown(self) -> None:
+        for feeder in self._feeders:
+            feeder.stop()
+            self._phandler.stream_unsub(feeder.subq)
+        self._feeders.clear()
+
+        assert self._conn is not None
+        try:
+            self._conn.send(("exit", None))
+        except OSError:  # pragma: no cover
+            pass
+        self._proc.join(self.JOIN_TIMEOUT)
+        if self._proc.is_alive():  # pragma: no cover
+            self._proc.terminate()
+            self._proc.join()
+        self._conn.close()
+        self._conn = None
+
+        # descriptors left for a dead reader must not block exit
+        self._descq.cancel_join_thread()
+        self._descq.close()
+        self._descq = None
+
+        for ring in self._rings:
+            ring.close()
+        self._rings.clear()
+
+    def start(self, kwargs: Any) -> bool:
+        """Start plugin process.
+
+        :param kwargs: plugin specific arguments
+        """
+        assert self._phandler
+
+        chanlist: list["DeviceChannel"] = []
+        triggers: ChannelTriggers = []
+        if "channels" in kwargs:
+            chanlist = self._phandler.chanlist_plugin(kwargs["channels"])
+            triggers = self._phandler.triggers_config(
+                chanlist, kwargs.get("trig")
+            )
+        refs = self._refs(chanlist, triggers)
+        opts = kwargs.get(
+            "stream_opts", getattr(self._cls, "STREAM_OPTS", None)
+        )
+
+        self._descq = self._ctx.Queue()
+        for idx, ref in enumerate(refs):
+            ring = ShmRing(self._ring_bytes)
+            self._rings.append(ring)
+            if opts is None:
+                subq = self._phandler.stream_sub(ref)
+            else:
+                subq = self._phandler.stream_sub(ref, opts)
+            self._feeders.append(_ShmFeeder(idx, subq, ring, self._descq))
+
+        conn, child = self._ctx.Pipe()
+        self._proc = self._ctx.Process(
+            target=plugin_process_main,
+            args=(
+                self._cls,
+                child,
+                self._descq,
+                [(ring.name, ring.size) for ring in self._rings],
+                refs,
+                chanlist,
+                triggers,
+            ),
+            name=f"nxscli-{self._cls.__name__}",
+            daemon=True,
+        )
+        self._proc.start()
+        child.close()
+        self._conn = conn
+
+        for feeder in self._feeders:
+            feeder.start()
+
+        if not self._call("start", kwargs):
+            self._shutdown()
+            return False
+
+        return True
+
+    def stop(self) -> None:
+        """Stop plugin process."""
+        if self._conn is None:
+            return
+        # stop feeding first so the plugin can drain its queues
+        for feeder in self._feeders:
+            feeder.stop()
+        self._call("stop")
+        self._shutdown()
+
+    def data_wait(self, timeout: float = 0.0) -> bool:
+        """Return True if data are ready.
+
+        :param timeout: data wait timeout
+        """
+        return bool(self._call("data_wait", timeout))
+
+    def wait_for_plugin(self) -> bool:
+        """Return True if plugin is dont't need to wait."""
+        if self._conn is None:
+            return True
+        return bool(self._call("wait_for_plugin"))
+
+    def result(self) -> Any:
+        """Get plugin result from the process."""
+        return self._call("result")
@@ -0,0 +1,271 @@
+"""Rotation of capture files into segments."""
+
+import functools
+import json
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Generic, Protocol, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class SupportsClose(Protocol):
+    """Segment file writer."""
+
+    def close(self) -> None:
+        """Flush and close the file."""
+
+
+W = TypeVar("W", bound=SupportsClose)
+
+###############################################################################
+# Data: DRotateOpts
+###############################################################################
+
+
+@dataclass(frozen=True)
+class DRotateOpts:
+    """File rotation options.
+
+    A new segment is started when the current one holds ``size`` bytes
+    (before compression) or is ``interval`` seconds old, ``0`` disables
+    a limit.
+    """
+
+    size: int = 0
+    interval: float = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if files are rotated."""
+        return self.size > 0 or self.interval > 0
+
+
+###############################################################################
+# Data: DSegment
+###############################################################################
+
+
+@dataclass(frozen=True)
+class DSegment:
+    """Finished segment of a channel.
+
+    ``first`` and ``stop`` are capture indexes of the first row and
+    after the last row, ``opened`` and ``closed`` are wall clock times.
+    """
+
+    path: str
+    segment: int
+    chan: int
+    first: int
+    stop: int
+    opened: float
+    closed: float
+
+
+def segment_path(base: str, segment: int, suffix: str) -> str:
+    """Get path of a segment.
+
+    :param base: file path without suffix
+    :param segment: segment number
+    :param suffix: file name suffix
+    """
+    return f"{base}_{segment:06d}{suffix}"
+
+
+###############################################################################
+# Class: SegmentManifest
+###############################################################################
+
+
+class SegmentManifest:
+    """Finalize segments in the background and record them.
+
+    Segments are closed one by one by a background thread, then one
+    JSON line per channel (see :class:`DSegment`) is appended to the
+    manifest. A segment is listed only once its file is complete.
+    Errors are raised by the next :meth:`finish` or by :meth:`close`.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize a segment manifest.
+
+        :param path: manifest file path
+        """
+        self._path = path
+        self._pool = ThreadPoolExecutor(1, thread_name_prefix="segment")
+        self._futures: list[Future[None]] = []
+
+    @property
+    def path(self) -> str:
+        """Get manifest file path."""
+        return self._path
+
+    def _check(self) -> None:
+        """Raise errors of finished jobs and drop them."""
+        pending = []
+        for future in self._futures:
+            if future.done():
+                future.result()
+            else:
+                pending.append(future)
+        self._futures = pending
+
+    def _finish(
+        self, close: "Callable[[], None]", segments: list[DSegment]
+    ) -> None:
+        close()
+        with open(self._path, "a") as file:
+            for seg in segments:
+                file.write(json.dumps(asdict(seg)) + "\n")
+
+    def finish(
+        self, close: "Callable[[], None]", segments: list[DSegment]
+    ) -> None:
+        """Close a segment in the background and record it.
+
+        :param close: closes the segment file
+        :param segments: channel ranges of the segment
+        """
+        self._check()
+        self._futures.append(self._pool.submit(self._finish, close, segments))
+
+    def close(self) -> None:
+        """Wait for all segments."""
+        self._pool.shutdown()
+        self._check()
+
+
+###############################################################################
+# Class: SegmentRotator
+###############################################################################
+
+
+class SegmentRotator(Generic[W]):
+    """Split a capture file into segments.
+
+    Without rotation the file is ``base + suffix``. With rotation the
+    segments are ``segment_path(base, n, suffix)`` files. The next
+    segment is opened by the capture thread so no rows are lost, the
+    previous one is closed by :class:`SegmentManifest` in the
+    background.
+    """
+
+    def __init__(
+        self,
+        base: str,
+        suffix: str,
+        opener: "Callable[[str], W]",
+        opts: DRotateOpts | None = None,
+        manifest: SegmentManifest | None = None,
+        closed: "Callable[[W], None] | None" = None,
+    ) -> None:
+        """Open the first segment.
+
+        :param base: file path without suffix
+        :param suffix: file name suffix
+        :param opener: opens a segment file
+        :param opts: rotation options
+        :param manifest: manifest of finished segments, required if
+          files are rotated
+        :param closed: called with each writer once closed, from the
+          manifest thread for rotated files
+        """
+        self._base = base
+        self._suffix = suffix
+        self._opener = opener
+        self._opts = opts or DRotateOpts()
+        assert manifest is not None or not self._opts.enabled
+        self._manifest = manifest
+        self._closed = closed
+        self._segment = 0
+        self._open()
+
+    @property
+    def writer(self) -> W:
+        """Get the writer of the current segment."""
+        return self._writer
+
+    @property
+    def path(self) -> str:
+        """Get the path of the current segment."""
+        return self._path
+
+    @property
+    def segment(self) -> int:
+        """Get the current segment number."""
+        return self._segment
+
+    def _open(self) -> None:
+        if self._opts.enabled:
+            self._path = segment_path(self._base, self._segment, self._suffix)
+        else:
+            self._path = self._base + self._suffix
+        self._writer = self._opener(self._path)
+        self._bytes = 0
+        self._ranges: dict[int, list[int]] = {}
+        self._opened = time.time()
+        self._stamp = time.monotonic()
+
+    def _due(self) -> bool:
+        if not self._ranges:
+            return False
+        if self._opts.size and self._bytes >= self._opts.size:
+            return True
+        return bool(
+            self._opts.interval
+            and time.monotonic() - self._stamp >= self._opts.interval
+        )
+
+    def _segments(self) -> list[DSegment]:
+        closed = time.time()
+        return [
+            DSegment(
+                self._path,
+                self._segment,
+                chan,
+                first,
+                stop,
+                self._opened,
+                closed,
+            )
+            for chan, (first, stop) in sorted(self._ranges.items())
+        ]
+
+    def _close(self, writer: W) -> None:
+        writer.close()
+        if self._closed is not None:
+            self._closed(writer)
+
+    def _finish(self) -> None:
+        close = functools.partial(self._close, self._writer)
+        if self._manifest is None:
+            close()
+        else:
+            self._manifest.finish(close, self._segments())
+
+    def get(self) -> W:
+        """Get the writer for the next rows, rotate the file if due."""
+        if self._due():
+            self._finish()
+            self._segment += 1
+            self._open()
+        return self._writer
+
+    def account(self, chan: int, first: int, rows: int, nbytes: int) -> None:
+        """Account rows written to the current segment.
+
+        :param chan: channel number
+        :param first: capture index of the first row
+        :param rows: number of rows
+        :param nbytes: bytes written
+        """
+        self._bytes += nbytes
+        rng = self._ranges.setdefault(chan, [first, first])
+        rng[1] = first + rows
+
+    def close(self) -> None:
+        """Close the current segment."""
+        self._finish()
@@ -1,36 +1,416 @@
 """Shared physical stream fan-out provider for all plugins."""
 
 import queue
-from threading import Lock
-from time import sleep
-from typing import TYPE_CHECKING
+from dataclasses import replace
+from threading import Condition, Lock
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING, Any
 
+import numpy as np
+from nxslib.nxscope import DNxscopeStreamBlock
 from nxslib.thread import ThreadCommon
 
+from nxscli.metrics import metrics
+from nxscli.stream_queue import (
+    DStreamQueueStats,
+    DSubscriberStats,
+    EOverflowPolicy,
+    StreamQueue,
+)
+
 if TYPE_CHECKING:
     from nxslib.dev import DeviceChannel
-    from nxslib.nxscope import DNxscopeStreamBlock, NxscopeHandler
+    from nxslib.nxscope import NxscopeHandler
 
     from nxscli.channelref import ChannelRef
+    from nxscli.stream_queue import DStreamSubOpts
+
+BlockQueue = queue.Queue[list[DNxscopeStreamBlock]]
+# channel, payload and hub arrival stamp
+ReadyItem = tuple[int, list[DNxscopeStreamBlock], float]
+
+
+###############################################################################
+# Class: StreamRing
+###############################################################################
+
+
+class StreamRing:
+    """Preallocated per-channel ring with data and metadata rows.
+
+    The hub writes each physical block once into the ring. Readers keep
+    their own absolute read position in ``RingCursor``.
+
+    A block with a different row width or data type reallocates the
+    storage and starts a new generation with the head at ``0``, cursors
+    of older generations are moved to the new one.
+    """
+
+    def __init__(self, rows: int) -> None:
+        """Initialize an empty ring.
+
+        :param rows: ring capacity in samples
+        """
+        assert rows > 0
+        self._rows = rows
+        self._data: np.ndarray[Any, Any] | None = None
+        self._meta: np.ndarray[Any, Any] | None = None
+        # absolute number of rows written in this generation
+        self._head = 0
+        self._generation = 0
+        # final heads of previous generations
+        self._heads: list[int] = []
+        self.cond = Condition()
+
+    @property
+    def rows(self) -> int:
+        """Get ring capacity in samples."""
+        return self._rows
+
+    @property
+    def head(self) -> int:
+        """Get absolute write position."""
+        return self._head
+
+    @property
+    def generation(self) -> int:
+        """Get storage generation."""
+        return self._generation
+
+    def lost_locked(self, generation: int, pos: int) -> int:
+        """Return rows of older generations not read from ``pos``.
+
+        :param generation: generation of the reader position
+        :param pos: absolute reader position in that generation
+        """
+        heads = self._heads[generation:]
+        if not heads:
+            return 0
+        return max(heads[0] - pos, 0) + sum(heads[1:])
+
+    def _alloc_locked(self, block: DNxscopeStreamBlock, rows: int) -> None:
+        data = block.data.reshape(int(block.data.shape[0]), -1)
+        self._data = np.empty((rows, data.shape[1]), dtype=data.dtype)
+        if block.meta is None:
+            self._meta = None
+        else:
+            meta = block.meta.reshape(int(block.meta.shape[0]), -1)
+            self._meta = np.zeros((rows, meta.shape[1]), dtype=meta.dtype)
+
+    def reserve(self, rows: int) -> None:
+        """Grow ring capacity keeping the newest rows.
+
+        :param rows: requested minimal capacity
+        """
+        with self.cond:
+            if rows <= self._rows:
+                return
+            old_data = self._data
+            old_meta = self._meta
+            old_rows = self._rows
+            self._rows = rows
+            if old_data is None:
+                return
+            keep = min(self._head, old_rows)
+            src = np.arange(self._head - keep, self._head)
+            self._data = np.empty((rows,) + old_data.shape[1:], old_data.dtype)
+            self._data[src % rows] = old_data[src % old_rows]
+            if old_meta is not None:
+                self._meta = np.zeros(
+                    (rows,) + old_meta.shape[1:], old_meta.dtype
+                )
+                self._meta[src % rows] = old_meta[src % old_rows]
+
+    def _copy_locked(
+        self,
+        dst: np.ndarray[Any, Any],
+        src: np.ndarray[Any, Any],
+    ) -> None:
+        rows = int(src.shape[0])
+        start = self._head % self._rows
+        first = min(rows, self._rows - start)
+        dst[start : start + first] = src[:first]
+        if first < rows:
+            dst[: rows - first] = src[first:]
+
+    def write(self, payload: list[DNxscopeStreamBlock]) -> None:
+        """Copy payload rows into the ring and wake readers."""
+        with self.cond:
+            for block in payload:
+                nrows = int(block.data.shape[0])
+                if nrows == 0:
+                    continue
+                data = block.data.reshape(nrows, -1)
+                if (
+                    self._data is None
+                    or data.shape[1] != self._data.shape[1]
+                    or data.dtype != self._data.dtype
+                ):
+                    if self._data is not None:
+                        # old rows are gone, cursors resync on next read
+                        self._heads.append(self._head)
+                        self._generation += 1
+                        self._head = 0
+                    self._alloc_locked(block, self._rows)
+                assert self._data is not None
+                # keep only what fits, older rows would be overwritten
+                skip = max(nrows - self._rows, 0)
+                self._head += skip
+                self._copy_locked(self._data, data[skip:])
+                if self._meta is not None:
+                    if block.meta is None:
+                        meta = np.zeros(
+                            (nrows - skip, self._meta.shape[1]),
+                            dtype=self._meta.dtype,
+                        )
+                    else:
+                        meta = block.meta.reshape(nrows, -1)[skip:]
+                    self._copy_locked(self._meta, meta)
+                self._head += nrows - skip
+            self.cond.notify_all()
+
+    @staticmethod
+    def _view(
+        arr: np.ndarray[Any, Any], start: int, end: int
+    ) -> np.ndarray[Any, Any]:
+        view = arr[start:end]
+        # the ring is shared by all readers
+        view.flags.writeable = False
+        return view
+
+    def views_locked(self, start: int, stop: int) -> list[DNxscopeStreamBlock]:
+        """Return zero-copy views for absolute rows ``[start, stop)``.
+
+        Views are read-only and are overwritten once the writer wraps
+        around the ring, ``rows`` rows later.
+        """
+        assert self._data is not None
+        ret: list[DNxscopeStreamBlock] = []
+        while start < stop:
+            idx = start % self._rows
+            end = min(idx + stop - start, self._rows)
+            meta = None
+            if self._meta is not None:
+                meta = self._view(self._meta, idx, end)
+            ret.append(
+                DNxscopeStreamBlock(
+                    data=self._view(self._data, idx, end), meta=meta
+                )
+            )
+            start += end - idx
+        return ret
+
+
+###############################################################################
+# Class: RingCursor
+###############################################################################
+
+
+class RingCursor(queue.Queue[list[DNxscopeStreamBlock]]):
+    """Per-subscriber read cursor over a shared ``StreamRing``.
+
+    Implements the ``queue.Queue`` consumer API so plugins can use it as a
+    regular stream queue, ``put()`` raises ``TypeError``. ``get()``
+    returns read-only zero-copy views into the ring which are
+    overwritten once the writer wraps over them, so consumers that keep
+    data longer than the next ring size rows must copy it. A reader that
+    falls more than the ring size behind is moved to the oldest
+    available row and the skipped rows are counted as overruns, the
+    same holds for unread rows lost by a ring reallocation.
+    """
+
+    def __init__(self, ring: StreamRing) -> None:
+        """Initialize cursor at current ring head.
+
+        :param ring: shared channel ring
+        """
+        super().__init__()
+        self._ring = ring
+        with ring.cond:
+            self._generation = ring.generation
+            self._pos = ring.head
+        self._stats = DStreamQueueStats()
+        self._closed = False
+
+    @property
+    def ring(self) -> StreamRing:
+        """Get shared ring."""
+        return self._ring
+
+    @property
+    def closed(self) -> bool:
+        """Return ``True`` if the subscriber was removed."""
+        return self._closed
+
+    def close(self) -> None:
+        """Mark cursor as closed."""
+        self._closed = True
+
+    def _sync_locked(self) -> None:
+        """Move to the current ring generation."""
+        generation = self._ring.generation
+        if self._generation == generation:
+            return
+        lost = self._ring.lost_locked(self._generation, self._pos)
+        if lost > 0:
+            self._stats.overflows += 1
+            self._stats.dropped_rows += lost
+        self._generation = generation
+        self._pos = 0
+
+    def stats(self) -> DStreamQueueStats:
+        """Return a snapshot of cursor counters."""
+        with self._ring.cond:
+            self._sync_locked()
+            return replace(self._stats)
+
+    def snapshot(self, channel: str) -> DSubscriberStats:
+        """Return subscriber stats snapshot.
+
+        :param channel: channel name reported in stats
+        """
+        with self._ring.cond:
+            self._sync_locked()
+            pending = self._ring.head - self._pos
+            return DSubscriberStats(
+                channel=channel,
+                policy=EOverflowPolicy.DROP_OLDEST,
+                depth_blocks=0,
+                depth_bytes=0,
+                stats=replace(self._stats),
+                pending_rows=pending,
+            )
+
+    def qsize(self) -> int:
+        """Return number of unread rows."""
+        with self._ring.cond:
+            self._sync_locked()
+            return self._ring.head - self._pos
+
+    def empty(self) -> bool:
+        """Return ``True`` if there are no unread rows."""
+        return self.qsize() == 0
+
+    def put(
+        self,
+        item: list[DNxscopeStreamBlock],
+        block: bool = True,
+        timeout: float | None = None,
+    ) -> None:
+        """Cursors are read-only, data is written through the ring.
+
+        :raises TypeError: always
+        """
+        raise TypeError("RingCursor is read-only, write to StreamRing")
+
+    def get(
+        self, block: bool = True, timeout: float | None = None
+    ) -> list[DNxscopeStreamBlock]:
+        """Return all unread rows as ring views.
+
+        :param block: wait for new rows
+        :param timeout: wait timeout
+        :raises queue.Empty: if there are no unread rows
+        """
+        ring = self._ring
+        with ring.cond:
+            if block:
+                ring.cond.wait_for(
+                    lambda: ring.generation != self._generation
+                    or ring.head > self._pos,
+                    timeout,
+                )
+            self._sync_locked()
+            head = ring.head
+            if head <= self._pos:
+                raise queue.Empty
+            lost = head - ring.rows - self._pos
+            if lost > 0:
+                self._stats.overflows += 1
+                self._stats.dropped_rows += lost
+                self._pos += lost
+            ret = ring.views_locked(self._pos, head)
+            self._stats.blocks += len(ret)
+            self._stats.rows += head - self._pos
+            self._pos = head
+        return ret
+
+    def get_nowait(self) -> list[DNxscopeStreamBlock]:
+        """Return unread rows without blocking."""
+        return self.get(block=False)
+
+
+###############################################################################
+# Class: _SourceForwarder
+###############################################################################
+
+
+class _SourceForwarder:
+    """Forward one upstream channel queue into the shared ready queue.
+
+    Each upstream channel gets its own blocking waiter, so a quiet channel
+    never delays delivery of data from busy channels.
+    """
+
+    def __init__(
+        self, chid: int, srcq: BlockQueue, readyq: "queue.Queue[ReadyItem]"
+    ) -> None:
+        """Initialize forwarder for one upstream queue."""
+        self._chid = chid
+        self._srcq = srcq
+        self._readyq = readyq
+        self._thread = ThreadCommon(
+            self._thread_common, name=f"streamhub{chid}"
+        )
+
+    @property
+    def srcq(self) -> BlockQueue:
+        """Get upstream queue."""
+        return self._srcq
+
+    def start(self) -> None:
+        """Start forwarder thread."""
+        self._thread.thread_start()
+
+    def stop(self) -> None:
+        """Stop forwarder thread."""
+        self._thread.thread_stop()
+
+    def _thread_common(self) -> None:
+        try:
+            blocks = self._srcq.get(block=True, timeout=0.05)
+        except queue.Empty:
+            return
+
+        if not blocks:
+            return
+
+        self._readyq.put((self._chid, blocks, perf_counter()))
+
+
+###############################################################################
+# Class: SharedStreamProvider
+###############################################################################
 
 
 class SharedStreamProvider:
     """Provide shared physical stream queues to many consumers."""
 
+    # maximum number of ready items merged in one dispatch pass
+    _DRAIN_MAX = 256
+
     def __init__(self) -> None:
         """Initialize provider state."""
         self._lock = Lock()
         self._nxscope: "NxscopeHandler | None" = None
         self._started = False
-        self._source_subs: dict[
-            int, queue.Queue[list["DNxscopeStreamBlock"]]
-        ] = {}
-        self._subscribers: dict[
-            int, list[queue.Queue[list["DNxscopeStreamBlock"]]]
-        ] = {}
+        self._source_subs: dict[int, _SourceForwarder] = {}
+        self._subscribers: dict[int, list[StreamQueue | RingCursor]] = {}
+        self._rings: dict[int, StreamRing] = {}
         self._queue_to_channel: dict[int, int] = {}
+        self._readyq: queue.Queue[ReadyItem] = queue.Queue()
         self._thread = ThreadCommon(self._thread_common, name="streamhub")
-        self._poll_idx = 0
+        self._metrics = metrics.stage("hub")
 
     def on_connect(self, nxscope: "NxscopeHandler") -> None:
         """Attach provider to active Nxscope handler."""
@@ -43,6 +423,7 @@ class SharedStreamProvider:
         with self._lock:
             self._nxscope = None
             self._subscribers = {}
+            self._rings = {}
             self._queue_to_channel = {}
 
     def on_stream_start(self) -> None:
@@ -65,10 +446,12 @@ class SharedStreamProvider:
             self._started = False
         self._thread.thread_stop()
         with self._lock:
-            if self._nxscope is not None:
-                for subq in self._source_subs.values():
-                    self._nxscope.stream_unsub(subq)
-            self._source_subs = {}
+            dropped = [
+                self._drop_source_sub_locked(chid)
+                for chid in list(self._source_subs)
+            ]
+            self._readyq = queue.Queue()
+        self._source_join(dropped)
 
     def channel_get(self, channel: "ChannelRef") -> "DeviceChannel | None":
         """Return physical channel metadata from Nxscope."""
@@ -84,24 +467,34 @@ class SharedStreamProvider:
         return ()
 
     def stream_sub(
-        self, channel: "ChannelRef"
-    ) -> "queue.Queue[list[DNxscopeStreamBlock]] | None":
-        """Subscribe to physical channel fan-out queue."""
+        self, channel: "ChannelRef", opts: "DStreamSubOpts | None" = None
+    ) -> StreamQueue | RingCursor | None:
+        """Subscribe to physical channel fan-out queue.
+
+        With ``opts.ring_rows > 0`` the subscriber gets a ``RingCursor``
+        over a channel ring shared with other ring subscribers.
+
+        :param channel: physical channel reference
+        :param opts: optional queue limits and overflow policy
+        """
         if not channel.is_physical:
             return None
         chid = channel.physical_id()
         with self._lock:
-            subq: queue.Queue[list["DNxscopeStreamBlock"]] = queue.Queue()
+            subq: StreamQueue | RingCursor
+            if opts is not None and opts.ring_rows > 0:
+                subq = RingCursor(self._ring_get_locked(chid, opts.ring_rows))
+            else:
+                subq = StreamQueue(opts)
             self._subscribers.setdefault(chid, []).append(subq)
             self._queue_to_channel[id(subq)] = chid
             if self._started:
                 self._ensure_source_sub_locked(chid)
             return subq
 
-    def stream_unsub(
-        self, subq: "queue.Queue[list[DNxscopeStreamBlock]]"
-    ) -> bool:
+    def stream_unsub(self, subq: "BlockQueue") -> bool:
         """Unsubscribe consumer queue from fan-out."""
+        dropped = None
         with self._lock:
             qid = id(subq)
             chid = self._queue_to_channel.get(qid)
@@ -111,40 +504,139 @@ class SharedStreamProvider:
             subs = self._subscribers.get(chid, [])
             if subq in subs:
                 subs.remove(subq)
+                subq.close()
+            if not any(isinstance(x, RingCursor) for x in subs):
+                self._rings.pop(chid, None)
             if not subs:
                 self._subscribers.pop(chid, None)
-                if self._nxscope is not None and chid in self._source_subs:
-                    self._nxscope.stream_unsub(self._source_subs[chid])
-                    self._source_subs.pop(chid, None)
-            return True
+                dropped = self._drop_source_sub_locked(chid)
+        self._source_join([dropped])
+        return True
+
+    def stream_stats(self) -> tuple["DSubscriberStats", ...]:
+        """Return counters for all subscriber queues."""
+        with self._lock:
+            return tuple(
+                subq.snapshot(str(chid))
+                for chid, subs in self._subscribers.items()
+                for subq in subs
+            )
+
+    def _ring_get_locked(self, chid: int, rows: int) -> StreamRing:
+        ring = self._rings.get(chid)
+        if ring is None:
+            ring = StreamRing(rows)
+            self._rings[chid] = ring
+        else:
+            ring.reserve(rows)
+        return ring
 
     def _ensure_source_sub_locked(self, chid: int) -> None:
         if self._nxscope is None:
             return
         if chid in self._source_subs:
             return
-        self._source_subs[chid] = self._nxscope.stream_sub(chid)
+        fwd = _SourceForwarder(
+            chid, self._nxscope.stream_sub(chid), self._readyq
+        )
+        self._source_subs[chid] = fwd
+        fwd.start()
+
+    def _drop_source_sub_locked(self, chid: int) -> "_SourceForwarder | None":
+        """Detach forwarder from upstream, the caller joins it.
+
+        The forwarder thread waits on its upstream queue with a timeout,
+        joining it under the hub lock would block all subscribers.
+        """
+        fwd = self._source_subs.pop(chid, None)
+        if fwd is None:
+            return None
+        if self._nxscope is not None:
+            self._nxscope.stream_unsub(fwd.srcq)
+        return fwd
+
+    @staticmethod
+    def _source_join(dropped: list["_SourceForwarder | None"]) -> None:
+        """Stop forwarders dropped under the hub lock."""
+        for fwd in dropped:
+            if fwd is not None:
+                fwd.stop()
+
+    def _ready_drain(
+        self, readyq: "queue.Queue[ReadyItem]", first: ReadyItem
+    ) -> dict[int, tuple[list[DNxscopeStreamBlock], float]]:
+        """Merge all pending ready items into one payload per channel.
+
+        The payload keeps the arrival stamp of its oldest item. ``readyq``
+        is the queue ``first`` came from, ``on_stream_stop`` may replace
+        the hub queue in the meantime.
+        """
+        ready: dict[int, tuple[list[DNxscopeStreamBlock], float]] = {}
+        chid, blocks, stamp = first
+        ready[chid] = (list(blocks), stamp)
+        depth = 1
+        for _ in range(self._DRAIN_MAX):
+            try:
+                chid, blocks, stamp = readyq.get_nowait()
+            except queue.Empty:
+                break
+            depth += 1
+            if chid in ready:
+                ready[chid][0].extend(blocks)
+            else:
+                ready[chid] = (list(blocks), stamp)
+        self._metrics.queue_depth(depth)
+        return ready
 
     def _thread_common(self) -> None:
         with self._lock:
             if not self._started:
                 return
             if not self._source_subs:
-                sleep(0.005)
-                return
-            items = list(self._source_subs.items())
-            idx = self._poll_idx % len(items)
-            self._poll_idx += 1
-            chid, srcq = items[idx]
-            dstq = list(self._subscribers.get(chid, []))
+                readyq = None
+            else:
+                readyq = self._readyq
+
+        if readyq is None:
+            sleep(0.005)
+            return
 
         try:
-            blocks = srcq.get(block=True, timeout=0.02)
+            first = readyq.get(block=True, timeout=0.02)
         except queue.Empty:
             return
 
-        if not blocks:
-            return
+        ready = self._ready_drain(readyq, first)
+
+        with self._lock:
+            dst = [
+                (
+                    self._rings.get(chid),
+                    [
+                        subq
+                        for subq in self._subscribers.get(chid, [])
+                        if isinstance(subq, StreamQueue)
+                    ],
+                    blocks,
+                    stamp,
+                )
+                for chid, (blocks, stamp) in ready.items()
+            ]
+
+        stage = self._metrics
+        for ring, dstq, blocks, stamp in dst:
+            start = perf_counter()
+            stage.data_in(blocks)
+            # one copy into the ring serves all ring subscribers
+            if ring is not None:
+                ring.write(blocks)
+                stage.data_out(blocks)
+            for subq in dstq:
+                subq.push(blocks, self._is_started, stamp)
+                stage.data_out(blocks)
+            now = perf_counter()
+            stage.handler_time(now - start)
+            stage.latency(now - stamp)
 
-        for subq in dstq:
-            subq.put(blocks)
+    def _is_started(self) -> bool:
+        return self._started
@@ -0,0 +1,519 @@
+"""Bounded subscriber queues used by stream providers."""
+
+import queue
+from collections import deque
+from dataclasses import dataclass, replace
+from enum import Enum
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING
+
+import numpy as np
+from nxslib.nxscope import DNxscopeStreamBlock
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+StreamBlocks = list[DNxscopeStreamBlock]
+
+###############################################################################
+# Enum: EOverflowPolicy
+###############################################################################
+
+
+class EOverflowPolicy(Enum):
+    """Subscriber queue overflow policies."""
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    COALESCE = "coalesce"
+
+
+###############################################################################
+# Data: DStreamSubOpts
+###############################################################################
+
+
+@dataclass(frozen=True)
+class DStreamSubOpts:
+    """Per-subscription stream queue options.
+
+    Limits equal to ``0`` are disabled. With no limits the queue is
+    unbounded which is the legacy behavior.
+
+    ``ring_rows > 0`` selects the shared ring backend of the physical
+    stream hub: the subscriber reads zero-copy views from a per-channel
+    ring of at least ``ring_rows`` samples instead of owning a queue.
+    Queue limits and policy are ignored in that case.
+
+    ``batch_rows`` and ``batch_latency`` enable micro-batching: incoming
+    payloads are merged into one batch that is delivered when it holds at
+    least ``batch_rows`` samples or when its oldest payload waited
+    ``batch_latency`` seconds. Row-only batching is bounded by
+    ``StreamQueue.BATCH_LATENCY``.
+
+    ``drain_rows`` and ``drain_bytes`` enable drain-and-merge reads on the
+    consumer side: ``PluginQueueData.queue_get()`` takes all pending
+    payloads until one of the caps is reached, merges them and runs the
+    trigger once for the whole read. A consumer that fell behind then
+    catches up in a few large reads. Providers ignore these fields.
+
+    The ``COALESCE`` policy merges payloads into the newest queued payload
+    up to ``drain_rows`` samples (``StreamQueue.COALESCE_ROWS`` if not
+    set), above that the oldest payload is dropped.
+    """
+
+    max_blocks: int = 0
+    max_bytes: int = 0
+    policy: EOverflowPolicy = EOverflowPolicy.BLOCK
+    ring_rows: int = 0
+    batch_rows: int = 0
+    batch_latency: float = 0.0
+    drain_rows: int = 0
+    drain_bytes: int = 0
+
+
+###############################################################################
+# Data: DStreamQueueStats
+###############################################################################
+
+
+@dataclass
+class DStreamQueueStats:
+    """Subscriber queue counters."""
+
+    blocks: int = 0
+    rows: int = 0
+    nbytes: int = 0
+    dropped_blocks: int = 0
+    dropped_rows: int = 0
+    overflows: int = 0
+    coalesced: int = 0
+    batches: int = 0
+    high_water_blocks: int = 0
+    high_water_bytes: int = 0
+
+
+###############################################################################
+# Data: DSubscriberStats
+###############################################################################
+
+
+@dataclass(frozen=True)
+class DSubscriberStats:
+    """Counters of one provider subscription."""
+
+    channel: str
+    policy: EOverflowPolicy
+    depth_blocks: int
+    depth_bytes: int
+    stats: DStreamQueueStats
+    pending_rows: int = 0
+
+
+###############################################################################
+# Function: payload_size
+###############################################################################
+
+
+def payload_size(payload: StreamBlocks) -> tuple[int, int, int]:
+    """Return ``(blocks, rows, bytes)`` of a block payload."""
+    rows = 0
+    nbytes = 0
+    for block in payload:
+        rows += int(block.data.shape[0])
+        nbytes += int(block.data.nbytes)
+        if block.meta is not None:
+            nbytes += int(block.meta.nbytes)
+    return len(payload), rows, nbytes
+
+
+###############################################################################
+# Function: merge_blocks
+###############################################################################
+
+
+def merge_blocks(payload: StreamBlocks) -> StreamBlocks:
+    """Merge consecutive blocks into one block when layouts match.
+
+    Blocks with different column counts, dtypes or metadata presence
+    cannot be stacked, in which case the payload is returned unchanged.
+    """
+    if len(payload) < 2:
+        return payload
+    first = payload[0]
+    has_meta = first.meta is not None
+    for block in payload[1:]:
+        if block.data.shape[1:] != first.data.shape[1:]:
+            return payload
+        if block.data.dtype != first.data.dtype:
+            return payload
+        if (block.meta is not None) != has_meta:
+            return payload
+        if has_meta:
+            assert block.meta is not None
+            assert first.meta is not None
+            if block.meta.shape[1:] != first.meta.shape[1:]:
+                return payload
+
+    data = np.concatenate([block.data for block in payload], axis=0)
+    meta = None
+    if has_meta:
+        meta = np.concatenate(
+            [block.meta for block in payload if block.meta is not None],
+            axis=0,
+        )
+    return [DNxscopeStreamBlock(data=data, meta=meta)]
+
+
+###############################################################################
+# Class: StreamQueue
+###############################################################################
+
+
+class StreamQueue(queue.Queue[StreamBlocks]):
+    """Subscriber queue with optional limits and overflow policy.
+
+    The queue keeps the standard ``queue.Queue`` consumer API so plugins
+    can use it without changes. Limits are applied on ``put()``.
+
+    Each payload carries a ``perf_counter()`` arrival stamp, the stamp of
+    the last payload returned by ``get()`` is available as
+    ``last_stamp`` for latency metrics.
+    """
+
+    # wait slice used by producers blocked on a full queue
+    BLOCK_SLICE = 0.1
+    # latency bound for batches limited only by row count
+    BATCH_LATENCY = 0.1
+    # coalesced payload size limit if drain_rows is not set
+    COALESCE_ROWS = 65536
+
+    def __init__(self, opts: DStreamSubOpts | None = None) -> None:
+        """Initialize subscriber queue.
+
+        :param opts: subscription options, ``None`` means unbounded
+        """
+        super().__init__()
+        self._opts = opts if opts is not None else DStreamSubOpts()
+        self._stats = DStreamQueueStats()
+        self._depth_blocks = 0
+        self._depth_bytes = 0
+        self._closed = False
+        self._stamps: deque[float] = deque()
+        self._last_stamp = 0.0
+        self._batch: StreamBlocks = []
+        self._batch_rows = 0
+        self._batch_t0 = 0.0
+        self._batch_stamp = 0.0
+        self._waker: "Callable[[], None] | None" = None
+        self._batching = self._opts.batch_rows > 0 or (
+            self._opts.batch_latency > 0
+        )
+        if self._opts.batch_latency > 0:
+            self._batch_latency = self._opts.batch_latency
+        else:
+            self._batch_latency = self.BATCH_LATENCY
+        self._coalesce_rows = self._opts.drain_rows or self.COALESCE_ROWS
+
+    @property
+    def opts(self) -> DStreamSubOpts:
+        """Get subscription options."""
+        return self._opts
+
+    @property
+    def closed(self) -> bool:
+        """Return ``True`` if the subscriber was removed."""
+        return self._closed
+
+    @property
+    def last_stamp(self) -> float:
+        """Get arrival stamp of the last payload returned by ``get()``."""
+        return self._last_stamp
+
+    def close(self) -> None:
+        """Mark queue as closed and wake blocked producers."""
+        with self.mutex:
+            self._closed = True
+            self.not_full.notify_all()
+            self._wake()
+
+    def set_waker(self, waker: "Callable[[], None] | None") -> None:
+        """Set callback invoked when the consumer should check the queue.
+
+        Used by consumers that wait outside of ``get()``, for example an
+        event loop. The callback is called from the producer thread with
+        the queue mutex held, so it must not block.
+
+        :param waker: callback or ``None`` to remove it
+        """
+        with self.mutex:
+            self._waker = waker
+
+    def _wake(self) -> None:
+        if self._waker is not None:
+            self._waker()
+
+    def batch_wait(self) -> float | None:
+        """Return time to pending batch deadline or ``None``."""
+        with self.mutex:
+            return self._batch_wait_locked()
+
+    def _batch_take_locked(self) -> tuple[StreamBlocks, float]:
+        batch = merge_blocks(self._batch)
+        self._batch = []
+        self._batch_rows = 0
+        self._stats.batches += 1
+        return batch, self._batch_stamp
+
+    def _batch_add(
+        self, item: StreamBlocks, stamp: float
+    ) -> tuple[StreamBlocks, float] | None:
+        """Add payload to pending batch, return batch if it is complete."""
+        _, rows, _ = payload_size(item)
+        with self.mutex:
+            if self._closed:
+                self._count_drop(item)
+                return None
+            if not self._batch:
+                self._batch_t0 = monotonic()
+                self._batch_stamp = stamp
+                # let a waiting consumer pick up the new batch deadline
+                self.not_empty.notify()
+                self._wake()
+            self._batch.extend(item)
+            self._batch_rows += rows
+            full = self._opts.batch_rows > 0 and (
+                self._batch_rows >= self._opts.batch_rows
+            )
+            expired = monotonic() - self._batch_t0 >= self._batch_latency
+            if not full and not expired:
+                return None
+            return self._batch_take_locked()
+
+    def _batch_wait_locked(self) -> float | None:
+        """Return time to pending batch deadline or ``None``."""
+        if not self._batch:
+            return None
+        return self._batch_t0 + self._batch_latency - monotonic()
+
+    def stats(self) -> DStreamQueueStats:
+        """Return a snapshot of queue counters."""
+        with self.mutex:
+            return replace(self._stats)
+
+    def depth(self) -> tuple[int, int]:
+        """Return current ``(blocks, bytes)`` held by the queue."""
+        with self.mutex:
+            return self._depth_blocks, self._depth_bytes
+
+    def snapshot(self, channel: str) -> DSubscriberStats:
+        """Return subscriber stats snapshot.
+
+        :param channel: channel name reported in stats
+        """
+        with self.mutex:
+            return DSubscriberStats(
+                channel=channel,
+                policy=self._opts.policy,
+                depth_blocks=self._depth_blocks,
+                depth_bytes=self._depth_bytes,
+                stats=replace(self._stats),
+                pending_rows=self._batch_rows,
+            )
+
+    def _is_over(self, blocks: int, nbytes: int) -> bool:
+        opts = self._opts
+        if opts.max_blocks > 0 and self._depth_blocks > 0:
+            if self._depth_blocks + blocks > opts.max_blocks:
+                return True
+        if opts.max_bytes > 0 and self._depth_bytes > 0:
+            if self._depth_bytes + nbytes > opts.max_bytes:
+                return True
+        return False
+
+    def _count_drop(self, payload: StreamBlocks) -> None:
+        blocks, rows, _ = payload_size(payload)
+        self._stats.dropped_blocks += blocks
+        self._stats.dropped_rows += rows
+
+    def _put(self, item: StreamBlocks, stamp: float | None = None) -> None:
+        blocks, rows, nbytes = payload_size(item)
+        self.queue.append(item)
+        self._stamps.append(perf_counter() if stamp is None else stamp)
+        self._depth_blocks += blocks
+        self._depth_bytes += nbytes
+        self._stats.blocks += blocks
+        self._stats.rows += rows
+        self._stats.nbytes += nbytes
+        if self._depth_blocks > self._stats.high_water_blocks:
+            self._stats.high_water_blocks = self._depth_blocks
+        if self._depth_bytes > self._stats.high_water_bytes:
+            self._stats.high_water_bytes = self._depth_bytes
+        self._wake()
+
+    def _get(self) -> StreamBlocks:
+        item: StreamBlocks = self.queue.popleft()
+        self._last_stamp = self._stamps.popleft()
+        blocks, _, nbytes = payload_size(item)
+        self._depth_blocks -= blocks
+        self._depth_bytes -= nbytes
+        return item
+
+    def _evict(self) -> None:
+        """Drop the oldest payload, it never gets a ``task_done()``."""
+        self._count_drop(self._get())
+        self.unfinished_tasks -= 1
+        if self.unfinished_tasks == 0:
+            self.all_tasks_done.notify_all()
+
+    def _drop_oldest(self, blocks: int, nbytes: int) -> None:
+        while self.queue and self._is_over(blocks, nbytes):
+            self._evict()
+
+    def _coalesce_fits(self, item: StreamBlocks) -> bool:
+        _, trows, _ = payload_size(self.queue[-1])
+        _, rows, _ = payload_size(item)
+        return trows + rows <= self._coalesce_rows
+
+    def _coalesce(self, item: StreamBlocks) -> None:
+        tail = self.queue.pop()
+        stamp = self._stamps.pop()
+        tblocks, _, tbytes = payload_size(tail)
+        self._depth_blocks -= tblocks
+        self._depth_bytes -= tbytes
+        merged = merge_blocks(tail + item)
+        mblocks, _, mbytes = payload_size(merged)
+        self.queue.append(merged)
+        self._stamps.append(stamp)
+        self._depth_blocks += mblocks
+        self._depth_bytes += mbytes
+        _, rows, nbytes = payload_size(item)
+        self._stats.rows += rows
+        self._stats.nbytes += nbytes
+        self._stats.coalesced += 1
+
+    def put(
+        self,
+        item: StreamBlocks,
+        block: bool = True,
+        timeout: float | None = None,
+        stamp: float | None = None,
+    ) -> None:
+        """Put payload into queue applying the overflow policy.
+
+        :param item: block payload
+        :param block: block if policy is ``BLOCK`` and queue is full
+        :param timeout: blocking timeout
+        :param stamp: arrival stamp, ``None`` means now
+        :raises queue.Full: if a blocking put timed out
+        """
+        if stamp is None:
+            stamp = perf_counter()
+        if self._batching:
+            batch = self._batch_add(item, stamp)
+            if batch is None:
+                return
+            item, stamp = batch
+        blocks, _, nbytes = payload_size(item)
+        with self.not_full:
+            if self._closed:
+                self._count_drop(item)
+                return
+            if not self._is_over(blocks, nbytes):
+                self._put(item, stamp)
+                self.unfinished_tasks += 1
+                self.not_empty.notify()
+                return
+
+            self._stats.overflows += 1
+            policy = self._opts.policy
+            if policy is EOverflowPolicy.DROP_NEWEST:
+                self._count_drop(item)
+                return
+            if policy is EOverflowPolicy.COALESCE and self._coalesce_fits(
+                item
+            ):
+                self._coalesce(item)
+                self.not_empty.notify()
+                return
+            if policy in (
+                EOverflowPolicy.DROP_OLDEST,
+                EOverflowPolicy.COALESCE,
+            ):
+                self._drop_oldest(blocks, nbytes)
+            else:
+                self._wait_room(blocks, nbytes, block, timeout)
+                if self._closed:
+                    self._count_drop(item)
+                    return
+
+            self._put(item, stamp)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def get(
+        self, block: bool = True, timeout: float | None = None
+    ) -> StreamBlocks:
+        """Get payload, delivering an expired pending batch if needed.
+
+        :param block: wait for data
+        :param timeout: wait timeout
+        :raises queue.Empty: if no data is available
+        """
+        if not self._batching:
+            return super().get(block, timeout)
+        deadline = None if timeout is None else monotonic() + timeout
+        with self.not_empty:
+            while True:
+                wait = self._batch_wait_locked()
+                if not self.queue and wait is not None and wait <= 0:
+                    self._put(*self._batch_take_locked())
+                    self.unfinished_tasks += 1
+                if self.queue:
+                    item = self._get()
+                    self.not_full.notify()
+                    return item
+                if not block:
+                    raise queue.Empty
+                if deadline is not None:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        raise queue.Empty
+                    if wait is None or remaining < wait:
+                        wait = remaining
+                self.not_empty.wait(wait)
+
+    def _wait_room(
+        self, blocks: int, nbytes: int, block: bool, timeout: float | None
+    ) -> None:
+        if not block:
+            raise queue.Full
+        ret = self.not_full.wait_for(
+            lambda: self._closed or not self._is_over(blocks, nbytes),
+            timeout,
+        )
+        if not ret:
+            raise queue.Full
+
+    def push(
+        self,
+        item: StreamBlocks,
+        alive: "Callable[[], bool]",
+        stamp: float | None = None,
+    ) -> None:
+        """Producer-side put that gives up when the producer stops.
+
+        :param item: block payload
+        :param alive: returns ``False`` when the producer is shutting down
+        :param stamp: arrival stamp, ``None`` means now
+        """
+        while True:
+            try:
+                self.put(item, timeout=self.BLOCK_SLICE, stamp=stamp)
+                return
+            except queue.Full:
+                if not alive():
+                    with self.mutex:
+                        self._count_drop(item)
+                    return
@@ -1,18 +1,23 @@
 """Module containing Nxscli stream data trigger logic."""
 
 import weakref
-from copy import deepcopy
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from enum import Enum
 from threading import Lock
+from time import perf_counter
 from typing import TYPE_CHECKING, Any
 
 import numpy as np
 from nxslib.nxscope import DNxscopeStreamBlock
 
 from nxscli.logger import logger
+from nxscli.metrics import metrics
+from nxscli.stream_hub import StreamRing
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
     from nxscli.channelref import ChannelRef
 
 ###############################################################################
@@ -29,6 +34,14 @@ class ETriggerType(Enum):
     EDGE_FALLING = 3
     WINDOW_ENTER = 4
     WINDOW_EXIT = 5
+    AND = 6
+    OR = 7
+    THEN = 8
+    PULSE_HIGH = 9
+    PULSE_LOW = 10
+    SLEW = 11
+    RUNT_HIGH = 12
+    RUNT_LOW = 13
 
 
 class ETriggerCaptureMode(Enum):
@@ -78,6 +91,9 @@ class DTriggerConfigReq:
     post_samples: int | None = None
     holdoff: int = 0
     rearm: bool = False
+    terms: list["DTriggerConfigReq"] | None = None
+    negate: bool = False
+    within: int = 0
 
 
 ###############################################################################
@@ -160,18 +176,94 @@ def trigger_from_req(req: DTriggerConfigReq) -> "DTriggerConfig":
             window_high=high,
             capture_mode=capture_mode,
         )
+    elif req.ttype in _REQ_BUILDERS:
+        dtc = _REQ_BUILDERS[req.ttype](req, srcchan, capture_mode)
     else:
         raise AssertionError
 
+    _options_from_req(dtc, req)
+    return dtc
+
+
+def _options_from_req(dtc: "DTriggerConfig", req: DTriggerConfigReq) -> None:
+    """Apply named trigger options from request."""
     if req.pre_samples is not None:
         dtc.pre_samples = req.pre_samples
     if req.post_samples is not None:
         dtc.post_samples = req.post_samples
     dtc.holdoff = req.holdoff
     dtc.rearm = req.rearm
+    dtc.negate = req.negate
+
+
+def _combo_from_req(
+    req: DTriggerConfigReq,
+    srcchan: int | None,
+    capture_mode: ETriggerCaptureMode,
+) -> "DTriggerConfig":
+    """Get trigger combination configuration from request."""
+    # terms are data triggers
+    assert req.terms
+    terms = [trigger_from_req(term) for term in req.terms]
+    assert all(term.ttype in _TERM_TYPES for term in terms)
+    assert req.ttype != "then" or len(terms) == 2
+    return DTriggerConfig(
+        ETriggerType[req.ttype.upper()],
+        srcchan,
+        req.vect,
+        capture_mode=capture_mode,
+        terms=terms,
+        within=req.within,
+    )
+
+
+def _shape_from_req(
+    req: DTriggerConfigReq,
+    srcchan: int | None,
+    capture_mode: ETriggerCaptureMode,
+) -> "DTriggerConfig":
+    """Get slew-rate, pulse-width or runt trigger configuration from request.
+
+    Parameters are ``[hoffset, limit]`` for slew rate,
+    ``[hoffset, level, width_min, width_max]`` for pulse width and
+    ``[hoffset, low, high]`` for runt triggers.
+    """
+    assert req.params
+    ttype = _SHAPE_REQ[req.ttype]
+    dtc = DTriggerConfig(
+        ttype,
+        srcchan,
+        req.vect,
+        int(req.params[0]),
+        capture_mode=capture_mode,
+    )
+    if ttype in (ETriggerType.RUNT_HIGH, ETriggerType.RUNT_LOW):
+        dtc.window_low = float(req.params[1])
+        dtc.window_high = float(req.params[2])
+        return dtc
+    dtc.level = float(req.params[1])
+    if ttype is not ETriggerType.SLEW:
+        dtc.width_min = int(req.params[2])
+        if len(req.params) > 3:
+            dtc.width_max = int(req.params[3])
     return dtc
 
 
+_SHAPE_REQ = {
+    "sr": ETriggerType.SLEW,
+    "ph": ETriggerType.PULSE_HIGH,
+    "pl": ETriggerType.PULSE_LOW,
+    "rh": ETriggerType.RUNT_HIGH,
+    "rl": ETriggerType.RUNT_LOW,
+}
+_REQ_BUILDERS = {
+    "and": _combo_from_req,
+    "or": _combo_from_req,
+    "then": _combo_from_req,
+}
+_REQ_BUILDERS.update({key: _shape_from_req for key in _SHAPE_REQ})
+
+
 ###############################################################################
 # Class: DTriggerConfig
 ###############################################################################
@@ -194,6 +286,13 @@ class DTriggerConfig:
     post_samples: int = 0
     holdoff: int = 0
     rearm: bool = False
+    # combination terms and THEN distance, term negation
+    terms: list["DTriggerConfig"] = field(default_factory=list)
+    within: int = 0
+    negate: bool = False
+    # pulse width limits in samples, 0 is no upper limit
+    width_min: int = 0
+    width_max: int = 0
 
     @property
     def effective_pre_samples(self) -> int:
@@ -203,6 +302,410 @@ class DTriggerConfig:
         return self.hoffset
 
 
+###############################################################################
+# Function: _edge_hits, _window_hits
+###############################################################################
+
+
+def _edge_hits(
+    vec: np.ndarray[Any, Any], level: float, rising: bool
+) -> np.ndarray[Any, Any]:
+    """Return indexes of samples that complete a level crossing."""
+    if vec.size < 2:
+        return np.empty((0,), dtype=np.int64)
+    if rising:
+        mask = (vec[:-1] <= level) & (vec[1:] > level)
+    else:
+        mask = (vec[:-1] >= level) & (vec[1:] < level)
+    return np.flatnonzero(mask) + 1
+
+
+def _window_hits(
+    vec: np.ndarray[Any, Any], low: float, high: float, enter: bool
+) -> np.ndarray[Any, Any]:
+    """Return indexes of samples that enter or exit a window."""
+    if vec.size < 2:
+        return np.empty((0,), dtype=np.int64)
+    inside = (vec >= low) & (vec <= high)
+    if enter:
+        mask = (~inside[:-1]) & inside[1:]
+    else:
+        mask = inside[:-1] & (~inside[1:])
+    return np.flatnonzero(mask) + 1
+
+
+def _column(data: np.ndarray[Any, Any], vect: int) -> np.ndarray[Any, Any]:
+    """Return a block column, numerical data keeps its native type."""
+    vec = data[:, vect]
+    if vec.dtype.kind in "biuf":
+        return vec
+    return np.asarray(vec, dtype=np.float64)
+
+
+def _slew_hits(
+    vec: np.ndarray[Any, Any], limit: float
+) -> np.ndarray[Any, Any]:
+    """Return indexes of samples that change by more than a limit."""
+    if vec.dtype.kind in "biu":
+        # integer differences wrap around
+        vec = vec.astype(np.float64)
+    return np.flatnonzero(np.abs(np.diff(vec)) > limit) + 1
+
+
+# start of a run that began before the known data
+_UNKNOWN = int(np.iinfo(np.int64).min)
+
+
+def _runs(
+    inside: np.ndarray[Any, Any], open_start: int | None
+) -> tuple[np.ndarray[Any, Any], np.ndarray[Any, Any], int | None]:
+    """Return runs of ``True`` samples completed in a vector.
+
+    A run open at sample 0 started at ``open_start``, runs with unknown
+    start are dropped. Return run starts, run ends (the first sample
+    after a run) and the start of a run still open at the vector end.
+    """
+    step = np.diff(inside.astype(np.int8))
+    starts = np.flatnonzero(step == 1) + 1
+    ends = np.flatnonzero(step == -1) + 1
+    if inside[0]:
+        first = _UNKNOWN if open_start is None else open_start
+        starts = np.concatenate(([first], starts))
+    last = None
+    if inside[-1] and starts[-1] != _UNKNOWN:
+        last = int(starts[-1])
+    starts = starts[: ends.size]
+    keep = starts != _UNKNOWN
+    return starts[keep], ends[keep], last
+
+
+def _pulse_hits(
+    vec: np.ndarray[Any, Any],
+    config: "DTriggerConfig",
+    prior: tuple[int, bool] | None,
+) -> tuple[np.ndarray[Any, Any], tuple[int, bool] | None]:
+    """Return ends of pulses with a matching width.
+
+    ``prior`` is a pulse open before ``vec`` as ``(start, False)``, the
+    pulse open at the end of ``vec`` is returned in the same form.
+    """
+    assert config.level is not None
+    if config.ttype is ETriggerType.PULSE_HIGH:
+        inside = vec > config.level
+    else:
+        inside = vec < config.level
+    starts, ends, last = _runs(inside, None if prior is None else prior[0])
+    width = ends - starts
+    ok = width >= config.width_min
+    if config.width_max > 0:
+        ok &= width <= config.width_max
+    return ends[ok], None if last is None else (last, False)
+
+
+def _runt_hits(
+    vec: np.ndarray[Any, Any],
+    config: "DTriggerConfig",
+    prior: tuple[int, bool] | None,
+) -> tuple[np.ndarray[Any, Any], tuple[int, bool] | None]:
+    """Return ends of runt pulses.
+
+    A runt pulse crosses the first threshold but not the second one
+    before it returns. ``prior`` is a pulse open before ``vec`` as
+    ``(start, reached)``, where sample 0 is already accounted for.
+    """
+    assert config.window_low is not None
+    assert config.window_high is not None
+    if config.ttype is ETriggerType.RUNT_HIGH:
+        inside = vec > config.window_low
+        beyond = vec > config.window_high
+    else:
+        inside = vec < config.window_high
+        beyond = vec < config.window_low
+    starts, ends, last = _runs(inside, None if prior is None else prior[0])
+    # samples beyond the second threshold, sample 0 is a run start or
+    # belongs to the prior pulse
+    beyond[:1] = False
+    count = np.cumsum(beyond)
+    begin = count[np.maximum(starts, 1) - 1]
+    reached = count[ends - 1] > begin
+    if prior is not None and prior[1]:
+        reached |= starts <= 0
+    if last is None:
+        return ends[~reached], None
+    touched = bool(count[-1] > count[max(last, 1) - 1])
+    if last <= 0 and prior is not None:
+        touched |= prior[1]
+    return ends[~reached], (last, touched)
+
+
+# trigger types that detect hits in sample data
+_EDGE_TYPES = (
+    ETriggerType.EDGE_RISING,
+    ETriggerType.EDGE_FALLING,
+    ETriggerType.WINDOW_ENTER,
+    ETriggerType.WINDOW_EXIT,
+)
+_EVENT_TYPES = _EDGE_TYPES + (ETriggerType.SLEW,)
+# whole pulse triggers, pulses can span payloads
+_RUN_TYPES = (
+    ETriggerType.PULSE_HIGH,
+    ETriggerType.PULSE_LOW,
+    ETriggerType.RUNT_HIGH,
+    ETriggerType.RUNT_LOW,
+)
+_TERM_TYPES = _EVENT_TYPES + _RUN_TYPES
+# combinations of data triggers
+_COMBO_TYPES = (ETriggerType.AND, ETriggerType.OR, ETriggerType.THEN)
+_HIT_TYPES = _TERM_TYPES + _COMBO_TYPES
+
+
+def _config_hits(
+    vec: np.ndarray[Any, Any], config: DTriggerConfig
+) -> np.ndarray[Any, Any]:
+    """Return indexes of all edge, window or slew trigger hits."""
+    if config.ttype is ETriggerType.SLEW:
+        assert config.level is not None
+        return _slew_hits(vec, config.level)
+    if config.ttype in (ETriggerType.EDGE_RISING, ETriggerType.EDGE_FALLING):
+        assert config.level is not None
+        return _edge_hits(
+            vec, config.level, config.ttype is ETriggerType.EDGE_RISING
+        )
+    assert config.window_low is not None
+    assert config.window_high is not None
+    return _window_hits(
+        vec,
+        config.window_low,
+        config.window_high,
+        config.ttype is ETriggerType.WINDOW_ENTER,
+    )
+
+
+def _detect_key(config: DTriggerConfig) -> tuple[Any, ...]:
+    """Return trigger config fields that affect hit detection."""
+    if config.ttype in _COMBO_TYPES:
+        terms = tuple(
+            _detect_key(term) + (term.negate,) for term in config.terms
+        )
+        return config.ttype, terms, config.within
+    return (
+        config.ttype,
+        config.vect,
+        config.level,
+        config.window_low,
+        config.window_high,
+        config.width_min,
+        config.width_max,
+    )
+
+
+###############################################################################
+# Class: TriggerDetector
+###############################################################################
+
+
+class TriggerDetector:
+    """Hit detection shared by triggers with the same channel and condition.
+
+    Edge, window and slew hits depend only on a sample and the sample
+    before it. The detector keeps the values and hits of the newest
+    samples of the channel by absolute stream position, so every sample
+    is evaluated once however subscribers batch or merge their blocks.
+    A request is served from this timeline when its samples and boundary
+    sample match the stored ones, only samples not seen yet are
+    evaluated. At least ``CACHE_ROWS`` samples are kept, a subscriber
+    that lags further behind evaluates its blocks again.
+    """
+
+    # samples kept for lagging subscribers, two file plugin drains
+    CACHE_ROWS = 1 << 17
+
+    def __init__(self, config: DTriggerConfig) -> None:
+        """Initialize a shared trigger detector.
+
+        :param config: trigger configuration with detection parameters
+        """
+        self._config = config
+        self._lock = Lock()
+        # timeline buffers, samples [_lo, _hi) are at _start and later
+        self._vals: np.ndarray[Any, Any] = np.empty(0)
+        self._mask: np.ndarray[Any, Any] = np.empty(0, dtype=bool)
+        self._lo = 0
+        self._hi = 0
+        self._start = 0
+        self.evaluated = 0
+        self.evaluated_rows = 0
+        self.reused = 0
+
+    def _eval(
+        self, bound: np.ndarray[Any, Any] | None, vec: np.ndarray[Any, Any]
+    ) -> np.ndarray[Any, Any]:
+        """Evaluate hits of ``vec`` after an optional boundary sample."""
+        self.evaluated += 1
+        self.evaluated_rows += vec.size
+        if bound is None:
+            return _config_hits(vec, self._config)
+        return _config_hits(np.concatenate((bound, vec)), self._config) - 1
+
+    def _reset_locked(
+        self,
+        start: int,
+        vals: np.ndarray[Any, Any],
+        mask: np.ndarray[Any, Any],
+    ) -> None:
+        """Replace the timeline with samples from ``start``."""
+        rows = self.CACHE_ROWS
+        if vals.size > rows:
+            start += vals.size - rows
+            vals = vals[-rows:]
+            mask = mask[-rows:]
+        if self._vals.dtype != vals.dtype or self._vals.size == 0:
+            self._vals = np.empty(2 * rows, dtype=vals.dtype)
+            self._mask = np.zeros(2 * rows, dtype=bool)
+        self._vals[: vals.size] = vals
+        self._mask[: vals.size] = mask
+        self._lo, self._hi, self._start = 0, vals.size, start
+
+    def _extend_locked(
+        self, vals: np.ndarray[Any, Any], mask: np.ndarray[Any, Any]
+    ) -> None:
+        """Append samples that follow the timeline."""
+        rows = self._hi - self._lo
+        num = vals.size
+        if num > self.CACHE_ROWS:
+            self._reset_locked(self._start + rows, vals, mask)
+            return
+        if self._hi + num > self._vals.size:
+            # move the newest samples to the buffer start
+            keep = min(self.CACHE_ROWS - num, rows)
+            self._vals[:keep] = self._vals[self._hi - keep : self._hi]
+            self._mask[:keep] = self._mask[self._hi - keep : self._hi]
+            self._start += rows - keep
+            self._lo, self._hi = 0, keep
+        self._vals[self._hi : self._hi + num] = vals
+        self._mask[self._hi : self._hi + num] = mask
+        self._hi += num
+
+    def hits(
+        self,
+        pos: int,
+        prev: np.ndarray[Any, Any] | None,
+        data: np.ndarray[Any, Any],
+    ) -> np.ndarray[Any, Any]:
+        """Return rows of ``data`` that complete a trigger condition.
+
+        :param pos: stream position of the first ``data`` row
+        :param prev: previous block data, its last row is the boundary
+        :param data: block data
+        """
+        vect = self._config.vect
+        vec = _column(data, vect)
+        bound = None if prev is None else _column(prev[-1:], vect)
+        # request window with the boundary sample
+        win = vec if bound is None else np.concatenate((bound, vec))
+        first = pos + vec.size - win.size
+        with self._lock:
+            end = self._start + self._hi - self._lo
+            # window samples already in the timeline
+            known = min(win.size, end - first)
+            at = self._lo + first - self._start
+            if (
+                self._vals.dtype != win.dtype
+                or not self._start <= first < end
+                or not np.array_equal(self._vals[at : at + known], win[:known])
+            ):
+                hits = self._eval(bound, vec)
+                if first + win.size > end:
+                    # newer samples replace the timeline
+                    mask = np.zeros(win.size, dtype=bool)
+                    mask[hits + win.size - vec.size] = True
+                    self._reset_locked(first, win, mask)
+                return hits
+
+            # hits are known for samples after the first one in the window
+            shift = first + 1 - pos
+            old = np.flatnonzero(self._mask[at + 1 : at + known]) + shift
+            if known == win.size:
+                self.reused += 1
+                return old
+            new = self._eval(win[known - 1 : known], win[known:])
+            mask = np.zeros(win.size - known, dtype=bool)
+            mask[new] = True
+            self._extend_locked(win[known:], mask)
+            return np.concatenate((old, new + first + known - pos))
+
+
+###############################################################################
+# Class: TriggerRegistry
+###############################################################################
+
+
+class TriggerRegistry:
+    """Weak set of trigger handlers indexed by channel.
+
+    Lookups by channel do not walk all registered handlers.
+    """
+
+    def __init__(self, key: "Callable[[TriggerHandler], int | None]") -> None:
+        """Initialize a trigger registry.
+
+        :param key: get the channel a handler is indexed by
+        """
+        self._key = key
+        self._index: dict[int | None, weakref.WeakSet[TriggerHandler]] = {}
+
+    def __len__(self) -> int:
+        """Get the number of registered handlers."""
+        return sum(len(x) for x in self._index.values())
+
+    def __iter__(self) -> "Iterator[TriggerHandler]":
+        """Iterate over a snapshot of registered handlers."""
+        for handlers in list(self._index.values()):
+            yield from list(handlers)
+
+    def __contains__(self, inst: "TriggerHandler") -> bool:
+        """Check if a handler is registered."""
+        handlers = self._index.get(self._key(inst))
+        return handlers is not None and inst in handlers
+
+    def add(self, inst: "TriggerHandler") -> None:
+        """Register a handler.
+
+        :param inst: trigger handler
+        """
+        key = self._key(inst)
+        if key not in self._index:
+            self._index[key] = weakref.WeakSet()
+        self._index[key].add(inst)
+
+    def remove(self, inst: "TriggerHandler") -> None:
+        """Unregister a handler.
+
+        :param inst: trigger handler
+        """
+        self._index[self._key(inst)].remove(inst)
+
+    def clear(self) -> None:
+        """Unregister all handlers."""
+        self._index.clear()
+
+    def channel(self, chan: int) -> list["TriggerHandler"]:
+        """Get handlers registered for a channel.
+
+        :param chan: channel id
+        """
+        handlers = self._index.get(chan)
+        return [] if handlers is None else list(handlers)
+
+    def first(self, chan: int) -> "TriggerHandler | None":
+        """Get the first available handler for a channel.
+
+        :param chan: channel id
+        """
+        handlers = self._index.get(chan)
+        return None if handlers is None else next(iter(handlers), None)
+
+
 ###############################################################################
 # Class: TriggerHandler
 ###############################################################################
@@ -211,12 +714,24 @@ class DTriggerConfig:
 class TriggerHandler(object):
     """The class used to handler stream data trigger."""
 
-    _instances: weakref.WeakSet["TriggerHandler"] = weakref.WeakSet()
-    _wait_for_src: weakref.WeakSet["TriggerHandler"] = weakref.WeakSet()
+    # all handlers by channel, and handlers waiting for a source channel
+    _instances = TriggerRegistry(lambda x: x._chan)
+    _wait_for_src = TriggerRegistry(lambda x: x.config.srcchan)
+    # shared by all trigger handlers
+    _metrics = metrics.stage("trigger")
+    # shared detection stage keyed by channel and detection parameters
+    _detectors: "weakref.WeakValueDictionary[Any, TriggerDetector]" = (
+        weakref.WeakValueDictionary()
+    )
+    _detectors_lock = Lock()
+    # evaluate identical triggers once for all handlers
+    SHARED_DETECTION = True
 
     def __new__(cls, chan: int, config: DTriggerConfig) -> "TriggerHandler":
         """Create a new instance and store reference in a weak set."""
         instance = object.__new__(cls)
+        # channel is needed to index the instance
+        object.__setattr__(instance, "_chan", chan)
         cls._instances.add(instance)
         # create additional flag that helps during instance cleanup
         object.__setattr__(instance, "_initdone", False)
@@ -230,7 +745,39 @@ class TriggerHandler(object):
         self._trigger: DTriggerState = DTriggerState(False, 0)
         self._triger_done = False
         self._post_remaining = 0
-        self._last_event: DTriggerEvent | None = None
+        self._events: list[DTriggerEvent] = []
+
+        # block stream pre-trigger history, used by start-after mode
+        self._blockmode = False
+        self._hist: StreamRing | None = None
+        self._hist_layout: tuple[Any, ...] | None = None
+        self._hist_rows = 0
+        self._last: list[Any] = []
+        self._carry: DNxscopeStreamBlock | None = None
+        # block data the boundary sample comes from
+        self._carry_src: np.ndarray[Any, Any] | None = None
+        # shared detectors used by this handler, keyed by config
+        self._detect: dict[tuple[Any, ...], TriggerDetector] = {}
+        # absolute position of the next block stream sample
+        self._abs = 0
+
+        # rearmed sequence capture, positions are absolute samples
+        self._rearm = (
+            config.rearm
+            and config.capture_mode is ETriggerCaptureMode.START_AFTER
+            and config.ttype in _HIT_TYPES
+        )
+        self._next_arm = 0
+        self._cross_hits: deque[int] = deque()
+        self._seg: list[DNxscopeStreamBlock] = []
+        self._seg_pos = (0, 0, 0)
+        # THEN and pulse trigger state kept between payloads:
+        # (window end, state after the window, state before the window)
+        self._stream_state: dict[tuple[Any, ...], tuple[int, Any, Any]] = {}
+
+        # cross trigger snapshot (state, source frame idx, absolute sample),
+        # replaced by the source and never modified
+        self._cross_state: tuple[bool, int, int | None] = (False, 0, None)
 
         # trigger source channel reference
         self._src: "TriggerHandler" | None = None  # noqa: TC010
@@ -244,9 +791,6 @@ class TriggerHandler(object):
         # check pending cross channels
         self._pending_crosschan()
 
-        # cross trigger status protected with lock
-        self._lock = Lock()
-        self._cross_trigger: DTriggerState = DTriggerState(False, 0)
         self._initdone = True
 
     def __del__(self) -> None:
@@ -258,10 +802,7 @@ class TriggerHandler(object):
         src = None
         if self._config.srcchan is not None:
             # get the first available trigger related to srcchan
-            for x in TriggerHandler._instances:
-                if x.chan == self._config.srcchan:
-                    src = x
-                    break
+            src = TriggerHandler._instances.first(self._config.srcchan)
 
             if not src:
                 # not found source channel
@@ -278,13 +819,11 @@ class TriggerHandler(object):
     def _pending_crosschan(self) -> None:
         # check if any instance wait for us
         # NOTE: there can be many waiting instances
-        tmp = []
-        for inst in TriggerHandler._wait_for_src:
-            if inst.config.srcchan == self.chan:
-                # subscribe us and set source
-                self.subscribe_cross(inst)
-                inst.source_set(self)
-                tmp.append(inst)
+        tmp = TriggerHandler._wait_for_src.channel(self.chan)
+        for inst in tmp:
+            # subscribe us and set source
+            self.subscribe_cross(inst)
+            inst.source_set(self)
         # remove all handled instnaces from set
         for inst in tmp:
             TriggerHandler._wait_for_src.remove(inst)
@@ -310,11 +849,7 @@ class TriggerHandler(object):
         if self._is_block_payload(combined):
             parts: list[np.ndarray[Any, Any]] = []
             for block in combined:
-                parts.append(
-                    np.asarray(block.data[:, vect], dtype=np.float64).reshape(
-                        -1
-                    )
-                )
+                parts.append(_column(block.data, vect))
             if not parts:  # pragma: no cover
                 return np.empty((0,), dtype=np.float64)
             if len(parts) == 1:
@@ -330,51 +865,221 @@ class TriggerHandler(object):
     def _combined_vector(self, combined: list[Any], vect: int) -> list[float]:
         return [float(v) for v in self._combined_vector_np(combined, vect)]
 
+    @staticmethod
+    def _first_hit(hits: np.ndarray[Any, Any]) -> DTriggerState:
+        if hits.size > 0:
+            return DTriggerState(True, int(hits[0]))
+        return DTriggerState(False, 0)
+
     def _edgerising(
         self, combined: list[Any], vect: int, level: float
     ) -> DTriggerState:
         vec = self._combined_vector_np(combined, vect)
-        if vec.size < 2:
-            return DTriggerState(False, 0)
-        hits = np.flatnonzero((vec[:-1] <= level) & (vec[1:] > level))
-        if hits.size > 0:
-            return DTriggerState(True, int(hits[0] + 1))
-        return DTriggerState(False, 0)
+        return self._first_hit(_edge_hits(vec, level, True))
 
     def _edgefalling(
         self, combined: list[Any], vect: int, level: float
     ) -> DTriggerState:
         vec = self._combined_vector_np(combined, vect)
-        if vec.size < 2:
-            return DTriggerState(False, 0)
-        hits = np.flatnonzero((vec[:-1] >= level) & (vec[1:] < level))
-        if hits.size > 0:
-            return DTriggerState(True, int(hits[0] + 1))
-        return DTriggerState(False, 0)
+        return self._first_hit(_edge_hits(vec, level, False))
 
     def _windowenter(
         self, combined: list[Any], vect: int, low: float, high: float
     ) -> DTriggerState:
         vec = self._combined_vector_np(combined, vect)
-        if vec.size < 2:
-            return DTriggerState(False, 0)
-        inside = (vec >= low) & (vec <= high)
-        hits = np.flatnonzero((~inside[:-1]) & inside[1:])
-        if hits.size > 0:
-            return DTriggerState(True, int(hits[0] + 1))
-        return DTriggerState(False, 0)
+        return self._first_hit(_window_hits(vec, low, high, True))
 
     def _windowexit(
         self, combined: list[Any], vect: int, low: float, high: float
     ) -> DTriggerState:
         vec = self._combined_vector_np(combined, vect)
-        if vec.size < 2:
-            return DTriggerState(False, 0)
-        inside = (vec >= low) & (vec <= high)
-        hits = np.flatnonzero(inside[:-1] & (~inside[1:]))
-        if hits.size > 0:
-            return DTriggerState(True, int(hits[0] + 1))
-        return DTriggerState(False, 0)
+        return self._first_hit(_window_hits(vec, low, high, False))
+
+    def _self_hits(
+        self, combined: list[Any], config: DTriggerConfig
+    ) -> np.ndarray[Any, Any]:
+        """Return payload indexes of all edge or window trigger hits."""
+        vec = self._combined_vector_np(combined, config.vect)
+        return _config_hits(vec, config)
+
+    def _detector(self, config: DTriggerConfig) -> TriggerDetector:
+        """Get the shared detector of this channel and trigger condition."""
+        key = _detect_key(config)
+        detector = self._detect.get(key)
+        if detector is None:
+            with TriggerHandler._detectors_lock:
+                detector = TriggerHandler._detectors.get((self._chan, key))
+                if detector is None:
+                    detector = TriggerDetector(config)
+                    TriggerHandler._detectors[(self._chan, key)] = detector
+            # keep the detector alive while this handler uses it
+            self._detect[key] = detector
+        return detector
+
+    def _shared_hits(
+        self, data: list[Any], config: DTriggerConfig
+    ) -> np.ndarray[Any, Any]:
+        """Return all hits in the ``[carry] + data`` detection window.
+
+        Hits are taken from the shared detector by stream position, so
+        handlers with the same condition on the same stream compute them
+        only once.
+        """
+        if not TriggerHandler.SHARED_DETECTION:
+            window = data if self._carry is None else [self._carry] + data
+            return self._self_hits(window, config)
+        detector = self._detector(config)
+        prev = self._carry_src
+        base = 0 if prev is None else 1
+        pos = self._abs
+        parts = []
+        for block in data:
+            rows = int(block.data.shape[0])
+            if rows == 0:
+                continue
+            hits = detector.hits(pos, prev, block.data)
+            if hits.size > 0:
+                parts.append(hits + base)
+            base += rows
+            pos += rows
+            prev = block.data
+        if not parts:
+            return np.empty((0,), dtype=np.int64)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def _window_hits(
+        self,
+        window: list[Any],
+        data: list[Any] | None,
+        config: DTriggerConfig,
+        abs0: int | None = None,
+    ) -> np.ndarray[Any, Any]:
+        """Get all hits of a condition, shared for block stream windows."""
+        if config.ttype in _COMBO_TYPES:
+            return self._combo_hits(window, data, config, abs0)
+        if config.ttype in _RUN_TYPES:
+            return self._run_hits(window, config, abs0)
+        if data is None:
+            return self._self_hits(window, config)
+        return self._shared_hits(data, config)
+
+    def _window_trigger(
+        self,
+        window: list[Any],
+        data: list[Any] | None,
+        config: DTriggerConfig,
+        abs0: int | None = None,
+    ) -> DTriggerState:
+        """Check a trigger condition, shared for block stream windows."""
+        if config.ttype not in _HIT_TYPES or (
+            data is None and config.ttype in _EDGE_TYPES
+        ):
+            return self._is_self_trigger(window, config)
+        return self._first_hit(self._window_hits(window, data, config, abs0))
+
+    def _term_hits(
+        self,
+        window: list[Any],
+        data: list[Any] | None,
+        term: DTriggerConfig,
+        abs0: int | None,
+        size: int,
+    ) -> np.ndarray[Any, Any]:
+        """Get hits of a combination term, negated terms use a mask."""
+        hits = self._window_hits(window, data, term, abs0)
+        if not term.negate:
+            return hits
+        mask = np.ones(size, dtype=bool)
+        mask[hits] = False
+        # the first sample has no boundary in this window
+        mask[:1] = False
+        return np.flatnonzero(mask)
+
+    def _combo_hits(
+        self,
+        window: list[Any],
+        data: list[Any] | None,
+        config: DTriggerConfig,
+        abs0: int | None,
+    ) -> np.ndarray[Any, Any]:
+        """Return hits of a trigger combination in the window frame.
+
+        Terms are combined as boolean masks over the window. For
+        ``THEN`` the last hit of the first term is kept between payloads
+        when absolute sample positions are known.
+        """
+        size = self._sample_count(window)
+        terms = [
+            self._term_hits(window, data, term, abs0, size)
+            for term in config.terms
+        ]
+        if config.ttype is not ETriggerType.THEN:
+            mask = np.zeros(size, dtype=bool)
+            if config.ttype is ETriggerType.OR:
+                for hits in terms:
+                    mask[hits] = True
+                return np.flatnonzero(mask)
+            count = np.zeros(size, dtype=np.int64)
+            for hits in terms:
+                count[hits] += 1
+            return np.flatnonzero(count == len(terms))
+
+        first, second = terms
+        prior = None
+        if abs0 is not None:
+            prior = self._state_prior(config, abs0 + size)
+            if prior is not None:
+                first = np.concatenate(([prior - abs0], first))
+        # the latest first term hit at or before each second term hit
+        idx = np.searchsorted(first, second, side="right") - 1
+        ok = idx >= 0
+        ok[ok] = second[ok] - first[idx[ok]] <= config.within
+        if abs0 is not None:
+            last = prior if first.size == 0 else int(first[-1]) + abs0
+            self._state_set(config, abs0 + size, last, prior)
+        return second[ok]
+
+    def _run_hits(
+        self, window: list[Any], config: DTriggerConfig, abs0: int | None
+    ) -> np.ndarray[Any, Any]:
+        """Return pulse-width or runt trigger hits in the window frame.
+
+        A hit is the first sample after a matching pulse. A pulse still
+        open at the window end is kept in absolute samples, so pulses can
+        span payloads. Without absolute positions only pulses that start
+        in the window are found.
+        """
+        vec = self._combined_vector_np(window, config.vect)
+        if vec.size == 0:
+            return np.empty((0,), dtype=np.int64)
+        prior = None
+        if abs0 is not None:
+            prior = self._state_prior(config, abs0 + vec.size)
+        local = None if prior is None else (prior[0] - abs0, prior[1])
+        if config.ttype in (ETriggerType.PULSE_HIGH, ETriggerType.PULSE_LOW):
+            hits, last = _pulse_hits(vec, config, local)
+        else:
+            hits, last = _runt_hits(vec, config, local)
+        if abs0 is not None:
+            state = None if last is None else (last[0] + abs0, last[1])
+            self._state_set(config, abs0 + vec.size, state, prior)
+        return hits
+
+    def _state_prior(self, config: DTriggerConfig, end: int) -> Any:
+        """Get the stream state before a window ending at ``end``.
+
+        The same window can be evaluated again for an identical cross
+        condition, it then uses the state from before that window.
+        """
+        state = self._stream_state.get(_detect_key(config))
+        if state is None:
+            return None
+        return state[2] if state[0] == end else state[1]
+
+    def _state_set(
+        self, config: DTriggerConfig, end: int, state: Any, prior: Any
+    ) -> None:
+        self._stream_state[_detect_key(config)] = (end, state, prior)
 
     def _is_self_trigger(
         self, combined: list[Any], config: DTriggerConfig
@@ -410,7 +1115,9 @@ class TriggerHandler(object):
         else:
             raise AssertionError
 
-    def _is_triggered(self, combined: list[Any]) -> DTriggerState:
+    def _is_triggered(
+        self, combined: list[Any], frame: tuple[int, int] | None = None
+    ) -> DTriggerState:
         if self._trigger.state:
             # make sure that idx is 0
             return DTriggerState(True, 0)
@@ -420,27 +1127,78 @@ class TriggerHandler(object):
             # source must be connected
             if not self._src_configured:
                 raise AssertionError
+            if frame is not None:
+                return self._cross_check(*frame)
             return self.cross_trigger
 
         # self-triggered
-        return self._is_self_trigger(combined, self._config)
-
-    def _cross_channel_handle(self, combined: list[Any]) -> None:
+        abs0 = None if frame is None else frame[0]
+        return self._window_trigger(combined, None, self._config, abs0)
+
+    def _cross_channel_handle(
+        self,
+        combined: list[Any],
+        offset: int = 0,
+        abs0: int | None = None,
+        data: list[Any] | None = None,
+    ) -> None:
+        """Signal cross-channel triggers connected to this source.
+
+        ``data`` is the block payload of a ``[carry] + data`` window,
+        hits are then taken from the shared detection stage. ``abs0`` is
+        the absolute sample position of the window start. Identical
+        cross conditions are evaluated once per window.
+        """
+        found: dict[tuple[Any, ...], Any] = {}
         for cross in self._cross:
-            if cross.cross_trigger.state is True:
+            key = (cross._rearm, _detect_key(cross.config))
+            if cross._rearm:
+                # rearmed handlers get all hits as absolute positions
+                if abs0 is not None:
+                    if key not in found:
+                        found[key] = self._window_hits(
+                            combined, data, cross.config, abs0
+                        )
+                    if found[key].size > 0:
+                        cross.cross_hits_add(found[key] + abs0)
+                continue
+            if cross._cross_state[0]:
                 continue
             # check cross channel requirements for trigger
-            trigger = self._is_self_trigger(combined, cross.config)
+            if key not in found:
+                found[key] = self._window_trigger(
+                    combined, data, cross.config, abs0
+                )
+            trigger = found[key]
             # signal if triggered
             if trigger.state is True:
-                cross.cross_trigger = trigger
+                cross._cross_state = (
+                    True,
+                    trigger.idx + offset,
+                    None if abs0 is None else abs0 + trigger.idx,
+                )
+
+    def _cross_check(self, frame0: int, end: int) -> DTriggerState:
+        """Map the source trigger to the ``[frame0, end)`` sample frame.
+
+        A trigger with an absolute position is aligned to the same
+        sample of this channel. If the source is ahead, the trigger waits
+        until this channel receives the matching sample.
+        """
+        state, idx, pos = self._cross_state
+        if not state:
+            return DTriggerState(False, 0)
+        if pos is None:
+            return DTriggerState(True, idx)
+        if pos >= end:
+            return DTriggerState(False, 0)
+        return DTriggerState(True, max(pos - frame0, 0))
 
     @property
     def cross_trigger(self) -> DTriggerState:
         """Get cross tirgger state."""
-        with self._lock:
-            ret = deepcopy(self._cross_trigger)
-        return ret
+        state, idx, _ = self._cross_state
+        return DTriggerState(state, idx)
 
     @cross_trigger.setter
     def cross_trigger(self, val: DTriggerState) -> None:
@@ -448,8 +1206,25 @@ class TriggerHandler(object):
 
         :param val: cross triger state
         """
-        with self._lock:
-            self._cross_trigger = val
+        # single reference swap, readers never see a partial update
+        self._cross_state = (val.state, val.idx, None)
+
+    def cross_hits_add(self, hits: np.ndarray[Any, Any]) -> None:
+        """Add absolute sample positions of source trigger hits.
+
+        :param hits: sorted absolute positions in the source stream
+        """
+        # deque operations are atomic, the source and the consumer
+        # do not need a lock
+        self._cross_hits.extend(hits.tolist())
+
+    def _cross_hits_pop(self, end: int) -> np.ndarray[Any, Any]:
+        """Return source hits before ``end``, keep the later ones."""
+        ret = []
+        hits = self._cross_hits
+        while hits and hits[0] < end:
+            ret.append(hits.popleft())
+        return np.asarray(ret, dtype=np.int64)
 
     @property
     def chan(self) -> int:
@@ -461,19 +1236,30 @@ class TriggerHandler(object):
         """Get trigger configuration."""
         return self._config
 
+    def _event_add(self, sample_index: float) -> None:
+        self._events.append(
+            DTriggerEvent(
+                sample_index=sample_index,
+                channel=self._chan,
+                capture_mode=self._config.capture_mode,
+            )
+        )
+
     def pop_trigger_event(self) -> DTriggerEvent | None:
-        """Return and clear the last emitted trigger event."""
-        event = self._last_event
-        self._last_event = None
-        return event
+        """Return the first emitted trigger event and clear all events."""
+        events = self.pop_trigger_events()
+        return events[0] if events else None
+
+    def pop_trigger_events(self) -> list[DTriggerEvent]:
+        """Return and clear all trigger events of the last payload."""
+        events = self._events
+        self._events = []
+        return events
 
     @classmethod
     def find_by_channel(cls, chan: int) -> "TriggerHandler | None":
         """Return registered trigger handler for one channel if present."""
-        for inst in cls._instances:
-            if inst.chan == chan:
-                return inst
-        return None
+        return cls._instances.first(chan)
 
     @classmethod
     def cls_cleanup(cls: type["TriggerHandler"]) -> None:
@@ -482,6 +1268,9 @@ class TriggerHandler(object):
             x.cleanup(remove_self=False)
         # clear set
         cls._instances.clear()
+        # handlers created later do not share detection with old ones
+        with cls._detectors_lock:
+            cls._detectors.clear()
 
     def cleanup(self, remove_self: bool = True) -> None:
         """Clean up instance."""
@@ -543,17 +1332,6 @@ class TriggerHandler(object):
             offset = 0
         return ret
 
-    def _cache_tail(self, combined: list[Any], hoffset: int) -> list[Any]:
-        if hoffset <= 0:
-            return combined
-        if not combined:
-            return []
-        if not self._is_block_payload(combined):
-            return combined[-hoffset:]
-        total = sum(int(block.data.shape[0]) for block in combined)
-        start = max(total - hoffset, 0)
-        return self._slice_from(combined, start)
-
     def _sample_count(self, combined: list[Any]) -> int:
         """Return number of samples in combined payload."""
         if not combined:
@@ -607,10 +1385,211 @@ class TriggerHandler(object):
         start = max(total - count, 0)
         return self._slice_range(combined, start, total)
 
+    @staticmethod
+    def _block_layout(block: DNxscopeStreamBlock) -> tuple[Any, ...]:
+        meta = None if block.meta is None else block.meta.shape[1:]
+        return block.data.dtype, block.data.shape[1:], meta
+
+    def _history(self) -> list[Any]:
+        """Return pre-trigger history blocks without copying."""
+        if self._hist is None:
+            return self._last
+        head = self._hist.head
+        with self._hist.cond:
+            return self._hist.views_locked(head - self._hist_rows, head)
+
+    def _history_add(self, data: list[Any], pre_samples: int) -> None:
+        """Keep the newest ``pre_samples`` rows and a boundary sample."""
+        blocks = [block for block in data if block.data.shape[0] > 0]
+        if not blocks:
+            return
+        self._carry = DNxscopeStreamBlock(
+            data=blocks[-1].data[-1:],
+            meta=None if blocks[-1].meta is None else blocks[-1].meta[-1:],
+        )
+        self._carry_src = blocks[-1].data
+        if pre_samples <= 0:
+            # history is the last payload, kept only as a reference
+            self._last = data
+            self._hist_rows = self._sample_count(data)
+            return
+        for block in blocks:
+            layout = self._block_layout(block)
+            if self._hist is None or layout != self._hist_layout:
+                # new ring, history with other layout is dropped
+                self._hist = StreamRing(pre_samples)
+                self._hist_layout = layout
+                self._hist_rows = 0
+            self._hist.write([block])
+            self._hist_rows = min(
+                self._hist_rows + int(block.data.shape[0]), pre_samples
+            )
+
+    def _history_reset(self) -> None:
+        # ring views may be returned to consumers, never write them again
+        self._hist = None
+        self._hist_layout = None
+        self._hist_rows = 0
+        self._last = []
+        self._carry = None
+        self._carry_src = None
+
+    def _data_triggered_start_after_blocks(self, data: list[Any]) -> list[Any]:
+        """Start-after-trigger for block payloads.
+
+        Detection scans only new samples with one boundary sample from the
+        previous payload. Pre-trigger history is kept in a preallocated
+        ring, so the cost per payload does not depend on its length.
+        Trigger indexes use the ``history + data`` frame.
+        """
+        self._events = []
+        window = data if self._carry is None else [self._carry] + data
+        # offset of the detection window in the history + data frame
+        offset = self._hist_rows - (0 if self._carry is None else 1)
+
+        triggered = self._trigger.state
+        if triggered or self._config.srcchan is not None:
+            frame0 = self._abs - self._hist_rows
+            end = self._abs + self._sample_count(data)
+            self._trigger = self._is_triggered(window, (frame0, end))
+        else:
+            self._trigger = self._window_trigger(
+                window,
+                data,
+                self._config,
+                self._abs - (0 if self._carry is None else 1),
+            )
+            if self._trigger.state:
+                self._trigger.idx += offset
+
+        # check all cross-channel triggers
+        self._cross_channel_handle(
+            window,
+            offset,
+            self._abs - (0 if self._carry is None else 1),
+            data,
+        )
+
+        pre_samples = self._config.effective_pre_samples
+
+        if not self._trigger.state:
+            if self._config.ttype is ETriggerType.ALWAYS_OFF:
+                # never captures, keep only the boundary sample
+                pre_samples = 0
+            self._history_add(data, pre_samples)
+            return []
+
+        hoffset = 0
+        if not self._triger_done:
+            hoffset = pre_samples
+            self._triger_done = True
+
+        start_idx = self._trigger.idx - hoffset
+        ret = self._slice_from(self._history() + data, start_idx)
+        if not triggered and self._should_emit_event():
+            self._event_add(float(self._trigger.idx - max(start_idx, 0)))
+        self._history_reset()
+        return ret
+
+    @staticmethod
+    def _blocks_copy(blocks: list[Any]) -> DNxscopeStreamBlock:
+        """Copy blocks into one block."""
+        metas = [block.meta for block in blocks]
+        meta = None
+        if all(m is not None for m in metas):
+            meta = np.concatenate(metas)
+        return DNxscopeStreamBlock(
+            data=np.concatenate([block.data for block in blocks]), meta=meta
+        )
+
+    def _sequence_accept(self, hits: np.ndarray[Any, Any]) -> list[int]:
+        """Filter sorted hits by rearm position and holdoff."""
+        gap = max(self._config.holdoff, self._config.post_samples + 1)
+        ret: list[int] = []
+        i = int(np.searchsorted(hits, self._next_arm))
+        while i < hits.size:
+            pos = int(hits[i])
+            ret.append(pos)
+            self._next_arm = pos + gap
+            i += int(np.searchsorted(hits[i:], self._next_arm))
+        return ret
+
+    def _segment_fill(
+        self, frame: list[Any], frame0: int, end: int, ret: list[Any]
+    ) -> None:
+        """Copy available rows of the pending segment from the frame.
+
+        ``_seg_pos`` holds the next absolute row to copy, the trigger
+        offset in the segment and the absolute end of the segment.
+        """
+        start, trig, stop = self._seg_pos
+        upto = min(stop, end)
+        if upto > start:
+            part = self._slice_range(frame, start - frame0, upto - frame0)
+            self._seg.append(self._blocks_copy(part))
+        if upto < stop:
+            self._seg_pos = (upto, trig, stop)
+            return
+
+        block = self._seg[0] if len(self._seg) == 1 else None
+        if block is None:
+            block = self._blocks_copy(self._seg)
+        self._event_add(float(self._sample_count(ret) + trig))
+        ret.append(block)
+        self._seg = []
+        self._seg_pos = (0, 0, 0)
+
+    def _data_triggered_sequence(self, data: list[Any]) -> list[Any]:
+        """Rearmed start-after capture of fixed trigger segments.
+
+        All hits of a payload are found in one vectorized pass, filtered
+        by rearm and holdoff, and each accepted hit is captured as one
+        block with ``pre`` samples before the trigger sample and ``post``
+        samples after it. Each segment emits its own trigger event.
+        """
+        self._events = []
+        carry = 0 if self._carry is None else 1
+        window = data if self._carry is None else [self._carry] + data
+        abs0 = self._abs - carry
+        self._cross_channel_handle(window, self._hist_rows - carry, abs0, data)
+
+        rows = self._sample_count(data)
+        end = self._abs + rows
+        frame = self._history() + data
+        frame0 = self._abs - self._hist_rows
+        if self._config.srcchan is None:
+            hits = self._window_hits(window, data, self._config, abs0) + abs0
+        else:
+            hits = self._cross_hits_pop(end)
+            # hits older than the kept history cannot be captured
+            hits = hits[hits >= frame0]
+
+        ret: list[Any] = []
+        if self._seg:
+            self._segment_fill(frame, frame0, end, ret)
+        pre = self._config.effective_pre_samples
+        post = self._config.post_samples
+        for pos in self._sequence_accept(hits):
+            start = max(pos - pre, frame0)
+            self._seg_pos = (start, pos - start, pos + post + 1)
+            self._segment_fill(frame, frame0, end, ret)
+
+        self._history_add(data, pre)
+        return ret
+
     def _data_triggered_start_after(self, data: list[Any]) -> list[Any]:
-        """Legacy start-after-trigger behavior with pre-trigger history."""
+        """Start-after-trigger behavior with pre-trigger history."""
+        if self._is_block_payload(data) or (not data and self._blockmode):
+            self._blockmode = True
+            if self._rearm:
+                return self._data_triggered_sequence(data)
+            return self._data_triggered_start_after_blocks(data)
+        if self._rearm and data:
+            raise NotImplementedError(
+                "rearm capture requires NumPy block stream payloads"
+            )
         combined = self._cache + data
-        self._last_event = None
+        self._events = []
 
         self._trigger = self._is_triggered(combined)
 
@@ -621,14 +1600,8 @@ class TriggerHandler(object):
 
         if not self._trigger.state:
             ret = []
-            if self._is_block_payload(combined):
-                if pre_samples <= 0:
-                    self._cache = data
-                else:
-                    self._cache = self._cache_tail(combined, pre_samples)
-            else:
-                clen = len(self._cache)
-                self._cache = combined[clen - pre_samples :]
+            clen = len(self._cache)
+            self._cache = combined[clen - pre_samples :]
         else:
             first_trigger = not self._triger_done
             if not self._triger_done:
@@ -641,18 +1614,14 @@ class TriggerHandler(object):
             ret = self._slice_from(combined, start_idx)
             trigger_sample = self._trigger.idx - max(start_idx, 0)
             if first_trigger and self._should_emit_event():
-                self._last_event = DTriggerEvent(
-                    sample_index=float(trigger_sample),
-                    channel=self._chan,
-                    capture_mode=self._config.capture_mode,
-                )
+                self._event_add(float(trigger_sample))
             self._cache = []
 
         return ret
 
     def _data_triggered_stop_after(self, data: list[Any]) -> list[Any]:
         """Stream immediately, then stop after trigger plus tail samples."""
-        self._last_event = None
+        self._events = []
         if not self._should_emit_event():
             return data
         if not data and self._post_remaining <= 0:
@@ -676,8 +1645,9 @@ class TriggerHandler(object):
         combined = self._cache + data
         cache_rows = self._sample_count(self._cache)
 
-        self._trigger = self._is_triggered(combined)
-        self._cross_channel_handle(combined)
+        frame = (self._abs - cache_rows, self._abs + self._sample_count(data))
+        self._trigger = self._is_triggered(combined, frame)
+        self._cross_channel_handle(combined, 0, frame[0])
 
         if not self._trigger.state:
             self._cache = self._tail_samples(combined, 1)
@@ -686,14 +1656,7 @@ class TriggerHandler(object):
         total = self._sample_count(combined)
         stop_at = self._trigger.idx + self._config.post_samples + 1
         returned = self._slice_range(combined, cache_rows, min(total, stop_at))
-        self._last_event = DTriggerEvent(
-            sample_index=max(
-                self._trigger.idx - cache_rows,
-                0.0,
-            ),
-            channel=self._chan,
-            capture_mode=self._config.capture_mode,
-        )
+        self._event_add(max(self._trigger.idx - cache_rows, 0.0))
         self._post_remaining = max(stop_at - total, 0)
         self._cache = []
         return returned
@@ -703,8 +1666,21 @@ class TriggerHandler(object):
 
         :param data: stream data
         """
+        start = perf_counter()
+        ret = self._data_triggered(data)
+        if self._is_block_payload(data):
+            self._metrics.data_in(data)
+            self._metrics.data_out(ret)
+            self._metrics.handler_time(perf_counter() - start)
+        return ret
+
+    def _data_triggered(self, data: list[Any]) -> list[Any]:
         if self._config.capture_mode is ETriggerCaptureMode.START_AFTER:
-            return self._data_triggered_start_after(data)
-        if self._config.capture_mode is ETriggerCaptureMode.STOP_AFTER:
-            return self._data_triggered_stop_after(data)
-        raise AssertionError
+            ret = self._data_triggered_start_after(data)
+        elif self._config.capture_mode is ETriggerCaptureMode.STOP_AFTER:
+            ret = self._data_triggered_stop_after(data)
+        else:
+            raise AssertionError
+        if self._is_block_payload(data):
+            self._abs += self._sample_count(data)
+        return ret
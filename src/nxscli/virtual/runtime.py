@@ -3,7 +3,7 @@
 import queue
 from dataclasses import dataclass
 from threading import Lock
-from time import sleep
+from time import perf_counter, sleep
 from typing import TYPE_CHECKING
 
 import numpy as np
@@ -11,12 +11,15 @@ from nxslib.dev import DeviceChannel
 from nxslib.nxscope import DNxscopeStreamBlock, NxscopeHandler
 from nxslib.thread import ThreadCommon
 
+from nxscli.metrics import metrics
+from nxscli.stream_queue import StreamQueue
 from nxscli.virtual.errors import VirtualChannelError
 from nxscli.virtual.manager import VirtualChannelManager
 from nxscli.virtual.models import SampleValue, VirtualChannelSpec
 
 if TYPE_CHECKING:
     from nxscli.channelref import ChannelRef
+    from nxscli.stream_queue import DStreamSubOpts, DSubscriberStats
 
 
 @dataclass(frozen=True)
@@ -41,13 +44,12 @@ class VirtualStreamRuntime:
         self._alias_to_output_id: dict[str, str] = {}
         self._output_id_to_alias: dict[str, str] = {}
         self._channels: dict[str, DeviceChannel] = {}
-        self._subscribers: dict[
-            str, list[queue.Queue[list[DNxscopeStreamBlock]]]
-        ] = {}
+        self._subscribers: dict[str, list[StreamQueue]] = {}
         self._physical_subs: dict[
             int, queue.Queue[list[DNxscopeStreamBlock]]
         ] = {}
         self._thread = ThreadCommon(self._thread_common, name="virtstream")
+        self._metrics = metrics.stage("virtual")
         self._poll_idx = 0
         self._started = False
 
@@ -168,16 +170,20 @@ class VirtualStreamRuntime:
             return tuple(self._channels.values())
 
     def stream_sub(
-        self, channel: "ChannelRef"
-    ) -> queue.Queue[list[DNxscopeStreamBlock]] | None:
-        """Subscribe queue for virtual channel."""
+        self, channel: "ChannelRef", opts: "DStreamSubOpts | None" = None
+    ) -> StreamQueue | None:
+        """Subscribe queue for virtual channel.
+
+        :param channel: virtual channel reference
+        :param opts: optional queue limits and overflow policy
+        """
         if not channel.is_virtual:
             return None
         chan = channel.virtual_name()
         with self._lock:
             if chan not in self._channels:
                 return None
-            subq: queue.Queue[list[DNxscopeStreamBlock]] = queue.Queue()
+            subq = StreamQueue(opts)
             self._subscribers.setdefault(chan, []).append(subq)
             return subq
 
@@ -190,11 +196,21 @@ class VirtualStreamRuntime:
                 subs = self._subscribers[chan]
                 if subq in subs:
                     subs.remove(subq)
+                    subq.close()
                     if not subs:
                         del self._subscribers[chan]
                     return True
         return False
 
+    def stream_stats(self) -> tuple["DSubscriberStats", ...]:
+        """Return counters for all subscriber queues."""
+        with self._lock:
+            return tuple(
+                subq.snapshot(chan)
+                for chan, subs in self._subscribers.items()
+                for subq in subs
+            )
+
     def on_connect(self, nxscope: NxscopeHandler) -> None:
         """Attach runtime to connected Nxscope handler."""
         with self._lock:
@@ -309,15 +325,27 @@ class VirtualStreamRuntime:
         except queue.Empty:
             return
 
+        stamp = perf_counter()
+        self._metrics.data_in(batch)
         out_batches = self._process_batch(chid, batch)
+        self._metrics.handler_time(perf_counter() - stamp)
 
         if not out_batches:
             return
 
         with self._lock:
-            for alias, samples in out_batches.items():
-                for qsub in self._subscribers.get(alias, []):
-                    qsub.put(samples)
+            dst = [
+                (list(self._subscribers.get(alias, [])), samples)
+                for alias, samples in out_batches.items()
+            ]
+
+        for dstq, samples in dst:
+            for qsub in dstq:
+                qsub.push(samples, self._is_started, stamp)
+                self._metrics.data_out(samples)
+
+    def _is_started(self) -> bool:
+        return self._started
 
     def _process_batch(
         self,
@@ -1,11 +1,16 @@
+import bz2
+import gzip
+import json
 import socket
 from importlib.metadata import PackageNotFoundError
 
+import numpy as np
 import pytest  # type: ignore
 from click.testing import CliRunner
 
 import nxscli
 import nxscli.commands.cmd_version
+from nxscli.chunkfile import ChunkFileReader
 from nxscli.cli.main import main
 from tests.fake_nxscope import FakeNxscope
 
@@ -240,6 +245,37 @@ def test_main_pcsv(runner):
         result = runner.invoke(main, args)
         assert result.exit_code == 0
 
+    with runner.isolated_filesystem():
+        args = ["dummy", "chan", "1", "pcsv", "--wbuf", "1", "--wflush", "0"]
+        result = runner.invoke(main, args + ["--fsync", "close", "50", "./t"])
+        assert result.exit_code == 0
+        with open("./t_chan1.csv") as f:
+            assert len(f.readlines()) == 50
+
+    with runner.isolated_filesystem():
+        args = ["dummy", "chan", "1", "pcsv", "--wbuf", "1", "--codec"]
+        result = runner.invoke(main, args + ["bz2", "50", "./t"])
+        assert result.exit_code == 0
+        with bz2.open("./t_chan1.csv.bz2", "rt") as f:
+            assert len(f.readlines()) == 50
+
+    with runner.isolated_filesystem():
+        args = ["dummy", "chan", "1", "pcsv", "--rotsize", "0.001"]
+        result = runner.invoke(main, args + ["500", "./t"])
+        assert result.exit_code == 0
+        with open("./t_segments.jsonl") as f:
+            segments = [json.loads(line) for line in f]
+        # files rotate between stream batches
+        assert segments[0]["path"] == "./t_chan1_000000.csv"
+        stop = 0
+        for seg in segments:
+            assert seg["first"] == stop
+            with open(seg["path"]) as f:
+                rows = len(f.readlines())
+            assert rows == seg["stop"] - seg["first"]
+            stop = seg["stop"]
+        assert stop == 500
+
 
 def test_main_pnpsave(runner):
     args = ["chan", "1", "pnpsave", "1", "./test"]
@@ -261,6 +297,80 @@ def test_main_pnpsave(runner):
         result = runner.invoke(main, args)
         assert result.exit_code == 0
 
+    with runner.isolated_filesystem():
+        args = ["dummy", "chan", "1", "pnpsave", "--bufrows", "8"]
+        result = runner.invoke(main, args + ["100", "./test"])
+        assert result.exit_code == 0
+
+    with runner.isolated_filesystem():
+        args = ["dummy", "chan", "7", "pnpsave", "--dtype", "float64"]
+        result = runner.invoke(main, args + ["100", "./test"])
+        assert result.exit_code == 0
+        assert np.load("./test_chan7.npy").dtype == np.float64
+
+    with runner.isolated_filesystem():
+        args = ["dummy", "chan", "1", "pnpsave", "--wbuf", "1", "--fsync"]
+        result = runner.invoke(main, args + ["flush", "100", "./test"])
+        assert result.exit_code == 0
+        assert np.load("./test_chan1.npy").shape[1] >= 100
+
+    with runner.isolated_filesystem():
+        args = ["dummy", "chan", "1", "pnpsave", "--codec", "zlib"]
+        result = runner.invoke(main, args + ["--clevel", "1", "100", "./test"])
+        assert result.exit_code == 0
+        with gzip.open("./test_chan1.npy.gz") as file:
+            assert np.load(file).shape[1] >= 100
+
+    with runner.isolated_filesystem():
+        args = ["dummy", "chan", "1", "pnpsave", "--rotsize", "0.001"]
+        result = runner.invoke(main, args + ["--rottime", "60", "500", "./t"])
+        assert result.exit_code == 0
+        with open("./t_segments.jsonl") as f:
+            segments = [json.loads(line) for line in f]
+        assert segments[0]["path"] == "./t_chan1_000000.npy"
+        arrs = [np.load(seg["path"]) for seg in segments]
+        assert sum(arr.shape[1] for arr in arrs) == segments[-1]["stop"]
+
+
+def test_main_pchunk(runner):
+    args = ["chan", "1", "pchunk", "1", "./test"]
+    result = runner.invoke(main, args)
+    assert result.exit_code == 2
+
+    with runner.isolated_filesystem():
+        args = ["dummy", "chan", "1,7", "pchunk", "100", "./test"]
+        result = runner.invoke(main, args)
+        assert result.exit_code == 0
+        reader = ChunkFileReader("./test.nxc")
+        assert reader.recovered is False
+        assert reader.channels == [1, 7]
+        assert reader.span(1) == (0, 100)
+        assert reader.read(7, 10, 20).shape[0] == 10
+
+    with runner.isolated_filesystem():
+        args = ["dummy", "chan", "7", "pchunk", "--dtype", "int16", "--wbuf"]
+        result = runner.invoke(main, args + ["1", "100", "./test"])
+        assert result.exit_code == 0
+        assert ChunkFileReader("./test.nxc").dtype(7) == np.int16
+
+    with runner.isolated_filesystem():
+        args = ["dummy", "chan", "1", "pchunk", "--codec", "lzma"]
+        result = runner.invoke(main, args + ["100", "./test"])
+        assert result.exit_code == 0
+        assert ChunkFileReader("./test.nxc").read(1).shape[0] == 100
+
+    with runner.isolated_filesystem():
+        args = ["dummy", "chan", "1", "pchunk", "--rotsize", "0.001"]
+        result = runner.invoke(main, args + ["500", "./test"])
+        assert result.exit_code == 0
+        with open("./test_segments.jsonl") as f:
+            segments = [json.loads(line) for line in f]
+        assert segments[0]["path"] == "./test_000000.nxc"
+        for seg in segments:
+            reader = ChunkFileReader(seg["path"])
+            assert reader.span(1) == (seg["first"], seg["stop"])
+        assert segments[-1]["stop"] == 500
+
 
 def test_main_pnpmem(runner):
     args = ["chan", "1", "pnpmem", "1", "./test", "100"]
@@ -282,6 +392,17 @@ def test_main_pnpmem(runner):
         result = runner.invoke(main, args)
         assert result.exit_code == 0
 
+    with runner.isolated_filesystem():
+        args = ["dummy", "chan", "7", "pnpmem", "--dtype", "int16"]
+        result = runner.invoke(main, args + ["10", "./test", "10"])
+        assert result.exit_code == 0
+
+    with runner.isolated_filesystem():
+        args = ["dummy", "chan", "1", "pnpmem", "--wflush", "0.01"]
+        args += ["--fsync", "flush", "100", "./test", "10"]
+        result = runner.invoke(main, args)
+        assert result.exit_code == 0
+
 
 def test_main_pnone(runner):
     args = ["chan", "1", "pnone", "1"]
@@ -105,6 +105,39 @@ def test_trigger():
     with pytest.raises(click.BadParameter):
         t.convert("1:er#vbad,0,0.5", None, None)
 
+    parsed = t.convert("1:and#2@1,er/0.5,!wx@0/-1/1,pre=4", None, None)
+    req = parsed[1]
+    assert req.ttype == "and"
+    assert req.srcchan == 2
+    assert req.params == []
+    assert req.pre_samples == 4
+    assert [x.ttype for x in req.terms] == ["er", "wx"]
+    assert [x.vect for x in req.terms] == [1, 0]
+    assert [x.negate for x in req.terms] == [False, True]
+    assert req.terms[1].params == ["0", "-1", "1"]
+
+    parsed = t.convert("g:then,er/0.5,ef@1/0.2,within=100", None, None)
+    assert parsed[-1].within == 100
+    assert len(parsed[-1].terms) == 2
+
+    with pytest.raises(click.BadParameter):
+        t.convert("1:or,er/0.5", None, None)
+
+    with pytest.raises(click.BadParameter):
+        t.convert("1:then,er/0.5,er/1,er/2", None, None)
+
+    with pytest.raises(click.BadParameter):
+        t.convert("1:and,er/0.5,on", None, None)
+
+    parsed = t.convert("1:ph@2,0,0.5,4,8,pre=2", None, None)
+    assert parsed[1].ttype == "ph"
+    assert parsed[1].vect == 2
+    assert parsed[1].params == ["0", "0.5", "4", "8"]
+
+    parsed = t.convert("1:or,rh/0.2/0.8,sr@1/0.5", None, None)
+    assert [x.ttype for x in parsed[1].terms] == ["rh", "sr"]
+    assert parsed[1].terms[0].params == ["0", "0.2", "0.8"]
+
 
 def test_stringlist():
     s = StringList()
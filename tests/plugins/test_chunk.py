@@ -0,0 +1,118 @@
+import json
+
+import numpy as np
+
+from nxscli.chunkfile import ChunkFileReader
+from nxscli.filewriter import DFileWriterOpts
+from nxscli.plugins.chunk import PluginChunk
+from nxscli.rotate import DRotateOpts
+from nxscli.trigger import DTriggerEvent, ETriggerCaptureMode
+
+
+class QData:
+    def __init__(self, chan, events) -> None:  # noqa: ANN001
+        self.chan = chan
+        self.vdim = 2
+        self.dtype = np.dtype(np.float32)
+        self._events = events
+
+    def pop_trigger_events(self):  # noqa: ANN201
+        events = self._events
+        self._events = []
+        return events
+
+
+class Block:
+    def __init__(self, data) -> None:  # noqa: ANN001
+        self.data = data
+        self.meta = None
+
+
+def test_pluginchunk_init() -> None:
+    plugin = PluginChunk()
+    assert plugin.stream is True
+    assert plugin.writer_stats() == []
+
+
+def test_pluginchunk_handle_blocks_and_final(tmp_path) -> None:
+    mode = ETriggerCaptureMode.START_AFTER
+    plugin = PluginChunk()
+    plugin._phandler = object()
+    plugin._path = str(tmp_path / "capture")
+    plugin._samples = 5
+    plugin._init()
+    plugin._datalen = [0, 0]
+
+    pdata0 = QData(0, [DTriggerEvent(1.0, 0, mode)])
+    pdata3 = QData(3, [])
+    data = np.arange(6.0).reshape(3, 2)
+    plugin._handle_blocks([Block(data)], pdata0, 0)
+    plugin._handle_blocks([Block(data)], pdata3, 1)
+    # trigger events are relative to the payload start
+    pdata0._events = [DTriggerEvent(0.0, 0, mode), DTriggerEvent(2.0, 0, mode)]
+    plugin._handle_blocks([Block(data)], pdata0, 0)
+    assert plugin._datalen == [5, 3]
+    assert len(plugin.writer_stats()) == 1
+    plugin._final()
+
+    reader = ChunkFileReader(str(tmp_path / "capture.nxc"))
+    assert reader.channels == [0, 3]
+    assert reader.dtype(0) == np.float32
+    ref = np.concatenate([data, data[:2]])
+    assert np.array_equal(reader.read(0), ref)
+    assert np.array_equal(reader.read(3), data)
+    # events above the sample limit are dropped with their rows
+    assert reader.events(0).tolist() == [1.0, 3.0]
+
+
+def test_pluginchunk_dtype_codec(tmp_path) -> None:
+    plugin = PluginChunk()
+    plugin._phandler = object()
+    plugin._path = str(tmp_path / "capture")
+    plugin._samples = 5
+    plugin._dtype = np.dtype(np.int16)
+    plugin._writer_opts = DFileWriterOpts(codec="zlib")
+    plugin._init()
+    plugin._datalen = [0]
+    plugin._handle_blocks([Block(np.ones((2, 2)))], QData(1, []), 0)
+    plugin._final()
+
+    reader = ChunkFileReader(str(tmp_path / "capture.nxc"))
+    assert reader.dtype(1) == np.int16
+    assert np.array_equal(reader.read(1), np.ones((2, 2)))
+
+
+def test_pluginchunk_rotate(tmp_path) -> None:
+    plugin = PluginChunk()
+    plugin._phandler = object()
+    plugin._path = str(tmp_path / "capture")
+    plugin._samples = 100
+    plugin._rotate_opts = DRotateOpts(size=48)
+    plugin._writer_opts = DFileWriterOpts(codec="zlib")
+    plugin._init()
+    plugin._datalen = [0, 0]
+
+    # 3 rows of 2 float32 values are 24 bytes, segments of two batches
+    data = np.arange(6.0).reshape(3, 2)
+    for _ in range(3):
+        plugin._handle_blocks([Block(data)], QData(0, []), 0)
+        plugin._handle_blocks([Block(data)], QData(5, []), 1)
+    plugin._final()
+
+    with open(str(tmp_path / "capture_segments.jsonl")) as f:
+        segments = [json.loads(line) for line in f]
+    assert [(s["segment"], s["chan"], s["first"]) for s in segments] == [
+        (0, 0, 0),
+        (0, 5, 0),
+        (1, 0, 3),
+        (1, 5, 3),
+        (2, 0, 6),
+        (2, 5, 6),
+    ]
+    reader = ChunkFileReader(str(tmp_path / "capture_000001.nxc"))
+    assert reader.span(5) == (3, 6)
+    assert np.array_equal(reader.read(5), data)
+    # compression counters of all segments
+    codec = plugin.codec_stats()
+    assert sorted(codec) == ["chan0", "chan5"]
+    assert codec["chan5"].raw_bytes == 3 * data.astype(np.float32).nbytes
@@ -1,10 +1,11 @@
-import csv
 import io
 
 import numpy as np
 from nxslib.nxscope import DNxscopeStreamBlock
 
+from nxscli.filewriter import DFileWriterOpts
 from nxscli.plugins.csv import PluginCsv
+from nxscli.rotate import DRotateOpts, SegmentRotator
 
 
 def test_plugincsv_init():
@@ -17,44 +18,32 @@ def test_plugincsv_init():
 
 def test_plugincsv_handle_blocks_none_meta_and_empty_block() -> None:
     plugin = PluginCsv()
-    out = io.StringIO()
-    writer = csv.writer(
-        out,
-        delimiter=" ",
-        quotechar="|",
-        escapechar="\\",
-        quoting=csv.QUOTE_MINIMAL,
-    )
-    plugin._csvwriters = [[writer, out]]
+    out = io.BytesIO()
+    plugin._csvfiles = [SegmentRotator("capture", ".csv", lambda _: out)]
     plugin._samples = 10
     plugin._nostop = False
     plugin._datalen = [0]
     plugin._meta_string = False
-    pdata = type("Q", (), {"vdim": 1})()
+    pdata = type("Q", (), {"vdim": 1, "chan": 0})()
 
     block0 = DNxscopeStreamBlock(data=np.empty((0, 1)), meta=None)
     block1 = DNxscopeStreamBlock(data=np.array([[1.0], [2.0]]), meta=None)
     plugin._handle_blocks([block0, block1], pdata, 0)
 
     assert plugin._datalen == [2]
+    rows = [(np.float64(1.0),), (np.float64(2.0),)]
+    assert out.getvalue().decode() == "".join(f"{row} ()\r\n" for row in rows)
 
 
 def test_plugincsv_handle_blocks_meta_string() -> None:
     plugin = PluginCsv()
-    out = io.StringIO()
-    writer = csv.writer(
-        out,
-        delimiter=" ",
-        quotechar="|",
-        escapechar="\\",
-        quoting=csv.QUOTE_MINIMAL,
-    )
-    plugin._csvwriters = [[writer, out]]
+    out = io.BytesIO()
+    plugin._csvfiles = [SegmentRotator("capture", ".csv", lambda _: out)]
     plugin._samples = 10
     plugin._nostop = False
     plugin._datalen = [0]
     plugin._meta_string = True
-    pdata = type("Q", (), {"vdim": 1})()
+    pdata = type("Q", (), {"vdim": 1, "chan": 0})()
 
     block = DNxscopeStreamBlock(
         data=np.array([[1.0], [2.0]]),
@@ -63,4 +52,59 @@ def test_plugincsv_handle_blocks_meta_string() -> None:
     plugin._handle_blocks([block], pdata, 0)
 
     assert plugin._datalen == [2]
-    assert "A" in out.getvalue()
+    assert b"A" in out.getvalue()
+
+
+def test_plugincsv_rotate(tmp_path) -> None:
+    class Data:
+        def __init__(self) -> None:
+            self.qdlist = [type("Q", (), {"vdim": 1, "chan": 2})()]
+
+    plugin = PluginCsv()
+    plugin._phandler = object()
+    plugin._data = Data()
+    plugin._path = str(tmp_path / "capture")
+    plugin._samples = 10
+    plugin._rotate_opts = DRotateOpts(size=1)
+    plugin._init()
+    plugin._datalen = [0]
+
+    pdata = plugin._data.qdlist[0]
+    for value in range(3):
+        block = DNxscopeStreamBlock(data=np.array([[value]]), meta=None)
+        plugin._handle_blocks([block], pdata, 0)
+    plugin._final()
+
+    for value in range(3):
+        path = tmp_path / f"capture_chan2_{value:06d}.csv"
+        row = (np.int64(value),)
+        assert path.read_text() == f"{row} ()\n"
+    lines = (tmp_path / "capture_segments.jsonl").read_text().splitlines()
+    assert len(lines) == 3
+
+
+def test_plugincsv_codec_stats_per_channel(tmp_path) -> None:
+    class Data:
+        def __init__(self) -> None:
+            self.qdlist = [type("Q", (), {"vdim": 1, "chan": 2})()]
+
+    plugin = PluginCsv()
+    plugin._phandler = object()
+    plugin._data = Data()
+    plugin._path = str(tmp_path / "capture")
+    plugin._samples = 10
+    plugin._writer_opts = DFileWriterOpts(codec="zlib")
+    plugin._rotate_opts = DRotateOpts(size=1)
+    plugin._init()
+    plugin._datalen = [0]
+
+    pdata = plugin._data.qdlist[0]
+    for value in range(2):
+        block = DNxscopeStreamBlock(data=np.array([[value]]), meta=None)
+        plugin._handle_blocks([block], pdata, 0)
+    plugin._final()
+
+    # keyed by channel like other file plugins, summed over segments
+    stats = plugin.codec_stats()
+    assert list(stats) == ["chan2"]
+    assert stats["chan2"].raw_bytes == 2 * len(f"{(np.int64(0),)} ()\r\n")
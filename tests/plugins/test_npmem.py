@@ -1,5 +1,6 @@
 import numpy as np
 
+from nxscli.npring import NpRingReader
 from nxscli.plugins.npmem import PluginNpmem
 
 
@@ -13,6 +14,7 @@ def test_pluginnpmem_handle_blocks_and_samples(tmp_path) -> None:
         def __init__(self) -> None:
             self.chan = 2
             self.vdim = 2
+            self.dtype = np.dtype(np.float32)
 
     class Data:
         def __init__(self) -> None:
@@ -34,15 +36,53 @@ def test_pluginnpmem_handle_blocks_and_samples(tmp_path) -> None:
     plugin._init()
     plugin._datalen = [0]
     pdata = plugin._data.qdlist[0]
+    reader = NpRingReader(str(tmp_path / "capture_chan2.dat"))
 
     plugin._handle_samples([Sample((1.0, 2.0))], pdata, 0)
-    assert plugin._datalen[0] == 0
+    assert plugin._datalen[0] == 1
+    assert reader.latest(2).tolist() == [[1.0, 2.0]]
 
     plugin._handle_blocks(
         [Block(np.array([[3.0, 4.0], [5.0, 6.0]]))], pdata, 0
     )
-    assert plugin._datalen[0] == 2
+    assert plugin._datalen[0] == 3
+    assert reader.index == 3
+    # the ring keeps the latest samples
     assert np.array_equal(
-        np.asarray(plugin._npfiles[0]),
-        np.array([[1.0, 3.0], [2.0, 4.0]], dtype=np.float32),
+        reader.latest(2), np.array([[3.0, 4.0], [5.0, 6.0]], dtype=np.float32)
     )
+    plugin._final()
+
+
+def test_pluginnpmem_dtype(tmp_path) -> None:
+    class QData:
+        def __init__(self, chan: int) -> None:
+            self.chan = chan
+            self.vdim = 1
+            self.dtype = np.dtype(np.int16)
+
+    class Data:
+        def __init__(self) -> None:
+            self.qdlist = [QData(0), QData(1)]
+
+    class Block:
+        def __init__(self, data):  # noqa: ANN001
+            self.data = data
+
+    data = np.array([[-300], [1], [2]], dtype=np.int16)
+    for dtype in (None, np.dtype(np.float64)):
+        plugin = PluginNpmem()
+        plugin._phandler = object()
+        plugin._data = Data()
+        plugin._path = str(tmp_path / f"capture_{dtype}")
+        plugin._npshape = 3
+        plugin._dtype = dtype
+        plugin._init()
+        plugin._datalen = [0, 0]
+        plugin._handle_blocks([Block(data)], plugin._data.qdlist[1], 1)
+        plugin._final()
+
+        # channel data type is kept unless an output type is given
+        reader = NpRingReader(plugin._path + "_chan1.dat")
+        assert reader.dtype == (dtype or np.int16)
+        assert np.array_equal(reader.latest(3), data)
@@ -1,6 +1,10 @@
+import json
+
 import numpy as np
 
+from nxscli.filewriter import DFileWriterOpts
 from nxscli.plugins.npsave import PluginNpsave
+from nxscli.rotate import DRotateOpts
 
 
 def test_pluginnpsave_init() -> None:
@@ -13,6 +17,7 @@ def test_pluginnpsave_handle_blocks_and_final(tmp_path) -> None:
         def __init__(self) -> None:
             self.chan = 1
             self.vdim = 2
+            self.dtype = np.dtype(np.float64)
 
     class Data:
         def __init__(self) -> None:
@@ -41,11 +46,12 @@ def test_pluginnpsave_handle_blocks_and_final(tmp_path) -> None:
     assert plugin._datalen[0] == 2
 
 
-def test_pluginnpsave_handle_samples() -> None:
+def test_pluginnpsave_handle_samples(tmp_path) -> None:
     class QData:
         def __init__(self) -> None:
             self.chan = 1
             self.vdim = 2
+            self.dtype = np.dtype(np.float64)
 
     class Data:
         def __init__(self) -> None:
@@ -58,11 +64,15 @@ def test_pluginnpsave_handle_samples() -> None:
     plugin = PluginNpsave()
     plugin._phandler = object()
     plugin._data = Data()
+    plugin._path = str(tmp_path / "capture")
     plugin._init()
     plugin._datalen = [0]
     pdata = plugin._data.qdlist[0]
     plugin._handle_samples([Sample((1.0, 2.0)), Sample((3.0, 4.0))], pdata, 0)
     assert plugin._datalen[0] == 2
+    plugin._final()
+    arr = np.load(str(tmp_path / "capture_chan1.npy"))
+    assert np.array_equal(arr, np.array([[1.0, 3.0], [2.0, 4.0]]))
 
 
 def test_pluginnpsave_final_empty_chunks(tmp_path) -> None:
@@ -70,6 +80,7 @@ def test_pluginnpsave_final_empty_chunks(tmp_path) -> None:
         def __init__(self) -> None:
             self.chan = 3
             self.vdim = 2
+            self.dtype = np.dtype(np.float64)
 
     class Data:
         def __init__(self) -> None:
@@ -83,3 +94,134 @@ def test_pluginnpsave_final_empty_chunks(tmp_path) -> None:
     plugin._final()
     arr = np.load(str(tmp_path / "capture_empty_chan3.npy"))
     assert arr.shape == (2, 0)
+
+
+def test_pluginnpsave_streams_with_bounded_buffers(tmp_path) -> None:
+    class QData:
+        def __init__(self) -> None:
+            self.chan = 2
+            self.vdim = 3
+            self.dtype = np.dtype(np.int16)
+
+    class Data:
+        def __init__(self) -> None:
+            self.qdlist = [QData()]
+
+    class Block:
+        def __init__(self, data):  # noqa: ANN001
+            self.data = data
+
+    plugin = PluginNpsave()
+    plugin._phandler = object()
+    plugin._data = Data()
+    plugin._path = str(tmp_path / "capture")
+    plugin._buffer_rows = 4
+    plugin._init()
+    plugin._datalen = [0]
+
+    # two buffers of 4 rows, more only if the disk is behind
+    assert plugin._writers[0].writer.buffer_bytes == 2 * 4 * 3 * 2
+
+    pdata = plugin._data.qdlist[0]
+    data = np.arange(3 * 50, dtype=np.int16).reshape(50, 3)
+    for start in range(0, 50, 7):
+        plugin._handle_blocks([Block(data[start : start + 7])], pdata, 0)
+    plugin._final()
+
+    # channel data type is kept
+    arr = np.load(str(tmp_path / "capture_chan2.npy"))
+    assert arr.dtype == np.int16
+    assert np.array_equal(arr, data.T)
+    assert plugin._datalen[0] == 50
+
+
+def test_pluginnpsave_output_dtype(tmp_path) -> None:
+    class QData:
+        def __init__(self) -> None:
+            self.chan = 4
+            self.vdim = 1
+            self.dtype = np.dtype(np.int8)
+
+    class Data:
+        def __init__(self) -> None:
+            self.qdlist = [QData()]
+
+    class Block:
+        def __init__(self, data):  # noqa: ANN001
+            self.data = data
+
+    class Sample:
+        def __init__(self, data):  # noqa: ANN001
+            self.data = data
+
+    plugin = PluginNpsave()
+    plugin._phandler = object()
+    plugin._data = Data()
+    plugin._path = str(tmp_path / "capture")
+    plugin._dtype = np.dtype(np.float32)
+    plugin._init()
+    plugin._datalen = [0]
+
+    pdata = plugin._data.qdlist[0]
+    plugin._handle_blocks(
+        [Block(np.array([[-1], [2]], dtype=np.int8))], pdata, 0
+    )
+    plugin._handle_samples([Sample((3,))], pdata, 0)
+    plugin._final()
+
+    arr = np.load(str(tmp_path / "capture_chan4.npy"))
+    assert arr.dtype == np.float32
+    assert np.array_equal(arr, np.array([[-1.0, 2.0, 3.0]]))
+
+
+def test_pluginnpsave_rotate(tmp_path) -> None:
+    class QData:
+        def __init__(self) -> None:
+            self.chan = 0
+            self.vdim = 1
+            self.dtype = np.dtype(np.int32)
+
+    class Data:
+        def __init__(self) -> None:
+            self.qdlist = [QData()]
+
+    class Block:
+        def __init__(self, data):  # noqa: ANN001
+            self.data = data
+
+    plugin = PluginNpsave()
+    plugin._phandler = object()
+    plugin._data = Data()
+    plugin._path = str(tmp_path / "capture")
+    plugin._rotate_opts = DRotateOpts(size=40)
+    plugin._init()
+    plugin._datalen = [0]
+
+    pdata = plugin._data.qdlist[0]
+    data = np.arange(25, dtype=np.int32).reshape(25, 1)
+    for start in range(0, 25, 5):
+        plugin._handle_blocks([Block(data[start : start + 5])], pdata, 0)
+    plugin._final()
+
+    # 40 bytes are 10 rows of int32
+    with open(str(tmp_path / "capture_segments.jsonl")) as f:
+        segments = [json.loads(line) for line in f]
+    assert [(s["first"], s["stop"]) for s in segments] == [
+        (0, 10),
+        (10, 20),
+        (20, 25),
+    ]
+    for seg in segments:
+        arr = np.load(seg["path"])
+        assert np.array_equal(arr[0], np.arange(seg["first"], seg["stop"]))
+    assert segments[2]["path"] == str(tmp_path / "capture_chan0_000002.npy")
+    # no compression, nothing accounted
+    assert plugin.codec_stats() == {}
+
+    # compression counters are keyed by channel
+    plugin._writer_opts = DFileWriterOpts(codec="zlib")
+    plugin._init()
+    plugin._datalen = [0]
+    plugin._handle_blocks([Block(data[:5])], pdata, 0)
+    plugin._final()
+    assert list(plugin.codec_stats()) == ["chan0"]
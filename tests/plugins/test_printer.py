@@ -0,0 +1,36 @@
+import numpy as np
+from nxslib.nxscope import DNxscopeStreamBlock
+
+from nxscli.plugins.printer import PluginPrinter
+
+
+def test_pluginprinter_init():
+    plugin = PluginPrinter()
+
+    assert plugin.stream is True
+    assert plugin._q.maxsize == PluginPrinter.MAX_SAMPLES
+
+
+def test_pluginprinter_slow_terminal_drops_oldest(monkeypatch) -> None:
+    monkeypatch.setattr(PluginPrinter, "MAX_SAMPLES", 2)
+    plugin = PluginPrinter()
+    plugin._samples = 5
+    plugin._nostop = False
+    plugin._datalen = [0]
+    pdata = type("Q", (), {"chan": 3})()
+
+    block = DNxscopeStreamBlock(
+        data=np.arange(5, dtype=np.float64).reshape(5, 1), meta=None
+    )
+    plugin._handle_blocks([block], pdata, 0)
+    plugin._final()
+
+    # the terminal gets only the newest samples
+    assert plugin._q.qsize() == 2
+    assert plugin._dropped == 3
+    assert plugin.result() == "1: {'chan': 3, 'data': (3.0,), 'meta': ()}"
+    assert plugin.handled is False
+    assert plugin.result().startswith("2: ")
+    # dropped samples are accounted, the capture is done
+    plugin.handled = True
+    assert plugin.handled is True
@@ -0,0 +1,187 @@
+import asyncio
+import queue
+import threading
+
+import numpy as np
+import pytest  # type: ignore
+from nxslib.dev import DeviceChannel
+from nxslib.nxscope import DNxscopeStreamBlock
+
+from nxscli.astream import AsyncStream
+from nxscli.channelref import ChannelRef
+from nxscli.idata import PluginData, PluginDataCb
+from nxscli.phandler import PluginHandler
+from nxscli.stream_queue import DStreamSubOpts, StreamQueue
+from nxscli.trigger import DTriggerConfig, ETriggerType, TriggerHandler
+from tests.fake_nxscope import FakeNxscope
+
+
+def _block(value: float, rows: int = 1):
+    return DNxscopeStreamBlock(
+        data=np.full((rows, 1), value, dtype=np.float64), meta=None
+    )
+
+
+class _Subs:
+    def __init__(self, factory):
+        self.factory = factory
+        self.queues = []
+        self.unsub = []
+
+    def sub(self, _, opts=None):
+        q = self.factory(opts)
+        self.queues.append(q)
+        return q
+
+    def cb(self):
+        return PluginDataCb(self.sub, self.unsub.append)
+
+
+def _stream(subs: _Subs, nchan: int = 1, opts=None) -> AsyncStream:
+    chans = [DeviceChannel(i, 2, 1, f"chan{i}") for i in range(nchan)]
+    trig = [
+        TriggerHandler(i, DTriggerConfig(ETriggerType.ALWAYS_ON))
+        for i in range(nchan)
+    ]
+    return AsyncStream(PluginData(chans, trig, subs.cb(), opts))
+
+
+@pytest.fixture
+def nxscope():
+    nxscope = FakeNxscope()
+    yield nxscope
+    nxscope.disconnect()
+
+
+def test_astream_phandler(nxscope) -> None:
+    async def run(p):
+        chans = [ChannelRef.physical(0), ChannelRef.physical(1)]
+        async with p.astream(chans) as stream:
+            p.stream_start()
+            got = {}
+            while len(got) < 2:
+                chan, blocks = await stream.__anext__()
+                got[chan] = blocks[0].data.shape[0]
+            assert stream.closed is False
+        assert stream.closed is True
+        return got
+
+    with PluginHandler() as p:
+        p.nxscope_connect(nxscope)
+        got = asyncio.run(run(p))
+        p.stream_stop()
+        assert got == {0: 1200, 1: 1200}
+        # subscriptions were removed on close
+        assert p.get_subscriber_stats() == ()
+
+
+def test_astream_wakeup_from_thread() -> None:
+    subs = _Subs(StreamQueue)
+    stream = _stream(subs, 2)
+
+    async def run():
+        timer = threading.Timer(0.02, subs.queues[1].put, ([_block(5.0)],))
+        timer.start()
+        chan, blocks = await stream.__anext__()
+        timer.join()
+        subs.queues[0].put([_block(1.0)])
+        subs.queues[1].put([_block(2.0)])
+        # one payload per channel and round
+        rest = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        await stream.aclose()
+        return chan, blocks, rest
+
+    chan, blocks, rest = asyncio.run(run())
+    assert chan == 1
+    assert blocks[0].data[0, 0] == 5.0
+    assert [x[0] for x in rest] == [0, 1]
+    assert subs.unsub == subs.queues
+    TriggerHandler.cls_cleanup()
+
+
+def test_astream_closed_loop_wakeup() -> None:
+    subs = _Subs(StreamQueue)
+    stream = _stream(subs)
+
+    async def run():
+        subs.queues[0].put([_block(1.0)])
+        return await stream.__anext__()
+
+    asyncio.run(run())
+    # waker still bound to the closed loop
+    subs.queues[0].put([_block(2.0)])
+    TriggerHandler.cls_cleanup()
+
+
+def test_astream_batch_deadline() -> None:
+    subs = _Subs(StreamQueue)
+    opts = DStreamSubOpts(batch_rows=100, batch_latency=0.02)
+    stream = _stream(subs, opts=opts)
+
+    async def run():
+        subs.queues[0].put([_block(1.0)])
+        subs.queues[0].put([_block(2.0)])
+        item = await stream.__anext__()
+        await stream.aclose()
+        return item
+
+    chan, blocks = asyncio.run(run())
+    assert chan == 0
+    assert blocks[0].data.shape == (2, 1)
+    TriggerHandler.cls_cleanup()
+
+
+def test_astream_poll_plain_queue() -> None:
+    subs = _Subs(lambda _: queue.Queue())
+    stream = _stream(subs)
+    stream.POLL_INTERVAL = 0.01
+
+    async def run():
+        timer = threading.Timer(0.03, subs.queues[0].put, ([_block(3.0)],))
+        timer.start()
+        item = await stream.__anext__()
+        timer.join()
+        await stream.aclose()
+        return item
+
+    chan, blocks = asyncio.run(run())
+    assert blocks[0].data[0, 0] == 3.0
+    TriggerHandler.cls_cleanup()
+
+
+def test_astream_close_wakes_waiter() -> None:
+    subs = _Subs(StreamQueue)
+    stream = _stream(subs)
+
+    async def run():
+        task = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.01)
+        await stream.aclose()
+        with pytest.raises(StopAsyncIteration):
+            await task
+        # closed stream ends iteration
+        return [x async for x in stream]
+
+    assert asyncio.run(run()) == []
+    TriggerHandler.cls_cleanup()
+
+
+def test_astream_cancel() -> None:
+    subs = _Subs(StreamQueue)
+    stream = _stream(subs)
+
+    async def run():
+        task = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await stream.aclose()
+        # stream closed before iteration
+        async with _stream(subs):
+            pass
+
+    asyncio.run(run())
+    assert subs.unsub == subs.queues
+    TriggerHandler.cls_cleanup()
@@ -0,0 +1,229 @@
+import os
+import threading
+
+import numpy as np
+import pytest  # type: ignore
+
+from nxscli.chunkfile import (
+    CHUNK_FILE_HEADER_SIZE,
+    CHUNK_HEADER,
+    CHUNK_TRAILER,
+    ChunkFileReader,
+    ChunkFileWriter,
+    chunk_file_repair,
+)
+from nxscli.filewriter import DFileWriterOpts
+
+
+def _capture(path, opts=None):  # noqa: ANN001
+    writer = ChunkFileWriter(path, opts)
+    ref = {1: [], 7: []}
+    first = {1: 0, 7: 0}
+    for i, rows in enumerate((3, 5, 0, 4, 6)):
+        data1 = np.arange(rows, dtype=np.float32).reshape(-1, 1) + 10 * i
+        data7 = np.arange(3 * rows, dtype=np.int8).reshape(-1, 3) + i
+        writer.write(1, data1, first[1])
+        writer.write(7, data7, first[7], [first[7] + 0.5] if rows else [])
+        ref[1].append(data1)
+        ref[7].append(data7)
+        first[1] += rows
+        first[7] += rows
+    return writer, {k: np.concatenate(v) for k, v in ref.items()}
+
+
+def test_chunkfile_roundtrip(tmp_path) -> None:
+    path = str(tmp_path / "cap.nxc")
+    writer, ref = _capture(path)
+    assert writer.chunks == 8
+    writer.close()
+    writer.close()
+    # the footer is written on close
+    assert writer.stats().bytes_written < os.path.getsize(path)
+
+    reader = ChunkFileReader(path)
+    assert reader.recovered is False
+    assert reader.channels == [1, 7]
+    assert reader.chunks(1) == 4
+    assert reader.span(7) == (0, 18)
+    assert reader.dtype(1) == np.float32
+    assert reader.dtype(7) == np.int8
+    assert reader.vdim(7) == 3
+
+    assert np.array_equal(reader.read(1), ref[1])
+    assert np.array_equal(reader.read(7), ref[7])
+    for start, stop in ((0, 1), (2, 9), (3, 8), (-5, 4), (7, 100), (17, 18)):
+        ref7 = ref[7][max(start, 0) : stop]
+        assert np.array_equal(reader.read(7, start, stop), ref7)
+
+    # a range within one chunk is a view of the file map
+    view = reader.read(7, 4, 7)
+    assert view.base is not None
+    assert view.flags.writeable is False
+
+    empty = reader.read(7, 18, 30)
+    assert empty.shape == (0, 3)
+    assert empty.dtype == np.int8
+
+    assert reader.events(7).tolist() == [0.5, 3.5, 8.5, 12.5]
+    assert reader.events(7, 4, 12).tolist() == [8.5]
+    assert reader.events(1).tolist() == []
+
+    with pytest.raises(KeyError):
+        reader.read(2)
+
+
+def test_chunkfile_write_invalid(tmp_path) -> None:
+    writer = ChunkFileWriter(str(tmp_path / "cap.nxc"))
+    with pytest.raises(ValueError):
+        writer.write(0, np.array([["a"]], dtype=object), 0)
+    writer.close()
+
+
+@pytest.mark.parametrize("cut", [0, 1, CHUNK_HEADER.itemsize + 3])
+def test_chunkfile_killed(tmp_path, cut) -> None:
+    path = str(tmp_path / "cap.nxc")
+    writer, ref = _capture(path)
+    writer.close()
+    reader = ChunkFileReader(path)
+    # the footer is lost and the last chunk torn
+    end = int(reader._chunks[7]["offset"][-1]) + cut
+    del reader
+    with open(path, "r+b") as file:
+        file.truncate(end)
+
+    reader = ChunkFileReader(path)
+    assert reader.recovered is True
+    assert np.array_equal(reader.read(1), ref[1])
+    assert np.array_equal(reader.read(7), ref[7][:12])
+    assert reader.events(7).tolist() == [0.5, 3.5, 8.5]
+    del reader
+
+    assert chunk_file_repair(path) is True
+    assert chunk_file_repair(path) is False
+    reader = ChunkFileReader(path)
+    assert reader.recovered is False
+    assert np.array_equal(reader.read(7), ref[7][:12])
+
+
+def test_chunkfile_damaged(tmp_path) -> None:
+    path = str(tmp_path / "cap.nxc")
+    writer, ref = _capture(path)
+    writer.close()
+    size = os.path.getsize(path)
+
+    # damaged index entry, chunks are scanned
+    with open(path, "r+b") as file:
+        file.seek(size - CHUNK_TRAILER.itemsize - 1)
+        file.write(b"\xff")
+    reader = ChunkFileReader(path)
+    assert reader.recovered is True
+    assert np.array_equal(reader.read(7), ref[7])
+    del reader
+
+    # damaged trailer
+    with open(path, "r+b") as file:
+        file.seek(size - CHUNK_TRAILER.itemsize + 8)
+        file.write(b"\xff")
+    assert ChunkFileReader(path).recovered is True
+
+    # damaged chunk data, later chunks are dropped
+    with open(path, "r+b") as file:
+        file.seek(CHUNK_FILE_HEADER_SIZE + CHUNK_HEADER.itemsize)
+        file.write(b"\xff")
+    reader = ChunkFileReader(path)
+    assert reader.channels == []
+
+
+def test_chunkfile_live(tmp_path) -> None:
+    path = str(tmp_path / "cap.nxc")
+    opts = DFileWriterOpts(buffer_size=64)
+    writer = ChunkFileWriter(path, opts)
+    assert ChunkFileReader(path).channels == []
+    writer.write(0, np.ones((100, 2)), 0)
+    writer._writer.flush()
+    with writer._writer._cond:
+        writer._writer._wait(lambda: writer._writer._pending_bytes == 0)
+    assert os.path.getsize(path) == CHUNK_FILE_HEADER_SIZE + 1664
+    # the file is read while the capture is running
+    assert ChunkFileReader(path).span(0) == (0, 100)
+    writer.close()
+
+
+def test_chunkfile_invalid(tmp_path) -> None:
+    path = tmp_path / "cap.nxc"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        ChunkFileReader(str(path))
+
+    path.write_bytes(b"x" * CHUNK_FILE_HEADER_SIZE)
+    with pytest.raises(ValueError):
+        ChunkFileReader(str(path))
+
+    writer = ChunkFileWriter(str(path))
+    writer.close()
+    data = bytearray(path.read_bytes())
+    data[8] = 2
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        ChunkFileReader(str(path))
+
+
+@pytest.mark.parametrize("name", ["zlib", "lzma", "bz2"])
+def test_chunkfile_codec(tmp_path, name) -> None:
+    path = str(tmp_path / "cap.nxc")
+    writer, ref = _capture(path, DFileWriterOpts(codec=name, level=1))
+    writer.close()
+    stats = writer.codec_stats()
+    assert sorted(stats) == [1, 7]
+    assert stats[1].raw_bytes == ref[1].nbytes
+    assert stats[7].cpu_time >= 0
+    assert writer.stats().codec is not None
+
+    reader = ChunkFileReader(path)
+    assert reader.recovered is False
+    assert reader.chunks(7) == 4
+    assert np.array_equal(reader.read(1), ref[1])
+    assert np.array_equal(reader.read(7, 2, 9), ref[7][2:9])
+    assert reader.events(7).tolist() == [0.5, 3.5, 8.5, 12.5]
+
+    # chunks are independent, the index is rebuilt from compressed chunks
+    end = int(reader._chunks[7]["offset"][-1]) + 1
+    del reader
+    with open(path, "r+b") as file:
+        file.truncate(end)
+    reader = ChunkFileReader(path)
+    assert reader.recovered is True
+    assert np.array_equal(reader.read(7), ref[7][:12])
+
+
+def test_chunkfile_codec_reused_buffer(tmp_path) -> None:
+    path = str(tmp_path / "cap.nxc")
+    writer = ChunkFileWriter(path, DFileWriterOpts(codec="zlib"))
+    encode = writer._encode
+    started = threading.Event()
+
+    def delayed(*args):  # noqa: ANN002, ANN202
+        started.wait()
+        return encode(*args)
+
+    writer._encode = delayed
+    buf = np.arange(8, dtype=np.int16).reshape(8, 1)
+    writer.write(0, buf, 0)
+    # the source buffer is overwritten before the chunk is encoded
+    buf[:] = -1
+    started.set()
+    writer.close()
+    ref = np.arange(8, dtype=np.int16).reshape(8, 1)
+    assert np.array_equal(ChunkFileReader(path).read(0), ref)
+
+
+def test_chunkfile_codec_unknown(tmp_path) -> None:
+    path = str(tmp_path / "cap.nxc")
+    writer = ChunkFileWriter(path)
+    writer.write(0, np.ones((4, 1)), 0)
+    writer.close()
+    with open(path, "r+b") as file:
+        file.seek(CHUNK_FILE_HEADER_SIZE + CHUNK_HEADER.fields["codec"][1])
+        file.write(b"\x7f")
+    with pytest.raises(ValueError):
+        ChunkFileReader(path).read(0)
@@ -0,0 +1,44 @@
+import pytest  # type: ignore
+
+from nxscli.codec import (
+    CODECS,
+    DCodecStats,
+    codec_by_ident,
+    codec_get,
+    codec_stats_log,
+)
+
+
+@pytest.mark.parametrize("name", sorted(CODECS))
+def test_codec_roundtrip(name) -> None:
+    codec = codec_get(name)
+    assert codec_by_ident(codec.ident) is codec
+    assert codec.ext.startswith(".")
+    data = bytes(range(256)) * 64
+    for level in (None, 1):
+        packed = codec.compress(memoryview(data), level)
+        assert len(packed) < len(data)
+        assert codec.decompress(packed) == data
+
+
+@pytest.mark.parametrize("name", ["zlib", "lzma", "bz2"])
+def test_codec_concatenated(name) -> None:
+    codec = codec_get(name)
+    # independent streams of a file are decoded as one stream
+    packed = codec.compress(b"abc", None) + codec.compress(b"def", None)
+    assert codec.decompress(packed) == b"abcdef"
+
+
+def test_codec_invalid() -> None:
+    with pytest.raises(ValueError):
+        codec_get("xxx")
+    with pytest.raises(ValueError):
+        codec_by_ident(0)
+
+
+def test_codec_stats() -> None:
+    assert DCodecStats().ratio == 0.0
+    stats = DCodecStats().add(100, 10, 0.5).add(50, 5, 0.25)
+    assert stats == DCodecStats(150, 15, 0.75)
+    assert stats.ratio == 10.0
+    codec_stats_log("test", stats)
@@ -0,0 +1,71 @@
+import csv
+import io
+
+import numpy as np
+import pytest  # type: ignore
+
+from nxscli.csvfile import csv_block, csv_field
+
+
+def _writer(out: io.StringIO) -> "csv._writer":
+    return csv.writer(
+        out,
+        delimiter=" ",
+        quotechar="|",
+        escapechar="\\",
+        quoting=csv.QUOTE_MINIMAL,
+    )
+
+
+def _reference(data, meta, metastr) -> str:  # noqa: ANN001
+    out = io.StringIO()
+    if meta is None:
+        meta_rows = [() for _ in range(data.shape[0])]
+    elif metastr:
+        meta_rows = [m.tobytes().decode() for m in meta.astype(np.uint8)]
+    else:
+        meta_rows = [tuple(m) for m in meta]
+    _writer(out).writerows(zip((tuple(r) for r in data), meta_rows))
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("text", ["", "a", "a b", "a\\b", "a|b", "x\ny"])
+def test_csv_field(text) -> None:
+    out = io.StringIO()
+    _writer(out).writerow(["x", text])
+    assert out.getvalue() == "x " + csv_field(text) + "\r\n"
+
+
+@pytest.mark.parametrize(
+    "dtype", [np.float16, np.float32, np.float64, np.int8, np.uint64]
+)
+@pytest.mark.parametrize("vdim", [0, 1, 3])
+@pytest.mark.parametrize("mlen", [None, 1, 2])
+def test_csv_block(dtype, vdim, mlen) -> None:
+    rng = np.random.default_rng(0)
+    data = (rng.standard_normal((20, vdim)) * 1000).astype(dtype)
+    meta = None
+    if mlen is not None:
+        meta = rng.integers(0, 255, (20, mlen)).astype(np.uint8)
+    assert csv_block(data, meta) == _reference(data, meta, False)
+    assert csv_block(data[:0], meta) == ""
+
+
+def test_csv_block_object() -> None:
+    data = np.array([[1, "a b"], [2.5, None]], dtype=object)
+    assert csv_block(data, None) == _reference(data, None, False)
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        [b"abcd", b"ab\x00\x00"],
+        [b"a|b ", b"\\ok!", b"zz\r\n"],
+        [b"\xc3\xa9xy", b"abcd"],
+        [b"\xc3\xa9 y", b"abcd"],
+    ],
+)
+def test_csv_block_metastr(rows) -> None:
+    data = np.arange(len(rows), dtype=np.float32).reshape(-1, 1)
+    meta = np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(len(rows), 4)
+    assert csv_block(data, meta, True) == _reference(data, meta, True)
@@ -0,0 +1,235 @@
+import threading
+import time
+
+import pytest  # type: ignore
+
+from nxscli.codec import codec_get
+from nxscli.filewriter import (
+    DFileWriterOpts,
+    DFileWriterStats,
+    EFsyncPolicy,
+    FileWriter,
+    writer_stats_log,
+)
+
+
+def _wait(cond, timeout: float = 5.0) -> bool:  # noqa: ANN001
+    end = time.monotonic() + timeout
+    while not cond() and time.monotonic() < end:
+        time.sleep(0.001)
+    return bool(cond())
+
+
+def test_filewriter(tmp_path) -> None:
+    path = tmp_path / "data.bin"
+    opts = DFileWriterOpts(buffer_size=8, flush_interval=0)
+    writer = FileWriter(str(path), opts, header=b"HDR")
+    assert writer.opts is opts
+    chunks = [b"abc", b"", b"0123456789abcdef01", b"x" * 8, b"yz"]
+    for chunk in chunks:
+        writer.write(chunk)
+    stats = writer.stats()
+    assert stats.buffer_bytes == stats.buffers * 8
+    assert 0.0 <= stats.occupancy <= 1.0
+
+    def finalize(f) -> None:  # noqa: ANN001
+        f.seek(0)
+        f.write(b"hdr")
+
+    writer.close(finalize)
+    # closing again does nothing
+    writer.close()
+    assert path.read_bytes() == b"hdr" + b"".join(chunks)
+
+    stats = writer.stats()
+    assert stats.bytes_written == 3 + sum(len(c) for c in chunks)
+    assert stats.writes == stats.latency.count
+    assert stats.writes >= 4
+    assert stats.pending_bytes == 0
+    assert stats.fsyncs == 0
+    writer_stats_log("test", stats)
+    assert DFileWriterStats().occupancy == 0.0
+
+
+def test_filewriter_flush(tmp_path) -> None:
+    path = tmp_path / "data.bin"
+
+    # partially filled buffer is written after the flush interval
+    opts = DFileWriterOpts(buffer_size=1024, flush_interval=0.01)
+    writer = FileWriter(str(path), opts)
+    writer.write(b"abc")
+    assert _wait(lambda: writer.stats().bytes_written == 3)
+    writer.close()
+
+    # explicit flush
+    opts = DFileWriterOpts(buffer_size=1024, flush_interval=0)
+    writer = FileWriter(str(path), opts)
+    writer.write(b"abcd")
+    writer.flush()
+    assert _wait(lambda: writer.stats().bytes_written == 4)
+    writer.close()
+    assert path.read_bytes() == b"abcd"
+
+
+@pytest.mark.parametrize(
+    "policy,syncs",
+    [
+        (EFsyncPolicy.NEVER, 0),
+        (EFsyncPolicy.CLOSE, 1),
+        (EFsyncPolicy.FLUSH, 3),
+    ],
+)
+def test_filewriter_fsync(tmp_path, policy, syncs) -> None:
+    opts = DFileWriterOpts(buffer_size=4, flush_interval=0, fsync=policy)
+    writer = FileWriter(str(tmp_path / "data.bin"), opts)
+    writer.write(b"01234567")
+    writer.close()
+    assert writer.stats().fsyncs == syncs
+
+
+def test_filewriter_max_buffers(tmp_path) -> None:
+    release = threading.Event()
+
+    class SlowFile:
+        def __init__(self, f) -> None:  # noqa: ANN001
+            self.f = f
+
+        def write(self, data) -> int:  # noqa: ANN001
+            release.wait()
+            return self.f.write(data)
+
+        def __getattr__(self, name: str):  # noqa: ANN204
+            return getattr(self.f, name)
+
+    path = tmp_path / "data.bin"
+    opts = DFileWriterOpts(
+        buffer_size=4, buffers=2, max_buffers=3, flush_interval=0
+    )
+    writer = FileWriter(str(path), opts)
+    writer._file = SlowFile(writer._file)
+    done = threading.Event()
+
+    def capture() -> None:
+        for i in range(10):
+            writer.write(bytes([i]) * 4)
+        done.set()
+
+    # the disk is stalled, buffers are added up to the limit, then the
+    # capture thread waits
+    thread = threading.Thread(target=capture)
+    thread.start()
+    assert _wait(lambda: writer.stats().buffers == 3)
+    assert not done.wait(0.05)
+    stats = writer.stats()
+    assert stats.buffers == 3
+    assert stats.buffer_bytes == 12
+    assert stats.high_water_bytes <= 12
+    release.set()
+    thread.join()
+    writer.close()
+    assert path.read_bytes() == b"".join(bytes([i]) * 4 for i in range(10))
+    stats = writer.stats()
+    assert stats.buffers == 3
+    assert stats.stalls >= 1
+    assert stats.stall_time > 0.0
+
+
+def test_filewriter_max_buffers_job(tmp_path) -> None:
+    release = threading.Event()
+    opts = DFileWriterOpts(
+        buffer_size=4, buffers=2, max_buffers=2, flush_interval=0
+    )
+    writer = FileWriter(str(tmp_path / "data.bin"), opts)
+
+    def job() -> bytes:
+        release.wait()
+        return b"x" * 8
+
+    # jobs hold their input, pending bytes are limited too
+    writer.write_job(job, 8)
+    thread = threading.Thread(target=writer.write_job, args=(job, 8))
+    thread.start()
+    time.sleep(0.05)
+    assert thread.is_alive()
+    release.set()
+    thread.join()
+    writer.close()
+    assert writer.stats().stalls == 1
+    assert writer.stats().bytes_written == 16
+
+
+def test_filewriter_error(tmp_path) -> None:
+    class BadFile:
+        def __init__(self, f) -> None:  # noqa: ANN001
+            self.f = f
+
+        def write(self, data) -> int:  # noqa: ANN001
+            raise OSError("disk full")
+
+        def __getattr__(self, name: str):  # noqa: ANN204
+            return getattr(self.f, name)
+
+    opts = DFileWriterOpts(buffer_size=2, flush_interval=0)
+    writer = FileWriter(str(tmp_path / "data.bin"), opts)
+    writer._file = BadFile(writer._file)
+    # the error is reported by a write after the I/O thread failed
+    with pytest.raises(OSError):
+        while True:
+            writer.write(b"ab")
+    with pytest.raises(OSError):
+        writer.close()
+    assert writer._file.closed
+
+
+@pytest.mark.parametrize("name", ["zlib", "lzma", "bz2"])
+def test_filewriter_codec(tmp_path, name) -> None:
+    path = tmp_path / "data.bin"
+    opts = DFileWriterOpts(buffer_size=1024, flush_interval=0, codec=name)
+    writer = FileWriter(str(path), opts, header=b"HDR")
+    data = [bytes([i % 7]) * 700 for i in range(20)]
+    for chunk in data:
+        writer.write(chunk)
+    writer.close()
+
+    # buffers are independent streams
+    codec = codec_get(name)
+    assert codec.decompress(path.read_bytes()) == b"HDR" + b"".join(data)
+    stats = writer.stats()
+    assert stats.codec is not None
+    assert stats.codec.raw_bytes == 3 + 14000
+    assert stats.codec.bytes == stats.bytes_written == path.stat().st_size
+    assert stats.codec.ratio > 5
+    assert stats.writes == 14
+    writer_stats_log("test", stats)
+
+
+def test_filewriter_write_job(tmp_path) -> None:
+    path = tmp_path / "data.bin"
+    opts = DFileWriterOpts(buffer_size=1024, flush_interval=0)
+    writer = FileWriter(str(path), opts)
+    done = []
+    writer.write(b"ab")
+    writer.write_job(lambda: b"CD", 10, lambda n, cpu: done.append(n))
+    writer.write(b"ef")
+    writer.write_job(lambda: b"GH", 10)
+    writer.close()
+    # jobs are written in order with buffered data
+    assert path.read_bytes() == b"abCDefGH"
+    assert done == [2]
+    stats = writer.stats()
+    assert stats.codec is not None
+    assert stats.codec.raw_bytes == 20
+    assert stats.codec.bytes == 4
+
+
+def test_filewriter_write_job_error(tmp_path) -> None:
+    def job() -> bytes:
+        raise ValueError("encoder error")
+
+    writer = FileWriter(str(tmp_path / "data.bin"))
+    writer.write_job(job, 1)
+    assert _wait(lambda: writer._error is not None)
+    with pytest.raises(ValueError):
+        writer.write_job(job, 1)
+    with pytest.raises(ValueError):
+        writer.close()
@@ -1,12 +1,21 @@
 import queue
+import threading
+import time
 
 import numpy as np
 import pytest  # type: ignore
-from nxslib.dev import DeviceChannel
+from nxslib.dev import DeviceChannel, EDeviceChannelType
 from nxslib.nxscope import DNxscopeStreamBlock
 
 from nxscli.channelref import ChannelRef
-from nxscli.idata import PluginData, PluginDataCb, PluginQueueData
+from nxscli.idata import (
+    PluginData,
+    PluginDataCb,
+    PluginQueueData,
+    channel_dtype,
+)
+from nxscli.iplugin import IPluginFile
+from nxscli.stream_queue import DStreamSubOpts, StreamQueue
 from nxscli.trigger import DTriggerConfig, ETriggerType, TriggerHandler
 
 g_queue: queue.Queue[list] = queue.Queue()
@@ -33,6 +42,7 @@ def test_pluginqueuedata():
     assert qdata.is_numerical == chan.data.is_numerical
     assert qdata.vdim == chan.data.vdim
     assert qdata.mlen == chan.data.mlen
+    assert qdata.dtype == np.dtype(np.uint8)
 
     # no data on queue
     ret = qdata.queue_get(block=False)
@@ -293,3 +303,210 @@ def test_nxsclipdata_find_trigger_prefers_visible_list() -> None:
 
     qdata._queue_deinit()
     TriggerHandler.cls_cleanup()
+
+
+def test_pluginqueuedata_queue_stats() -> None:
+    chan = DeviceChannel(0, 2, 1, "chan0")
+    trig = TriggerHandler(0, DTriggerConfig(ETriggerType.ALWAYS_ON))
+    assert PluginQueueData(queue.Queue(), chan, trig).queue_stats() is None
+
+    subq = StreamQueue()
+    subq.put([DNxscopeStreamBlock(data=np.zeros((2, 1)), meta=None)])
+    stats = PluginQueueData(subq, chan, trig).queue_stats()
+    assert stats is not None
+    assert stats.rows == 2
+    TriggerHandler.cls_cleanup()
+
+
+def test_pluginqueuedata_queue_stamp() -> None:
+    chan = DeviceChannel(0, 2, 1, "chan0")
+    trig = TriggerHandler(0, DTriggerConfig(ETriggerType.ALWAYS_ON))
+    assert PluginQueueData(queue.Queue(), chan, trig).queue_stamp() is None
+
+    subq = StreamQueue()
+    subq.put(
+        [DNxscopeStreamBlock(data=np.zeros((2, 1)), meta=None)], stamp=5.0
+    )
+    qdata = PluginQueueData(subq, chan, trig)
+    assert qdata.queue_stamp() == 0.0
+    subq.get_nowait()
+    assert qdata.queue_stamp() == 5.0
+    TriggerHandler.cls_cleanup()
+
+
+def test_plugindata_passes_stream_opts() -> None:
+    calls = []
+
+    def stream_sub(*args):
+        calls.append(args)
+        return queue.Queue()
+
+    def stream_unsub(_):
+        pass
+
+    channels = [DeviceChannel(0, 2, 1, "chan0")]
+    cb = PluginDataCb(stream_sub, stream_unsub)
+    opts = DStreamSubOpts(max_blocks=8)
+    trig = [TriggerHandler(0, DTriggerConfig(ETriggerType.ALWAYS_ON))]
+    PluginData(channels, trig, cb)
+    PluginData(channels, trig, cb, opts)
+    assert calls == [
+        (ChannelRef.physical(0),),
+        (ChannelRef.physical(0), opts),
+    ]
+    TriggerHandler.cls_cleanup()
+
+
+def test_plugindata_wait_ready() -> None:
+    subs: list[queue.Queue] = []
+
+    def stream_sub(_, opts=None):
+        subs.append(StreamQueue(opts) if len(subs) < 2 else queue.Queue())
+        return subs[-1]
+
+    def stream_unsub(_):
+        pass
+
+    block = DNxscopeStreamBlock(data=np.zeros((2, 1)), meta=None)
+    channels = [DeviceChannel(i, 2, 1, f"chan{i}") for i in range(2)]
+    trig = [
+        TriggerHandler(i, DTriggerConfig(ETriggerType.ALWAYS_ON))
+        for i in range(2)
+    ]
+    cb = PluginDataCb(stream_sub, stream_unsub)
+    opts = DStreamSubOpts(batch_rows=100, batch_latency=0.01)
+    gdata = PluginData(channels, trig, cb, opts)
+    assert gdata.qdlist[0].queue._waker is not None
+
+    # nothing to wait for
+    gdata.wait_ready(0.0)
+
+    # pending batch bounds the wait
+    start = time.perf_counter()
+    subs[1].put([block])
+    gdata.wait_ready(5.0)
+    assert time.perf_counter() - start < 1.0
+    assert gdata.qdlist[1].queue_get(block=False) != []
+
+    # producer wakes the consumer
+    timer = threading.Timer(0.02, subs[0].put, ([block],))
+    timer.start()
+    gdata.wait_ready(5.0)
+    timer.join()
+    assert time.perf_counter() - start < 2.0
+    # data queued, no wait
+    gdata.wait_ready(5.0)
+    gdata.qdlist[0].queue.get(timeout=1.0)
+
+    gdata.close()
+    assert subs[0]._waker is None
+
+    # queues without notification are polled
+    gdata = PluginData(channels, trig, cb)
+    gdata.wait_ready(5.0)
+    subs[-1].put([block])
+    gdata.wait_ready(5.0)
+    assert gdata._poll is True
+    TriggerHandler.cls_cleanup()
+
+
+def test_pluginqueuedata_drain_and_merge() -> None:
+    chan = DeviceChannel(0, 2, 1, "chan0")
+    trig = TriggerHandler(0, DTriggerConfig(ETriggerType.ALWAYS_ON))
+
+    def block(val: float, rows: int = 2) -> DNxscopeStreamBlock:
+        return DNxscopeStreamBlock(data=np.full((rows, 1), val), meta=None)
+
+    subq = StreamQueue()
+    qdata = PluginQueueData(subq, chan, trig, drain_rows=5)
+    for i in range(4):
+        subq.put([block(float(i))], stamp=float(i + 1))
+
+    # merged up to the row cap, stamp of the oldest payload
+    ret = qdata.queue_get(block=False)
+    assert len(ret) == 1
+    assert ret[0].data[:, 0].tolist() == [0.0, 0.0, 1.0, 1.0, 2.0, 2.0]
+    assert qdata.queue_stamp() == 1.0
+    # single pending payload is returned as is
+    ret = qdata.queue_get(block=False)
+    assert ret[0].data[:, 0].tolist() == [3.0, 3.0]
+    assert qdata.queue_stamp() == 4.0
+    assert qdata.queue_get(block=False) == []
+
+    # byte cap, layouts that cannot be merged stay separate blocks
+    qdata = PluginQueueData(subq, chan, trig, drain_bytes=16)
+    subq.put([block(1.0, 1)])
+    subq.put(
+        [DNxscopeStreamBlock(data=np.zeros((1, 1)), meta=np.zeros((1, 1)))]
+    )
+    subq.put([block(2.0)])
+    assert len(qdata.queue_get(block=False)) == 2
+    assert qdata.queue_get(block=False)[0].data[0, 0] == 2.0
+
+    # options are passed from plugin data
+    cb = PluginDataCb(lambda *_: StreamQueue(), lambda _: None)
+    opts = DStreamSubOpts(drain_rows=10, drain_bytes=20)
+    gdata = PluginData([chan], [trig], cb, opts)
+    assert gdata.qdlist[0]._drain_rows == 10
+    assert gdata.qdlist[0]._drain_bytes == 20
+    TriggerHandler.cls_cleanup()
+
+
+def test_pluginqueuedata_rearm_trigger_events() -> None:
+    q = queue.Queue()
+    data = np.asarray([0.0, 1.0, 0.0, 1.0], dtype=float).reshape(-1, 1)
+    q.put([DNxscopeStreamBlock(data=data, meta=None)])
+    chan = DeviceChannel(7, 2, 1, "chan7")
+    dtc = DTriggerConfig(ETriggerType.EDGE_RISING, level=0.5, rearm=True)
+    qdata = PluginQueueData(q, chan, TriggerHandler(7, dtc))
+
+    ret = qdata.queue_get(block=False)
+    assert len(ret) == 2
+    events = qdata.pop_trigger_events()
+    assert [e.sample_index for e in events] == [0.0, 1.0]
+    assert qdata.pop_trigger_events() == []
+    TriggerHandler.cls_cleanup()
+
+
+def test_channel_dtype() -> None:
+    assert channel_dtype(EDeviceChannelType.INT16.value) == np.int16
+    assert channel_dtype(EDeviceChannelType.FLOAT.value) == np.float32
+    # fixed-point channels are scaled to float64 by nxslib
+    assert channel_dtype(EDeviceChannelType.B16.value) == np.float64
+    assert channel_dtype(EDeviceChannelType.USER1.value) == np.float64
+
+
+def test_pluginqueuedata_file_plugins_share_detection() -> None:
+    opts = IPluginFile.STREAM_OPTS
+    chan = DeviceChannel(0, 10, 1, "chan0")
+    dtc = DTriggerConfig(ETriggerType.EDGE_RISING, level=0.5)
+    subs = []
+    for _ in range(2):
+        subq = StreamQueue(opts)
+        trig = TriggerHandler(0, dtc)
+        qdata = PluginQueueData(subq, chan, trig, drain_rows=opts.drain_rows)
+        subs.append((subq, qdata, []))
+    det = subs[0][1]._trigger._detector(dtc)
+
+    def read(qdata, out):  # noqa: ANN001, ANN202
+        # pending batches are delivered after the batch latency
+        while ret := qdata.queue_get(block=True, timeout=0.2):
+            out.extend(ret)
+
+    vals = np.tile(np.array([0.0, 0.0, 1.0]), 100).reshape(-1, 1)
+    for i in range(30):
+        for subq, _, _ in subs:
+            subq.put([DNxscopeStreamBlock(data=vals.copy(), meta=None)])
+        # the first file plugin reads more often, payloads merge differently
+        if i % 10 == 9:
+            _, qdata, out = subs[0]
+            read(qdata, out)
+    _, qdata, out = subs[1]
+    read(qdata, out)
+
+    # every sample is evaluated once for both subscribers
+    assert det.evaluated_rows == 30 * vals.shape[0]
+    first = np.concatenate([b.data for b in subs[0][2]])
+    second = np.concatenate([b.data for b in subs[1][2]])
+    assert np.array_equal(first, second)
+    TriggerHandler.cls_cleanup()
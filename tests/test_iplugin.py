@@ -1,6 +1,8 @@
 import pytest  # type: ignore
 
-from nxscli.iplugin import EPluginType, IPlugin
+from nxscli.codec import DCodecStats
+from nxscli.filewriter import DFileWriterOpts
+from nxscli.iplugin import EPluginType, IPlugin, IPluginFile
 
 
 class XTestPlugin1(IPlugin):
@@ -51,3 +53,49 @@ def test_nxscliplugin_init():
 
     # at default plugins return None for inputhook
     assert p1.get_inputhook() is None
+
+
+class XTestPluginFile(IPluginFile):
+    @property
+    def stream(self) -> bool:
+        return True
+
+    def stop(self):
+        pass
+
+    def data_wait(self):
+        return True
+
+    def start(self, kwargs):
+        return True
+
+    def result(self):
+        return
+
+
+def test_nxscliplugin_file():
+    p1 = XTestPluginFile()
+    assert p1.ptype == EPluginType.FILE
+    assert p1.stream is True
+    p1.stop()
+    assert p1.data_wait() is True
+    assert p1.start({}) is True
+    p1.result()
+    assert p1._writer_opts == DFileWriterOpts()
+    # file plugins share batched stream options
+    assert p1.STREAM_OPTS is IPluginFile.STREAM_OPTS
+    assert p1.STREAM_OPTS.batch_rows > 0
+    # no files written
+    assert p1.writer_stats() == []
+    p1._writer_stats_log()
+    assert p1._file_suffix(".csv") == ".csv"
+    p1._writer_opts = DFileWriterOpts(codec="lzma")
+    assert p1._file_suffix(".csv") == ".csv.xz"
+
+    # compression counters are summed over closed files
+    p1._codec_account("0", None)
+    assert p1.codec_stats() == {}
+    p1._codec_account("0", DCodecStats(10, 2, 0.5))
+    p1._codec_account("0", DCodecStats(20, 4, 0.5))
+    assert p1.codec_stats() == {"0": DCodecStats(30, 6, 1.0)}
+    p1._writer_stats_log()
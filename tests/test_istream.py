@@ -1,6 +1,16 @@
-from nxscli.istream import IServiceRegistry, IStreamProvider
+from nxscli.istream import (
+    IServiceRegistry,
+    IStreamProvider,
+    IStreamStatsProvider,
+)
+from nxscli.stream_hub import SharedStreamProvider
 
 
 def test_istream_protocols_import() -> None:
     assert IStreamProvider is not None
     assert IServiceRegistry is not None
+
+
+def test_istream_stats_provider() -> None:
+    assert isinstance(SharedStreamProvider(), IStreamStatsProvider)
+    assert not isinstance(object(), IStreamStatsProvider)
@@ -0,0 +1,85 @@
+import numpy as np
+from nxslib.nxscope import DNxscopeStreamBlock
+
+from nxscli.metrics import (
+    DHistogramSnapshot,
+    LatencyHistogram,
+    MetricsRegistry,
+    StageMetrics,
+    payload_rows,
+)
+
+
+def _block(rows: int) -> DNxscopeStreamBlock:
+    return DNxscopeStreamBlock(data=np.zeros((rows, 1)), meta=None)
+
+
+def test_payload_rows() -> None:
+    assert payload_rows([]) == 0
+    assert payload_rows([_block(2), _block(3)]) == 5
+
+
+def test_latency_histogram() -> None:
+    hist = LatencyHistogram()
+    assert hist.snapshot() == DHistogramSnapshot(
+        buckets=(0,) * LatencyHistogram.BUCKETS
+    )
+    hist.observe(0.0)
+    hist.observe(0.5e-6)
+    hist.observe(3e-6)
+    hist.observe(100.0)
+    snap = hist.snapshot()
+    assert snap.count == 4
+    assert snap.maximum == 100.0
+    assert snap.buckets[0] == 2
+    assert snap.buckets[2] == 1
+    assert snap.buckets[-1] == 1
+    assert snap.mean == snap.total / 4
+    assert snap.percentile(50) == 1e-6
+    assert snap.percentile(75) == 4e-6
+    assert snap.percentile(100) == 100.0
+
+
+def test_histogram_snapshot_empty() -> None:
+    snap = DHistogramSnapshot()
+    assert snap.mean == 0.0
+    assert snap.percentile(99) == 0.0
+    # rank above all buckets falls back to maximum
+    snap = DHistogramSnapshot(count=2, maximum=1.0, buckets=(1,))
+    assert snap.percentile(100) == 1.0
+
+
+def test_stage_metrics() -> None:
+    stage = StageMetrics("hub")
+    assert stage.name == "hub"
+    stage.data_in([_block(2), _block(3)])
+    stage.data_out([_block(4)])
+    stage.queue_depth(3)
+    stage.queue_depth(1)
+    stage.handler_time(1e-5)
+    stage.latency(2e-3)
+
+    snap = stage.snapshot()
+    assert snap.name == "hub"
+    assert (snap.blocks_in, snap.rows_in) == (2, 5)
+    assert (snap.blocks_out, snap.rows_out) == (1, 4)
+    assert snap.queue_high_water == 3
+    assert snap.handler_time.count == 1
+    assert snap.latency.maximum == 2e-3
+
+    stage.reset()
+    snap = stage.snapshot()
+    assert snap.rows_in == 0
+    assert snap.latency.count == 0
+
+
+def test_metrics_registry() -> None:
+    reg = MetricsRegistry()
+    stage = reg.stage("a")
+    assert reg.stage("a") is stage
+    stage.data_in([_block(1)])
+    assert reg.snapshot()["a"].rows_in == 1
+
+    reg.reset()
+    assert reg.stage("a") is stage
+    assert reg.snapshot()["a"].rows_in == 0
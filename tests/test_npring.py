@@ -0,0 +1,171 @@
+import ast
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest  # type: ignore
+
+from nxscli.filewriter import DFileWriterOpts, EFsyncPolicy
+from nxscli.npring import (
+    RING_HEADER,
+    RING_HEADER_SIZE,
+    NpRingReader,
+    NpRingWriter,
+)
+
+
+def test_npringwriter(tmp_path) -> None:
+    path = str(tmp_path / "ring.dat")
+    writer = NpRingWriter(path, 2, 5, dtype=np.int16)
+    reader = NpRingReader(path)
+    assert reader.capacity == 5
+    assert reader.vdim == 2
+    assert reader.dtype == np.int16
+    assert reader.index == 0
+    assert reader.latest(3).shape == (0, 2)
+
+    chunks = [
+        np.arange(2 * rows).reshape(rows, 2) + 100 * i
+        for i, rows in enumerate((3, 0, 4, 12, 1))
+    ]
+    ref = np.concatenate(chunks).astype(np.int16)
+    written = 0
+    for chunk in chunks:
+        writer.write(chunk)
+        written += chunk.shape[0]
+        assert writer.index == reader.index == written
+        assert reader.seq % 2 == 0
+        # latest rows are a view of the file map
+        view = reader.latest(4)
+        assert view.base is not None
+        assert np.array_equal(view, ref[max(0, written - 4) : written])
+        # both ring halves hold the same rows
+        assert np.array_equal(writer.data[:5], writer.data[5:])
+
+    rows, index = reader.read(100)
+    assert index == 20
+    assert np.array_equal(rows, ref[-5:])
+    writer.close()
+
+
+def test_npringreader_raw_memmap(tmp_path) -> None:
+    path = str(tmp_path / "ring.dat")
+    writer = NpRingWriter(path, 3, 4, dtype=np.float32)
+    data = np.random.rand(6, 3)
+    writer.write(data)
+
+    # attach with plain Numpy from another process
+    code = (
+        "import numpy as np, sys;"
+        f"hdr = np.memmap(sys.argv[1], np.dtype({RING_HEADER.descr!r}), "
+        "'r', shape=(1,));"
+        "buf = np.memmap(sys.argv[1], np.float32, 'r', "
+        f"offset={RING_HEADER_SIZE}, shape=(8, 3));"
+        "end = int(hdr['index'][0]) % 4 + 4;"
+        "print(buf[end - 4 : end].tolist())"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code, path],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert np.array_equal(
+        np.array(ast.literal_eval(out), dtype=np.float32),
+        data[-4:].astype(np.float32),
+    )
+
+
+def test_npringreader_retry(tmp_path) -> None:
+    path = str(tmp_path / "ring.dat")
+    writer = NpRingWriter(path, 1, 4)
+    writer.write(np.array([[1.0], [2.0]]))
+
+    class Reader(NpRingReader):
+        # write in progress, then a write completed while reading
+        SEQ = [1] * 12 + [2, 4, 4, 4]
+
+        @property
+        def seq(self) -> int:
+            return self.SEQ.pop(0)
+
+    reader = Reader(path)
+    rows, index = reader.read(2)
+    assert index == 2
+    assert rows.tolist() == [[1.0], [2.0]]
+    assert Reader.SEQ == []
+
+
+def test_npringreader_torn(tmp_path) -> None:
+    path = str(tmp_path / "ring.dat")
+    writer = NpRingWriter(path, 1, 4)
+    writer.write(np.array([[1.0]]))
+    writer.close()
+
+    # the writer was killed in the middle of a write
+    hdr = np.memmap(path, RING_HEADER, "r+", shape=(1,))
+    hdr["seq"][0] += 1
+    hdr.flush()
+
+    reader = NpRingReader(path)
+    assert reader.seq % 2 == 1
+    start = time.monotonic()
+    with pytest.raises(TimeoutError, match="torn"):
+        reader.read(1, timeout=0.05)
+    assert 0.05 <= time.monotonic() - start < 1.0
+
+    reader.READ_TIMEOUT = 0.01
+    with pytest.raises(TimeoutError):
+        reader.read(1)
+
+
+def test_npringreader_invalid(tmp_path) -> None:
+    path = tmp_path / "ring.dat"
+    path.write_bytes(b"\x00" * 16)
+    with pytest.raises(ValueError):
+        NpRingReader(str(path))
+
+    path.write_bytes(b"\x00" * RING_HEADER_SIZE)
+    with pytest.raises(ValueError):
+        NpRingReader(str(path))
+
+    NpRingWriter(str(path), 1, 1)
+    hdr = np.memmap(str(path), dtype=RING_HEADER, shape=(1,))
+    hdr["version"] = 99
+    hdr.flush()
+    with pytest.raises(ValueError):
+        NpRingReader(str(path))
+
+
+@pytest.mark.parametrize(
+    "policy,syncs",
+    [(EFsyncPolicy.NEVER, 0), (EFsyncPolicy.CLOSE, 1)],
+)
+def test_npringwriter_sync_close(tmp_path, policy, syncs) -> None:
+    opts = DFileWriterOpts(fsync=policy)
+    writer = NpRingWriter(str(tmp_path / "ring.dat"), 1, 4, opts=opts)
+    writer.write(np.ones((6, 1)))
+    assert writer._thread is None
+    stats = writer.stats()
+    assert stats.pending_bytes == 2 * 4 * 8
+    assert stats.bytes_written == 6 * 8
+    assert stats.buffer_bytes == 2 * 4 * 8
+    writer.close()
+    assert writer.stats().fsyncs == syncs
+
+
+def test_npringwriter_sync_flush(tmp_path) -> None:
+    opts = DFileWriterOpts(flush_interval=0.01, fsync=EFsyncPolicy.FLUSH)
+    writer = NpRingWriter(str(tmp_path / "ring.dat"), 1, 4, opts=opts)
+    writer.write(np.ones((2, 1)))
+    end = time.monotonic() + 5.0
+    while writer.stats().fsyncs == 0 and time.monotonic() < end:
+        time.sleep(0.001)
+    stats = writer.stats()
+    assert stats.fsyncs == 1
+    assert stats.pending_bytes == 0
+    assert stats.high_water_bytes == 2 * 2 * 8
+    assert stats.latency.count == 1
+    writer.close()
+    assert writer.stats().fsyncs == 2
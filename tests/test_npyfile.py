@@ -0,0 +1,142 @@
+import bz2
+import gzip
+import lzma
+import os
+
+import numpy as np
+import pytest  # type: ignore
+
+from nxscli.filewriter import DFileWriterOpts, EFsyncPolicy
+from nxscli.npyfile import NpyStreamWriter, npy_file_repair, npy_header
+
+
+def test_npy_header() -> None:
+    hdr = npy_header((2, 10), np.dtype(np.float32), True, 128)
+    assert len(hdr) == 128
+    assert hdr.endswith(b"\n")
+
+    with pytest.raises(ValueError):
+        npy_header((2, 10), np.dtype(np.float32), True, 32)
+
+
+@pytest.mark.parametrize("transposed", [True, False])
+def test_npystreamwriter(tmp_path, transposed) -> None:
+    path = str(tmp_path / "data.npy")
+    writer = NpyStreamWriter(
+        path, 2, dtype=np.float32, buffer_rows=5, transposed=transposed
+    )
+    chunks = [np.random.rand(rows, 2) for rows in (3, 7, 0, 11, 1)]
+    for chunk in chunks:
+        writer.write(chunk)
+    assert writer.rows == 22
+    writer.close()
+    # closing again does nothing
+    writer.close()
+
+    ref = np.concatenate(chunks).astype(np.float32)
+    arr = np.load(path)
+    assert arr.dtype == np.float32
+    if transposed:
+        assert np.array_equal(arr, ref.T)
+    else:
+        assert np.array_equal(arr, ref)
+    assert np.array_equal(np.load(path, mmap_mode="r"), arr)
+
+
+def test_npystreamwriter_empty(tmp_path) -> None:
+    path = str(tmp_path / "data.npy")
+    writer = NpyStreamWriter(path, 0, buffer_rows=2)
+    writer.write(np.empty((3, 0)))
+    writer.close()
+    assert np.load(path).shape == (0, 3)
+
+
+def test_npystreamwriter_write_error(tmp_path) -> None:
+    class BadFile:
+        def __init__(self, f) -> None:  # noqa: ANN001
+            self.f = f
+
+        def write(self, data) -> int:  # noqa: ANN001
+            raise OSError("disk full")
+
+        def __getattr__(self, name: str):  # noqa: ANN204
+            return getattr(self.f, name)
+
+    path = str(tmp_path / "data.npy")
+    writer = NpyStreamWriter(path, 1, buffer_rows=2)
+    writer._writer._file = BadFile(writer._writer._file)
+    writer.write(np.zeros((2, 1)))
+    # the error is reported by a write after the I/O thread failed
+    with pytest.raises(OSError):
+        while True:
+            writer.write(np.zeros((2, 1)))
+    with pytest.raises(OSError):
+        writer.close()
+    assert writer._writer._file.closed
+
+
+@pytest.mark.parametrize(
+    "name,fopen",
+    [("zlib", gzip.open), ("lzma", lzma.open), ("bz2", bz2.open)],
+)
+@pytest.mark.parametrize("fsync", [EFsyncPolicy.NEVER, EFsyncPolicy.CLOSE])
+def test_npystreamwriter_codec(tmp_path, name, fopen, fsync) -> None:
+    path = tmp_path / "data.npy.z"
+    opts = DFileWriterOpts(codec=name, fsync=fsync)
+    writer = NpyStreamWriter(str(path), 3, np.int16, buffer_rows=4, opts=opts)
+    chunks = [np.arange(3 * rows).reshape(rows, 3) for rows in (5, 0, 9)]
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.close()
+    writer.close()
+
+    # the compressed header is placed before the rows on close
+    assert os.listdir(tmp_path) == ["data.npy.z"]
+    with fopen(path) as file:
+        arr = np.load(file)
+    assert np.array_equal(arr, np.concatenate(chunks).T)
+    assert writer.stats().codec.ratio > 0
+
+
+@pytest.mark.parametrize(
+    "ext,fopen", [(".gz", gzip.open), (".xz", lzma.open), (".bz2", bz2.open)]
+)
+@pytest.mark.parametrize("tail", [b"", b"garbage"])
+def test_npy_file_repair(tmp_path, ext, fopen, tail) -> None:
+    path = str(tmp_path / ("data.npy" + ext))
+    name = {".gz": "zlib", ".xz": "lzma", ".bz2": "bz2"}[ext]
+    opts = DFileWriterOpts(codec=name, flush_interval=0)
+    writer = NpyStreamWriter(path, 2, np.int16, buffer_rows=4, opts=opts)
+    data = np.arange(2 * 14, dtype=np.int16).reshape(14, 2)
+    writer.write(data)
+    # the capture is killed before the header is patched
+    writer._writer.close()
+    with open(path + ".part", "rb") as f:
+        part = f.read()
+
+    # the last stream of 2 rows is torn
+    with open(path + ".part", "wb") as f:
+        f.write(part[:-4] + tail)
+    assert npy_file_repair(path) == 12
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+    with fopen(path) as file:
+        arr = np.load(file)
+    assert np.array_equal(arr, data[:12].T)
+
+
+def test_npy_file_repair_invalid(tmp_path) -> None:
+    with pytest.raises(ValueError):
+        npy_file_repair(str(tmp_path / "data.npy"))
+
+    path = str(tmp_path / "data.npy.gz")
+    with open(path + ".part", "wb") as f:
+        f.write(b"\x1f\x8b")
+    with pytest.raises(ValueError):
+        npy_file_repair(path)
+
+    # rows without values
+    opts = DFileWriterOpts(codec="zlib")
+    NpyStreamWriter(path, 0, opts=opts)._writer.close()
+    assert npy_file_repair(path) == 0
+    with gzip.open(path) as file:
+        assert np.load(file).shape == (0, 0)
@@ -17,6 +17,7 @@ from nxscli.iplugin import (
 )
 from nxscli.phandler import PluginHandler
 from nxscli.plugins.none import PluginNone
+from nxscli.stream_queue import DStreamSubOpts, EOverflowPolicy, StreamQueue
 from nxscli.trigger import DTriggerConfigReq, TriggerHandler
 from tests.fake_nxscope import FakeNxscope
 
@@ -983,11 +984,16 @@ def test_pluginthread_common_not_done_path() -> None:
                 )
             ]
 
+        def queue_stamp(self):
+            return None
+
     plugin = PluginNone()
     plugin._samples = 2
     plugin._nostop = False
     plugin._datalen = [0]
-    plugin._plugindata = SimpleNamespace(qdlist=[_QD()])
+    plugin._plugindata = SimpleNamespace(
+        qdlist=[_QD()], wait_ready=lambda timeout: None
+    )
 
     plugin._thread_common()
     assert plugin._datalen == [1]
@@ -1019,3 +1025,31 @@ def test_iplugin_get_plot_handler_default():
     """Test that IPlugin.get_plot_handler() returns None by default."""
     plugin = MockPlugin1()
     assert plugin.get_plot_handler() is None
+
+
+def test_phandler_stream_stats_with_subscribers(nxscope) -> None:
+    with PluginHandler() as p:
+        # provider without optional stream_stats API
+        p.stream_provider_add(_MockProvider())
+        p.nxscope_connect(nxscope)
+
+        opts = DStreamSubOpts(max_blocks=4, policy=EOverflowPolicy.DROP_NEWEST)
+        subq = p.stream_sub(ChannelRef.physical(1), opts)
+        assert isinstance(subq, StreamQueue)
+        assert subq.opts is opts
+
+        # NxScope stream stats are returned unchanged
+        stats = p.get_stream_stats()
+        assert stats.connected is True
+        assert not hasattr(stats, "subscribers")
+        subs = p.get_subscriber_stats()
+        assert len(subs) == 1
+        assert subs[0].channel == "1"
+        assert subs[0].policy is EOverflowPolicy.DROP_NEWEST
+
+        snap = p.get_metrics()
+        assert snap.subscribers == subs
+        assert "hub" in snap.stages
+
+        p.stream_unsub(subq)
+        assert p.get_subscriber_stats() == ()
@@ -3,6 +3,7 @@ import pytest
 from nxslib.nxscope import DNxscopeStreamBlock
 
 from nxscli.pluginthr import PluginThread
+from nxscli.stream_queue import DStreamQueueStats
 
 
 class _ThreadStub:
@@ -13,6 +14,15 @@ class _ThreadStub:
         self.stopped = True
 
 
+class _PD:
+    def __init__(self, qdlist) -> None:  # noqa: ANN001
+        self.qdlist = qdlist
+        self.waits: list[float] = []
+
+    def wait_ready(self, timeout: float) -> None:
+        self.waits.append(timeout)
+
+
 class _PluginThreadImpl(PluginThread):
     def __init__(self) -> None:
         super().__init__()
@@ -34,11 +44,15 @@ def test_pluginthread_block_payload_uses_queue_get() -> None:
         def queue_get(
             self, block: bool = True, timeout: float = 1.0
         ):  # noqa: ANN001, ARG002
+            assert block is False
             return [DNxscopeStreamBlock(data=np.array([[1.0]]), meta=None)]
 
+        def queue_stamp(self):  # noqa: ANN201
+            return 0.0
+
     plug = _PluginThreadImpl()
     plug._thread = _ThreadStub()
-    plug._plugindata = type("PD", (), {"qdlist": [PData()]})()
+    plug._plugindata = _PD([PData()])
     plug._samples = 1
     plug._nostop = False
     plug._datalen = [0]
@@ -48,6 +62,7 @@ def test_pluginthread_block_payload_uses_queue_get() -> None:
     assert len(plug.handled) == 1
     assert plug._datalen == [1]
     assert plug._thread.stopped is True
+    assert plug._plugindata.waits == [PluginThread.WAIT_TIMEOUT]
 
 
 def test_pluginthread_block_payload_without_converter_uses_queue_get() -> None:
@@ -57,9 +72,12 @@ def test_pluginthread_block_payload_without_converter_uses_queue_get() -> None:
         ):  # noqa: ANN001, ARG002
             return [DNxscopeStreamBlock(data=np.array([[1.0]]), meta=None)]
 
+        def queue_stamp(self):  # noqa: ANN201
+            return None
+
     plug = _PluginThreadImpl()
     plug._thread = _ThreadStub()
-    plug._plugindata = type("PD", (), {"qdlist": [PData()]})()
+    plug._plugindata = _PD([PData()])
     plug._samples = 1
     plug._nostop = False
     plug._datalen = [0]
@@ -71,19 +89,56 @@ def test_pluginthread_block_payload_without_converter_uses_queue_get() -> None:
     assert plug._thread.stopped is True
 
 
-def test_pluginthread_block_rows_handles_none_meta() -> None:
-    class _PData:
-        pass
+def test_pluginthread_block_columns() -> None:
+    plug = _PluginThreadImpl()
+    plug._samples = 5
+    plug._nostop = False
+    plug._datalen = [0]
 
+    first = DNxscopeStreamBlock(data=np.array([[1.0], [2.0]]), meta=None)
+    cols = list(plug._block_columns([first], 0))
+    assert len(cols) == 1
+    assert cols[0].start == 0
+    assert cols[0].rows == 2
+    assert cols[0].meta is None
+    # single block is not copied
+    assert np.shares_memory(cols[0].data, first.data)
+    assert plug._datalen == [2]
+
+    # one view per block, cut at the sample limit
+    meta = np.array([[7], [8]], dtype=np.uint8)
+    blocks = [
+        DNxscopeStreamBlock(data=np.array([[3.0], [4.0]]), meta=meta),
+        DNxscopeStreamBlock(data=np.array([[5.0], [6.0]]), meta=meta),
+    ]
+    cols = list(plug._block_columns(blocks, 0))
+    assert [c.start for c in cols] == [2, 4]
+    assert [c.data[:, 0].tolist() for c in cols] == [[3.0, 4.0], [5.0]]
+    assert np.shares_memory(cols[1].data, blocks[1].data)
+    assert cols[1].meta is not None
+    assert cols[1].meta[:, 0].tolist() == [7]
+    assert plug._datalen == [5]
+    assert list(plug._block_columns(blocks, 0)) == []
+
+    # no limit in nostop mode
+    plug._nostop = True
+    cols = list(plug._block_columns(blocks, 0))
+    assert [c.rows for c in cols] == [2, 2]
+    assert cols[0].start == 5
+
+
+def test_pluginthread_block_rows_deprecated() -> None:
     plug = _PluginThreadImpl()
-    rows = list(
-        plug._block_rows(
-            [DNxscopeStreamBlock(data=np.array([[1.0], [2.0]]), meta=None)],
-            _PData(),
-            0,
-        )
-    )
-    assert rows == [((1.0,), ()), ((2.0,), ())]
+    plug._datalen = [0]
+    meta = np.array([[7, 8]], dtype=np.uint8)
+    blocks = [
+        DNxscopeStreamBlock(data=np.array([[1.0], [2.0]]), meta=None),
+        DNxscopeStreamBlock(data=np.array([[3.0, 4.0]]), meta=meta),
+    ]
+    with pytest.warns(DeprecationWarning):
+        rows = list(plug._block_rows(blocks, None, 0))
+    assert rows == [((1.0,), ()), ((2.0,), ()), ((3.0, 4.0), (7, 8))]
+    assert plug._datalen == [0]
 
 
 def test_pluginthread_non_block_payload_raises() -> None:
@@ -95,7 +150,7 @@ def test_pluginthread_non_block_payload_raises() -> None:
 
     plug = _PluginThreadImpl()
     plug._thread = _ThreadStub()
-    plug._plugindata = type("PD", (), {"qdlist": [PData()]})()
+    plug._plugindata = _PD([PData()])
     plug._samples = 1
     plug._nostop = False
     plug._datalen = [0]
@@ -113,7 +168,7 @@ def test_pluginthread_empty_payload_is_ignored() -> None:
 
     plug = _PluginThreadImpl()
     plug._thread = _ThreadStub()
-    plug._plugindata = type("PD", (), {"qdlist": [PData()]})()
+    plug._plugindata = _PD([PData()])
     plug._samples = 1
     plug._nostop = False
     plug._datalen = [0]
@@ -122,3 +177,22 @@ def test_pluginthread_empty_payload_is_ignored() -> None:
 
     assert plug.handled == []
     assert plug._datalen == [0]
+
+
+def test_pluginthread_final_logs_dropped_blocks() -> None:
+    class PData:
+        def __init__(self, stats):  # noqa: ANN001
+            self._stats = stats
+
+        def queue_stats(self):
+            return self._stats
+
+    dropped = DStreamQueueStats(dropped_blocks=2, dropped_rows=5)
+    plug = _PluginThreadImpl()
+    plug._plugindata = type(
+        "PD",
+        (),
+        {"qdlist": [PData(None), PData(DStreamQueueStats()), PData(dropped)]},
+    )()
+    plug._final_common()
+    assert plug._ready.is_set()
@@ -0,0 +1,419 @@
+import multiprocessing
+import queue
+import threading
+
+import numpy as np
+import pytest  # type: ignore
+from nxslib.dev import DeviceChannel
+from nxslib.nxscope import DNxscopeStreamBlock
+
+from nxscli.channelref import ChannelRef
+from nxscli.iplugin import (
+    DPluginDescription,
+    EPluginType,
+    IPlugin,
+    IPluginNone,
+)
+from nxscli.phandler import PluginHandler
+from nxscli.plugins.none import PluginNone
+from nxscli.procplugin import (
+    PluginProcess,
+    ProcessPluginHandler,
+    ShmRing,
+    _plugin_command,
+    _ShmFeeder,
+    plugin_process_main,
+)
+from nxscli.stream_queue import DStreamSubOpts
+from nxscli.trigger import (
+    DTriggerConfig,
+    DTriggerConfigReq,
+    ETriggerType,
+    TriggerHandler,
+)
+from tests.fake_nxscope import FakeNxscope
+
+
+def _block(rows: int, val: float = 0.0, meta: bool = False):
+    data = np.full((rows, 2), val)
+    mdata = np.arange(rows, dtype=np.uint8).reshape(-1, 1) if meta else None
+    return DNxscopeStreamBlock(data=data, meta=mdata)
+
+
+def _alive() -> bool:
+    return True
+
+
+def _dead() -> bool:
+    return False
+
+
+class PluginFail(IPluginNone):
+    def __init__(self):
+        super().__init__()
+
+    @property
+    def stream(self) -> bool:
+        return False
+
+    def stop(self) -> None:
+        pass
+
+    def start(self, _) -> bool:
+        return False
+
+    def data_wait(self, timeout=0.0) -> bool:
+        return True
+
+    def result(self):
+        return lambda: None
+
+
+class PluginPlot(PluginFail):
+    PTYPE = EPluginType.STATIC
+
+
+@pytest.fixture
+def nxscope():
+    nxscope = FakeNxscope()
+    yield nxscope
+    nxscope.disconnect()
+
+
+def test_shmring_write_read() -> None:
+    writer = ShmRing(1024)
+    reader = ShmRing(1024, writer.name)
+    assert writer.size == 1024
+
+    payload = [_block(2, 1.0, meta=True), _block(3, 2.0)]
+    assert writer.payload_bytes(payload) == 3 * 64
+    ret = writer.write(payload, _alive)
+    assert ret is not None
+    end, descs = ret
+    assert end == 3 * 64
+
+    got = reader.read(end, descs)
+    assert len(got) == 2
+    assert np.array_equal(got[0].data, payload[0].data)
+    assert np.array_equal(got[0].meta, payload[0].meta)
+    assert got[1].meta is None
+    assert np.array_equal(got[1].data, payload[1].data)
+
+    reader.close()
+    writer.close()
+    # second close is no-op
+    writer.close()
+
+
+def test_shmring_wrap_and_full() -> None:
+    writer = ShmRing(256)
+    reader = ShmRing(256, writer.name)
+
+    # 16 bytes per row
+    first = writer.write([_block(8, 1.0)], _alive)
+    second = writer.write([_block(4, 2.0)], _alive)
+    assert first is not None and second is not None
+
+    # no room for payload and the writer is stopped
+    assert writer.write([_block(8, 3.0)], _dead) is None
+
+    reader.read(*first)
+    # payload does not fit at the tail, ring wraps to the start
+    third = writer.write([_block(8, 3.0)], _alive)
+    assert third is not None
+    assert third[1][0][0][0] == 0
+    reader.read(*second)
+    assert reader.read(*third)[0].data[0, 0] == 3.0
+
+    with pytest.raises(ValueError):
+        writer.write([_block(100)], _alive)
+
+    objs = DNxscopeStreamBlock(
+        data=np.array([[None]], dtype=object), meta=None
+    )
+    with pytest.raises(ValueError):
+        writer.write([objs], _alive)
+
+    reader.close()
+    writer.close()
+
+
+def test_shmring_writer_waits_for_reader() -> None:
+    writer = ShmRing(128)
+    reader = ShmRing(128, writer.name)
+    first = writer.write([_block(8)], _alive)
+    assert first is not None
+
+    timer = threading.Timer(0.02, reader.read, first)
+    timer.start()
+    assert writer.write([_block(8)], _alive) is not None
+    timer.join()
+
+    reader.close()
+    writer.close()
+
+
+def test_shm_feeder() -> None:
+    ring = ShmRing(128)
+    reader = ShmRing(128, ring.name)
+    subq: queue.Queue = queue.Queue()
+    descq: queue.Queue = queue.Queue()
+    feeder = _ShmFeeder(3, subq, ring, descq)
+    assert feeder.subq is subq
+
+    # empty queue and empty payload
+    feeder._thread_common()
+    subq.put([])
+    feeder._thread_common()
+    assert descq.empty()
+
+    subq.put([_block(2, 1.0)])
+    feeder._thread_common()
+    idx, end, descs = descq.get_nowait()
+    assert idx == 3
+    assert reader.read(end, descs)[0].data[0, 0] == 1.0
+
+    # payload larger than ring is passed block by block
+    subq.put([_block(8, 2.0), _block(8, 3.0)])
+    feeder._started = True
+    timer = threading.Timer(0.02, lambda: reader.read(*descq.get_nowait()[1:]))
+    timer.start()
+    feeder._thread_common()
+    timer.join()
+    _, end, descs = descq.get_nowait()
+    assert reader.read(end, descs)[0].data[0, 0] == 3.0
+
+    # stopped feeder gives up on full ring
+    feeder._started = False
+    ring.write([_block(8)], _alive)
+    subq.put([_block(8)])
+    feeder._thread_common()
+    assert descq.empty()
+
+    feeder.start()
+    feeder.stop()
+    reader.close()
+    ring.close()
+
+
+def test_process_plugin_handler() -> None:
+    ring = ShmRing(1024)
+    chans = [DeviceChannel(0, 2, 2, "chan0")]
+    refs = [ChannelRef.physical(0), ChannelRef.physical(5)]
+    triggers = [
+        (
+            0,
+            DTriggerConfig(
+                ETriggerType.ALWAYS_ON,
+                srcchan=5,
+                source_ref=ChannelRef.physical(5),
+            ),
+        )
+    ]
+    descq: queue.Queue = queue.Queue()
+    handler = ProcessPluginHandler(
+        chans, triggers, refs, [ShmRing(1024, ring.name)] * 2, descq
+    )
+
+    assert handler.chanlist_plugin(None) is chans
+    trig = handler.triggers_plugin(chans, None)
+    assert len(trig) == 1
+    assert trig[0].chan == 0
+    # hidden source is kept alive by the handler
+    del trig
+    assert TriggerHandler.find_by_channel(5) is handler._hidden[0]
+    # hidden source handler is reused
+    trig2 = handler.triggers_plugin(chans, None)
+    assert trig2[0].config.srcchan == 5
+    assert len(handler._hidden) == 1
+    # visible source does not need hidden handler
+    visible = handler.triggers_plugin([DeviceChannel(5, 2, 2, "chan5")], None)
+    assert len(visible) == 1
+
+    cb = handler.cb_get()
+    with pytest.raises(ValueError):
+        cb.stream_sub(ChannelRef.physical(1))
+    subq = cb.stream_sub(ChannelRef.physical(0))
+    srcq = cb.stream_sub(ChannelRef.physical(5))
+
+    # no data
+    handler._thread_common()
+
+    payload = [_block(2, 4.0)]
+    descq.put((0, *ring.write(payload, _alive)))
+    handler._thread_common()
+    assert subq.get_nowait()[0].data[0, 0] == 4.0
+
+    descq.put((1, *ring.write(payload, _alive)))
+    handler._thread_common()
+    assert srcq.get_nowait()[0].data[0, 0] == 4.0
+    cb.stream_unsub(subq)
+    descq.put((0, *ring.write(payload, _alive)))
+    handler._thread_common()
+    # payload without subscribers is still released
+    assert subq.empty()
+
+    handler.start()
+    handler.stop()
+    ring.close()
+    TriggerHandler.cls_cleanup()
+
+
+def test_plugin_command() -> None:
+    plugin = PluginFail()
+    assert _plugin_command(plugin, "start", {}) is False
+    assert _plugin_command(plugin, "stop", None) is None
+    assert _plugin_command(plugin, "data_wait", 0.0) is True
+    assert _plugin_command(plugin, "wait_for_plugin", None) is True
+    # unpicklable result
+    assert _plugin_command(plugin, "result", None) is None
+    with pytest.raises(ValueError):
+        _plugin_command(plugin, "foo", None)
+
+
+def test_plugin_process_main_in_thread() -> None:
+    ring = ShmRing(4096)
+    chans = [DeviceChannel(0, 2, 1, "chan0")]
+    refs = [ChannelRef.physical(0)]
+    triggers = [(0, DTriggerConfig(ETriggerType.ALWAYS_ON))]
+    descq: queue.Queue = queue.Queue()
+    conn, child = multiprocessing.Pipe()
+    thr = threading.Thread(
+        target=plugin_process_main,
+        args=(
+            PluginNone,
+            child,
+            descq,
+            [(ring.name, ring.size)],
+            refs,
+            chans,
+            triggers,
+        ),
+    )
+    thr.start()
+
+    kwargs = {"samples": 4, "nostop": False, "channels": [0], "trig": None}
+    conn.send(("start", kwargs))
+    assert conn.recv() is True
+    descq.put((0, *ring.write([_block(4)], _alive)))
+    conn.send(("data_wait", 1.0))
+    assert conn.recv() is True
+    conn.send(("result", None))
+    assert conn.recv() is None
+    conn.send(("exit", None))
+    thr.join()
+
+    # parent end closed
+    conn2, child2 = multiprocessing.Pipe()
+    thr = threading.Thread(
+        target=plugin_process_main,
+        args=(PluginFail, child2, descq, [], [], [], []),
+    )
+    thr.start()
+    conn2.close()
+    thr.join()
+
+    conn.close()
+    ring.close()
+    TriggerHandler.cls_cleanup()
+
+
+def test_plugin_process_plot_rejected() -> None:
+    with pytest.raises(ValueError):
+        PluginProcess(PluginPlot)
+    # plugin type is not known without an instance
+    with pytest.raises(ValueError):
+        PluginProcess(IPlugin)
+
+
+def test_plugin_process_not_started() -> None:
+    plugin = PluginProcess(PluginNone, ring_bytes=1024)
+    assert str(plugin) == "PluginProcess(PluginNone)"
+    assert plugin.plugin_cls is PluginNone
+    assert plugin.stream is True
+    # plugin class is not instantiated in the parent
+    assert PluginProcess(PluginFail).stream is False
+    assert PluginFail().stream is False
+    assert plugin.data_wait() is False
+    assert plugin.wait_for_plugin() is True
+    assert plugin.result() is None
+    plugin.stop()
+
+    chans = [DeviceChannel(0, 2, 1, "chan0"), DeviceChannel(-1, 2, 1, "v2")]
+    triggers = [
+        (0, DTriggerConfig(ETriggerType.ALWAYS_ON)),
+        (
+            -1,
+            DTriggerConfig(
+                ETriggerType.ALWAYS_ON,
+                srcchan=0,
+                source_ref=ChannelRef.physical(0),
+            ),
+        ),
+        (
+            0,
+            DTriggerConfig(
+                ETriggerType.ALWAYS_ON,
+                srcchan=3,
+                source_ref=ChannelRef.physical(3),
+            ),
+        ),
+    ]
+    assert plugin._refs(chans, triggers) == [
+        ChannelRef.physical(0),
+        ChannelRef.virtual(2),
+        ChannelRef.physical(3),
+    ]
+
+
+def test_phandler_process_plugin(nxscope) -> None:
+    plugins = [
+        DPluginDescription("none", PluginNone),
+        DPluginDescription("fail", PluginFail),
+    ]
+    with PluginHandler(plugins) as p:
+        p.nxscope_connect(nxscope)
+        p.triggers_configure(
+            {0: DTriggerConfigReq("on", ChannelRef.physical(1))}
+        )
+        p.enable(
+            "none",
+            process=True,
+            samples=1000,
+            channels=[ChannelRef.physical(0)],
+            trig=None,
+            nostop=False,
+        )
+        p.enable("fail", process=True)
+        p.enable(
+            "none",
+            process=True,
+            samples=10,
+            channels=[ChannelRef.physical(2)],
+            trig=None,
+            nostop=False,
+            stream_opts=DStreamSubOpts(max_blocks=4),
+        )
+        p.start()
+
+        # failed plugin is not started
+        assert p.get_started_plugins() == ((0, "none"), (1, "none"))
+        # cross-channel trigger of pid 0 depends on data order, wait for 1
+        assert p.plugin_get_instance(1).data_wait(30.0) is True
+        plugin = p.plugin_get_instance(0)
+        assert isinstance(plugin, PluginProcess)
+        # channel 0 and hidden trigger source channel 1
+        assert len(plugin._rings) == 2
+        assert plugin.result() is None
+        assert plugin.wait_for_plugin() is True
+        p.stop()
+
+        assert plugin.data_wait() is False
+        # lost process
+        plugin._conn, child = multiprocessing.Pipe()
+        child.close()
+        assert plugin.result() is None
+        plugin._conn = None
+
+        p.disable(1)
+        assert p._process == {0, 2}
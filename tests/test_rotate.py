@@ -0,0 +1,121 @@
+import io
+import json
+import threading
+
+import pytest  # type: ignore
+
+from nxscli.rotate import (
+    DRotateOpts,
+    SegmentManifest,
+    SegmentRotator,
+    segment_path,
+)
+
+
+class Writer(io.BytesIO):
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+
+
+def test_rotateopts() -> None:
+    assert DRotateOpts().enabled is False
+    assert DRotateOpts(size=1).enabled is True
+    assert DRotateOpts(interval=0.5).enabled is True
+    assert segment_path("a/b_chan1", 12, ".csv") == "a/b_chan1_000012.csv"
+
+
+def test_rotator_disabled() -> None:
+    rot = SegmentRotator("base", ".csv", Writer)
+    assert rot.path == "base.csv"
+    assert rot.writer.path == "base.csv"
+    writer = rot.get()
+    rot.account(0, 0, 10, 1 << 30)
+    assert rot.get() is writer
+    assert rot.segment == 0
+    rot.close()
+    assert writer.closed
+
+
+def test_rotator_size(tmp_path) -> None:
+    manifest = SegmentManifest(str(tmp_path / "cap_segments.jsonl"))
+    opts = DRotateOpts(size=100)
+    rot = SegmentRotator("base", ".csv", Writer, opts, manifest)
+    assert rot.path == "base_000000.csv"
+
+    # empty segment is never rotated
+    first = rot.get()
+    rot.account(2, 0, 5, 60)
+    assert rot.get() is first
+    rot.account(2, 5, 5, 60)
+    second = rot.get()
+    assert second is not first
+    assert rot.path == "base_000001.csv"
+    rot.account(2, 10, 3, 10)
+    rot.close()
+    manifest.close()
+    assert first.closed and second.closed
+
+    with open(manifest.path) as f:
+        segments = [json.loads(line) for line in f]
+    assert [(s["path"], s["segment"]) for s in segments] == [
+        ("base_000000.csv", 0),
+        ("base_000001.csv", 1),
+    ]
+    assert [(s["chan"], s["first"], s["stop"]) for s in segments] == [
+        (2, 0, 10),
+        (2, 10, 13),
+    ]
+    assert segments[0]["opened"] <= segments[0]["closed"]
+
+
+def test_rotator_interval_channels(tmp_path, mocker) -> None:
+    clock = mocker.patch("nxscli.rotate.time.monotonic", return_value=0.0)
+    manifest = SegmentManifest(str(tmp_path / "m.jsonl"))
+    opts = DRotateOpts(interval=10.0)
+    rot = SegmentRotator("cap", ".nxc", Writer, opts, manifest)
+    rot.account(3, 0, 4, 1)
+    rot.account(1, 0, 2, 1)
+    clock.return_value = 9.0
+    assert rot.segment == 0 and rot.get() is rot.writer
+    clock.return_value = 10.0
+    rot.get()
+    assert rot.segment == 1
+    rot.close()
+    manifest.close()
+
+    with open(manifest.path) as f:
+        segments = [json.loads(line) for line in f]
+    # one line per channel, the last segment has no rows
+    assert [(s["segment"], s["chan"], s["stop"]) for s in segments] == [
+        (0, 1, 2),
+        (0, 3, 4),
+    ]
+
+
+def test_manifest_errors(tmp_path) -> None:
+    def fail() -> None:
+        raise OSError("disk full")
+
+    manifest = SegmentManifest(str(tmp_path / "m.jsonl"))
+    manifest.finish(fail, [])
+    with pytest.raises(OSError):
+        manifest.close()
+
+    manifest = SegmentManifest(str(tmp_path / "m.jsonl"))
+    manifest.finish(fail, [])
+    manifest._futures[0].exception()
+    with pytest.raises(OSError):
+        manifest.finish(lambda: None, [])
+    manifest._pool.shutdown()
+
+
+def test_manifest_pending(tmp_path) -> None:
+    manifest = SegmentManifest(str(tmp_path / "m.jsonl"))
+    closing = threading.Event()
+    manifest.finish(closing.wait, [])
+    # a segment still closing is kept for the next check
+    manifest.finish(lambda: None, [])
+    assert len(manifest._futures) == 2
+    closing.set()
+    manifest.close()
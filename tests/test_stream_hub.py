@@ -1,12 +1,20 @@
 import queue
+import threading
 from types import SimpleNamespace
 
 import numpy as np
+import pytest
 from nxslib.dev import DeviceChannel
 from nxslib.nxscope import DNxscopeStreamBlock
 
 from nxscli.channelref import ChannelRef
-from nxscli.stream_hub import SharedStreamProvider
+from nxscli.stream_hub import (
+    RingCursor,
+    SharedStreamProvider,
+    StreamRing,
+    _SourceForwarder,
+)
+from nxscli.stream_queue import DStreamSubOpts, EOverflowPolicy, StreamQueue
 
 
 class _FakeNxscopeHub:
@@ -152,8 +160,10 @@ def test_stream_hub_internal_branch_paths() -> None:
     # started with no nxscope path in stop
     hub._started = True
     hub._nxscope = None
-    hub._source_subs = {0: queue.Queue()}
+    hub._source_subs = {0: _SourceForwarder(0, queue.Queue(), hub._readyq)}
     hub.on_stream_stop()
+    # dropping unknown source is no-op
+    hub._drop_source_sub_locked(5)
 
 
 def test_fake_nxscopehub_stream_unsub_paths() -> None:
@@ -163,3 +173,347 @@ def test_fake_nxscopehub_stream_unsub_paths() -> None:
     assert 0 in fake.source_queues
     fake.stream_unsub(q0)
     assert 0 not in fake.source_queues
+
+
+def test_stream_hub_forwarder_paths() -> None:
+    readyq = queue.Queue()
+    srcq = queue.Queue()
+    fwd = _SourceForwarder(3, srcq, readyq)
+    assert fwd.srcq is srcq
+
+    # timeout and empty payload are ignored
+    fwd._thread_common()
+    srcq.put([])
+    fwd._thread_common()
+    assert readyq.empty()
+
+    blocks = [_block(1.0)]
+    srcq.put(blocks)
+    fwd._thread_common()
+    chid, got, stamp = readyq.get_nowait()
+    assert (chid, got) == (3, blocks)
+    assert stamp > 0.0
+
+
+def test_stream_hub_drains_all_ready_channels_in_one_pass() -> None:
+    hub = SharedStreamProvider()
+    fake = _FakeNxscopeHub()
+    hub.on_connect(fake)
+
+    sub0 = hub.stream_sub(ChannelRef.physical(0))
+    sub1 = hub.stream_sub(ChannelRef.physical(1))
+    assert sub0 is not None
+    assert sub1 is not None
+
+    # simulate started hub without background threads
+    hub._started = True
+    hub._readyq.put((0, [_block(1.0)], 0.0))
+    hub._readyq.put((1, [_block(2.0)], 0.0))
+    hub._readyq.put((0, [_block(3.0)], 0.0))
+    hub._source_subs = {0: _SourceForwarder(0, queue.Queue(), hub._readyq)}
+    hub._thread_common()
+
+    out0 = sub0.get_nowait()
+    out1 = sub1.get_nowait()
+    assert [float(b.data[0, 0]) for b in out0] == [1.0, 3.0]
+    assert [float(b.data[0, 0]) for b in out1] == [2.0]
+    assert sub0.empty()
+
+    # nothing ready within timeout
+    hub._thread_common()
+    assert sub0.empty()
+
+    # drain is capped per pass
+    hub._DRAIN_MAX = 1
+    for i in range(3):
+        hub._readyq.put((0, [_block(float(i))], 0.0))
+    hub._thread_common()
+    assert len(sub0.get_nowait()) == 2
+    hub._thread_common()
+    assert len(sub0.get_nowait()) == 1
+
+    hub._source_subs = {}
+    hub._started = False
+
+
+def test_stream_hub_quiet_channel_does_not_delay_busy_channel() -> None:
+    hub = SharedStreamProvider()
+    fake = _FakeNxscopeHub()
+    hub.on_connect(fake)
+
+    busy = hub.stream_sub(ChannelRef.physical(0))
+    quiet = hub.stream_sub(ChannelRef.physical(1))
+    assert busy is not None
+    assert quiet is not None
+    hub.on_stream_start()
+
+    for i in range(20):
+        fake.source_queues[0].put([_block(float(i))])
+    got = []
+    while len(got) < 20:
+        got.extend(busy.get(block=True, timeout=0.5))
+    assert [float(b.data[0, 0]) for b in got] == [float(i) for i in range(20)]
+    assert quiet.empty()
+
+    hub.on_stream_stop()
+    hub.on_disconnect()
+
+
+def test_stream_hub_bounded_subscribers_and_stats() -> None:
+    hub = SharedStreamProvider()
+    fake = _FakeNxscopeHub()
+    hub.on_connect(fake)
+
+    lossless = hub.stream_sub(ChannelRef.physical(0))
+    lossy = hub.stream_sub(
+        ChannelRef.physical(0),
+        DStreamSubOpts(max_blocks=2, policy=EOverflowPolicy.DROP_OLDEST),
+    )
+    assert isinstance(lossless, StreamQueue)
+    assert isinstance(lossy, StreamQueue)
+
+    hub._started = True
+    hub._source_subs = {0: _SourceForwarder(0, queue.Queue(), hub._readyq)}
+    for i in range(5):
+        hub._readyq.put((0, [_block(float(i))], 0.0))
+        hub._thread_common()
+
+    snaps = hub.stream_stats()
+    assert len(snaps) == 2
+    assert snaps[0].channel == "0"
+    assert snaps[0].stats.dropped_blocks == 0
+    assert snaps[0].depth_blocks == 5
+    assert snaps[1].policy is EOverflowPolicy.DROP_OLDEST
+    assert snaps[1].stats.dropped_blocks == 3
+    assert snaps[1].depth_blocks == 2
+
+    # blocking subscriber does not hang a stopped hub
+    blocking = hub.stream_sub(ChannelRef.physical(0), DStreamSubOpts(1))
+    blocking.BLOCK_SLICE = 0.01
+    blocking.put([_block(9.0)])
+    hub._started = False
+    blocking.push([_block(10.0)], hub._is_started)
+    assert blocking.stats().dropped_blocks == 1
+
+    assert hub.stream_unsub(blocking) is True
+    assert blocking.closed is True
+    hub._source_subs = {}
+
+
+def _rows(start: int, rows: int, meta: bool = False) -> DNxscopeStreamBlock:
+    data = np.arange(start, start + rows, dtype=np.float64).reshape(-1, 1)
+    mdata = None
+    if meta:
+        mdata = np.arange(start, start + rows, dtype=np.uint8).reshape(-1, 1)
+    return DNxscopeStreamBlock(data=data, meta=mdata)
+
+
+def _values(blocks) -> list[float]:
+    return [float(x) for b in blocks for x in b.data[:, 0]]
+
+
+def test_stream_ring_write_and_cursor_views() -> None:
+    ring = StreamRing(8)
+    assert ring.rows == 8
+    cur = RingCursor(ring)
+    assert cur.empty()
+    with pytest.raises(queue.Empty):
+        cur.get_nowait()
+    with pytest.raises(queue.Empty):
+        cur.get(timeout=0.01)
+    with pytest.raises(TypeError):
+        cur.put([_rows(0, 1)])
+
+    # empty blocks are skipped
+    ring.write([DNxscopeStreamBlock(data=np.zeros((0, 1)), meta=None)])
+    ring.write([_rows(0, 3, meta=True), _rows(3, 3, meta=True)])
+    assert cur.qsize() == 6
+    out = cur.get_nowait()
+    assert len(out) == 1
+    assert _values(out) == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    assert out[0].meta[:, 0].tolist() == [0, 1, 2, 3, 4, 5]
+    # zero-copy read-only view into the ring storage
+    assert np.shares_memory(out[0].data, ring._data)
+    with pytest.raises(ValueError):
+        out[0].data[0, 0] = 1.0
+    assert ring._data.flags.writeable
+
+    # wrapped read returns two views, missing meta is zero-filled
+    ring.write([_rows(6, 4)])
+    out = cur.get_nowait()
+    assert len(out) == 2
+    assert _values(out) == [6.0, 7.0, 8.0, 9.0]
+    assert out[1].meta[:, 0].tolist() == [0, 0]
+
+    snap = cur.snapshot("0")
+    assert snap.policy is EOverflowPolicy.DROP_OLDEST
+    assert snap.pending_rows == 0
+    assert snap.stats.rows == 10
+    assert snap.stats.blocks == 3
+    assert cur.ring is ring
+    cur.close()
+    assert cur.closed is True
+
+
+def test_stream_ring_overrun_and_large_block() -> None:
+    ring = StreamRing(4)
+    cur = RingCursor(ring)
+    ring.write([_rows(0, 3)])
+    ring.write([_rows(3, 3)])
+    assert _values(cur.get_nowait()) == [2.0, 3.0, 4.0, 5.0]
+    stats = cur.stats()
+    assert stats.overflows == 1
+    assert stats.dropped_rows == 2
+
+    # block larger than the ring keeps only the newest rows
+    ring.write([_rows(10, 6)])
+    assert _values(cur.get_nowait()) == [12.0, 13.0, 14.0, 15.0]
+    assert cur.stats().dropped_rows == 4
+
+    # layout change reallocates storage
+    ring.write([DNxscopeStreamBlock(data=np.ones((1, 2)), meta=None)])
+    assert ring.generation == 1
+    assert ring.head == 1
+    out = cur.get_nowait()
+    assert out[0].data.shape == (1, 2)
+    assert out[0].data.tolist() == [[1.0, 1.0]]
+
+
+def test_stream_ring_realloc_resyncs_cursors() -> None:
+    ring = StreamRing(8)
+    behind = RingCursor(ring)
+    ring.write([_rows(0, 6)])
+    current = RingCursor(ring)
+    assert behind.qsize() == 6
+    assert current.qsize() == 0
+
+    # unread rows of the old layout are lost and counted
+    ring.write([DNxscopeStreamBlock(data=np.full((2, 2), 7.0), meta=None)])
+    assert behind.qsize() == 2
+    assert behind.stats().dropped_rows == 6
+    assert behind.get_nowait()[0].data.tolist() == [[7.0, 7.0]] * 2
+    assert current.snapshot("0").pending_rows == 2
+    assert current.stats().overflows == 0
+
+    # a cursor behind several generations loses all of them
+    ring.write([_rows(0, 3)])
+    ring.write([DNxscopeStreamBlock(data=np.ones((1, 3)), meta=None)])
+    assert ring.generation == 3
+    assert current.get_nowait()[0].data.shape == (1, 3)
+    assert current.stats().dropped_rows == 2 + 3
+    assert ring.lost_locked(3, 0) == 0
+
+
+def test_stream_ring_realloc_wakes_blocked_reader() -> None:
+    ring = StreamRing(8)
+    ring.write([_rows(0, 4)])
+    cur = RingCursor(ring)
+    got: list = []
+    thr = threading.Thread(target=lambda: got.extend(cur.get(timeout=1.0)))
+    thr.start()
+    # the new head is below the cursor position
+    ring.write([DNxscopeStreamBlock(data=np.ones((1, 2)), meta=None)])
+    thr.join(timeout=1.0)
+    assert [b.data.tolist() for b in got] == [[[1.0, 1.0]]]
+
+
+def test_stream_ring_reserve() -> None:
+    ring = StreamRing(4)
+    ring.reserve(2)  # smaller request is a no-op
+    ring.reserve(6)  # grow before first write
+    assert ring.rows == 6
+
+    cur = RingCursor(ring)
+    ring.write([_rows(0, 5, meta=True)])
+    ring.reserve(10)
+    assert ring.rows == 10
+    out = cur.get_nowait()
+    assert _values(out) == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert out[0].meta[:, 0].tolist() == [0, 1, 2, 3, 4]
+
+    nometa = StreamRing(2)
+    nometa.write([_rows(0, 3)])
+    nometa.reserve(4)
+    cur = RingCursor(nometa)
+    nometa.write([_rows(3, 1)])
+    assert _values(cur.get_nowait()) == [3.0]
+
+
+def test_stream_ring_cursor_wakes_blocked_reader() -> None:
+    ring = StreamRing(8)
+    cur = RingCursor(ring)
+    got: list[float] = []
+    thr = threading.Thread(
+        target=lambda: got.extend(_values(cur.get(timeout=1.0)))
+    )
+    thr.start()
+    ring.write([_rows(0, 2)])
+    thr.join(timeout=1.0)
+    assert got == [0.0, 1.0]
+
+
+def test_stream_hub_ring_subscribers() -> None:
+    hub = SharedStreamProvider()
+    fake = _FakeNxscopeHub()
+    hub.on_connect(fake)
+
+    ring1 = hub.stream_sub(ChannelRef.physical(0), DStreamSubOpts(ring_rows=4))
+    ring2 = hub.stream_sub(ChannelRef.physical(0), DStreamSubOpts(ring_rows=8))
+    plain = hub.stream_sub(ChannelRef.physical(0))
+    assert isinstance(ring1, RingCursor)
+    assert isinstance(ring2, RingCursor)
+    assert ring1.ring is ring2.ring
+    assert ring1.ring.rows == 8
+    assert isinstance(plain, StreamQueue)
+
+    hub._started = True
+    hub._source_subs = {0: _SourceForwarder(0, queue.Queue(), hub._readyq)}
+    hub._readyq.put((0, [_rows(0, 2)], 0.0))
+    hub._readyq.put((0, [_rows(2, 2)], 0.0))
+    hub._thread_common()
+
+    assert _values(ring1.get_nowait()) == [0.0, 1.0, 2.0, 3.0]
+    assert _values(ring2.get_nowait()) == [0.0, 1.0, 2.0, 3.0]
+    assert _values(plain.get_nowait()) == [0.0, 1.0, 2.0, 3.0]
+    snaps = hub.stream_stats()
+    assert len(snaps) == 3
+    assert snaps[0].stats.rows == 4
+
+    # ring is released with its last cursor
+    assert hub.stream_unsub(ring1) is True
+    assert 0 in hub._rings
+    assert hub.stream_unsub(ring2) is True
+    assert 0 not in hub._rings
+    assert ring2.closed is True
+    assert hub.stream_unsub(plain) is True
+    hub._source_subs = {}
+    hub._started = False
+    hub.on_disconnect()
+
+
+def test_stream_hub_joins_forwarder_without_lock() -> None:
+    hub = SharedStreamProvider()
+    fake = _FakeNxscopeHub()
+    hub.on_connect(fake)
+
+    sub = hub.stream_sub(ChannelRef.physical(0))
+    hub._started = True
+    fwd = _SourceForwarder(0, fake.stream_sub(0), hub._readyq)
+    hub._source_subs = {0: fwd}
+    locked = []
+    fwd.stop = lambda: locked.append(hub._lock.locked())
+    assert hub.stream_unsub(sub) is True
+    assert locked == [False]
+    assert fake.unsub_calls == 1
+    hub._started = False
+
+
+def test_stream_hub_drains_queue_it_waited_on() -> None:
+    hub = SharedStreamProvider()
+    readyq: queue.Queue = queue.Queue()
+    readyq.put((0, [_block(2.0)], 0.0))
+    # the hub queue is replaced by on_stream_stop meanwhile
+    hub._readyq.put((0, [_block(9.0)], 0.0))
+    ready = hub._ready_drain(readyq, (0, [_block(1.0)], 0.0))
+    assert [float(b.data[0, 0]) for b in ready[0][0]] == [1.0, 2.0]
+    assert hub._readyq.qsize() == 1
@@ -0,0 +1,304 @@
+import queue
+import threading
+import time
+
+import numpy as np
+import pytest
+from nxslib.nxscope import DNxscopeStreamBlock
+
+from nxscli.stream_queue import (
+    DStreamSubOpts,
+    EOverflowPolicy,
+    StreamQueue,
+    merge_blocks,
+    payload_size,
+)
+
+
+def _block(value: float, rows: int = 1, meta: bool = False):
+    data = np.full((rows, 1), value, dtype=np.float64)
+    mdata = np.zeros((rows, 1), dtype=np.uint8) if meta else None
+    return DNxscopeStreamBlock(data=data, meta=mdata)
+
+
+def test_payload_size() -> None:
+    assert payload_size([]) == (0, 0, 0)
+    assert payload_size([_block(1.0, 2), _block(1.0, 3, meta=True)]) == (
+        2,
+        5,
+        2 * 8 + 3 * 8 + 3,
+    )
+
+
+def test_merge_blocks() -> None:
+    single = [_block(1.0)]
+    assert merge_blocks(single) is single
+
+    merged = merge_blocks([_block(1.0, 2), _block(2.0, 3)])
+    assert len(merged) == 1
+    assert merged[0].data.shape == (5, 1)
+    assert merged[0].meta is None
+
+    merged = merge_blocks([_block(1.0, 2, True), _block(2.0, 1, True)])
+    assert merged[0].meta.shape == (3, 1)
+
+    # incompatible layouts are kept
+    vec = DNxscopeStreamBlock(data=np.zeros((1, 2)), meta=None)
+    assert len(merge_blocks([_block(1.0), vec])) == 2
+    i16 = DNxscopeStreamBlock(data=np.zeros((1, 1), np.int16), meta=None)
+    assert len(merge_blocks([_block(1.0), i16])) == 2
+    assert len(merge_blocks([_block(1.0), _block(1.0, meta=True)])) == 2
+    wide = DNxscopeStreamBlock(
+        data=np.zeros((1, 1)), meta=np.zeros((1, 4), np.uint8)
+    )
+    assert len(merge_blocks([_block(1.0, meta=True), wide])) == 2
+
+
+def test_stream_queue_unbounded() -> None:
+    q = StreamQueue()
+    for i in range(100):
+        q.put([_block(float(i))])
+    assert q.qsize() == 100
+    assert q.depth() == (100, 800)
+    stats = q.stats()
+    assert stats.blocks == 100
+    assert stats.rows == 100
+    assert stats.high_water_blocks == 100
+    assert stats.dropped_blocks == 0
+    assert float(q.get_nowait()[0].data[0, 0]) == 0.0
+    assert q.depth() == (99, 792)
+
+
+def test_stream_queue_drop_newest() -> None:
+    q = StreamQueue(
+        DStreamSubOpts(max_blocks=2, policy=EOverflowPolicy.DROP_NEWEST)
+    )
+    for i in range(5):
+        q.put([_block(float(i))])
+    assert [float(q.get_nowait()[0].data[0, 0]) for _ in range(2)] == [
+        0.0,
+        1.0,
+    ]
+    stats = q.stats()
+    assert stats.dropped_blocks == 3
+    assert stats.dropped_rows == 3
+    assert stats.overflows == 3
+
+
+def test_stream_queue_drop_oldest_bytes() -> None:
+    q = StreamQueue(
+        DStreamSubOpts(max_bytes=16, policy=EOverflowPolicy.DROP_OLDEST)
+    )
+    for i in range(5):
+        q.put([_block(float(i))])
+    assert [float(q.get_nowait()[0].data[0, 0]) for _ in range(2)] == [
+        3.0,
+        4.0,
+    ]
+    assert q.stats().dropped_blocks == 3
+    assert q.stats().high_water_bytes == 16
+
+    # oversized payload is accepted into empty queue
+    q.put([_block(1.0, rows=10)])
+    assert q.depth() == (1, 80)
+
+
+def test_stream_queue_coalesce() -> None:
+    q = StreamQueue(
+        DStreamSubOpts(max_blocks=2, policy=EOverflowPolicy.COALESCE)
+    )
+    for i in range(5):
+        q.put([_block(float(i))])
+    first = q.get_nowait()
+    tail = q.get_nowait()
+    assert float(first[0].data[0, 0]) == 0.0
+    assert len(tail) == 1
+    assert tail[0].data[:, 0].tolist() == [1.0, 2.0, 3.0, 4.0]
+    stats = q.stats()
+    assert stats.coalesced == 3
+    assert stats.rows == 5
+    assert stats.dropped_blocks == 0
+    assert q.depth() == (0, 0)
+
+
+def test_stream_queue_drop_oldest_join() -> None:
+    q = StreamQueue(
+        DStreamSubOpts(max_blocks=2, policy=EOverflowPolicy.DROP_OLDEST)
+    )
+    for i in range(5):
+        q.put([_block(float(i))])
+    # evicted payloads are not waited for by join()
+    assert q.unfinished_tasks == 2
+    for _ in range(2):
+        q.get_nowait()
+        q.task_done()
+    q.join()
+
+    # the only unfinished payload is evicted
+    q = StreamQueue(
+        DStreamSubOpts(max_blocks=1, policy=EOverflowPolicy.DROP_OLDEST)
+    )
+    q.put([_block(0.0)])
+    q.put([_block(1.0)])
+    assert q.unfinished_tasks == 1
+    q.get_nowait()
+    q.task_done()
+    q.join()
+
+
+def test_stream_queue_coalesce_limit() -> None:
+    q = StreamQueue(
+        DStreamSubOpts(
+            max_blocks=1, policy=EOverflowPolicy.COALESCE, drain_rows=4
+        )
+    )
+    for i in range(6):
+        q.put([_block(float(i), rows=2)])
+    # the coalesced payload never grows above drain_rows
+    tail = q.get_nowait()
+    assert tail[0].data[:, 0].tolist() == [4.0, 4.0, 5.0, 5.0]
+    stats = q.stats()
+    assert stats.coalesced == 3
+    assert stats.dropped_rows == 8
+    assert q.unfinished_tasks == 1
+
+    assert StreamQueue()._coalesce_rows == StreamQueue.COALESCE_ROWS
+
+
+def test_stream_queue_block_policy() -> None:
+    q = StreamQueue(DStreamSubOpts(max_blocks=1))
+    q.put([_block(0.0)])
+
+    with pytest.raises(queue.Full):
+        q.put([_block(1.0)], block=False)
+    with pytest.raises(queue.Full):
+        q.put([_block(1.0)], timeout=0.01)
+
+    # consumer makes room for blocked producer
+    thr = threading.Thread(target=q.put, args=([_block(2.0)],))
+    thr.start()
+    assert float(q.get(timeout=1.0)[0].data[0, 0]) == 0.0
+    thr.join(timeout=1.0)
+    assert float(q.get(timeout=1.0)[0].data[0, 0]) == 2.0
+
+    # close wakes blocked producer, payload is dropped
+    q.put([_block(3.0)])
+    thr = threading.Thread(target=q.put, args=([_block(4.0)],))
+    thr.start()
+    q.close()
+    thr.join(timeout=1.0)
+    assert q.closed is True
+    assert q.stats().dropped_blocks == 1
+
+    # put on closed queue drops
+    q.put([_block(5.0)])
+    assert q.stats().dropped_blocks == 2
+
+
+def test_stream_queue_push_gives_up_when_producer_stops() -> None:
+    q = StreamQueue(DStreamSubOpts(max_blocks=1))
+    q.BLOCK_SLICE = 0.01
+    q.put([_block(0.0)])
+
+    alive = iter([True, False])
+    q.push([_block(1.0)], lambda: next(alive))
+    assert q.qsize() == 1
+    assert q.stats().dropped_blocks == 1
+
+    q.get_nowait()
+    q.push([_block(2.0)], lambda: True)
+    assert q.qsize() == 1
+
+
+def test_stream_queue_snapshot() -> None:
+    q = StreamQueue(
+        DStreamSubOpts(max_blocks=4, policy=EOverflowPolicy.DROP_OLDEST)
+    )
+    q.put([_block(0.0, rows=3)])
+    snap = q.snapshot("v1")
+    assert snap.channel == "v1"
+    assert snap.policy is EOverflowPolicy.DROP_OLDEST
+    assert snap.depth_blocks == 1
+    assert snap.depth_bytes == 24
+    assert snap.stats.rows == 3
+    assert q.opts.max_blocks == 4
+
+
+def test_stream_queue_batch_rows() -> None:
+    q = StreamQueue(DStreamSubOpts(batch_rows=4, batch_latency=10.0))
+    q.put([_block(0.0, rows=2)])
+    q.put([_block(1.0, rows=1)])
+    assert q.qsize() == 0
+    assert q.snapshot("0").pending_rows == 3
+    with pytest.raises(queue.Empty):
+        q.get_nowait()
+    with pytest.raises(queue.Empty):
+        q.get(timeout=0.01)
+
+    q.put([_block(2.0, rows=1)])
+    out = q.get_nowait()
+    assert len(out) == 1
+    assert out[0].data[:, 0].tolist() == [0.0, 0.0, 1.0, 2.0]
+    stats = q.stats()
+    assert stats.batches == 1
+    assert stats.rows == 4
+    assert q.snapshot("0").pending_rows == 0
+
+    # closed queue drops instead of batching
+    q.close()
+    q.put([_block(3.0)])
+    assert q.stats().dropped_blocks == 1
+
+
+def test_stream_queue_batch_latency() -> None:
+    q = StreamQueue(DStreamSubOpts(batch_latency=0.02))
+    q.put([_block(0.0)])
+    # consumer waits for the batch deadline
+    out = q.get(timeout=1.0)
+    assert out[0].data[:, 0].tolist() == [0.0]
+
+    # producer flushes an expired batch
+    q.put([_block(1.0)])
+    time.sleep(0.03)
+    q.put([_block(2.0)])
+    assert q.qsize() == 1
+    assert q.get_nowait()[0].data[:, 0].tolist() == [1.0, 2.0]
+
+    # blocked consumer is woken by the first payload of a batch
+    got = []
+    thr = threading.Thread(target=lambda: got.append(q.get()))
+    thr.start()
+    time.sleep(0.01)
+    q.put([_block(3.0)])
+    thr.join(timeout=1.0)
+    assert got[0][0].data[:, 0].tolist() == [3.0]
+
+
+def test_stream_queue_batch_rows_default_latency() -> None:
+    q = StreamQueue(DStreamSubOpts(batch_rows=100))
+    q.put([_block(0.0)])
+    assert q.get(timeout=1.0)[0].data[:, 0].tolist() == [0.0]
+
+
+def test_stream_queue_waker_and_batch_wait() -> None:
+    woken = []
+    q = StreamQueue(DStreamSubOpts(batch_latency=10.0))
+    q.set_waker(lambda: woken.append(1))
+    assert q.batch_wait() is None
+
+    # first payload of a batch wakes the consumer to pick up the deadline
+    q.put([_block(1.0)])
+    assert woken == [1]
+    wait = q.batch_wait()
+    assert wait is not None and 0 < wait <= 10.0
+
+    q.close()
+    assert woken == [1, 1]
+
+    q = StreamQueue()
+    q.set_waker(lambda: woken.append(2))
+    q.put([_block(1.0)])
+    assert woken[-1] == 2
+    q.set_waker(None)
+    q.put([_block(1.0)])
+    assert len(woken) == 3
@@ -7,11 +7,13 @@ from nxslib.nxscope import DNxscopeStream, DNxscopeStreamBlock
 from nxscli.trigger import (
     DTriggerConfig,
     DTriggerConfigReq,
+    DTriggerState,
     ETriggerCaptureMode,
     ETriggerType,
     TriggerHandler,
     trigger_from_req,
 )
+from nxscli.trigger.core import TriggerDetector
 
 # we want to run TriggerHandler tests without concurency
 global_lock = Lock()
@@ -1134,23 +1136,13 @@ def test_triggerhandler_block_helpers_and_cache_paths() -> None:
         block = DNxscopeStreamBlock(data=np.array([[0.0], [2.0]]), meta=None)
         out = th.data_triggered([block])
         assert out == []
-        assert th._cache
+        assert th._hist_rows == 2
 
         sliced = th._slice_from([block], 1)
         assert len(sliced) == 1
         assert sliced[0].data.shape[0] == 1
         assert sliced[0].meta is None
 
-        tail = th._cache_tail([block], 1)
-        assert len(tail) == 1
-        assert tail[0].data.shape[0] == 1
-
-        assert th._cache_tail([block], 0) == [block]
-        assert th._cache_tail([], 1) == []
-        assert th._cache_tail([DNxscopeStream((1,), ())], 1) == [
-            DNxscopeStream((1,), ())
-        ]
-
         block0 = DNxscopeStreamBlock(data=np.array([[0.0], [1.0]]), meta=None)
         block1 = DNxscopeStreamBlock(data=np.array([[2.0]]), meta=None)
         assert th._slice_from([block0, block1], 2) == [block1]
@@ -1182,7 +1174,8 @@ def test_triggerhandler_block_cache_hoffset_zero_keeps_current_batch() -> None:
         out = th.data_triggered(payload)
 
         assert out == []
-        assert th._cache is payload
+        assert th._last is payload
+        assert th._hist is None
         TriggerHandler.cls_cleanup()
 
 
@@ -1428,3 +1421,793 @@ def test_triggerhandle_chanxtochanx():
 
 def test_triggerhandle_allthesame():
     pass
+
+
+def _rows(out) -> list[float]:
+    return [float(v) for block in out for v in block.data[:, 0]]
+
+
+def test_triggerhandle_block_pre_samples_ring() -> None:
+    with global_lock:
+        dtc = DTriggerConfig(ETriggerType.EDGE_RISING, level=5.0)
+        dtc.pre_samples = 4
+        th = TriggerHandler(0, dtc)
+
+        def block(*vals: float) -> DNxscopeStreamBlock:
+            data = np.array([[v] for v in vals]).reshape(-1, 1)
+            return DNxscopeStreamBlock(data=data, meta=data.astype(np.uint8))
+
+        # empty payload before any block goes through the legacy path
+        assert th.data_triggered([]) == []
+        assert th.data_triggered([block(0.0, 1.0, 2.0)]) == []
+        assert th.data_triggered([block(3.0, 4.0), block()]) == []
+        assert th._hist_rows == 4
+        # empty polls keep the boundary sample
+        assert th.data_triggered([]) == []
+        assert th.data_triggered([block(4.5)]) == []
+        assert th.data_triggered([]) == []
+        assert th._hist is not None
+        ring = th._hist
+
+        # edge between the carried sample and the first new sample
+        out = th.data_triggered([block(6.0, 7.0)])
+        assert _rows(out) == [2.0, 3.0, 4.0, 4.5, 6.0, 7.0]
+        assert [int(v) for b in out for v in b.meta[:, 0]] == [
+            2,
+            3,
+            4,
+            4,
+            6,
+            7,
+        ]
+        # history views come from the ring and are not reused
+        assert any(np.shares_memory(b.data, ring._data) for b in out)
+        assert th._hist is None
+        event = th.pop_trigger_event()
+        assert event is not None
+        assert event.sample_index == 4.0
+
+        # triggered, data passes through
+        nxt = [block(1.0)]
+        assert th.data_triggered(nxt)[0] is nxt[0]
+        assert th.data_triggered([]) == []
+
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_block_history_layout_change() -> None:
+    with global_lock:
+        dtc = DTriggerConfig(ETriggerType.EDGE_RISING, hoffset=3, level=5.0)
+        th = TriggerHandler(0, dtc)
+
+        first = DNxscopeStreamBlock(data=np.array([[0.0], [1.0]]), meta=None)
+        assert th.data_triggered([first]) == []
+        ring = th._hist
+
+        # other dtype drops older history
+        second = DNxscopeStreamBlock(
+            data=np.array([[2], [3]], dtype=np.int32), meta=None
+        )
+        assert th.data_triggered([second]) == []
+        assert th._hist is not ring
+        assert th._hist_rows == 2
+
+        out = th.data_triggered(
+            [
+                DNxscopeStreamBlock(
+                    data=np.array([[9]], dtype=np.int32), meta=None
+                )
+            ]
+        )
+        assert _rows(out) == [2.0, 3.0, 9.0]
+
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_block_always_off_keeps_no_history() -> None:
+    with global_lock:
+        dtc = DTriggerConfig(ETriggerType.ALWAYS_OFF, hoffset=10)
+        th = TriggerHandler(0, dtc)
+        block = DNxscopeStreamBlock(data=np.array([[1.0]]), meta=None)
+        assert th.data_triggered([block]) == []
+        assert th._hist is None
+        assert th._hist_rows == 1
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_block_cross_channel_frame() -> None:
+    with global_lock:
+        src = TriggerHandler(0, DTriggerConfig(ETriggerType.ALWAYS_OFF))
+        dtc = DTriggerConfig(ETriggerType.EDGE_RISING, srcchan=0, level=5.0)
+        dtc.pre_samples = 2
+        dst = TriggerHandler(1, dtc)
+
+        def block(*vals: float) -> DNxscopeStreamBlock:
+            return DNxscopeStreamBlock(
+                data=np.array([[v] for v in vals]), meta=None
+            )
+
+        assert dst.data_triggered([block(10.0, 11.0, 12.0)]) == []
+        assert src.data_triggered([block(0.0, 1.0)]) == []
+        # source edge at the boundary, index in the history + data frame
+        assert src.data_triggered([block(9.0, 9.0)]) == []
+        assert dst.cross_trigger.state is True
+        assert dst.cross_trigger.idx == 2
+
+        out = dst.data_triggered([block(13.0)])
+        assert _rows(out) == [11.0, 12.0, 13.0]
+        # aligned to the same absolute sample as the source edge
+        assert dst.pop_trigger_event().sample_index == 1.0
+
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_block_cross_channel_source_ahead() -> None:
+    with global_lock:
+        src = TriggerHandler(0, DTriggerConfig(ETriggerType.ALWAYS_OFF))
+        dtc = DTriggerConfig(ETriggerType.EDGE_RISING, srcchan=0, level=0.5)
+        dtc.pre_samples = 1
+        dst = TriggerHandler(1, dtc)
+        # second dependent with the same condition, evaluated once
+        dst2 = TriggerHandler(2, dtc)
+        det = src._detector(dtc)
+
+        # edge at absolute sample 5, the dependent is still at sample 0
+        assert src.data_triggered([_seq_block([0, 0, 0, 0, 0, 1], 0)]) == []
+        assert (det.evaluated, det.reused) == (1, 0)
+        assert dst.cross_trigger.state is True
+        assert dst2._cross_state == (True, 5, 5)
+
+        assert dst.data_triggered([_seq_block([0, 0, 0], 0)]) == []
+        out = dst.data_triggered([_seq_block([0, 0, 0, 0], 3)])
+        assert [_seq_idx(b) for b in out] == [[4, 5, 6]]
+        assert dst.pop_trigger_event().sample_index == 1.0
+
+        # state set directly has no absolute position
+        dst2.cross_trigger = DTriggerState(True, 1)
+        out = dst2.data_triggered([_seq_block([0, 0], 0)])
+        assert [_seq_idx(b) for b in out] == [[0, 1]]
+
+        TriggerHandler.cls_cleanup()
+
+
+def test_trigger_registry() -> None:
+    with global_lock:
+        th0 = TriggerHandler(0, DTriggerConfig(ETriggerType.ALWAYS_ON))
+        th1 = TriggerHandler(
+            1, DTriggerConfig(ETriggerType.ALWAYS_ON, srcchan=3)
+        )
+        reg = TriggerHandler._instances
+        assert reg.channel(0) == [th0]
+        assert reg.channel(5) == []
+        assert reg.first(5) is None
+        assert TriggerHandler.find_by_channel(1) is th1
+        assert th1 in TriggerHandler._wait_for_src
+        assert th0 not in TriggerHandler._wait_for_src
+        assert sorted(x.chan for x in reg) == [0, 1]
+
+        th3 = TriggerHandler(3, DTriggerConfig(ETriggerType.ALWAYS_ON))
+        assert th1 not in TriggerHandler._wait_for_src
+        assert th3._cross == [th1]
+        TriggerHandler.cls_cleanup()
+        assert len(reg) == 0
+
+
+def _seq_block(vals: list[float], first: int) -> DNxscopeStreamBlock:
+    idx = np.arange(first, first + len(vals), dtype=np.float64)
+    data = np.column_stack([np.asarray(vals, dtype=np.float64), idx])
+    return DNxscopeStreamBlock(data=data, meta=idx.astype(np.uint32)[:, None])
+
+
+def _seq_idx(block: DNxscopeStreamBlock) -> list[int]:
+    return [int(v) for v in block.data[:, 1]]
+
+
+def test_triggerhandle_rearm_segments_one_pass() -> None:
+    with global_lock:
+        vals = [0, 1, 0, 1, 0, 0, 1, 0, 0, 0]
+        for holdoff, segs, events in (
+            (0, [[0, 1, 2], [2, 3, 4], [5, 6, 7]], [1.0, 4.0, 7.0]),
+            (4, [[0, 1, 2], [5, 6, 7]], [1.0, 4.0]),
+        ):
+            req = DTriggerConfigReq(
+                "er",
+                None,
+                params=["0", "0.5"],
+                pre_samples=1,
+                post_samples=1,
+                holdoff=holdoff,
+                rearm=True,
+            )
+            th = TriggerHandler(0, trigger_from_req(req))
+
+            out = th.data_triggered([_seq_block(vals, 0)])
+            assert [_seq_idx(b) for b in out] == segs
+            assert out[0].meta[:, 0].tolist() == [0, 1, 2]
+            got = th.pop_trigger_events()
+            assert [e.sample_index for e in got] == events
+            assert th.pop_trigger_events() == []
+            TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_rearm_segment_spans_payloads() -> None:
+    with global_lock:
+        dtc = DTriggerConfig(
+            ETriggerType.EDGE_FALLING,
+            level=0.5,
+            pre_samples=2,
+            post_samples=3,
+            rearm=True,
+        )
+        th = TriggerHandler(0, dtc)
+
+        # payloads without blocks are legacy samples
+        assert th.data_triggered([]) == []
+        with pytest.raises(NotImplementedError):
+            th.data_triggered([DNxscopeStream((1,), ())])
+
+        assert th.data_triggered([_seq_block([1, 1, 1, 1], 0)]) == []
+        # hit at 4, the segment needs rows up to 7
+        assert th.data_triggered([_seq_block([0, 1, 1], 4)]) == []
+        assert th.pop_trigger_event() is None
+        assert th.data_triggered([]) == []
+        out = th.data_triggered([_seq_block([1, 1, 0], 7)])
+        assert [_seq_idx(b) for b in out] == [[2, 3, 4, 5, 6, 7]]
+        assert th.pop_trigger_event().sample_index == 2.0
+
+        # trigger stays armed, next hit at 9 is pending
+        out = th.data_triggered([_seq_block([0, 0, 0, 0, 0, 0], 10)])
+        assert [_seq_idx(b) for b in out] == [[7, 8, 9, 10, 11, 12]]
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_rearm_window() -> None:
+    with global_lock:
+        dtc = DTriggerConfig(
+            ETriggerType.WINDOW_EXIT,
+            window_low=-0.5,
+            window_high=0.5,
+            rearm=True,
+            holdoff=3,
+        )
+        th = TriggerHandler(0, dtc)
+        vals = [0, 1, 0, 1, 0, 1]
+        out = th.data_triggered([_seq_block(vals, 0)])
+        assert [_seq_idx(b) for b in out] == [[1], [5]]
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_rearm_cross_channel() -> None:
+    with global_lock:
+        src = TriggerHandler(0, DTriggerConfig(ETriggerType.ALWAYS_OFF))
+        dtc = DTriggerConfig(
+            ETriggerType.EDGE_RISING,
+            srcchan=0,
+            level=0.5,
+            pre_samples=1,
+            rearm=True,
+        )
+        dst = TriggerHandler(1, dtc)
+        # stop-after source handler does not take rearmed hits
+        stop = TriggerHandler(
+            2,
+            DTriggerConfig(
+                ETriggerType.EDGE_RISING,
+                srcchan=0,
+                level=0.5,
+                capture_mode=ETriggerCaptureMode.STOP_AFTER,
+            ),
+        )
+
+        # legacy samples are not propagated
+        assert src.data_triggered([DNxscopeStream((1,), ())]) == []
+        assert list(dst._cross_hits) == []
+
+        assert dst.data_triggered([_seq_block([0, 0, 0, 0], 0)]) == []
+        assert src.data_triggered([_seq_block([0, 1, 0, 1], 0)]) == []
+        assert src.data_triggered([]) == []
+        assert list(dst._cross_hits) == [1, 3]
+        assert stop.cross_trigger.state is True
+
+        # hit 1 is older than the history
+        out = dst.data_triggered([_seq_block([0, 0, 0, 0], 4)])
+        assert [_seq_idx(b) for b in out] == [[3]]
+        assert dst.pop_trigger_event().sample_index == 0.0
+
+        vals = [0, 0, 0, 0, 0, 1, 0, 0, 1, 0]
+        assert src.data_triggered([_seq_block(vals, 4)]) == []
+        out = dst.data_triggered([_seq_block([0, 0], 8)])
+        assert [_seq_idx(b) for b in out] == [[8, 9]]
+        # later hits wait for the data
+        assert list(dst._cross_hits) == [12]
+        out = dst.data_triggered([_seq_block([0, 0, 0], 10)])
+        assert [_seq_idx(b) for b in out] == [[11, 12]]
+        assert list(dst._cross_hits) == []
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_shared_detection() -> None:
+    with global_lock:
+        dtc = DTriggerConfig(ETriggerType.EDGE_RISING, level=0.5)
+        th1 = TriggerHandler(0, dtc)
+        # other capture options share the detection
+        th2 = TriggerHandler(
+            0,
+            DTriggerConfig(ETriggerType.EDGE_RISING, level=0.5, pre_samples=2),
+        )
+        other = TriggerHandler(
+            0, DTriggerConfig(ETriggerType.EDGE_RISING, level=2.0)
+        )
+        chan1 = TriggerHandler(1, dtc)
+        det = th1._detector(dtc)
+        assert th2._detector(th2.config) is det
+        assert other._detector(other.config) is not det
+        assert chan1._detector(dtc) is not det
+
+        first = [_seq_block([0, 0, 0], 0)]
+        assert th1.data_triggered(first) == []
+        assert th2.data_triggered(first) == []
+        assert (det.evaluated, det.reused) == (1, 1)
+
+        # edge at the boundary, hits in both blocks of the payload
+        second = [_seq_block([1, 0], 3), _seq_block([], 5), _seq_block([1], 5)]
+        out1 = th1.data_triggered(second)
+        out2 = th2.data_triggered(second)
+        assert [_seq_idx(b) for b in out1] == [[3, 4], [5]]
+        assert [i for b in out2 for i in _seq_idx(b)] == [1, 2, 3, 4, 5]
+        assert (det.evaluated, det.reused) == (3, 3)
+
+        # a later handler reuses the stored samples
+        th3 = TriggerHandler(0, dtc)
+        assert th3.data_triggered([_seq_block([0, 0, 0], 0)]) == []
+        out3 = th3.data_triggered(second)
+        assert [_seq_idx(b) for b in out3] == [[3, 4], [5]]
+        assert (det.evaluated, det.reused) == (3, 6)
+        assert det.evaluated_rows == 6
+        blocks = [_seq_block([0, 1], 0), _seq_block([0, 1], 2)]
+        assert th3._shared_hits(blocks, dtc).tolist() == [1, 3]
+
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerdetector_cache() -> None:
+    dtc = DTriggerConfig(
+        ETriggerType.WINDOW_ENTER, window_low=0, window_high=1
+    )
+    det = TriggerDetector(dtc)
+    det.CACHE_ROWS = 8
+    prev = np.array([[5.0]])
+    data = np.array([[0.5], [5.0], [0.5]])
+
+    assert det.hits(0, None, data).tolist() == [2]
+    assert det.hits(0, None, data).tolist() == [2]
+    assert (det.evaluated, det.reused) == (1, 1)
+    # the boundary of the first stored sample is not known
+    assert det.hits(1, prev, data).tolist() == [0, 2]
+    assert det.evaluated == 2
+
+    # other block splits reuse the stored samples
+    assert det.hits(1, None, data[:1]).tolist() == []
+    assert det.hits(2, data[:1], data[1:]).tolist() == [1]
+    assert (det.evaluated, det.reused) == (2, 3)
+    # only new samples are evaluated
+    more = np.array([[0.5], [5.0], [0.5], [5.0]])
+    assert det.hits(3, data[1:2], more).tolist() == [0, 2]
+    assert (det.evaluated, det.evaluated_rows) == (3, 9)
+
+    # other samples at the same position are evaluated without the cache
+    assert det.hits(1, prev, prev).tolist() == []
+    assert det.hits(6, None, data).tolist() == [2]
+    assert det.evaluated == 5
+
+    # the newest samples are kept when the buffer is full
+    for pos in range(9, 30, 3):
+        assert det.hits(pos, data, data).tolist() == [2]
+    assert det._start > 6
+    assert det._hi - det._lo <= 2 * det.CACHE_ROWS
+    det.hits(27, data[-1:], data)
+    assert det.reused == 4
+    # a lagging request is evaluated again
+    assert det.hits(1, prev, data).tolist() == [0, 2]
+    assert det.reused == 4
+
+    # requests larger than the cache keep its newest samples
+    big = np.tile(data, (4, 1))
+    assert det.hits(30, data[-1:], big).tolist() == [2, 5, 8, 11]
+    assert det._hi - det._lo == det.CACHE_ROWS
+    assert det.hits(40, None, big).tolist() == [2, 5, 8, 11]
+    assert det._hi - det._lo == det.CACHE_ROWS
+
+    # other sample types replace the timeline
+    ints = np.array([[5], [0]], dtype=np.int16)
+    assert det.hits(52, None, ints).tolist() == [1]
+    assert det._vals.dtype == np.int16
+
+
+def test_triggerhandle_shared_detection_disabled() -> None:
+    with global_lock:
+        TriggerHandler.SHARED_DETECTION = False
+        try:
+            dtc = DTriggerConfig(ETriggerType.EDGE_RISING, level=0.5)
+            th = TriggerHandler(0, dtc)
+            assert th.data_triggered([_seq_block([0, 0], 0)]) == []
+            out = th.data_triggered([_seq_block([1, 1], 2)])
+            assert [_seq_idx(b) for b in out] == [[2, 3]]
+            assert th._detect == {}
+        finally:
+            TriggerHandler.SHARED_DETECTION = True
+            TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_rearm_cross_stop_after_source() -> None:
+    with global_lock:
+        src = TriggerHandler(
+            0,
+            DTriggerConfig(
+                ETriggerType.EDGE_RISING,
+                level=0.5,
+                capture_mode=ETriggerCaptureMode.STOP_AFTER,
+            ),
+        )
+        dst = TriggerHandler(
+            1,
+            DTriggerConfig(
+                ETriggerType.EDGE_RISING, srcchan=0, level=0.5, rearm=True
+            ),
+        )
+        dst2 = TriggerHandler(2, dst.config)
+        src.data_triggered([_seq_block([0, 0], 0)])
+        src.data_triggered([_seq_block([1, 0, 1], 2)])
+        assert list(dst._cross_hits) == [2, 4]
+        assert list(dst2._cross_hits) == [2, 4]
+        TriggerHandler.cls_cleanup()
+
+
+def _combo_block(a: list[float], b: list[float], first: int):
+    idx = np.arange(first, first + len(a), dtype=np.float64)
+    data = np.column_stack(
+        [np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64), idx]
+    )
+    return DNxscopeStreamBlock(data=data, meta=None)
+
+
+def _combo_idx(out) -> list[int]:
+    return [int(v) for block in out for v in block.data[:, 2]]
+
+
+def test_triggerfromreq_combo() -> None:
+    terms = [
+        DTriggerConfigReq("er", None, 0, ["0", "0.5"]),
+        DTriggerConfigReq("wx", None, 1, ["0", "-1", "1"], negate=True),
+    ]
+    x = trigger_from_req(DTriggerConfigReq("and", 3, terms=terms))
+    assert x.ttype is ETriggerType.AND
+    assert x.srcchan == 3
+    assert [t.ttype for t in x.terms] == [
+        ETriggerType.EDGE_RISING,
+        ETriggerType.WINDOW_EXIT,
+    ]
+    assert x.terms[1].negate is True
+
+    x = trigger_from_req(
+        DTriggerConfigReq("then", None, terms=terms, within=10)
+    )
+    assert x.ttype is ETriggerType.THEN
+    assert x.within == 10
+
+    with pytest.raises(AssertionError):
+        trigger_from_req(DTriggerConfigReq("or", None))
+    with pytest.raises(AssertionError):
+        trigger_from_req(
+            DTriggerConfigReq(
+                "or", None, terms=[DTriggerConfigReq("on", None)]
+            )
+        )
+    with pytest.raises(AssertionError):
+        trigger_from_req(DTriggerConfigReq("then", None, terms=terms[:1]))
+
+
+def test_triggerhandle_combo_and_or() -> None:
+    with global_lock:
+        rise = DTriggerConfig(ETriggerType.EDGE_RISING, level=0.5)
+        fall = DTriggerConfig(ETriggerType.EDGE_FALLING, vect=1, level=0.5)
+        nfall = DTriggerConfig(
+            ETriggerType.EDGE_FALLING, vect=1, level=0.5, negate=True
+        )
+        a = [0, 1, 0, 1, 0, 1]
+        b = [1, 0, 1, 1, 1, 1]
+        for ttype, terms, first in (
+            (ETriggerType.AND, [rise, fall], 1),
+            (ETriggerType.AND, [rise, nfall], 3),
+            (ETriggerType.OR, [fall, rise], 1),
+            (ETriggerType.OR, [nfall, fall], 1),
+        ):
+            dtc = DTriggerConfig(ttype, terms=terms, rearm=True)
+            th = TriggerHandler(0, dtc)
+            out = th.data_triggered([_combo_block(a, b, 0)])
+            assert _combo_idx(out)[0] == first
+            TriggerHandler.cls_cleanup()
+
+        # boundary between payloads is a valid hit, not the first sample
+        dtc = DTriggerConfig(ETriggerType.AND, terms=[rise, nfall])
+        th = TriggerHandler(0, dtc)
+        assert th.data_triggered([_combo_block([0, 0], [1, 1], 0)]) == []
+        out = th.data_triggered([_combo_block([1, 1], [1, 1], 2)])
+        assert _combo_idx(out) == [2, 3]
+        assert th.pop_trigger_event().sample_index == 0.0
+        TriggerHandler.cls_cleanup()
+
+        # legacy list payloads
+        th = TriggerHandler(0, DTriggerConfig(ETriggerType.OR, terms=[rise]))
+        data = [DNxscopeStream((x, 0.0), ()) for x in (0.0, 1.0)]
+        assert th.data_triggered(data) == data[1:]
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_combo_then() -> None:
+    with global_lock:
+        rise = DTriggerConfig(ETriggerType.EDGE_RISING, level=0.5)
+        fall = DTriggerConfig(ETriggerType.EDGE_FALLING, vect=1, level=0.5)
+        dtc = DTriggerConfig(
+            ETriggerType.THEN, terms=[rise, fall], within=3, rearm=True
+        )
+        th = TriggerHandler(0, dtc)
+
+        # B without A is ignored, A at 2 is kept for the next payload
+        out = th.data_triggered([_combo_block([0, 0, 1, 1], [1, 0, 1, 1], 0)])
+        assert out == []
+        out = th.data_triggered([_combo_block([1, 1, 1], [1, 0, 1], 4)])
+        assert _combo_idx(out) == [5]
+        # A at 8, B at 12 is too late
+        out = th.data_triggered(
+            [_combo_block([0, 1, 1, 1, 1, 1], [1, 1, 1, 1, 1, 0], 7)]
+        )
+        assert out == []
+        TriggerHandler.cls_cleanup()
+
+        # the same window evaluated twice uses the same prior state
+        th = TriggerHandler(0, dtc)
+        th._abs = 0
+        assert (
+            th._combo_hits(
+                [_combo_block([0, 1], [1, 1], 0)], None, dtc, 0
+            ).size
+            == 0
+        )
+        win = [_combo_block([1, 1], [1, 0], 2)]
+        for _ in range(2):
+            assert th._combo_hits(win, None, dtc, 2).tolist() == [1]
+        # no absolute positions, no state
+        assert th._combo_hits(win, None, dtc, None).tolist() == []
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_combo_cross_and_stop_after() -> None:
+    with global_lock:
+        rise = DTriggerConfig(ETriggerType.EDGE_RISING, level=0.5)
+        fall = DTriggerConfig(ETriggerType.EDGE_FALLING, vect=1, level=0.5)
+        combo = DTriggerConfig(
+            ETriggerType.THEN,
+            terms=[rise, fall],
+            within=2,
+            capture_mode=ETriggerCaptureMode.STOP_AFTER,
+            post_samples=1,
+        )
+        src = TriggerHandler(0, combo)
+        cross = DTriggerConfig(
+            ETriggerType.THEN, srcchan=0, terms=[rise, fall], within=2
+        )
+        dst = TriggerHandler(1, cross)
+
+        out = src.data_triggered([_combo_block([0, 1, 1], [1, 1, 1], 0)])
+        assert _combo_idx(out) == [0, 1, 2]
+        out = src.data_triggered([_combo_block([1, 1, 1], [0, 1, 1], 3)])
+        assert _combo_idx(out) == [3, 4]
+        assert dst._cross_state == (True, 1, 3)
+
+        out = dst.data_triggered([_combo_block([0] * 5, [0] * 5, 0)])
+        assert _combo_idx(out) == [3, 4]
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerfromreq_pulse() -> None:
+    x = trigger_from_req(DTriggerConfigReq("sr", 2, 1, ["4", "0.5"]))
+    assert x.ttype is ETriggerType.SLEW
+    assert (x.srcchan, x.vect, x.hoffset, x.level) == (2, 1, 4, 0.5)
+
+    x = trigger_from_req(DTriggerConfigReq("ph", None, 0, ["0", "1", "5"]))
+    assert x.ttype is ETriggerType.PULSE_HIGH
+    assert (x.level, x.width_min, x.width_max) == (1.0, 5, 0)
+    x = trigger_from_req(
+        DTriggerConfigReq("pl", None, 0, ["0", "1", "5", "9"], pre_samples=3)
+    )
+    assert x.ttype is ETriggerType.PULSE_LOW
+    assert (x.width_min, x.width_max, x.pre_samples) == (5, 9, 3)
+
+    x = trigger_from_req(DTriggerConfigReq("rh", None, 0, ["0", "0.2", "1"]))
+    assert x.ttype is ETriggerType.RUNT_HIGH
+    assert (x.window_low, x.window_high) == (0.2, 1.0)
+    x = trigger_from_req(DTriggerConfigReq("rl", None, 0, ["0", "0.2", "1"]))
+    assert x.ttype is ETriggerType.RUNT_LOW
+
+    # pulse triggers can be combination terms
+    terms = [
+        DTriggerConfigReq("ph", None, 0, ["0", "1", "5"]),
+        DTriggerConfigReq("sr", None, 1, ["0", "2"]),
+    ]
+    x = trigger_from_req(DTriggerConfigReq("or", None, terms=terms))
+    assert [t.ttype for t in x.terms] == [
+        ETriggerType.PULSE_HIGH,
+        ETriggerType.SLEW,
+    ]
+
+
+def test_triggerhandle_slew() -> None:
+    with global_lock:
+        dtc = DTriggerConfig(ETriggerType.SLEW, level=0.5, rearm=True)
+        th = TriggerHandler(0, dtc)
+        out = th.data_triggered([_seq_block([0, 0.25, 1, 1.25], 0)])
+        assert [_seq_idx(b) for b in out] == [[2]]
+        # the payload boundary is a valid hit
+        out = th.data_triggered([_seq_block([0, -0.25], 4)])
+        assert [_seq_idx(b) for b in out] == [[4]]
+        TriggerHandler.cls_cleanup()
+
+        # legacy list payloads
+        dtc = DTriggerConfig(ETriggerType.SLEW, level=0.5)
+        th = TriggerHandler(0, dtc)
+        assert th._self_hits([DNxscopeStream((0.0,), ())], dtc).size == 0
+        data = [DNxscopeStream((x,), ()) for x in (0.0, 0.25, -1.0, 0.0)]
+        assert th.data_triggered(data) == data[2:]
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_native_dtype() -> None:
+    with global_lock:
+        # integer samples are not converted for level comparisons
+        data = np.array([[250], [5], [200], [201]], dtype=np.uint8)
+        dtc = DTriggerConfig(ETriggerType.EDGE_RISING, level=100)
+        th = TriggerHandler(0, dtc)
+        out = th.data_triggered([DNxscopeStreamBlock(data=data, meta=None)])
+        assert [b.data[:, 0].tolist() for b in out] == [[200, 201]]
+        assert out[0].data.dtype == np.uint8
+        TriggerHandler.cls_cleanup()
+
+        # slew rate of unsigned samples does not wrap around
+        dtc = DTriggerConfig(ETriggerType.SLEW, level=100)
+        th = TriggerHandler(0, dtc)
+        out = th.data_triggered([DNxscopeStreamBlock(data=data, meta=None)])
+        assert [b.data[:, 0].tolist() for b in out] == [[5, 200, 201]]
+        TriggerHandler.cls_cleanup()
+
+        # non-numerical columns are converted
+        data = np.array([[0], [1]], dtype=object)
+        dtc = DTriggerConfig(ETriggerType.EDGE_RISING, level=0.5)
+        th = TriggerHandler(0, dtc)
+        out = th.data_triggered([DNxscopeStreamBlock(data=data, meta=None)])
+        assert [b.data[:, 0].tolist() for b in out] == [[1]]
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_pulse_width() -> None:
+    with global_lock:
+        for ttype, vals in (
+            (ETriggerType.PULSE_HIGH, [1, 0, 1, 1, 0, 1, 1, 1, 1, 0, 1]),
+            (ETriggerType.PULSE_LOW, [0, 1, 0, 0, 1, 0, 0, 0, 0, 1, 0]),
+        ):
+            dtc = DTriggerConfig(
+                ttype, level=0.5, width_min=2, width_max=3, rearm=True
+            )
+            th = TriggerHandler(0, dtc)
+            # the pulse open at the first sample has no known width
+            out = th.data_triggered([_seq_block(vals[:3], 0)])
+            assert out == []
+            # pulse 2..3 spans payloads, pulse 5..8 is too wide
+            out = th.data_triggered([_seq_block(vals[3:7], 3)])
+            assert [_seq_idx(b) for b in out] == [[4]]
+            out = th.data_triggered([_seq_block(vals[7:], 7)])
+            assert out == []
+            TriggerHandler.cls_cleanup()
+
+        # no upper limit
+        dtc = DTriggerConfig(
+            ETriggerType.PULSE_HIGH, level=0.5, width_min=2, rearm=True
+        )
+        th = TriggerHandler(0, dtc)
+        vals = [0, 1, 1, 1, 1, 1, 0, 1, 0]
+        out = th.data_triggered([_seq_block(vals, 0)])
+        assert [_seq_idx(b) for b in out] == [[6]]
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_runt() -> None:
+    with global_lock:
+        for ttype, sign in (
+            (ETriggerType.RUNT_HIGH, 1.0),
+            (ETriggerType.RUNT_LOW, -1.0),
+        ):
+            dtc = DTriggerConfig(
+                ttype,
+                window_low=0.2 * sign,
+                window_high=0.8 * sign,
+                rearm=True,
+            )
+            if sign < 0:
+                dtc.window_low, dtc.window_high = (
+                    dtc.window_high,
+                    dtc.window_low,
+                )
+            th = TriggerHandler(0, dtc)
+            vals = [0, 0.5, 0.5, 0, 0.5, 1, 0.5, 0, 0.5]
+            out = th.data_triggered([_seq_block([v * sign for v in vals], 0)])
+            assert [_seq_idx(b) for b in out] == [[3]]
+            # pulse from 8 reaches beyond in this payload, 11.. does not
+            vals = [1, 0.5, 0, 0.5, 0.5]
+            out = th.data_triggered([_seq_block([v * sign for v in vals], 9)])
+            assert out == []
+            # pulse from 12 continues
+            vals = [0.5, 0, 0.5, 1]
+            out = th.data_triggered([_seq_block([v * sign for v in vals], 14)])
+            assert [_seq_idx(b) for b in out] == [[15]]
+            # pulse from 16 reached beyond in the previous payload
+            vals = [0.5, 0]
+            out = th.data_triggered([_seq_block([v * sign for v in vals], 18)])
+            assert out == []
+            TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_pulse_state() -> None:
+    with global_lock:
+        dtc = DTriggerConfig(
+            ETriggerType.RUNT_HIGH, window_low=0.2, window_high=0.8
+        )
+        th = TriggerHandler(0, dtc)
+        assert th._run_hits([], dtc, 0).size == 0
+        assert th._run_hits([_seq_block([0, 0.5], 0)], dtc, 0).size == 0
+        # the same window evaluated twice uses the same prior state
+        win = [_seq_block([0.5, 1, 0.5], 1)]
+        for _ in range(2):
+            assert th._run_hits(win, dtc, 1).size == 0
+        win = [_seq_block([0.5, 0], 3)]
+        assert th._run_hits(win, dtc, 3).size == 0
+        win = [_seq_block([0, 0.5, 0.5], 4)]
+        assert th._run_hits(win, dtc, 4).size == 0
+        win = [_seq_block([0.5, 0.5, 0], 6)]
+        assert th._run_hits(win, dtc, 6).tolist() == [2]
+        # no absolute positions, no state
+        win = [_seq_block([0.5, 0], 8)]
+        assert th._run_hits(win, dtc, None).size == 0
+        TriggerHandler.cls_cleanup()
+
+        # legacy list payloads find pulses within one payload
+        dtc = DTriggerConfig(ETriggerType.PULSE_LOW, level=0.5, width_min=1)
+        th = TriggerHandler(0, dtc)
+        data = [DNxscopeStream((x,), ()) for x in (1.0, 0.0, 1.0, 1.0)]
+        assert th.data_triggered(data) == data[2:]
+        TriggerHandler.cls_cleanup()
+
+
+def test_triggerhandle_pulse_combo_and_cross() -> None:
+    with global_lock:
+        pulse = DTriggerConfig(ETriggerType.PULSE_HIGH, level=0.5, width_min=2)
+        slew = DTriggerConfig(ETriggerType.SLEW, vect=1, level=0.5)
+        dtc = DTriggerConfig(ETriggerType.AND, terms=[pulse, slew])
+        th = TriggerHandler(0, dtc)
+        out = th.data_triggered([_combo_block([0, 1, 1], [0, 0, 0], 0)])
+        assert out == []
+        out = th.data_triggered([_combo_block([1, 0, 0], [0, 1, 1], 3)])
+        assert _combo_idx(out) == [4, 5]
+        TriggerHandler.cls_cleanup()
+
+        src = TriggerHandler(0, DTriggerConfig(ETriggerType.ALWAYS_ON))
+        dst = TriggerHandler(
+            1,
+            DTriggerConfig(
+                ETriggerType.PULSE_LOW, 0, level=0.5, width_min=2, rearm=True
+            ),
+        )
+        src.data_triggered([_seq_block([1, 0, 0], 0)])
+        src.data_triggered([_seq_block([0, 1, 1], 3)])
+        out = dst.data_triggered([_seq_block([9] * 6, 0)])
+        assert [_seq_idx(b) for b in out] == [[4]]
+        TriggerHandler.cls_cleanup()
@@ -8,6 +8,7 @@ from nxslib.dev import Device, DeviceChannel
 from nxslib.nxscope import DNxscopeStreamBlock
 
 from nxscli.channelref import ChannelRef
+from nxscli.stream_queue import DStreamSubOpts, StreamQueue
 from nxscli.virtual.errors import VirtualChannelError
 from nxscli.virtual.runtime import VirtualStreamRuntime
 from nxscli.virtual.services import get_runtime
@@ -348,3 +349,42 @@ def test_runtime_stream_unsub_branch_paths() -> None:
 def test_fake_nxscope_stream_unsub_no_match_branch() -> None:
     fake = _FakeNxscope()
     fake.stream_unsub(queue.Queue())
+
+
+def test_runtime_bounded_subscriber_stats() -> None:
+    runtime = VirtualStreamRuntime()
+    fake = _FakeNxscope()
+    runtime.add_virtual_channel(
+        channel_id=0,
+        name="v0",
+        operator="scale_offset",
+        inputs=("0",),
+        params={},
+    )
+    runtime.on_connect(fake)
+    opts = DStreamSubOpts(max_blocks=1)
+    sub = runtime.stream_sub(ChannelRef.virtual(0), opts)
+    assert isinstance(sub, StreamQueue)
+    assert sub.opts is opts
+    sub.BLOCK_SLICE = 0.01
+
+    runtime._physical_subs = {0: queue.Queue()}
+    for i in range(2):
+        runtime._physical_subs[0].put(
+            [DNxscopeStreamBlock(data=np.asarray([[float(i)]]), meta=None)]
+        )
+        # runtime not started, blocked producer gives up on full queue
+        runtime._thread_common()
+
+    stats = runtime.stream_stats()
+    assert len(stats) == 1
+    assert stats[0].channel == "v0"
+    assert stats[0].depth_blocks == 1
+    assert stats[0].stats.dropped_blocks == 1
+    assert stats[0].stats.overflows == 1
+
+    assert runtime.stream_unsub(sub) is True
+    assert sub.closed is True
+    assert runtime.stream_stats() == ()
+    runtime._physical_subs = {}
+    runtime.on_disconnect()